@@ -0,0 +1,73 @@
+"""Benchmarks writing the ISA-JSON of a loaded synthetic archive with
+json.dump and ISAJSONEncoder, for an archive of about n_processes
+processes, and checks whether loading and dumping it again writes the
+same document.
+
+Run it on two revisions to compare encoders.
+
+Usage:
+
+    python -m benchmarks.bench_isajson_dump [n_processes ...]
+"""
+from __future__ import absolute_import
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from isatools import isajson
+from isatools import isatab
+from benchmarks import synthetic
+
+# a source makes a study process and 3 assay processes for each of its 2
+# samples
+_PROCESSES_PER_SOURCE = 8
+
+
+def _dump(investigation, path, **kwargs):
+    start = time.time()
+    with open(path, 'w') as fp:
+        json.dump(investigation, fp, cls=isajson.ISAJSONEncoder, **kwargs)
+    elapsed = time.time() - start
+    with open(path, 'rb') as fp:
+        digest = hashlib.sha1(fp.read()).hexdigest()
+    return elapsed, os.path.getsize(path), digest
+
+
+def _load(i_path):
+    with open(i_path) as fp:
+        return isatab.load(fp)
+
+
+def bench(n_processes):
+    tmp = tempfile.mkdtemp()
+    try:
+        n_sources = max(1, n_processes // _PROCESSES_PER_SOURCE)
+        i_path = synthetic.write_archive(tmp, n_sources)
+        path = os.path.join(tmp, 'i.json')
+        _, _, digest = _dump(_load(i_path), path)
+        investigation = _load(i_path)
+        n_processes = sum(
+            len(study.process_sequence) +
+            sum(len(assay.process_sequence) for assay in study.assays)
+            for study in investigation.studies)
+        elapsed, size, digest_again = _dump(investigation, path)
+        print('{:>8} processes  dump {:6.2f}s {:>10} bytes  '
+              'same document again: {}'.format(
+                n_processes, elapsed, size, digest == digest_again))
+        try:
+            elapsed, size, _ = _dump(investigation, path, compact=True)
+        except TypeError:  # an encoder without compact mode
+            return
+        print('{:>8} processes  dump {:6.2f}s {:>10} bytes  compact'.format(
+            n_processes, elapsed, size))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    for n in [int(x) for x in sys.argv[1:]] or [100000]:
+        bench(n)
@@ -0,0 +1,50 @@
+"""Benchmarks isatab.batch_validate on a batch of synthetic archives,
+comparing a sequential batch with batches validated in a pool of worker
+processes.
+
+Usage:
+
+    python -m benchmarks.bench_isatab_batch_validate [n_archives [n_sources]]
+"""
+from __future__ import absolute_import
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from isatools import isatab
+from benchmarks import synthetic
+
+
+def bench(n_archives, n_sources):
+    tmp = tempfile.mkdtemp()
+    try:
+        tab_dirs = []
+        for i in range(n_archives):
+            tab_dir = os.path.join(tmp, 'archive{}'.format(i))
+            os.mkdir(tab_dir)
+            synthetic.write_archive(tab_dir, n_sources)
+            tab_dirs.append(tab_dir)
+        expected = None
+        for workers in [None] + [
+                x for x in (2, 4, 8) if x <= (os.cpu_count() or 1)]:
+            start = time.time()
+            batch_report = isatab.batch_validate(tab_dirs, workers=workers)
+            elapsed = time.time() - start
+            if expected is None:
+                expected, sequential = batch_report, elapsed
+            elif batch_report != expected:
+                raise AssertionError('batch validation with {} workers gave '
+                                     'different reports'.format(workers))
+            print('{:>4} archives x {:>6} sources  workers {:>4}  {:8.2f}s  '
+                  'speedup {:6.1f}x'.format(
+                    n_archives, n_sources, workers or 1, elapsed,
+                    sequential / elapsed))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    args = [int(x) for x in sys.argv[1:]]
+    bench(args[0] if len(args) > 0 else 16, args[1] if len(args) > 1 else 200)
@@ -0,0 +1,51 @@
+"""Benchmarks isatab.load on synthetic archives, comparing the row by row
+ProcessSequenceFactory with its columnar build mode.
+
+Usage:
+
+    python -m benchmarks.bench_isatab_load [n_sources ...]
+"""
+from __future__ import absolute_import
+import shutil
+import sys
+import tempfile
+import time
+
+from isatools import isatab
+from benchmarks import synthetic
+
+
+def _summary(investigation):
+    study = investigation.studies[0]
+    assay = study.assays[0]
+    return (len(study.sources), len(study.samples),
+            len(study.process_sequence), len(assay.other_material),
+            len(assay.data_files), len(assay.process_sequence))
+
+
+def bench(n_sources, sources_per_pool=1):
+    tmp = tempfile.mkdtemp()
+    try:
+        synthetic.write_archive(tmp, n_sources,
+                                sources_per_pool=sources_per_pool)
+        timings = {}
+        summaries = {}
+        for columnar in (False, True):
+            start = time.time()
+            summaries[columnar] = _summary(isatab.load(tmp, columnar=columnar))
+            timings[columnar] = time.time() - start
+        if summaries[False] != summaries[True]:
+            raise AssertionError('columnar load built a different graph: '
+                                 '{} != {}'.format(summaries[True],
+                                                   summaries[False]))
+        print('{:>8} sources  row-by-row {:8.2f}s  columnar {:8.2f}s  '
+              'speedup {:6.1f}x'.format(
+                n_sources, timings[False], timings[True],
+                timings[False] / timings[True]))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    for n in [int(x) for x in sys.argv[1:]] or [100, 500, 1000]:
+        bench(n)
@@ -0,0 +1,53 @@
+"""Benchmarks isatab.load on a synthetic archive with many assay tables,
+comparing a sequential load with loads parsing the assay tables in a pool
+of worker processes.
+
+Usage:
+
+    python -m benchmarks.bench_isatab_parallel [n_assays [n_sources]]
+"""
+from __future__ import absolute_import
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from isatools import isatab
+from benchmarks import synthetic
+
+
+def _summary(investigation):
+    study = investigation.studies[0]
+    return [(len(assay.samples), len(assay.other_material),
+             len(assay.data_files), len(assay.process_sequence))
+            for assay in study.assays]
+
+
+def bench(n_assays, n_sources, columnar=True):
+    tmp = tempfile.mkdtemp()
+    try:
+        synthetic.write_archive(tmp, n_sources, n_assays=n_assays)
+        expected = None
+        for workers in [None] + [
+                x for x in (2, 4, 8) if x <= (os.cpu_count() or 1)]:
+            start = time.time()
+            summary = _summary(isatab.load(
+                tmp, columnar=columnar, workers=workers))
+            elapsed = time.time() - start
+            if expected is None:
+                expected, sequential = summary, elapsed
+            elif summary != expected:
+                raise AssertionError('parallel load with {} workers built a '
+                                     'different graph'.format(workers))
+            print('{:>4} assays x {:>6} sources  workers {:>4}  {:8.2f}s  '
+                  'speedup {:6.1f}x'.format(
+                    n_assays, n_sources, workers or 1, elapsed,
+                    sequential / elapsed))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    args = [int(x) for x in sys.argv[1:]]
+    bench(args[0] if len(args) > 0 else 24, args[1] if len(args) > 1 else 2000)
@@ -0,0 +1,85 @@
+"""Benchmarks the end-to-end path enumeration behind the ISA-Tab table
+writers on synthetic pooled designs, comparing it with running networkx's
+all_simple_paths for every start and end node pair, and times isatab.dump.
+
+Usage:
+
+    python -m benchmarks.bench_isatab_paths [n_sources sources_per_pool samples_per_source ...]
+"""
+from __future__ import absolute_import
+import shutil
+import sys
+import tempfile
+import time
+
+import networkx as nx
+
+from isatools import isatab
+from isatools.model import *
+from benchmarks import synthetic
+
+
+def all_simple_paths_per_pair(G, start_nodes):
+    """The path enumeration the table writers used before _EndToEndPaths"""
+    paths = []
+    for start in start_nodes:
+        if isinstance(start, Source):
+            ends = [x for x in nx.algorithms.descendants(G, start)
+                    if isinstance(x, Sample) and len(G.out_edges(x)) == 0]
+        elif isinstance(start, Sample):
+            ends = [x for x in nx.algorithms.descendants(G, start)
+                    if isinstance(x, Process) and x.next_process is None]
+        else:
+            ends = []
+        for end in ends:
+            paths += list(nx.algorithms.all_simple_paths(G, start, end))
+    return paths
+
+
+def _timed(f, *args):
+    start = time.time()
+    result = f(*args)
+    return result, time.time() - start
+
+
+def bench(n_sources, sources_per_pool, samples_per_source):
+    tmp = tempfile.mkdtemp()
+    out = tempfile.mkdtemp()
+    try:
+        synthetic.write_archive(tmp, n_sources,
+                                samples_per_source=samples_per_source,
+                                sources_per_pool=sources_per_pool)
+        investigation = isatab.load(tmp, columnar=True)
+        study = investigation.studies[0]
+        timings = [0.0, 0.0]
+        n_paths = 0
+        for obj, kind in [(study, Source), (study.assays[0], Sample)]:
+            start_nodes = [x for x in obj.graph.nodes()
+                           if isinstance(x, kind)]
+            old, old_time = _timed(
+                all_simple_paths_per_pair, obj.graph, start_nodes)
+            new, new_time = _timed(
+                lambda: list(isatab._EndToEndPaths(obj.graph, start_nodes)))
+            if sorted(tuple(map(id, x)) for x in old) != \
+                    sorted(tuple(map(id, x)) for x in new):
+                raise AssertionError('different paths')
+            timings[0] += old_time
+            timings[1] += new_time
+            n_paths += len(new)
+        _, dump_time = _timed(isatab.dump, investigation, out)
+        print('{:>6} sources, pools of {:>4}, {:>4} samples each: {:>8} paths  '
+              'all_simple_paths {:8.2f}s  _EndToEndPaths {:8.2f}s  '
+              'dump {:8.2f}s'.format(
+                n_sources, sources_per_pool, samples_per_source, n_paths,
+                timings[0], timings[1], dump_time))
+    finally:
+        shutil.rmtree(tmp)
+        shutil.rmtree(out)
+
+
+if __name__ == '__main__':
+    args = [int(x) for x in sys.argv[1:]]
+    designs = [args[i:i + 3] for i in range(0, len(args) - 2, 3)] or [
+        (2000, 1, 2), (2000, 20, 2), (100, 100, 50), (200, 200, 100)]
+    for design in designs:
+        bench(*design)
@@ -0,0 +1,51 @@
+"""Benchmarks isatab.validate on synthetic archives, timing it and counting
+how many times each file of the archive is opened.
+
+Run it on two revisions to compare validation runs.
+
+Usage:
+
+    python -m benchmarks.bench_isatab_validate [n_sources ...]
+"""
+from __future__ import absolute_import
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from isatools import isatab
+from benchmarks import synthetic
+
+
+_opens = {}
+
+
+def _count_opens(event, args):
+    if event == 'open' and isinstance(args[0], str):
+        _opens[args[0]] = _opens.get(args[0], 0) + 1
+
+
+def bench(n_sources):
+    tmp = tempfile.mkdtemp()
+    try:
+        i_path = synthetic.write_archive(tmp, n_sources)
+        _opens.clear()
+        start = time.time()
+        with open(i_path, encoding='utf-8') as fp:
+            report = isatab.validate(fp)
+        elapsed = time.time() - start
+        opens = sorted((os.path.basename(k), v) for k, v in _opens.items()
+                       if os.path.dirname(k) == tmp)
+        print('{:>8} sources  {:8.2f}s  {} errors  {} warnings  opens: {}'
+              .format(n_sources, elapsed, len(report['errors']),
+                      len(report['warnings']),
+                      ', '.join('{} x{}'.format(*x) for x in opens)))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    sys.addaudithook(_count_opens)
+    for n in [int(x) for x in sys.argv[1:]] or [100, 500, 1000]:
+        bench(n)
@@ -0,0 +1,55 @@
+"""Benchmarks converting the ISA-JSON of a synthetic archive of about
+n_processes processes to ISA-Tab with json2isatab.convert, without and
+with validating it first, and prints the time spent in each stage.
+
+Usage:
+
+    python -m benchmarks.bench_json2isatab [n_processes ...]
+"""
+from __future__ import absolute_import
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from isatools import isajson
+from isatools import isatab
+from isatools.convert import json2isatab
+from benchmarks import synthetic
+
+# a source makes a study process and 3 assay processes for each of its 2
+# samples
+_PROCESSES_PER_SOURCE = 8
+
+
+def bench(n_processes):
+    tmp = tempfile.mkdtemp()
+    try:
+        n_sources = max(1, n_processes // _PROCESSES_PER_SOURCE)
+        i_path = synthetic.write_archive(tmp, n_sources)
+        with open(i_path) as fp:
+            investigation = isatab.load(fp)
+        json_dir = os.path.join(tmp, 'json')
+        os.makedirs(json_dir)
+        json_path = os.path.join(json_dir, 'i.json')
+        with open(json_path, 'w') as fp:
+            json.dump(investigation, fp, cls=isajson.ISAJSONEncoder)
+        for validate_first in (False, True):
+            out = tempfile.mkdtemp(dir=tmp)
+            start = time.time()
+            with open(json_path) as fp:
+                timings = json2isatab.convert(fp, out, validate_first=validate_first, timings=True)
+            print('{:>8} processes  convert {:6.2f}s  {}'.format(
+                n_processes, time.time() - start,
+                'validated first' if validate_first else 'not validated'))
+            for timing in timings or []:
+                print('{:>28} {:6.2f}s'.format(timing['stage'], timing['seconds']))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    for n in [int(x) for x in sys.argv[1:]] or [10000]:
+        bench(n)
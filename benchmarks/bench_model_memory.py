@@ -0,0 +1,64 @@
+"""Benchmarks the memory taken by the model objects of a loaded synthetic
+archive, in bytes per graph node, before and after building the study and
+assay graphs, with and without an annotation pool.
+
+Run it on two revisions to compare model representations.
+
+Usage:
+
+    python -m benchmarks.bench_model_memory [n_sources ...]
+"""
+from __future__ import absolute_import
+import gc
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+from isatools import isatab
+from isatools.model import OntologyAnnotationPool
+from benchmarks import synthetic
+
+
+def _count_nodes(investigation):
+    count = 0
+    for study in investigation.studies:
+        count += len(study.sources) + len(study.samples) + \
+            len(study.process_sequence)
+        for assay in study.assays:
+            count += len(assay.other_material) + len(assay.data_files) + \
+                len(assay.process_sequence)
+    return count
+
+
+def bench(n_sources, pooled=False):
+    tmp = tempfile.mkdtemp()
+    try:
+        synthetic.write_archive(tmp, n_sources)
+        gc.collect()
+        tracemalloc.start()
+        start = tracemalloc.get_traced_memory()[0]
+        investigation = isatab.load(
+            tmp, annotation_pool=OntologyAnnotationPool() if pooled else None)
+        gc.collect()
+        loaded = tracemalloc.get_traced_memory()[0] - start
+        for study in investigation.studies:  # graphs are cached on them
+            study.graph
+            for assay in study.assays:
+                assay.graph
+        gc.collect()
+        with_graphs = tracemalloc.get_traced_memory()[0] - start
+        tracemalloc.stop()
+        n_nodes = _count_nodes(investigation)
+        print('{:>8} sources {:>8} nodes {:>8}  loaded {:8.0f} bytes/node  '
+              'with graphs {:8.0f} bytes/node'.format(
+                n_sources, n_nodes, 'pooled' if pooled else 'unpooled',
+                loaded / n_nodes, with_graphs / n_nodes))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    for n in [int(x) for x in sys.argv[1:]] or [1000, 5000]:
+        bench(n)
+        bench(n, pooled=True)
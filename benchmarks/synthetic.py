@@ -0,0 +1,124 @@
+"""Synthetic ISA-Tab archives for the benchmarks in this directory.
+
+The archives follow the usual metabolomics layout, i.e. a study table of
+Source Name -> sample collection -> Sample Name and an assay table of
+Sample Name -> extraction -> Extract Name -> labeling -> Labeled Extract Name
+-> mass spectrometry -> MS Assay Name -> Raw Spectral Data File, with
+characteristics, factor values, parameter values and comments on the way.
+"""
+from __future__ import absolute_import
+import os
+
+from isatools import isatab
+from isatools.model import *
+
+
+STUDY_HEADER = [
+    'Source Name', 'Characteristics[organism]', 'Term Source REF',
+    'Term Accession Number', 'Characteristics[age]', 'Unit',
+    'Term Source REF', 'Term Accession Number', 'Protocol REF',
+    'Parameter Value[sampling time]', 'Unit', 'Term Source REF',
+    'Term Accession Number', 'Comment[collector]', 'Sample Name',
+    'Characteristics[organism part]', 'Term Source REF',
+    'Term Accession Number', 'Factor Value[dose]', 'Term Source REF',
+    'Term Accession Number']
+
+ASSAY_HEADER = [
+    'Sample Name', 'Protocol REF', 'Extract Name', 'Protocol REF',
+    'Labeled Extract Name', 'Label', 'Term Source REF',
+    'Term Accession Number', 'Protocol REF', 'Parameter Value[instrument]',
+    'Term Source REF', 'Term Accession Number', 'Parameter Value[scan polarity]',
+    'MS Assay Name', 'Raw Spectral Data File', 'Comment[checksum]']
+
+
+def _investigation(study_filename, assay_filenames):
+    obi = OntologySource(name='OBI')
+    uo = OntologySource(name='UO')
+    ncbitaxon = OntologySource(name='NCBITAXON')
+    investigation = Investigation(identifier='SYN1')
+    investigation.ontology_source_references = [obi, uo, ncbitaxon]
+    study = Study(filename=study_filename, identifier='SYN1-S1')
+    study.protocols = [
+        Protocol(name='sample collection', protocol_type=OntologyAnnotation(
+            term='sample collection'), parameters=[ProtocolParameter(
+                parameter_name=OntologyAnnotation(term='sampling time'))]),
+        Protocol(name='extraction', protocol_type=OntologyAnnotation(
+            term='extraction')),
+        Protocol(name='labeling', protocol_type=OntologyAnnotation(
+            term='labeling')),
+        Protocol(name='mass spectrometry', protocol_type=OntologyAnnotation(
+            term='mass spectrometry'), parameters=[
+                ProtocolParameter(parameter_name=OntologyAnnotation(
+                    term='instrument')),
+                ProtocolParameter(parameter_name=OntologyAnnotation(
+                    term='scan polarity'))])]
+    study.factors = [StudyFactor(name='dose', factor_type=OntologyAnnotation(
+        term='dose'))]
+    study.assays = [Assay(
+        filename=assay_filename,
+        measurement_type=OntologyAnnotation(term='metabolite profiling'),
+        technology_type=OntologyAnnotation(term='mass spectrometry'))
+        for assay_filename in assay_filenames]
+    investigation.studies = [study]
+    return investigation
+
+
+def study_rows(n_sources, samples_per_source=2, sources_per_pool=1):
+    """Yields study table rows. With sources_per_pool > 1, consecutive
+    sources are pooled into the same samples."""
+    for i in range(n_sources):
+        pool = i // sources_per_pool
+        for j in range(samples_per_source):
+            yield [
+                'source{}'.format(i), 'Homo sapiens' if i % 2 else 'Mus musculus',
+                'NCBITAXON', 'http://purl.obolibrary.org/obo/NCBITaxon_9606',
+                str(20 + i % 50), 'year', 'UO',
+                'http://purl.obolibrary.org/obo/UO_0000036',
+                'sample collection', str(j), 'hour', 'UO',
+                'http://purl.obolibrary.org/obo/UO_0000032',
+                'collector{}'.format(i % 3),
+                'sample{}-{}'.format(pool, j), 'blood', 'OBI', '',
+                'dose{}'.format(pool % 4), '', '']
+
+
+def assay_rows(n_sources, samples_per_source=2, sources_per_pool=1,
+               extracts_per_sample=1):
+    """Yields assay table rows for the samples of study_rows"""
+    for pool in range(-(-n_sources // sources_per_pool)):
+        for j in range(samples_per_source):
+            sample = 'sample{}-{}'.format(pool, j)
+            for k in range(extracts_per_sample):
+                extract = '{}.e{}'.format(sample, k)
+                yield [
+                    sample, 'extraction', extract, 'labeling',
+                    extract + '.le', 'biotin', 'OBI', '',
+                    'mass spectrometry', 'Q-TOF', 'OBI', '',
+                    'positive' if k % 2 == 0 else 'negative',
+                    extract + '.run', extract + '.mzML', 'md5-' + extract]
+
+
+def _write_table(path, header, rows):
+    with open(path, 'w', encoding='utf-8') as fp:
+        fp.write('\t'.join('"{}"'.format(x) for x in header) + '\n')
+        for row in rows:
+            fp.write('\t'.join('"{}"'.format(x) for x in row) + '\n')
+
+
+def write_archive(output_dir, n_sources, samples_per_source=2,
+                  sources_per_pool=1, extracts_per_sample=1, n_assays=1):
+    """Writes a synthetic ISA-Tab archive to output_dir and returns the path
+    to its investigation file. With n_assays > 1, the study has that many
+    copies of the assay table."""
+    assay_filenames = ['a_synthetic.txt'] + [
+        'a_synthetic_{}.txt'.format(i) for i in range(1, n_assays)]
+    investigation = _investigation('s_synthetic.txt', assay_filenames)
+    isatab.dump(investigation, output_dir, skip_dump_tables=True)
+    _write_table(
+        os.path.join(output_dir, 's_synthetic.txt'), STUDY_HEADER,
+        study_rows(n_sources, samples_per_source, sources_per_pool))
+    for assay_filename in assay_filenames:
+        _write_table(
+            os.path.join(output_dir, assay_filename), ASSAY_HEADER,
+            assay_rows(n_sources, samples_per_source, sources_per_pool,
+                       extracts_per_sample))
+    return os.path.join(output_dir, 'i_investigation.txt')
@@ -2,7 +2,6 @@ import json
 import os
 from os.path import join
 from isatools.io.isatab_parser import parse
-from jsonschema import RefResolver, Draft4Validator
 from uuid import uuid4
 from enum import Enum
 import re
@@ -11,6 +10,7 @@ import logging
 
 from isatools import config
 from isatools import isatab
+from isatools.io import json_schemas
 from isatools.isajson import ISAJSONEncoder
 
 logging.basicConfig(level=config.log_level)
@@ -131,14 +131,10 @@ class ISATab2ISAjson_v1:
                     ])
 
                 # validate json
-                with open(join(SCHEMAS_PATH, INVESTIGATION_SCHEMA)) as json_fp:
-                    schema = json.load(json_fp)
-                    resolver = RefResolver('file://'+join(SCHEMAS_PATH, INVESTIGATION_SCHEMA), schema)
-                    validator = Draft4Validator(schema, resolver=resolver)
-                    validator.validate(isa_json, schema)
-
-                    log.info("Conversion finished")
-                    return isa_json
+                json_schemas.get_validator(join(SCHEMAS_PATH, INVESTIGATION_SCHEMA)).validate(isa_json)
+
+                log.info("Conversion finished")
+                return isa_json
 
     def createComments(self, isadict):
         comments = []
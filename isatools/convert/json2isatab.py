@@ -1,6 +1,7 @@
 import os
 import shutil
 import logging
+import time
 
 from isatools import config
 from isatools import isajson
@@ -11,13 +12,18 @@ log = logging.getLogger(__name__)
 
 
 def convert(json_fp, path, i_file_name='i_investigation.txt', config_dir=isajson.default_config_dir,
-            validate_first=True):
-    """ Converter for ISA JSON to ISA Tab. Currently only converts investigation file contents
+            validate_first=True, timings=False):
+    """ Converter for ISA JSON to ISA Tab. The JSON is parsed once; when validated first, the Investigation
+    loaded by the validator is reused, and the table rows follow the processSequence links of the loaded
+    processes.
     :param json_fp: File pointer to ISA JSON input
     :param path: Directory to ISA tab output
     :param i_file_name: Investigation file name, default is i_investigation.txt
     :param config_dir: Directory to config directory
     :param validate_first: Validate JSON before conversion, default is True
+    :param timings: Return the seconds spent in each stage as a list of {"stage", "seconds"} dicts,
+    default is False
+    :return: None, or the stage timings if timings is True and the conversion went ahead
 
     Example usage:
         Read from a JSON and write to an investigation file, make sure to create/open relevant
@@ -29,24 +35,48 @@ def convert(json_fp, path, i_file_name='i_investigation.txt', config_dir=isajson
         json2isatab.convert(json_file, path)
 
     """
+    stage_timings = list()
+
+    def timed(stage, f, *args, **kwargs):
+        start = time.time()
+        result = f(*args, **kwargs)
+        seconds = time.time() - start
+        log.info("%s took %.3fs", stage, seconds)
+        stage_timings.append({"stage": stage, "seconds": seconds})
+        return result
+
+    isa_json = isa_obj = None
     if validate_first:
         log.info("Validating input JSON before conversion")
-        report = isajson.validate(fp=json_fp, config_dir=config_dir, log_level=logging.ERROR)
+        report, isa_json, isa_obj = timed("validate", isajson._validate, fp=json_fp, config_dir=config_dir,
+                                          log_level=logging.ERROR)
         if len(report['errors']) > 0:
             log.fatal("Could not proceed with conversion as there are some fatal validation errors. Check log.")
             return
-        json_fp.seek(0)  # reset file pointer after validation
-    log.info("Loading ISA-JSON from %s", json_fp.name)
-    isa_obj = isajson.load(fp=json_fp)
+    if isa_obj is None:
+        if isa_json is None:
+            log.info("Loading ISA-JSON from %s", json_fp.name)
+            isa_obj = timed("load", isajson.load, fp=json_fp)
+        else:  # validation stopped before loading, but the JSON is already parsed
+            isa_obj = timed("load", isajson.load_dict, isa_json)
     log.info("Dumping ISA-Tab to %s", path)
     log.debug("Using configuration from %s", config_dir)
-    isatab.dump(isa_obj=isa_obj, output_path=path, i_file_name=i_file_name)
+    timed("investigation file", isatab.dump, isa_obj=isa_obj, output_path=path, i_file_name=i_file_name,
+          skip_dump_tables=True)
+    timed("study tables", isatab.write_study_table_files, isa_obj, path)
+    timed("assay tables", isatab.write_assay_table_files, isa_obj, path)
     #  copy data files across from source directory where JSON is located
     log.info("Copying data files from source to target")
-    for file in [f for f in os.listdir(os.path.dirname(json_fp.name))
+    timed("data files", _copy_data_files, os.path.dirname(json_fp.name), path)
+    if timings:
+        return stage_timings
+
+
+def _copy_data_files(source_dir, path):
+    for file in [f for f in os.listdir(source_dir)
                  if not (f.endswith('.txt') and (f.startswith('i_') or f.startswith('s_') or f.startswith('a_'))) and
                  not (f.endswith('.json'))]:
-        filepath = os.path.join(os.path.dirname(json_fp.name), file)
+        filepath = os.path.join(source_dir, file)
         if os.path.isfile(filepath):
             log.debug("Copying %s to %s", filepath, path)
             shutil.copy(filepath, path)
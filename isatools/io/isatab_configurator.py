@@ -16,6 +16,9 @@ from lxml import etree as etree_
 import os
 import glob
 import logging
+import threading
+from bisect import bisect_left
+from bisect import bisect_right
 
 from isatools import config
 
@@ -54,6 +57,106 @@ def get_config(config_dict, measurement_type=None, technology_type=None):
     return sorted_config
 
 
+
+def _index_unique(items, key):
+    index = dict()
+    for item in items:
+        k = key(item)
+        index[k] = None if k in index else item
+    return index
+
+
+class CompiledConfiguration(object):
+    """A table configuration with its fields indexed for the validators.
+
+    It wraps the IsaTabConfigFileType parsed from a configuration file, and
+    looks up on it the attributes it does not have, so that it can be used
+    in place of it.
+    """
+
+    def __init__(self, config_obj):
+        self.config = config_obj
+        table_config = config_obj.get_isatab_configuration()[0]
+        self.fields = list(table_config.get_field())
+        self.protocol_fields = sorted(table_config.get_protocol_field(), key=lambda x: x.pos)
+        self.unit_fields = list(table_config.get_unit_field())
+        self.required_headers = [i.header for i in self.fields if i.is_required]
+        self.list_values = dict()
+        for field in self.fields:
+            if field.data_type is not None and field.data_type.lower().strip() == 'list' \
+                    and field.list_values is not None:
+                self.list_values[field.header] = frozenset(i.lower() for i in field.list_values.split(','))
+        self._fields_by_header = _index_unique(self.fields, lambda x: x.header)
+        self._fields_by_lower_header = _index_unique(self.fields, lambda x: x.header.lower())
+        self._unit_fields_by_pos = _index_unique(self.unit_fields, lambda x: x.pos)
+        self._protocol_positions = [i.pos for i in self.protocol_fields]
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name == 'config':
+            raise AttributeError(name)
+        return getattr(self.config, name)
+
+    def field(self, header):
+        """Returns the field with the given header, or None if there is
+        none or more than one."""
+        return self._fields_by_header.get(header)
+
+    def field_ignoring_case(self, header):
+        """Returns the field whose header matches header ignoring case, or
+        None if there is none or more than one."""
+        return self._fields_by_lower_header.get(header.lower())
+
+    def unit_field(self, pos):
+        """Returns the unit field at position pos, or None if there is none
+        or more than one."""
+        return self._unit_fields_by_pos.get(pos)
+
+    def protocol_fields_between(self, left_pos, right_pos):
+        """Returns the protocol fields positioned strictly between left_pos
+        and right_pos."""
+        return self.protocol_fields[bisect_right(self._protocol_positions, left_pos):
+                                    bisect_left(self._protocol_positions, right_pos)]
+
+
+def compile_config(config_obj):
+    """Returns config_obj as a CompiledConfiguration, compiling it unless it
+    already is one."""
+    if isinstance(config_obj, CompiledConfiguration):
+        return config_obj
+    return CompiledConfiguration(config_obj)
+
+
+_compiled_configs = dict()
+_compiled_configs_lock = threading.Lock()
+
+
+def config_dir_signature(config_dir):
+    """Returns the XML files of config_dir with their modification times,
+    which change whenever a configuration is added, removed or modified."""
+    files = glob.glob(os.path.join(os.path.abspath(config_dir), '*.xml'))
+    return sorted((file, os.stat(file).st_mtime_ns) for file in files)
+
+
+def load_compiled(config_dir):
+    """Loads the configurations of config_dir like load(), compiled with
+    compile_config().
+
+    The configurations are loaded once per process and shared, until an XML
+    file of config_dir is added, removed or modified.
+    """
+    config_dir = os.path.abspath(config_dir)
+    signature = config_dir_signature(config_dir)
+    with _compiled_configs_lock:
+        try:
+            cached_signature, configs = _compiled_configs[config_dir]
+        except KeyError:
+            cached_signature, configs = None, None
+        if cached_signature != signature:
+            configs = dict((k, CompiledConfiguration(v)) for k, v in load(config_dir).items())
+            _compiled_configs[config_dir] = (signature, configs)
+    return dict(configs)
+
+
 Validate_simpletypes_ = True
 
 
@@ -0,0 +1,90 @@
+"""Registry of the JSON Schema validators used to check ISA-JSON.
+
+A schema is read once per process together with the other *.json schemas of
+its directory, which its "$ref"s point to, so that validating against it
+never reads a schema file again. Batch tools can call warm() at startup to
+load the schemas before they start validating.
+"""
+from __future__ import absolute_import
+import glob
+import json
+import logging
+import os
+import pathlib
+import threading
+from jsonschema import Draft4Validator, RefResolver
+
+from isatools import config
+
+logging.basicConfig(level=config.log_level)
+log = logging.getLogger(__name__)
+
+_BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+CORE_INVESTIGATION_SCHEMA = os.path.join(_BASE_DIR, 'resources', 'schemas', 'isa_model_version_1_0_schemas',
+                                         'core', 'investigation_schema.json')
+DEFAULT_CONFIG_INVESTIGATION_SCHEMA = os.path.join(_BASE_DIR, 'resources', 'config', 'json', 'default',
+                                                   'schemas', 'investigation_schema.json')
+
+
+def _signature(schema_path):
+    files = glob.glob(os.path.join(os.path.dirname(schema_path), '*.json'))
+    if schema_path not in files:
+        files.append(schema_path)
+    return sorted((file, os.stat(file).st_mtime_ns) for file in files)
+
+
+def _load_tree(schema_path, signature):
+    store = dict()
+    for file, _ in signature:
+        with open(file) as fp:
+            store[pathlib.Path(file).as_uri()] = json.load(fp)
+    base_uri = pathlib.Path(schema_path).as_uri()
+    return base_uri, store[base_uri], store
+
+
+_schema_trees = dict()
+_schema_trees_lock = threading.Lock()
+_validators = threading.local()
+
+
+def get_validator(schema_path):
+    """Gets a Draft4Validator for the JSON schema at schema_path, resolving
+    its "$ref"s to the schemas of the same directory.
+
+    The schemas are loaded once per process and shared, until a *.json file
+    of the directory is added, removed or modified. As a validator keeps
+    track of the schema it is resolving in while it validates, each thread
+    gets validators of its own, which are reused for its next calls.
+    """
+    schema_path = os.path.abspath(schema_path)
+    signature = _signature(schema_path)
+    validators = getattr(_validators, 'validators', None)
+    if validators is None:
+        validators = _validators.validators = dict()
+    try:
+        cached_signature, validator = validators[schema_path]
+    except KeyError:
+        cached_signature, validator = None, None
+    if cached_signature != signature:
+        with _schema_trees_lock:
+            try:
+                cached_signature, tree = _schema_trees[schema_path]
+            except KeyError:
+                cached_signature, tree = None, None
+            if cached_signature != signature:
+                log.debug('Loading JSON schemas of {}'.format(os.path.dirname(schema_path)))
+                tree = _load_tree(schema_path, signature)
+                _schema_trees[schema_path] = (signature, tree)
+        base_uri, schema, store = tree
+        validator = Draft4Validator(schema, resolver=RefResolver(base_uri, schema, store=store))
+        validators[schema_path] = (signature, validator)
+    return validator
+
+
+def warm(schema_paths=(CORE_INVESTIGATION_SCHEMA, DEFAULT_CONFIG_INVESTIGATION_SCHEMA)):
+    """Loads the schemas at schema_paths into the registry, by default the
+    core ISA-JSON schemas and those of the default JSON configuration.
+    """
+    for schema_path in schema_paths:
+        get_validator(schema_path)
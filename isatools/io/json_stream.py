@@ -0,0 +1,230 @@
+"""Incremental reading of JSON documents.
+
+JSONStream walks a JSON document as it reads it from a file in blocks,
+handing out the members of objects and the elements of arrays one at a
+time, so that only the value being read is held in memory rather than the
+whole document. JSONValue offers the same walk over a value that has
+already been parsed, e.g. with json.load, so that code written against one
+works with the other. Usage:
+
+    stream = JSONStream(fp)
+    for key in stream.items():
+        if key == 'studies':
+            for _ in stream.elements():
+                study_json = stream.value()
+        # the values of the other members are skipped
+"""
+from __future__ import absolute_import
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_CHARS = re.compile(r'[0-9eE.+-]*')
+try:
+    _JSONDecodeError = json.JSONDecodeError
+except AttributeError:  # before Python 3.5, json raises ValueError
+    def _JSONDecodeError(message, doc, pos):
+        return ValueError('{}: char {}'.format(message, pos))
+
+
+class JSONStream(object):
+    """Pull parser over a JSON document read from the file-like object fp,
+    block_size characters at a time.
+
+    The document is walked in order. items() and elements() iterate over
+    the object or array that comes next, and the value of each member or
+    element they hand out must be read with value(), skip(), items() or
+    elements() before moving on; a value that is left unread is skipped.
+    Malformed JSON raises ValueError, json.JSONDecodeError from Python
+    3.5, like json.load does, and iterating over a value that is not an
+    object or array raises TypeError. object_pairs_hook is as for
+    json.load.
+    """
+
+    def __init__(self, fp, block_size=1 << 16, object_pairs_hook=None):
+        self._fp = fp
+        self._block_size = block_size
+        self._decoder = json.JSONDecoder(object_pairs_hook=object_pairs_hook)
+        self._decode_bytes = None
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self._values_read = 0
+
+    def _read(self):
+        """Reads more of the document into the buffer, dropping what has
+        been parsed already, and returns whether there was any left. Each
+        read is at least as long as the text still buffered, so a value
+        spread over several blocks is only parsed again a few times."""
+        if self._eof:
+            return False
+        size = max(self._block_size, len(self._buf) - self._pos)
+        while True:
+            data = self._fp.read(size)
+            if isinstance(data, bytes):
+                if self._decode_bytes is None:
+                    self._decode_bytes = codecs.getincrementaldecoder(
+                        'utf-8')().decode
+                text = self._decode_bytes(data, final=not data)
+            else:
+                text = data
+            if text or not data:
+                break
+        if not text:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def _error(self, message):
+        return _JSONDecodeError(message, self._buf, self._pos)
+
+    def peek(self):
+        """Returns the first character of the value that comes next, or ''
+        at the end of the document"""
+        while True:
+            if self._pos < len(self._buf) and \
+                    self._buf[self._pos] not in ' \t\n\r':
+                return self._buf[self._pos]
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._read():
+                return ''
+
+    def _expect(self, chars, what):
+        char = self.peek()
+        if char == '' or char not in chars:
+            raise self._error('Expecting {}'.format(what))
+        self._pos += 1
+        return char
+
+    def value(self):
+        """Parses the value that comes next and returns it"""
+        self._values_read += 1
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except ValueError:
+                if self._read():
+                    continue
+                raise
+            # a number that runs to the end of the buffer may go on in the
+            # next block
+            if _NUMBER_CHARS.match(self._buf, end).end() == len(self._buf) \
+                    and self._read():
+                continue
+            self._pos = end
+            return value
+
+    def skip(self):
+        """Reads past the value that comes next. An object or array is
+        parsed one member or element at a time, and each is dropped once
+        parsed"""
+        char = self.peek()
+        if char == '{':
+            for _ in self.items():
+                self.value()
+        elif char == '[':
+            for _ in self.elements():
+                self.value()
+        else:
+            self.value()
+
+    def end(self):
+        """Checks that nothing but whitespace is left in the document"""
+        if self.peek() != '':
+            raise self._error('Extra data')
+
+    def _members(self, open_char, close_char, what):
+        self._values_read += 1
+        char = self.peek()
+        if char != open_char and char != '' and char in '{["-0123456789tfn':
+            raise TypeError('Expecting {}, not another JSON value'.format(
+                what))
+        self._expect(open_char, what)
+        if self.peek() == close_char:
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            if open_char == '{':
+                key = self.value()
+                if not isinstance(key, str):
+                    raise self._error(
+                        'Expecting property name enclosed in double quotes')
+                self._expect(':', "':' delimiter")
+            else:
+                key = index
+            values_read = self._values_read
+            yield key
+            if self._values_read == values_read:
+                self.skip()
+            if self._expect(',' + close_char,
+                            "',' delimiter") == close_char:
+                return
+            index += 1
+
+    def items(self):
+        """Iterates over the object that comes next, yielding the key of
+        each of its members"""
+        return self._members('{', '}', 'object')
+
+    def elements(self):
+        """Iterates over the array that comes next, yielding the index of
+        each of its elements"""
+        return self._members('[', ']', 'array')
+
+
+class JSONValue(object):
+    """The walk of a JSONStream over a value that has already been parsed.
+    With object_pairs_hook, the values handed out are copies in which each
+    object is rebuilt by it, as json.load would have"""
+
+    def __init__(self, value, object_pairs_hook=None):
+        self._value = value
+        self._object_pairs_hook = object_pairs_hook
+
+    def peek(self):
+        if isinstance(self._value, dict):
+            return '{'
+        if isinstance(self._value, list):
+            return '['
+        return json.dumps(self._value)[:1]
+
+    def value(self):
+        if self._object_pairs_hook is None:
+            return self._value
+        return _rebuild(self._value, self._object_pairs_hook)
+
+    def skip(self):
+        pass
+
+    def end(self):
+        pass
+
+    def items(self):
+        if not isinstance(self._value, dict):
+            raise TypeError('Expecting object, not another JSON value')
+        for key, value in list(self._value.items()):
+            self._value = value
+            yield key
+
+    def elements(self):
+        if not isinstance(self._value, list):
+            raise TypeError('Expecting array, not another JSON value')
+        for index, value in enumerate(list(self._value)):
+            self._value = value
+            yield index
+
+
+def _rebuild(value, object_pairs_hook):
+    if isinstance(value, dict):
+        return object_pairs_hook([(k, _rebuild(v, object_pairs_hook))
+                                  for k, v in value.items()])
+    if isinstance(value, list):
+        return [_rebuild(v, object_pairs_hook) for v in value]
+    return value
@@ -9,20 +9,30 @@ import json
 import logging
 import os
 import re
+from io import StringIO
 from json import JSONEncoder
-from jsonschema import Draft4Validator, RefResolver, ValidationError
+from jsonschema import ValidationError
 
 from isatools import config
+from isatools.io import json_schemas
+from isatools.io.json_stream import JSONStream
+from isatools.io.json_stream import JSONValue
 from isatools.model import *
+from isatools.validation import ValidationReport
+from isatools.validation import iter_batch
+from isatools.validation import thread_log_handler
 
 __author__ = 'djcomlab@gmail.com (David Johnson)'
 
 logging.basicConfig(level=config.log_level)
 log = logging.getLogger(__name__)
 
-errors = []
-warnings = []
-info = []
+# Findings of the check functions when called without a report, outside of
+# validate()
+_default_report = ValidationReport()
+errors = _default_report.errors
+warnings = _default_report.warnings
+info = _default_report.info
 
 # REGEXES
 _RX_DOI = re.compile("(10[.][0-9]{4,}(?:[.][0-9]+)*/(?:(?![%'#? ])\\S)+)")
@@ -30,7 +40,119 @@ _RX_PMID = re.compile("[0-9]{8}")
 _RX_PMCID = re.compile("PMC[0-9]{8}")
 
 
-def load(fp):
+# the members of studies and assays that are read one element at a time
+_STREAMED_STUDY_KEYS = ('materials', 'processSequence')
+_STREAMED_ASSAY_KEYS = ('materials', 'dataFiles', 'processSequence')
+
+# the members that ISAJSONEncoder(compact=True) leaves out when empty
+_ARRAY_MEMBERS = frozenset([
+    "assays", "characteristicCategories", "characteristics", "comments", "components", "dataFiles", "factorValues",
+    "factors", "inputs", "ontologySourceReferences", "otherMaterials", "outputs", "parameterValues", "parameters",
+    "people", "processSequence", "protocols", "publications", "roles", "samples", "sources", "studies",
+    "studyDesignDescriptors", "unitCategories"])
+_STRING_MEMBERS = frozenset([
+    "address", "affiliation", "annotationValue", "authorList", "date", "description", "doi", "email", "factorName",
+    "fax", "file", "filename", "firstName", "identifier", "lastName", "midInitials", "name", "performer", "phone",
+    "pubMedID", "publicReleaseDate", "submissionDate", "technologyPlatform", "termAccession", "termSource", "title",
+    "type", "uri", "value", "version"])
+
+
+class _ISAJSONObject(dict):
+    """A JSON object of an ISA-JSON document, in which the members left out
+    by ISAJSONEncoder(compact=True) read as empty"""
+
+    def __missing__(self, key):
+        if key in _ARRAY_MEMBERS:
+            return []
+        if key in _STRING_MEMBERS:
+            return ''
+        if key == "materials":
+            return _ISAJSONObject()
+        raise KeyError(key)
+
+
+def load(fp, annotation_pool=None):
+    """Loads an ISA-JSON document into an Investigation object.
+
+    annotation_pool, when given, is an OntologyAnnotationPool from which the
+    ontology sources and the ontology annotation values of characteristics,
+    factor values and parameter values are taken, so that repeated terms
+    share a single instance.
+
+    The document is read as a stream, twice: first for all but the
+    materials, data files and process sequences of its studies and assays,
+    then for those, whose objects are built one JSON element at a time. The
+    parsed JSON of the whole document is never held in memory. A file that
+    cannot be seeked back is parsed whole with json.load instead.
+
+    Members left out of the document as ISAJSONEncoder(compact=True) does
+    are read as empty.
+    """
+    if hasattr(fp, 'seekable') and fp.seekable():
+        start = fp.tell()
+        investigation_json = _read_skeleton(JSONStream(fp, object_pairs_hook=_ISAJSONObject))
+        fp.seek(start)
+        return _load(investigation_json, JSONStream(fp, object_pairs_hook=_ISAJSONObject), annotation_pool)
+    return load_dict(json.load(fp), annotation_pool=annotation_pool)
+
+
+def load_dict(isa_json, annotation_pool=None):
+    """Loads an ISA-JSON document already parsed, e.g. with json.load, into
+    an Investigation object, as load() does"""
+    return _load(_read_skeleton(JSONValue(isa_json, object_pairs_hook=_ISAJSONObject)),
+                 JSONValue(isa_json, object_pairs_hook=_ISAJSONObject), annotation_pool)
+
+
+def _read_skeleton(stream):
+    """Reads an ISA-JSON document but for the members of its studies and
+    assays in _STREAMED_STUDY_KEYS and _STREAMED_ASSAY_KEYS, which are
+    skipped"""
+    investigation_json = _ISAJSONObject()
+    for key in stream.items():
+        if key != "studies":
+            investigation_json[key] = stream.value()
+            continue
+        investigation_json[key] = list()
+        for _ in stream.elements():
+            study_json = _ISAJSONObject()
+            for study_key in stream.items():
+                if study_key in _STREAMED_STUDY_KEYS:
+                    stream.skip()
+                elif study_key == "assays":
+                    study_json[study_key] = list()
+                    for __ in stream.elements():
+                        assay_json = _ISAJSONObject()
+                        for assay_key in stream.items():
+                            if assay_key in _STREAMED_ASSAY_KEYS:
+                                stream.skip()
+                            else:
+                                assay_json[assay_key] = stream.value()
+                        study_json[study_key].append(assay_json)
+                else:
+                    study_json[study_key] = stream.value()
+            investigation_json[key].append(study_json)
+    stream.end()
+    return investigation_json
+
+
+def _load(investigation_json, stream, annotation_pool=None):
+    """Builds an Investigation from the skeleton of an ISA-JSON document,
+    as read by _read_skeleton, and a stream over the whole document for
+    the materials, data files and process sequences of its studies and
+    assays.
+
+    Objects are built in the same order as if the document was walked in
+    the order of the ISA-JSON spec, whatever the order of its members. A
+    node or process referred to before it is declared is looked up at the
+    end of its study instead.
+    """
+
+    if annotation_pool is None:
+        new_annotation = OntologyAnnotation
+        new_ontology_source = OntologySource
+    else:
+        new_annotation = annotation_pool.annotation
+        new_ontology_source = annotation_pool.source
 
     def get_comments(j):
         comments = []
@@ -54,13 +176,82 @@ def load(fp):
                 roles.append(role)
         return roles
 
-    def get_jvalue(dict, key):
-        if key in dict.keys():
-            return dict[key]
-        else:
-            return None
+    def get_characteristic_category(characteristic_category_json):
+        return OntologyAnnotation(
+            id_=characteristic_category_json["@id"],
+            term=characteristic_category_json["characteristicType"]["annotationValue"],
+            term_source=term_source_dict[characteristic_category_json["characteristicType"]["termSource"]],
+            term_accession=characteristic_category_json["characteristicType"]["termAccession"],
+        )
+
+    def get_unit(unit_json):
+        return OntologyAnnotation(id_=unit_json["@id"],
+                                  term=unit_json["annotationValue"],
+                                  term_source=term_source_dict[unit_json["termSource"]],
+                                  term_accession=unit_json["termAccession"])
+
+    def get_nodes(ids, node_dicts):
+        """Looks up nodes by id, a later dict taking precedence over an
+        earlier one, with None for those not found"""
+        nodes = []
+        for id_ in ids:
+            node = None
+            for node_dict in node_dicts:
+                node = node_dict.get(id_, node)
+            nodes.append(node)
+        return nodes
+
+    def add_nodes(process_nodes, nodes_json, node_dicts, message):
+        """Adds the nodes of nodes_json to process_nodes, at the end of the
+        study if some of them are not declared yet"""
+        ids = [node_json["@id"] for node_json in nodes_json]
+
+        def add(final):
+            nodes = get_nodes(ids, node_dicts)
+            for id_, node in zip(ids, nodes):
+                if node is None:
+                    if final:
+                        raise IOError(message + id_)
+                    return False
+            for node in nodes:
+                process_nodes.append(node)
+            return True
+
+        if not add(False):
+            pending.append(add)
+
+    def add_links(process_dict, links):
+        """Links the processes of a process sequence to their previous and
+        next processes, the links being (process id, previous process id,
+        next process id) with None for a link that is not given"""
+        for process_id, prev_proc, next_proc in links:
+            try:
+                process_dict[process_id].prev_process = process_dict[prev_proc]
+            except KeyError:
+                pass
+            try:
+                process_dict[process_id].next_process = process_dict[next_proc]
+            except KeyError:
+                pass
+
+    def get_link(process_json):
+        link = [process_json["@id"]]
+        for key in ("previousProcess", "nextProcess"):
+            try:
+                link.append(process_json[key]["@id"])
+            except KeyError:
+                link.append(None)
+        return tuple(link)
+
+    def get_parameter_value_value(parameter_value_json):
+        try:
+            return new_annotation(
+                term=parameter_value_json["value"]["annotationValue"],
+                term_accession=parameter_value_json["value"]["termAccession"],
+                term_source=term_source_dict[parameter_value_json["value"]["termSource"]],)
+        except TypeError:
+            return parameter_value_json["value"]
 
-    investigation_json = json.load(fp)
     investigation = Investigation(
         identifier=investigation_json["identifier"],
         title=investigation_json["title"],
@@ -71,7 +262,7 @@ def load(fp):
     investigation.comments = get_comments(investigation_json)
     term_source_dict = {"": None}
     for ontologySourceReference_json in investigation_json["ontologySourceReferences"]:
-        ontology_source_reference = OntologySource(
+        ontology_source_reference = new_ontology_source(
             name=ontologySourceReference_json["name"],
             file=ontologySourceReference_json["file"],
             version=ontologySourceReference_json["version"],
@@ -129,16 +320,11 @@ def load(fp):
     for study_json in investigation_json["studies"]:
         for assay_json in study_json["assays"]:
             for assay_characteristics_category_json in assay_json["characteristicCategories"]:
-                characteristic_category = OntologyAnnotation(
-                    id_=assay_characteristics_category_json["@id"],
-                    term=assay_characteristics_category_json["characteristicType"]["annotationValue"],
-                    term_source=term_source_dict[assay_characteristics_category_json["characteristicType"]["termSource"]],
-                    term_accession=assay_characteristics_category_json["characteristicType"]["termAccession"],
-                )
+                characteristic_category = get_characteristic_category(assay_characteristics_category_json)
                 # study.characteristic_categories.append(characteristic_category)
                 categories_dict[characteristic_category.id] = characteristic_category
-    for study_json in investigation_json["studies"]:
-        process_dict = dict()
+
+    def begin_study(study_json):
         study = Study(
             identifier=study_json["identifier"],
             title=study_json["title"],
@@ -152,19 +338,11 @@ def load(fp):
         except KeyError:
             pass
         for study_characteristics_category_json in study_json["characteristicCategories"]:
-            characteristic_category = OntologyAnnotation(
-                id_=study_characteristics_category_json["@id"],
-                term=study_characteristics_category_json["characteristicType"]["annotationValue"],
-                term_source=term_source_dict[study_characteristics_category_json["characteristicType"]["termSource"]],
-                term_accession=study_characteristics_category_json["characteristicType"]["termAccession"],
-            )
+            characteristic_category = get_characteristic_category(study_characteristics_category_json)
             study.characteristic_categories.append(characteristic_category)
             categories_dict[characteristic_category.id] = characteristic_category
         for study_unit_json in study_json["unitCategories"]:
-            unit = OntologyAnnotation(id_=study_unit_json["@id"],
-                                      term=study_unit_json["annotationValue"],
-                                      term_source=term_source_dict[study_unit_json["termSource"]],
-                                      term_accession=study_unit_json["termAccession"])
+            unit = get_unit(study_unit_json)
             units_dict[unit.id] = unit
             study.units.append(unit)
         for study_publication_json in study_json["publications"]:
@@ -256,356 +434,661 @@ def load(fp):
             )
             study.factors.append(factor)
             factors_dict[factor.id] = factor
-        for source_json in study_json["materials"]["sources"]:
-            source = Source(
-                id_=source_json["@id"],
-                name=source_json["name"][7:],
-            )
-            for characteristic_json in source_json["characteristics"]:
-                value = characteristic_json["value"]
-                unit = None
-                characteristic = Characteristic(category=categories_dict[characteristic_json["category"]["@id"]])
-                if isinstance(value, dict):
-                    try:
-                        term = characteristic_json["value"]["annotationValue"]
-                        if isinstance(term, (int, float)):
-                            term = str(term)
-                        value = OntologyAnnotation(
-                            term=term,
-                            term_source=term_source_dict[characteristic_json["value"]["termSource"]],
-                            term_accession=characteristic_json["value"]["termAccession"])
-                    except KeyError:
-                        raise IOError("Can't create value as annotation")
-                elif isinstance(value, (int, float)):
-                    try:
-                        unit = units_dict[characteristic_json["unit"]["@id"]]
-                    except KeyError:
-                        unit = None
-                elif not isinstance(value, str):
-                    raise IOError("Unexpected type in characteristic value")
-                characteristic.value = value
-                characteristic.unit = unit
-                source.characteristics.append(characteristic)
-            sources_dict[source.id] = source
-            study.sources.append(source)
-        for sample_json in study_json["materials"]["samples"]:
-            sample = Sample(
-                id_=sample_json["@id"],
-                name=sample_json["name"][7:]
-            )
-            for characteristic_json in sample_json["characteristics"]:
-                value = characteristic_json["value"]
-                unit = None
-                characteristic = Characteristic(
-                        category=categories_dict[characteristic_json["category"]["@id"]])
-                if isinstance(value, dict):
-                    try:
-                        value = OntologyAnnotation(
-                            term=characteristic_json["value"]["annotationValue"],
-                            term_source=term_source_dict[characteristic_json["value"]["termSource"]],
-                            term_accession=characteristic_json["value"]["termAccession"])
-                    except KeyError:
-                        raise IOError("Can't create value as annotation")
-                elif isinstance(value, int) or isinstance(value, float):
-                    try:
-                        unit = units_dict[characteristic_json["unit"]["@id"]]
-                    except KeyError:
-                        raise IOError("Can't create unit annotation")
-                elif not isinstance(value, str):
-                    raise IOError("Unexpected type in characteristic value")
-                characteristic.value = value
-                characteristic.unit = unit
-                sample.characteristics.append(characteristic)
-            for factor_value_json in sample_json["factorValues"]:
+        return study
+
+    def add_source(study, source_json):
+        source = Source(
+            id_=source_json["@id"],
+            name=source_json["name"][7:],
+        )
+        for characteristic_json in source_json["characteristics"]:
+            value = characteristic_json["value"]
+            unit = None
+            characteristic = Characteristic(category=categories_dict[characteristic_json["category"]["@id"]])
+            if isinstance(value, dict):
                 try:
-                    factor_value = FactorValue(
-                        factor_name=factors_dict[factor_value_json["category"]["@id"]],
-                        value=OntologyAnnotation(
-                            term=factor_value_json["value"]["annotationValue"],
-                            term_accession=factor_value_json["value"]["termAccession"],
-                            term_source=term_source_dict[factor_value_json["value"]["termSource"]],
-                        ),
+                    term = characteristic_json["value"]["annotationValue"]
+                    if isinstance(term, (int, float)):
+                        term = str(term)
+                    value = new_annotation(
+                        term=term,
+                        term_source=term_source_dict[characteristic_json["value"]["termSource"]],
+                        term_accession=characteristic_json["value"]["termAccession"])
+                except KeyError:
+                    raise IOError("Can't create value as annotation")
+            elif isinstance(value, (int, float)):
+                try:
+                    unit = units_dict[characteristic_json["unit"]["@id"]]
+                except KeyError:
+                    unit = None
+            elif not isinstance(value, str):
+                raise IOError("Unexpected type in characteristic value")
+            characteristic.value = value
+            characteristic.unit = unit
+            source.characteristics.append(characteristic)
+        sources_dict[source.id] = source
+        study.sources.append(source)
+
+    def add_sample(study, sample_json):
+        sample = Sample(
+            id_=sample_json["@id"],
+            name=sample_json["name"][7:]
+        )
+        for characteristic_json in sample_json["characteristics"]:
+            value = characteristic_json["value"]
+            unit = None
+            characteristic = Characteristic(
+                    category=categories_dict[characteristic_json["category"]["@id"]])
+            if isinstance(value, dict):
+                try:
+                    value = new_annotation(
+                        term=characteristic_json["value"]["annotationValue"],
+                        term_source=term_source_dict[characteristic_json["value"]["termSource"]],
+                        term_accession=characteristic_json["value"]["termAccession"])
+                except KeyError:
+                    raise IOError("Can't create value as annotation")
+            elif isinstance(value, int) or isinstance(value, float):
+                try:
+                    unit = units_dict[characteristic_json["unit"]["@id"]]
+                except KeyError:
+                    raise IOError("Can't create unit annotation")
+            elif not isinstance(value, str):
+                raise IOError("Unexpected type in characteristic value")
+            characteristic.value = value
+            characteristic.unit = unit
+            sample.characteristics.append(characteristic)
+        for factor_value_json in sample_json["factorValues"]:
+            try:
+                factor_value = FactorValue(
+                    factor_name=factors_dict[factor_value_json["category"]["@id"]],
+                    value=new_annotation(
+                        term=factor_value_json["value"]["annotationValue"],
+                        term_accession=factor_value_json["value"]["termAccession"],
+                        term_source=term_source_dict[factor_value_json["value"]["termSource"]],
+                    ),
 
+                )
+            except TypeError:
+                factor_value = FactorValue(
+                    factor_name=factors_dict[factor_value_json["category"]["@id"]],
+                    value=factor_value_json["value"],
+                    unit=units_dict[factor_value_json["unit"]["@id"]],
+                )
+            sample.factor_values.append(factor_value)
+        samples_dict[sample.id] = sample
+        study.samples.append(sample)
+        try:
+            source_ids = [source_id_ref_json["@id"] for source_id_ref_json in sample_json["derivesFrom"]]
+        except KeyError:
+            sample.derives_from = []
+            return
+
+        def add_derives_from(final):
+            sources = get_nodes(source_ids, [sources_dict])
+            if any(source is None for source in sources):
+                if final:
+                    sample.derives_from = []
+                return final
+            for source in sources:
+                sample.derives_from.append(source)
+            return True
+
+        if not add_derives_from(False):
+            pending.append(add_derives_from)
+
+    def add_study_process(study, study_process_json):
+        process = Process(
+            id_=study_process_json["@id"],
+            executes_protocol=protocols_dict[study_process_json["executesProtocol"]["@id"]],
+        )
+        try:
+            process.comments = get_comments(study_process_json)
+        except KeyError:
+            pass
+        try:
+            process.date = study_process_json["date"]
+        except KeyError:
+            pass
+        try:
+            process.performer = study_process_json["performer"]
+        except KeyError:
+            pass
+        for parameter_value_json in study_process_json["parameterValues"]:
+            if isinstance(parameter_value_json["value"], int) or isinstance(parameter_value_json["value"], float):
+                parameter_value = ParameterValue(
+                    category=parameters_dict[parameter_value_json["category"]["@id"]],
+                    value=parameter_value_json["value"],
+                    unit=units_dict[parameter_value_json["unit"]["@id"]],
+                )
+                process.parameter_values.append(parameter_value)
+            else:
+                parameter_value = ParameterValue(
+                    category=parameters_dict[parameter_value_json["category"]["@id"]],
                     )
-                except TypeError:
-                    factor_value = FactorValue(
-                        factor_name=factors_dict[factor_value_json["category"]["@id"]],
-                        value=factor_value_json["value"],
-                        unit=units_dict[factor_value_json["unit"]["@id"]],
-                    )
-                sample.factor_values.append(factor_value)
-            samples_dict[sample.id] = sample
-            study.samples.append(sample)
-            try:
-                for source_id_ref_json in sample_json["derivesFrom"]:
-                    sample.derives_from.append(sources_dict[source_id_ref_json["@id"]])
-            except KeyError:
-                sample.derives_from = []
-        for study_process_json in study_json["processSequence"]:
-            process = Process(
-                id_=study_process_json["@id"],
-                executes_protocol=protocols_dict[study_process_json["executesProtocol"]["@id"]],
+                parameter_value.value = get_parameter_value_value(parameter_value_json)
+                process.parameter_values.append(parameter_value)
+        add_nodes(process.inputs, study_process_json["inputs"], [sources_dict, samples_dict],
+                  "Could not find input node in sources or samples dicts: ")
+        add_nodes(process.outputs, study_process_json["outputs"], [sources_dict, samples_dict],
+                  "Could not find output node in sources or samples dicts: ")
+        study.process_sequence.append(process)
+        study_process_dict[process.id] = process
+        study_links.append(get_link(study_process_json))
+
+    def begin_assay(study, assay_json):
+        assay = Assay(
+            measurement_type=OntologyAnnotation(
+                term=assay_json["measurementType"]["annotationValue"],
+                term_accession=assay_json["measurementType"]["termAccession"],
+                term_source=term_source_dict[assay_json["measurementType"]["termSource"]]
+            ),
+            technology_type=OntologyAnnotation(
+                term=assay_json["technologyType"]["annotationValue"],
+                term_accession=assay_json["technologyType"]["termAccession"],
+                term_source=term_source_dict[assay_json["technologyType"]["termSource"]]
+            ),
+            technology_platform=assay_json["technologyPlatform"],
+            filename=assay_json["filename"]
+        )
+        for assay_unit_json in assay_json["unitCategories"]:
+            unit = get_unit(assay_unit_json)
+            units_dict[unit.id] = unit
+            assay.units.append(unit)
+        for assay_characteristics_category_json in assay_json["characteristicCategories"]:
+            characteristic_category = get_characteristic_category(assay_characteristics_category_json)
+            study.characteristic_categories.append(characteristic_category)
+            categories_dict[characteristic_category.id] = characteristic_category
+        return assay
+
+    def add_data_file(assay, data_dict, data_json):
+        data_file = DataFile(
+            id_=data_json["@id"],
+            filename=data_json["name"],
+            label=data_json["type"],
+        )
+        try:
+            data_file.comments = get_comments(data_json)
+        except KeyError:
+            pass
+        data_dict[data_file.id] = data_file
+        try:
+            sample_id = data_json["derivesFrom"][0]["@id"]
+        except KeyError:
+            sample_id = None
+        if sample_id in samples_dict:
+            data_file.derives_from = samples_dict[sample_id]
+        else:
+            data_file.derives_from = None
+            if sample_id is not None:
+                def set_derives_from(final):
+                    data_file.derives_from = samples_dict.get(sample_id)
+                    return True
+
+                pending.append(set_derives_from)
+        assay.data_files.append(data_file)
+
+    def add_assay_sample(assay_samples, sample_json):
+        sample_id = sample_json["@id"]
+        if sample_id in samples_dict:
+            assay_samples.append(samples_dict[sample_id])
+            return
+        index = len(assay_samples)
+        assay_samples.append(None)
+
+        def set_sample(final):
+            assay_samples[index] = samples_dict[sample_id]
+            return True
+
+        pending.append(set_sample)
+
+    def add_other_material(assay, other_materials_dict, other_material_json):
+        material_name = other_material_json["name"]
+        if material_name.startswith("labeledextract-"):
+            material_name = material_name[15:]
+        else:
+            material_name = material_name[8:]
+        material = Material(
+            id_=other_material_json["@id"],
+            name=material_name,
+            type_=other_material_json["type"],
+        )
+        for characteristic_json in other_material_json["characteristics"]:
+            characteristic = Characteristic(
+                category=categories_dict[characteristic_json["category"]["@id"]],
+                value=new_annotation(
+                    term=characteristic_json["value"]["annotationValue"],
+                    term_source=term_source_dict[characteristic_json["value"]["termSource"]],
+                    term_accession=characteristic_json["value"]["termAccession"],
+                )
             )
-            try:
-                process.comments = get_comments(study_process_json)
-            except KeyError:
-                pass
-            try:
-                process.date = study_process_json["date"]
-            except KeyError:
-                pass
-            try:
-                process.performer = study_process_json["performer"]
-            except KeyError:
-                pass
-            for parameter_value_json in study_process_json["parameterValues"]:
-                if isinstance(parameter_value_json["value"], int) or isinstance(parameter_value_json["value"], float):
+            material.characteristics.append(characteristic)
+        assay.other_material.append(material)
+        other_materials_dict[material.id] = material
+
+    def add_assay_process(assay, node_dicts, process_dict, links, assay_process_json):
+        process = Process(
+            id_=assay_process_json["@id"],
+            executes_protocol=protocols_dict[assay_process_json["executesProtocol"]["@id"]]
+        )
+        try:
+            process.comments = get_comments(assay_process_json)
+        except KeyError:
+            pass
+        # additional properties, currently hard-coded special cases
+        if process.executes_protocol.protocol_type.term == "data collection" and assay.technology_type.term == "DNA microarray":
+            process.name = assay_process_json["name"]
+        elif process.executes_protocol.protocol_type.term == "nucleic acid sequencing":
+            process.name = assay_process_json["name"]
+        elif process.executes_protocol.protocol_type.term == "nucleic acid hybridization":
+            process.name = assay_process_json["name"]
+        elif process.executes_protocol.protocol_type.term == "data transformation":
+            process.name = assay_process_json["name"]
+        elif process.executes_protocol.protocol_type.term == "data normalization":
+            process.name = assay_process_json["name"]
+        add_nodes(process.inputs, assay_process_json["inputs"], node_dicts,
+                  "Could not find input node in samples or materials or data dicts: ")
+        add_nodes(process.outputs, assay_process_json["outputs"], node_dicts,
+                  "Could not find output node in samples or materials or data dicts: ")
+        for parameter_value_json in assay_process_json["parameterValues"]:
+            if "category" in parameter_value_json.keys():
+                if parameter_value_json["category"]["@id"] == "#parameter/Array_Design_REF":  # Special case
+                    process.array_design_ref = parameter_value_json["value"]
+                elif isinstance(parameter_value_json["value"], int) or \
+                        isinstance(parameter_value_json["value"], float):
                     parameter_value = ParameterValue(
                         category=parameters_dict[parameter_value_json["category"]["@id"]],
                         value=parameter_value_json["value"],
-                        unit=units_dict[parameter_value_json["unit"]["@id"]],
                     )
+                    if "unit" in parameter_value_json.keys():
+                        parameter_value.unit = units_dict[parameter_value_json["unit"]["@id"]]
                     process.parameter_values.append(parameter_value)
                 else:
                     parameter_value = ParameterValue(
                         category=parameters_dict[parameter_value_json["category"]["@id"]],
                         )
-                    try:
-                        parameter_value.value = OntologyAnnotation(
-                            term=parameter_value_json["value"]["annotationValue"],
-                            term_accession=parameter_value_json["value"]["termAccession"],
-                            term_source=term_source_dict[parameter_value_json["value"]["termSource"]],)
-                    except TypeError:
-                        parameter_value.value = parameter_value_json["value"]
+                    parameter_value.value = get_parameter_value_value(parameter_value_json)
                     process.parameter_values.append(parameter_value)
-            for input_json in study_process_json["inputs"]:
-                input_ = None
-                try:
-                    input_ = sources_dict[input_json["@id"]]
-                except KeyError:
-                    pass
-                finally:
-                    try:
-                        input_ = samples_dict[input_json["@id"]]
-                    except KeyError:
-                        pass
-                if input_ is None:
-                    raise IOError("Could not find input node in sources or samples dicts: " + input_json["@id"])
-                process.inputs.append(input_)
-            for output_json in study_process_json["outputs"]:
-                output = None
-                try:
-                    output = sources_dict[output_json["@id"]]
-                except KeyError:
-                    pass
-                finally:
-                    try:
-                        output = samples_dict[output_json["@id"]]
-                    except KeyError:
-                        pass
-                if output is None:
-                    raise IOError("Could not find output node in sources or samples dicts: " + output_json["@id"])
-                process.outputs.append(output)
-            study.process_sequence.append(process)
-            process_dict[process.id] = process
-        for study_process_json in study_json["processSequence"]:  # 2nd pass
+            else:
+                log.warning("warning: parameter category not found for instance {}".format(parameter_value_json))
+        assay.process_sequence.append(process)
+        process_dict[process.id] = process
+        links.append(get_link(assay_process_json))
+
+    def load_assay(study, assay_json):
+        assay = begin_assay(study, assay_json)
+        data_dict = dict()
+        other_materials_dict = dict()
+        process_dict = dict()
+        links = list()
+        assay_samples = list()
+        for key in stream.items():
+            if key == "materials":
+                for materials_key in stream.items():
+                    if materials_key == "samples":
+                        for _ in stream.elements():
+                            add_assay_sample(assay_samples, stream.value())
+                    elif materials_key == "otherMaterials":
+                        for _ in stream.elements():
+                            add_other_material(assay, other_materials_dict, stream.value())
+            elif key == "dataFiles":
+                for _ in stream.elements():
+                    add_data_file(assay, data_dict, stream.value())
+            elif key == "processSequence":
+                for _ in stream.elements():
+                    add_assay_process(assay, [samples_dict, other_materials_dict, data_dict],
+                                      process_dict, links, stream.value())
+        add_links(process_dict, links)
+
+        def set_samples(final):
+            assay.samples = assay_samples
+            return True
+
+        if None in assay_samples:
+            pending.append(set_samples)
+        else:
+            set_samples(True)
+        return assay
+
+    for key in stream.items():
+        if key != "studies":
+            continue
+        for i in stream.elements():
+            study_json = investigation_json["studies"][i]
+            study = begin_study(study_json)
+            study_process_dict = dict()
+            study_links = list()
+            pending = list()
+            assays = list()
+            for study_key in stream.items():
+                if study_key == "materials":
+                    for materials_key in stream.items():
+                        if materials_key == "sources":
+                            for _ in stream.elements():
+                                add_source(study, stream.value())
+                        elif materials_key == "samples":
+                            for _ in stream.elements():
+                                add_sample(study, stream.value())
+                elif study_key == "processSequence":
+                    for _ in stream.elements():
+                        add_study_process(study, stream.value())
+                elif study_key == "assays":
+                    for j in stream.elements():
+                        assays.append(load_assay(study, study_json["assays"][j]))
+            add_links(study_process_dict, study_links)
+            while pending:
+                pending.pop(0)(True)
+            for assay in assays:
+                study.assays.append(assay)
+            investigation.studies.append(study)
+    stream.end()
+    return investigation
+
+
+"""Everything below here is for the validator"""
+
+
+_ANNOTATION_KEYS = frozenset(["annotationValue", "termAccession", "termSource"])
+_ANNOTATION_KEYS_WITH_ID = _ANNOTATION_KEYS | {"@id"}
+
+
+class _JSONIndex(object):
+    """Base of the indexes the rules of validate() are evaluated against, so
+    that the document is walked once rather than once per rule. The ontology
+    annotations met on the walk are appended to annotations, in the order
+    walk_and_get_annotations() finds them"""
+
+    def __init__(self, annotations=None):
+        self.annotations = list() if annotations is None else annotations
+        self.dois = list()
+        self.pubmed_ids = list()
+
+    def _walk(self, value, handlers=None):
+        """Walks value in document order, handing the value of each of its
+        members that has a handler to the handler instead"""
+        if isinstance(value, dict):
+            if 3 <= len(value) <= 4 and (value.keys() == _ANNOTATION_KEYS or
+                                         value.keys() == _ANNOTATION_KEYS_WITH_ID):
+                self.annotations.append(value)
+            for key, member in value.items():
+                if handlers is not None and key in handlers:
+                    handlers[key](member)
+                else:
+                    self._walk(member)
+        elif isinstance(value, list):
+            for element in value:
+                self._walk(element)
+
+    def _walk_object(self, obj, handlers):
+        """Walks the object obj, reading the members that have a handler but
+        are missing from obj first, so that they raise KeyError as the rules
+        reading them did"""
+        for key in handlers:
+            if key not in obj:
+                handlers[key](obj[key])
+        self._walk(obj, handlers)
+
+    def _publications(self, publications_json):
+        for publication in publications_json:
+            try:
+                self.dois.append(publication["doi"])
+            except KeyError:
+                pass
+            self.pubmed_ids.append(publication["pubMedID"])
+            self._walk(publication)
+
+    def _process_sequence(self, process_sequence_json):
+        self.process_sequence = _ProcessSequenceIndex()
+        for process in process_sequence_json:
+            self.process_sequence.add(process)
+            self.io_ids.extend([i["@id"] for i in process["inputs"]])
+            self.io_ids.extend([o["@id"] for o in process["outputs"]])
+            try:
+                self.protocol_ids_used.append(process["executesProtocol"]["@id"])
+            except KeyError:
+                pass
+            for parameter_value in process["parameterValues"]:
+                self.parameter_ids_used.append(parameter_value["category"]["@id"])
+                if "unit" in parameter_value.keys():
+                    self.parameter_value_unit_ids_used.append(parameter_value["unit"]["@id"])
+            try:
+                self.process_dates.append(process["date"])
+            except KeyError:
+                pass
+            self._walk(process)
+
+    def _characteristic_categories(self, categories_json):
+        for category in categories_json:
+            self.category_ids.append(category["@id"])
+            self._walk(category)
+
+    def _unit_categories(self, units_json):
+        for unit in units_json:
+            self.unit_ids.append(unit["@id"])
+            self._walk(unit)
+
+
+class _ProcessSequenceIndex(object):
+    """The @ids of the processes of a process sequence, and the
+    previousProcess and nextProcess links between them as (process @id, link,
+    linked process @id)"""
+
+    def __init__(self, process_sequence_json=()):
+        self.process_ids = set()
+        self.links = list()
+        for process in process_sequence_json:
+            self.add(process)
+
+    def add(self, process):
+        process_id = process["@id"]
+        self.process_ids.add(process_id)
+        for link in ("previousProcess", "nextProcess"):
             try:
-                prev_proc = study_process_json["previousProcess"]["@id"]
-                process_dict[study_process_json["@id"]].prev_process = process_dict[prev_proc]
+                self.links.append((process_id, link, process[link]["@id"]))
             except KeyError:
                 pass
 
+
+class _AssayIndex(_JSONIndex):
+    """The @ids declared and referenced in an assay"""
+
+    def __init__(self, assay_json, annotations=None):
+        super(_AssayIndex, self).__init__(annotations)
+        self.filename = assay_json["filename"]
+        self.material_ids = list()
+        self.data_file_ids = list()
+        self.io_ids = list()
+        self.protocol_ids_used = list()
+        self.parameter_ids_used = list()
+        self.category_ids = list()
+        self.unit_ids = list()
+        self.sample_category_ids_used = list()
+        self.material_category_ids_used = list()
+        self.material_unit_ids_used = list()
+        self.parameter_value_unit_ids_used = list()
+        self.process_dates = list()
+        self._walk_object(assay_json, {
+            "materials": self._materials,
+            "dataFiles": self._data_files,
+            "processSequence": self._process_sequence,
+            "characteristicCategories": self._characteristic_categories,
+            "unitCategories": self._unit_categories
+        })
+        self.category_ids_used = self.sample_category_ids_used + self.material_category_ids_used
+        self.unit_ids_used = self.material_unit_ids_used + self.parameter_value_unit_ids_used
+
+    def _materials(self, materials_json):
+        self._walk_object(materials_json, {
+            "samples": self._samples,
+            "otherMaterials": self._other_materials
+        })
+
+    def _samples(self, samples_json):
+        for sample in samples_json:
+            if "characteristics" in sample.keys():
+                self.sample_category_ids_used.extend([c["category"]["@id"] for c in sample["characteristics"]])
+            self._walk(sample)
+
+    def _other_materials(self, other_materials_json):
+        for material in other_materials_json:
+            self.material_ids.append(material["@id"])
+            if "characteristics" in material.keys():
+                for characteristic in material["characteristics"]:
+                    self.material_category_ids_used.append(characteristic["category"]["@id"])
+                    if "unit" in characteristic.keys():
+                        self.material_unit_ids_used.append(characteristic["unit"]["@id"])
+            self._walk(material)
+
+    def _data_files(self, data_files_json):
+        for data_file in data_files_json:
+            self.data_file_ids.append(data_file["@id"])
+            self._walk(data_file)
+
+
+class _StudyIndex(_JSONIndex):
+    """The @ids declared and referenced in a study and its assays, and the
+    names, dates and publications that the rules check"""
+
+    def __init__(self, study_json, annotations=None):
+        super(_StudyIndex, self).__init__(annotations)
+        self.filename = study_json["filename"]
+        self.dates = list()
+        for key in ("publicReleaseDate", "submissionDate"):
             try:
-                next_proc = study_process_json["nextProcess"]["@id"]
-                process_dict[study_process_json["@id"]].next_process = process_dict[next_proc]
+                self.dates.append(study_json[key])
             except KeyError:
                 pass
+        self.assays = list()
+        self.source_ids = list()
+        self.sample_ids = list()
+        self.io_ids = list()
+        self.protocol_ids = list()
+        self.protocol_ids_used = list()
+        self.protocol_names = list()
+        self.parameter_ids = list()
+        self.parameter_ids_used = list()
+        self.parameter_names = list()
+        self.category_ids = list()
+        self.factor_ids = list()
+        self.factor_ids_used = list()
+        self.factor_names = list()
+        self.unit_ids = list()
+        self.source_category_ids_used = list()
+        self.sample_category_ids_used = list()
+        self.material_unit_ids_used = list()
+        self.factor_value_unit_ids_used = list()
+        self.parameter_value_unit_ids_used = list()
+        self.process_dates = list()
+        self._walk_object(study_json, {
+            "materials": self._materials,
+            "processSequence": self._process_sequence,
+            "assays": self._assays,
+            "protocols": self._protocols,
+            "characteristicCategories": self._characteristic_categories,
+            "factors": self._factors,
+            "unitCategories": self._unit_categories,
+            "publications": self._publications
+        })
+        self.material_ids = list()
+        self.data_file_ids = list()
+        self.category_ids_used = self.source_category_ids_used + self.sample_category_ids_used
+        self.unit_ids_used = self.material_unit_ids_used + self.factor_value_unit_ids_used + \
+            self.parameter_value_unit_ids_used
+        for assay in self.assays:
+            self.material_ids.extend(assay.material_ids)
+            self.data_file_ids.extend(assay.data_file_ids)
+            self.io_ids.extend(assay.io_ids)
+            self.protocol_ids_used.extend(assay.protocol_ids_used)
+            self.parameter_ids_used.extend(assay.parameter_ids_used)
+            self.category_ids.extend(assay.category_ids)
+            self.category_ids_used.extend(assay.category_ids_used)
+            self.unit_ids.extend(assay.unit_ids)
+            self.unit_ids_used.extend(assay.unit_ids_used)
+        self.io_id_set = set(self.io_ids)
+        # the ids that each of the material id collectors returns
+        self.node_ids = {
+            get_source_ids: self.source_ids,
+            get_sample_ids: self.sample_ids,
+            get_material_ids: self.material_ids,
+            get_data_file_ids: self.data_file_ids
+        }
 
-        for assay_json in study_json["assays"]:
-            process_dict = dict()
-            assay = Assay(
-                measurement_type=OntologyAnnotation(
-                    term=assay_json["measurementType"]["annotationValue"],
-                    term_accession=assay_json["measurementType"]["termAccession"],
-                    term_source=term_source_dict[assay_json["measurementType"]["termSource"]]
-                ),
-                technology_type=OntologyAnnotation(
-                    term=assay_json["technologyType"]["annotationValue"],
-                    term_accession=assay_json["technologyType"]["termAccession"],
-                    term_source=term_source_dict[assay_json["technologyType"]["termSource"]]
-                ),
-                technology_platform=assay_json["technologyPlatform"],
-                filename=assay_json["filename"]
-            )
-            for assay_unit_json in assay_json["unitCategories"]:
-                unit = OntologyAnnotation(id_=assay_unit_json["@id"],
-                                          term=assay_unit_json["annotationValue"],
-                                          term_source=term_source_dict[assay_unit_json["termSource"]],
-                                          term_accession=assay_unit_json["termAccession"])
-                units_dict[unit.id] = unit
-                assay.units.append(unit)
-            data_dict = dict()
-            for data_json in assay_json["dataFiles"]:
-                data_file = DataFile(
-                    id_=data_json["@id"],
-                    filename=data_json["name"],
-                    label=data_json["type"],
-                )
-                try:
-                    data_file.comments = get_comments(data_json)
-                except KeyError:
-                    pass
-                data_dict[data_file.id] = data_file
-                try:
-                    data_file.derives_from = samples_dict[data_json["derivesFrom"][0]["@id"]]
-                except KeyError:
-                    data_file.derives_from = None
-                assay.data_files.append(data_file)
-            for sample_json in assay_json["materials"]["samples"]:
-                sample = samples_dict[sample_json["@id"]]
-                assay.samples.append(sample)
-            for assay_characteristics_category_json in assay_json["characteristicCategories"]:
-                characteristic_category =OntologyAnnotation(
-                    id_=assay_characteristics_category_json["@id"],
-                    term=assay_characteristics_category_json["characteristicType"]["annotationValue"],
-                    term_source=term_source_dict[assay_characteristics_category_json["characteristicType"]["termSource"]],
-                    term_accession=assay_characteristics_category_json["characteristicType"]["termAccession"],
-                )
-                study.characteristic_categories.append(characteristic_category)
-                categories_dict[characteristic_category.id] = characteristic_category
-            other_materials_dict = dict()
-            for other_material_json in assay_json["materials"]["otherMaterials"]:
-                material_name = other_material_json["name"]
-                if material_name.startswith("labeledextract-"):
-                    material_name = material_name[15:]
-                else:
-                    material_name = material_name[8:]
-                material = Material(
-                    id_=other_material_json["@id"],
-                    name=material_name,
-                    type_=other_material_json["type"],
-                )
-                for characteristic_json in other_material_json["characteristics"]:
-                    characteristic = Characteristic(
-                        category=categories_dict[characteristic_json["category"]["@id"]],
-                        value=OntologyAnnotation(
-                            term=characteristic_json["value"]["annotationValue"],
-                            term_source=term_source_dict[characteristic_json["value"]["termSource"]],
-                            term_accession=characteristic_json["value"]["termAccession"],
-                        )
-                    )
-                    material.characteristics.append(characteristic)
-                assay.other_material.append(material)
-                other_materials_dict[material.id] = material
-            for assay_process_json in assay_json["processSequence"]:
-                process = Process(
-                    id_=assay_process_json["@id"],
-                    executes_protocol=protocols_dict[assay_process_json["executesProtocol"]["@id"]]
-                )
-                try:
-                    process.comments = get_comments(assay_process_json)
-                except KeyError:
-                    pass
-                # additional properties, currently hard-coded special cases
-                if process.executes_protocol.protocol_type.term == "data collection" and assay.technology_type.term == "DNA microarray":
-                    process.name = assay_process_json["name"]
-                elif process.executes_protocol.protocol_type.term == "nucleic acid sequencing":
-                    process.name = assay_process_json["name"]
-                elif process.executes_protocol.protocol_type.term == "nucleic acid hybridization":
-                    process.name = assay_process_json["name"]
-                elif process.executes_protocol.protocol_type.term == "data transformation":
-                    process.name = assay_process_json["name"]
-                elif process.executes_protocol.protocol_type.term == "data normalization":
-                    process.name = assay_process_json["name"]
-                for input_json in assay_process_json["inputs"]:
-                    input_ = None
-                    try:
-                        input_ = samples_dict[input_json["@id"]]
-                    except KeyError:
-                        pass
-                    finally:
-                        try:
-                            input_ = other_materials_dict[input_json["@id"]]
-                        except KeyError:
-                            pass
-                        finally:
-                            try:
-                                input_ = data_dict[input_json["@id"]]
-                            except KeyError:
-                                pass
-                    if input_ is None:
-                        raise IOError("Could not find input node in samples or materials or data dicts: " +
-                                      input_json["@id"])
-                    process.inputs.append(input_)
-                for output_json in assay_process_json["outputs"]:
-                    output = None
-                    try:
-                        output = samples_dict[output_json["@id"]]
-                    except KeyError:
-                        pass
-                    finally:
-                        try:
-                            output = other_materials_dict[output_json["@id"]]
-                        except KeyError:
-                            pass
-                        finally:
-                                try:
-                                    output = data_dict[output_json["@id"]]
-                                except KeyError:
-                                    pass
-                    if output is None:
-                        raise IOError("Could not find output node in samples or materials or data dicts: " +
-                                      output_json["@id"])
-                    process.outputs.append(output)
-                for parameter_value_json in assay_process_json["parameterValues"]:
-                    if "category" in parameter_value_json.keys():
-                        if parameter_value_json["category"]["@id"] == "#parameter/Array_Design_REF":  # Special case
-                            process.array_design_ref = parameter_value_json["value"]
-                        elif isinstance(parameter_value_json["value"], int) or \
-                                isinstance(parameter_value_json["value"], float):
-                            parameter_value = ParameterValue(
-                                category=parameters_dict[parameter_value_json["category"]["@id"]],
-                                value=parameter_value_json["value"],
-                            )
-                            if "unit" in parameter_value_json.keys():
-                                parameter_value.unit = units_dict[parameter_value_json["unit"]["@id"]]
-                            process.parameter_values.append(parameter_value)
-                        else:
-                            parameter_value = ParameterValue(
-                                category=parameters_dict[parameter_value_json["category"]["@id"]],
-                                )
-                            try:
-                                parameter_value.value = OntologyAnnotation(
-                                    term=parameter_value_json["value"]["annotationValue"],
-                                    term_accession=parameter_value_json["value"]["termAccession"],
-                                    term_source=term_source_dict[parameter_value_json["value"]["termSource"]],)
-                            except TypeError:
-                                parameter_value.value = parameter_value_json["value"]
-                            process.parameter_values.append(parameter_value)
-                    else:
-                        log.warning("warning: parameter category not found for instance {}".format(parameter_json))
-                assay.process_sequence.append(process)
-                process_dict[process.id] = process
-
-                for assay_process_json in assay_json["processSequence"]:  # 2nd pass
-                    try:
-                        prev_proc = assay_process_json["previousProcess"]["@id"]
-                        process_dict[assay_process_json["@id"]].prev_process = process_dict[prev_proc]
-                    except KeyError:
-                        pass
-
-                    try:
-                        next_proc = assay_process_json["nextProcess"]["@id"]
-                        process_dict[assay_process_json["@id"]].next_process = process_dict[next_proc]
-                    except KeyError:
-                        pass
-
-            study.assays.append(assay)
-        investigation.studies.append(study)
-    return investigation
+    def _materials(self, materials_json):
+        self._walk_object(materials_json, {
+            "sources": self._sources,
+            "samples": self._samples
+        })
 
+    def _sources(self, sources_json):
+        for source in sources_json:
+            self.source_ids.append(source["@id"])
+            for characteristic in source["characteristics"]:
+                self.source_category_ids_used.append(characteristic["category"]["@id"])
+                if "unit" in characteristic.keys():
+                    self.material_unit_ids_used.append(characteristic["unit"]["@id"])
+            self._walk(source)
+
+    def _samples(self, samples_json):
+        for sample in samples_json:
+            self.sample_ids.append(sample["@id"])
+            for characteristic in sample["characteristics"]:
+                self.sample_category_ids_used.append(characteristic["category"]["@id"])
+                if "unit" in characteristic.keys():
+                    self.material_unit_ids_used.append(characteristic["unit"]["@id"])
+            for factor_value in sample["factorValues"]:
+                self.factor_ids_used.append(factor_value["category"]["@id"])
+                if "unit" in factor_value.keys():
+                    self.factor_value_unit_ids_used.append(factor_value["unit"]["@id"])
+            self._walk(sample)
+
+    def _assays(self, assays_json):
+        for assay_json in assays_json:
+            self.assays.append(_AssayIndex(assay_json, self.annotations))
+
+    def _protocols(self, protocols_json):
+        for protocol in protocols_json:
+            self.protocol_ids.append(protocol["@id"])
+            self.protocol_names.append((protocol["name"], protocol["@id"]))
+            for parameter in protocol["parameters"]:
+                self.parameter_ids.append(parameter["@id"])
+                self.parameter_names.append((parameter["parameterName"], parameter["@id"]))
+            self._walk(protocol)
+
+    def _factors(self, factors_json):
+        for factor in factors_json:
+            self.factor_ids.append(factor["@id"])
+            self.factor_names.append((factor["factorName"], factor["@id"]))
+            self._walk(factor)
+
+
+class _ISAJSONIndex(_JSONIndex):
+    """The @ids declared and referenced in an ISA-JSON document, its ontology
+    annotations and term sources, and the names, dates and publications that
+    the rules check, gathered in a single walk over the document"""
+
+    def __init__(self, isa_json):
+        super(_ISAJSONIndex, self).__init__()
+        self.dates = list()
+        for key in ("publicReleaseDate", "submissionDate"):
+            try:
+                self.dates.append(isa_json[key])
+            except KeyError:
+                pass
+        self.studies = list()
+        self.term_sources = list()
+        self._walk_object(isa_json, {
+            "studies": self._studies,
+            "publications": self._publications,
+            "ontologySourceReferences": self._ontology_sources
+        })
 
-"""Everything below here is for the validator"""
+    def _studies(self, studies_json):
+        for study_json in studies_json:
+            self.studies.append(_StudyIndex(study_json, self.annotations))
+
+    def _ontology_sources(self, ontology_sources_json):
+        for ontology_source in ontology_sources_json:
+            self.term_sources.append(ontology_source["name"])
+            self._walk(ontology_source)
 
 
 def get_source_ids(study_json):
@@ -643,13 +1126,19 @@ def get_io_ids_in_process_sequence(study_json):
                                  all_process_sequences] for elem in iterabl]
 
 
-def check_material_ids_declared_used(study_json, id_collector_func):
+def check_material_ids_declared_used(study_json, id_collector_func, report=None, index=None):
     """Used for rules 1015-1018"""
-    node_ids = id_collector_func(study_json)
-    io_ids_in_process_sequence = get_io_ids_in_process_sequence(study_json)
-    is_node_ids_used = set(node_ids).issubset(set(io_ids_in_process_sequence))
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _StudyIndex(study_json)
+    node_ids = index.node_ids.get(id_collector_func)
+    if node_ids is None:
+        node_ids = id_collector_func(study_json)
+    io_ids_in_process_sequence = index.io_ids
+    is_node_ids_used = set(node_ids).issubset(index.io_id_set)
     if not is_node_ids_used:
-        warnings.append({
+        report.warnings.append({
             "message": "Material declared but not used",
             "supplemental": "{} not used in any inputs/outputs in {}".format(node_ids, io_ids_in_process_sequence),
             "code": 1017
@@ -658,14 +1147,16 @@ def check_material_ids_declared_used(study_json, id_collector_func):
                                                                                   io_ids_in_process_sequence))
 
 
-def check_material_ids_not_declared_used(study_json):
+def check_material_ids_not_declared_used(study_json, report=None, index=None):
     """Used for rules 1002-1005"""
-    node_ids = get_source_ids(study_json) + get_sample_ids(study_json) + get_material_ids(study_json) + \
-               get_data_file_ids(study_json)
-    io_ids_in_process_sequence = get_io_ids_in_process_sequence(study_json)
-    if len(set(io_ids_in_process_sequence)) - len(set(node_ids)) > 0:
-        diff = set(io_ids_in_process_sequence) - set(node_ids)
-        errors.append({
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _StudyIndex(study_json)
+    node_ids = index.source_ids + index.sample_ids + index.material_ids + index.data_file_ids
+    if len(index.io_id_set) - len(set(node_ids)) > 0:
+        diff = index.io_id_set - set(node_ids)
+        report.errors.append({
             "message": "Missing Material",
             "supplemental": "Inputs/outputs in {}  not found in sources, samples, materials or datafiles "
                             "declarations".format(list(diff)),
@@ -675,34 +1166,22 @@ def check_material_ids_not_declared_used(study_json):
                      "declared".format(list(diff)))
 
 
-def check_process_sequence_links(process_sequence_json):
+def check_process_sequence_links(process_sequence_json, report=None, index=None):
     """Used for rule 1006"""
-    process_ids = [process["@id"] for process in process_sequence_json]
-    for process in process_sequence_json:
-        try:
-            if process["previousProcess"]["@id"] not in process_ids:
-                errors.append({
-                    "message": "Missing Process link",
-                    "supplemental": "previousProcess {} in process {} does not refer to another process in "
-                                    "sequence".format(process["previousProcess"]["@id"], process["@id"]),
-                    "code": 1006
-                })
-                log.error("(E) previousProcess link {} in process {} does not refer to another process in "
-                             "sequence".format(process["previousProcess"]["@id"], process["@id"]))
-        except KeyError:
-            pass
-        try:
-            if process["nextProcess"]["@id"] not in process_ids:
-                errors.append({
-                    "message": "Missing Process link",
-                    "supplemental": "nextProcess {} in process {} does not refer to another process in "
-                                    "sequence".format(process["nextProcess"]["@id"], process["@id"]),
-                    "code": 1006
-                })
-                log.error("(E) nextProcess {} in process {} does not refer to another process in sequence".format(
-                    process["nextProcess"]["@id"], process["@id"]))
-        except KeyError:
-            pass
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _ProcessSequenceIndex(process_sequence_json)
+    for process_id, link, linked_process_id in index.links:
+        if linked_process_id not in index.process_ids:
+            report.errors.append({
+                "message": "Missing Process link",
+                "supplemental": "{} {} in process {} does not refer to another process in "
+                                "sequence".format(link, linked_process_id, process_id),
+                "code": 1006
+            })
+            log.error("(E) {} link {} in process {} does not refer to another process in "
+                      "sequence".format(link, linked_process_id, process_id))
 
 
 def get_study_protocol_ids(study_json):
@@ -710,26 +1189,17 @@ def get_study_protocol_ids(study_json):
     return [protocol["@id"] for protocol in study_json["protocols"]]
 
 
-def check_process_protocol_ids_usage(study_json):
+def check_process_protocol_ids_usage(study_json, report=None, index=None):
     """Used for rules 1007 and 1019"""
-    protocol_ids_declared = get_study_protocol_ids(study_json)
-    process_sequence = study_json["processSequence"]
-    protocol_ids_used = list()
-    for process in process_sequence:
-        try:
-            protocol_ids_used.append(process["executesProtocol"]["@id"])
-        except KeyError:
-            pass
-    for assay in study_json["assays"]:
-        process_sequence = assay["processSequence"]
-        for process in process_sequence:
-            try:
-                protocol_ids_used.append(process["executesProtocol"]["@id"])
-            except KeyError:
-                pass
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _StudyIndex(study_json)
+    protocol_ids_declared = index.protocol_ids
+    protocol_ids_used = index.protocol_ids_used
     if len(set(protocol_ids_used) - set(protocol_ids_declared)) > 0:
         diff = set(protocol_ids_used) - set(protocol_ids_declared)
-        errors.append({
+        report.errors.append({
             "message": "Missing Protocol declaration",
             "supplemental": "protocol IDs {} not declared".format(list(diff)),
             "code": 1007
@@ -738,7 +1208,7 @@ def check_process_protocol_ids_usage(study_json):
             list(diff)))
     elif len(set(protocol_ids_declared) - set(protocol_ids_used)) > 0:
         diff = set(protocol_ids_declared) - set(protocol_ids_used)
-        warnings.append({
+        report.warnings.append({
             "message": "Protocol declared but not used",
             "supplemental": "protocol IDs declared {} not used".format(list(diff)),
             "code": 1019
@@ -767,13 +1237,17 @@ def get_parameter_value_parameter_ids(study_json):
     return study_pv_parameter_ids
 
 
-def check_protocol_parameter_ids_usage(study_json):
+def check_protocol_parameter_ids_usage(study_json, report=None, index=None):
     """Used for rule 1009 and 1020"""
-    protocols_declared = get_study_protocols_parameter_ids(study_json) + ["#parameter/Array_Design_REF"] # + special case
-    protocols_used = get_parameter_value_parameter_ids(study_json)
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _StudyIndex(study_json)
+    protocols_declared = index.parameter_ids + ["#parameter/Array_Design_REF"]  # + special case
+    protocols_used = index.parameter_ids_used
     if len(set(protocols_used) - set(protocols_declared)) > 0:
         diff = set(protocols_used) - set(protocols_declared)
-        errors.append({
+        report.errors.append({
             "message": "Missing Protocol Parameter declaration",
             "supplemental": "protocol parameters {} used".format(list(diff)),
             "code": 1009
@@ -782,7 +1256,7 @@ def check_protocol_parameter_ids_usage(study_json):
                      "protocol".format(list(diff)))
     elif len(set(protocols_declared) - set(protocols_used)) > 0:
         diff = set(protocols_declared) - set(protocols_used)
-        warnings.append({
+        report.warnings.append({
             "message": "Protocol parameter declared in a protocol but never used",
             "supplemental": "protocol declared {} are not used".format(list(diff)),
             "code": 1020
@@ -810,22 +1284,22 @@ def get_characteristic_category_ids_in_assay_materials(assay_json):
               assay_json["materials"]["samples"] + assay_json["materials"]["otherMaterials"]] for elem in iterabl]
 
 
-def check_characteristic_category_ids_usage(studies_json):
+def check_characteristic_category_ids_usage(studies_json, report=None, index=None):
     """Used for rule 1013"""
+    if report is None:
+        report = _default_report
+    if index is None:
+        study_indexes = [_StudyIndex(study_json) for study_json in studies_json]
+    else:
+        study_indexes = index.studies
     characteristic_categories_declared = list()
     characteristic_categories_used = list()
-    for study_json in studies_json:
-        characteristic_categories_declared += get_characteristic_category_ids(study_json)
-        for assay in study_json["assays"]:
-            characteristic_categories_declared_in_assay = get_characteristic_category_ids(assay)
-            characteristic_categories_declared += characteristic_categories_declared_in_assay
-        characteristic_categories_used += get_characteristic_category_ids_in_study_materials(study_json)
-        for assay in study_json["assays"]:
-            characteristic_categories_used_in_assay = get_characteristic_category_ids_in_assay_materials(assay)
-            characteristic_categories_used += characteristic_categories_used_in_assay
+    for study_index in study_indexes:
+        characteristic_categories_declared += study_index.category_ids
+        characteristic_categories_used += study_index.category_ids_used
     if len(set(characteristic_categories_used) - set(characteristic_categories_declared)) > 0:
         diff = set(characteristic_categories_used) - set(characteristic_categories_declared)
-        errors.append({
+        report.errors.append({
                 "message": "Missing Characteristic Category declaration",
                 "supplemental": "Characteristic Categories {} used not declared".format(list(diff)),
                 "code": 1013
@@ -834,7 +1308,7 @@ def check_characteristic_category_ids_usage(studies_json):
                      "not been not declared".format(list(diff)))
     elif len(set(characteristic_categories_declared) - set(characteristic_categories_used)) > 0:
         diff = set(characteristic_categories_declared) - set(characteristic_categories_used)
-        warnings.append({
+        report.warnings.append({
             "message": "Characteristic Category not used",
             "supplemental": "Characteristic Categories {} declared".format(list(diff)),
             "code": 1022
@@ -854,13 +1328,17 @@ def get_study_factor_ids_in_sample_factor_values(study_json):
                                  study_json["materials"]["samples"]] for elem in iterabl]
 
 
-def check_study_factor_usage(study_json):
+def check_study_factor_usage(study_json, report=None, index=None):
     """Used for rules 1008 and 1021"""
-    factors_declared = get_study_factor_ids(study_json)
-    factors_used = get_study_factor_ids_in_sample_factor_values(study_json)
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _StudyIndex(study_json)
+    factors_declared = index.factor_ids
+    factors_used = index.factor_ids_used
     if len(set(factors_used) - set(factors_declared)) > 0:
         diff = set(factors_used) - set(factors_declared)
-        errors.append({
+        report.errors.append({
             "message": "Missing Study Factor declaration",
             "supplemental": "Study Factors {} used".format(list(diff)),
             "code": 1008
@@ -869,7 +1347,7 @@ def check_study_factor_usage(study_json):
                   .format(list(diff)))
     elif len(set(factors_declared) - set(factors_used)) > 0:
         diff = set(factors_declared) - set(factors_used)
-        warnings.append({
+        report.warnings.append({
             "message": "Study Factor is not used",
             "supplemental": "Study Factors {} are not used".format(list(diff)),
             "code": 1021
@@ -919,17 +1397,14 @@ def get_assay_unit_category_ids_in_materials_and_processes(assay_json):
     return [x for x in assay_characteristics_units_used + parameter_value_units_used if x is not None]
 
 
-def check_unit_category_ids_usage(study_json):
+def check_unit_category_ids_usage(study_json, report=None, index=None):
     """Used for rules 1014 and 1022"""
-    log.info("Getting units declared...")
-    units_declared = get_unit_category_ids(study_json)
-    for assay in study_json["assays"]:
-        units_declared.extend(get_unit_category_ids(assay))
-    log.info("Getting units used (study)...")
-    units_used = get_study_unit_category_ids_in_materials_and_processes(study_json)
-    log.info("Getting units used (assay)...")
-    for assay in study_json["assays"]:
-        units_used.extend(get_assay_unit_category_ids_in_materials_and_processes(assay))
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _StudyIndex(study_json)
+    units_declared = index.unit_ids
+    units_used = [x for x in index.unit_ids_used if x is not None]
     log.info("Comparing units declared vs units used...")
     if len(set(units_used) - set(units_declared)) > 0:
         diff = set(units_used) - set(units_declared)
@@ -937,7 +1412,7 @@ def check_unit_category_ids_usage(study_json):
                   .format(list(diff)))
     elif len(set(units_declared) - set(units_used)) > 0:
         diff = set(units_declared) - set(units_used)
-        warnings.append({
+        report.warnings.append({
             "message": "Unit declared but not used",
             "supplemental": "Units declared {} not used".format(list(diff)),
             "code": 1022
@@ -946,13 +1421,15 @@ def check_unit_category_ids_usage(study_json):
                     .format(list(diff)))
 
 
-def check_utf8(fp):
+def check_utf8(fp, report=None):
     """Used for rule 0010"""
+    if report is None:
+        report = _default_report
     import chardet
     with open(fp.name, "rb") as fp:
         charset = chardet.detect(fp.read())
         if charset["encoding"] is not "UTF-8" and charset["encoding"] is not "ascii":
-            warnings.append({
+            report.warnings.append({
                 "message": "File should be UTF8 encoding",
                 "supplemental": "Encoding is '{0}' with confidence {1}".format(charset["encoding"], charset["confidence"]),
                 "code": 10
@@ -962,16 +1439,14 @@ def check_utf8(fp):
             raise SystemError()
 
 
-def check_isa_schemas(isa_json, investigation_schema_path):
+def check_isa_schemas(isa_json, investigation_schema_path, report=None):
     """Used for rule 0003 and 4003"""
+    if report is None:
+        report = _default_report
     try:
-        with open(investigation_schema_path) as fp:
-            investigation_schema = json.load(fp)
-            resolver = RefResolver("file://" + investigation_schema_path, investigation_schema)
-            validator = Draft4Validator(investigation_schema, resolver=resolver)
-            validator.validate(isa_json)
+        json_schemas.get_validator(investigation_schema_path).validate(isa_json)
     except ValidationError as ve:
-        errors.append({
+        report.errors.append({
             "message": "Invalid JSON against ISA-JSON schemas",
             "supplemental": str(ve),
             "code": 3
@@ -981,81 +1456,70 @@ def check_isa_schemas(isa_json, investigation_schema_path):
         raise SystemError("(F) The JSON does not validate against the provided ISA-JSON schemas!")
 
 
-def check_date_formats(isa_json):
+def check_date_formats(isa_json, report=None, index=None):
     """Used for rule 3001"""
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _ISAJSONIndex(isa_json)
     def check_iso8601_date(date_str):
         if date_str is not "":
             try:
                 iso8601.parse_date(date_str)
             except iso8601.ParseError:
-                warnings.append({
+                report.warnings.append({
                     "message": "Date is not ISO8601 formatted",
                     "supplemental": "Found {} in date field".format(date_str),
                     "code": 3001
                 })
                 log.warning("(W) Date {} does not conform to ISO8601 format".format(date_str))
     import iso8601
-    try:
-        check_iso8601_date(isa_json["publicReleaseDate"])
-    except KeyError:
-        pass
-    try:
-        check_iso8601_date(isa_json["submissionDate"])
-    except KeyError:
-        pass
-    for study in isa_json["studies"]:
-        try:
-            check_iso8601_date(study["publicReleaseDate"])
-        except KeyError:
-            pass
-        try:
-            check_iso8601_date(study["submissionDate"])
-        except KeyError:
-            pass
-        for process in study["processSequence"]:
-            try:
-                check_iso8601_date(process["date"])
-            except KeyError:
-                pass
+    for date_str in index.dates:
+        check_iso8601_date(date_str)
+    for study_index in index.studies:
+        for date_str in study_index.dates + study_index.process_dates:
+            check_iso8601_date(date_str)
 
 
-def check_dois(isa_json):
+def check_dois(isa_json, report=None, index=None):
     """Used for rule 3002"""
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _ISAJSONIndex(isa_json)
     def check_doi(doi_str):
         if doi_str is not "":
             if not _RX_DOI.match(doi_str):
-                warnings.append({
+                report.warnings.append({
                     "message": "DOI is not valid format",
                     "supplemental": "Found {} in DOI field".format(doi_str),
                     "code": 3002
                 })
                 log.warning("(W) DOI {} does not conform to DOI format".format(doi_str))
-    for ipub in isa_json["publications"]:
-        try:
-            check_doi(ipub["doi"])
-        except KeyError:
-            pass
-    for study in isa_json["studies"]:
-        for spub in study["publications"]:
-            try:
-                check_doi(spub["doi"])
-            except KeyError:
-                pass
+    for doi_str in index.dois:
+        check_doi(doi_str)
+    for study_index in index.studies:
+        for doi_str in study_index.dois:
+            check_doi(doi_str)
 
 
-def check_filenames_present(isa_json):
+def check_filenames_present(isa_json, report=None, index=None):
     """Used for rule 3005"""
-    for s_pos, study in enumerate(isa_json["studies"]):
-        if study["filename"] is "":
-            warnings.append({
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _ISAJSONIndex(isa_json)
+    for s_pos, study_index in enumerate(index.studies):
+        if study_index.filename is "":
+            report.warnings.append({
                 "message": "Missing study file name",
                 "supplemental": "At study position {}".format(s_pos),
                 "code": 3005
             })
             log.warning("(W) A study filename is missing")
-        for a_pos, assay in enumerate(study["assays"]):
-            if assay["filename"] is "":
-                warnings.append({
+        for a_pos, assay_index in enumerate(study_index.assays):
+            if assay_index.filename is "":
+                report.warnings.append({
                     "message": "Missing assay file name",
                     "supplemental": "At study position {}, assay position {}".format(s_pos, a_pos),
                     "code": 3005
@@ -1063,74 +1527,93 @@ def check_filenames_present(isa_json):
                 log.warning("(W) An assay filename is missing")
 
 
-def check_pubmed_ids_format(isa_json):
+def check_pubmed_ids_format(isa_json, report=None, index=None):
     """Used for rule 3003"""
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _ISAJSONIndex(isa_json)
     def check_pubmed_id(pubmed_id_str):
         if pubmed_id_str is not "":
             if (_RX_PMID.match(pubmed_id_str) is None) and (_RX_PMCID.match(pubmed_id_str) is None):
-                warnings.append({
+                report.warnings.append({
                     "message": "PubMed ID is not valid format",
                     "supplemental": "Found PubMedID {}".format(pubmed_id_str),
                     "code": 3003
                 })
                 log.warning("(W) PubMed ID {} is not valid format".format(pubmed_id_str))
-    for ipub in isa_json["publications"]:
-        check_pubmed_id(ipub["pubMedID"])
-    for study in isa_json["studies"]:
-        for spub in study["publications"]:
-            check_pubmed_id(spub["pubMedID"])
+    for pubmed_id_str in index.pubmed_ids:
+        check_pubmed_id(pubmed_id_str)
+    for study_index in index.studies:
+        for pubmed_id_str in study_index.pubmed_ids:
+            check_pubmed_id(pubmed_id_str)
 
 
-def check_protocol_names(isa_json):
+def check_protocol_names(isa_json, report=None, index=None):
     """Used for rule 1010"""
-    for study in isa_json["studies"]:
-        for protocol in study["protocols"]:
-            if protocol["name"] is "":
-                warnings.append({
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _ISAJSONIndex(isa_json)
+    for study_index in index.studies:
+        for protocol_name, protocol_id in study_index.protocol_names:
+            if protocol_name is "":
+                report.warnings.append({
                     "message": "Protocol missing name",
-                    "supplemental": "Protocol @id={}".format(protocol["@id"]),
+                    "supplemental": "Protocol @id={}".format(protocol_id),
                     "code": 1010
                 })
                 log.warning("(W) A Protocol {} is missing Protocol Name, so can't be referenced in ISA-tab"
-                            .format(protocol["@id"]))
+                            .format(protocol_id))
 
 
-def check_protocol_parameter_names(isa_json):
+def check_protocol_parameter_names(isa_json, report=None, index=None):
     """Used for rule 1011"""
-    for study in isa_json["studies"]:
-        for protocol in study["protocols"]:
-            for parameter in protocol["parameters"]:
-                if parameter["parameterName"] is "":
-                    warnings.append({
-                        "message": "Protocol Parameter missing name",
-                        "supplemental": "Protocol Parameter @id={}".format(parameter["@id"]),
-                        "code": 1011
-                    })
-                    log.warning("(W) A Protocol Parameter {} is missing name, so can't be referenced in ISA-tab"
-                                .format(parameter["@id"]))
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _ISAJSONIndex(isa_json)
+    for study_index in index.studies:
+        for parameter_name, parameter_id in study_index.parameter_names:
+            if parameter_name is "":
+                report.warnings.append({
+                    "message": "Protocol Parameter missing name",
+                    "supplemental": "Protocol Parameter @id={}".format(parameter_id),
+                    "code": 1011
+                })
+                log.warning("(W) A Protocol Parameter {} is missing name, so can't be referenced in ISA-tab"
+                            .format(parameter_id))
 
 
-def check_study_factor_names(isa_json):
+def check_study_factor_names(isa_json, report=None, index=None):
     """Used for rule 1012"""
-    for study in isa_json["studies"]:
-        for factor in study["factors"]:
-            if factor["factorName"] is "":
-                warnings.append({
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _ISAJSONIndex(isa_json)
+    for study_index in index.studies:
+        for factor_name, factor_id in study_index.factor_names:
+            if factor_name is "":
+                report.warnings.append({
                     "message": "Study Factor missing name",
-                    "supplemental": "Study Factor @id={}".format(factor["@id"]),
+                    "supplemental": "Study Factor @id={}".format(factor_id),
                     "code": 1012
                 })
-                log.warning("(W) A Study Factor is missing name, so can't be referenced in ISA-tab"
-                            .format(factor["@id"]))
+                log.warning("(W) A Study Factor {} is missing name, so can't be referenced in ISA-tab"
+                            .format(factor_id))
 
 
-def check_ontology_sources(isa_json):
+def check_ontology_sources(isa_json, report=None, index=None):
     """Used for rule 3008"""
-    for ontology_source in isa_json["ontologySourceReferences"]:
-        if ontology_source["name"] is "":
-            warnings.append({
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _ISAJSONIndex(isa_json)
+    for term_source in index.term_sources:
+        if term_source is "":
+            report.warnings.append({
                 "message": "Ontology Source missing name ref",
-                "supplemental": "name={}".format(ontology_source["name"]),
+                "supplemental": "name={}".format(term_source),
                 "code": 3008
             })
             log.warning("(W) An Ontology Source Reference is missing Term Source Name, so can't be referenced")
@@ -1161,15 +1644,18 @@ def walk_and_get_annotations(isa_json, collector):
             walk_and_get_annotations(j, collector)
 
 
-def check_term_source_refs(isa_json):
+def check_term_source_refs(isa_json, report=None, index=None):
     """Used for rules 3007 and 3009"""
-    term_sources_declared = get_ontology_source_refs(isa_json)
-    collector = list()
-    walk_and_get_annotations(isa_json, collector)
-    term_sources_used = [annotation["termSource"] for annotation in collector if annotation["termSource"] is not ""]
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _ISAJSONIndex(isa_json)
+    term_sources_declared = index.term_sources
+    term_sources_used = [annotation["termSource"] for annotation in index.annotations
+                         if annotation["termSource"] is not ""]
     if len(set(term_sources_used) - set(term_sources_declared)) > 0:
         diff = set(term_sources_used) - set(term_sources_declared)
-        errors.append({
+        report.errors.append({
             "message": "Missing Term Source",
             "supplemental": "Ontology sources missing {}".format(list(diff)),
             "code": 3009
@@ -1178,7 +1664,7 @@ def check_term_source_refs(isa_json):
                   .format(list(diff)))
     elif len(set(term_sources_declared) - set(term_sources_used)) > 0:
         diff = set(term_sources_declared) - set(term_sources_used)
-        warnings.append({
+        report.warnings.append({
             "message": "Ontology Source Reference is not used",
             "supplemental": "Ontology sources not used {}".format(list(diff)),
             "code": 3007
@@ -1187,14 +1673,16 @@ def check_term_source_refs(isa_json):
                     .format(list(diff)))
 
 
-def check_term_accession_used_no_source_ref(isa_json):
+def check_term_accession_used_no_source_ref(isa_json, report=None, index=None):
     """Used for rule 3010"""
-    collector = list()
-    walk_and_get_annotations(isa_json, collector)
-    terms_using_accession_no_source_ref = [annotation for annotation in collector if annotation["termAccession"]
-                                           is not "" and annotation["termSource"] is ""]
+    if report is None:
+        report = _default_report
+    if index is None:
+        index = _ISAJSONIndex(isa_json)
+    terms_using_accession_no_source_ref = [annotation for annotation in index.annotations if
+                                           annotation["termAccession"] is not "" and annotation["termSource"] is ""]
     if len(terms_using_accession_no_source_ref) > 0:
-        warnings.append({
+        report.warnings.append({
             "message": "Missing Term Source REF in annotation",
             "supplemental": "Terms with accession but no source reference {}".format(terms_using_accession_no_source_ref),
             "code": 3010
@@ -1203,7 +1691,9 @@ def check_term_accession_used_no_source_ref(isa_json):
                     .format(terms_using_accession_no_source_ref))
 
 
-def load_config(config_dir):
+def load_config(config_dir, report=None):
+    if report is None:
+        report = _default_report
     import json
     configs = dict()
     for file in glob.iglob(os.path.join(config_dir, "*.json")):
@@ -1217,7 +1707,7 @@ def load_config(config_dir):
                 else:
                     configs[(config_dict["measurementType"], config_dict["technologyType"])] = config_dict
         except ValidationError:
-            errors.append({
+            report.errors.append({
                 "message": "Configurations could not be loaded",
                 "supplemental": "On loading {}".format(file),
                 "code": 4001
@@ -1226,7 +1716,9 @@ def load_config(config_dir):
     return configs
 
 
-def check_measurement_technology_types(assay_json, configs):
+def check_measurement_technology_types(assay_json, configs, report=None):
+    if report is None:
+        report = _default_report
     try:
         measurement_type = assay_json["measurementType"]["annotationValue"]
         technology_type = assay_json["technologyType"]["annotationValue"]
@@ -1234,7 +1726,7 @@ def check_measurement_technology_types(assay_json, configs):
         if config is None:
             raise KeyError
     except KeyError:
-        errors.append({
+        report.errors.append({
             "message": "Measurement/technology type invalid",
             "supplemental": "Measurement {}/technology {}".format(measurement_type, technology_type),
             "code": 4002
@@ -1243,8 +1735,10 @@ def check_measurement_technology_types(assay_json, configs):
                   .format(measurement_type, technology_type))
 
 
-def check_study_and_assay_graphs(study_json, configs):
+def check_study_and_assay_graphs(study_json, configs, report=None):
 
+    if report is None:
+        report = _default_report
     def check_assay_graph(process_sequence_json, config):
         list_of_last_processes_in_sequence = [i for i in process_sequence_json if "nextProcess" not in i.keys()]
         log.info("Checking against assay protocol sequence configuration {}".format(config["description"]))
@@ -1289,7 +1783,7 @@ def check_study_and_assay_graphs(study_json, configs):
                 prev_prot = prot
             from isatools.utils import contains
             if not contains(squished_assay_protocol_sequence_of_interest, config_protocol_sequence):
-                warnings.append({
+                report.warnings.append({
                     "message": "Process sequence is not valid against configuration",
                     "supplemental": "Config protocol sequence {} does not in assay protocol sequence {}".format(config_protocol_sequence,
                                                                                                                 squished_assay_protocol_sequence_of_interest),
@@ -1311,7 +1805,9 @@ def check_study_and_assay_graphs(study_json, configs):
         check_assay_graph(assay_json["processSequence"], config)
 
 
-def check_study_groups(study_or_assay):
+def check_study_groups(study_or_assay, report=None):
+    if report is None:
+        report = _default_report
     samples = study_or_assay.samples
     study_groups = set()
     for sample in samples:
@@ -1321,7 +1817,7 @@ def check_study_groups(study_or_assay):
     num_study_groups = len(study_groups)
     log.info('Found {} study groups in {}'.format(num_study_groups,
                                                   study_or_assay.identifier))
-    info.append({
+    report.info.append({
         'message': 'Found {} study groups in {}'.format(
             num_study_groups, study_or_assay.identifier),
         'supplemental': 'Found {} study groups in {}'.format(
@@ -1332,7 +1828,7 @@ def check_study_groups(study_or_assay):
         'Number of Study Groups')
     if study_group_size_in_comment is not None:
         if study_group_size_in_comment != num_study_groups:
-            warnings.append({
+            report.warnings.append({
                 'message': 'Reported study group size does not match table'
                     .format(num_study_groups,
                             study_or_assay.identifier),
@@ -1350,105 +1846,114 @@ default_config_dir = os.path.join(BASE_DIR, "resources", "config", "json", "defa
 
 def validate(fp, config_dir=default_config_dir, log_level=config.log_level,
              base_schemas_dir="isa_model_version_1_0_schemas"):
+    return _validate(fp, config_dir=config_dir, log_level=log_level, base_schemas_dir=base_schemas_dir)[0]
+
+
+def _validate(fp, config_dir=default_config_dir, log_level=config.log_level,
+              base_schemas_dir="isa_model_version_1_0_schemas"):
+    """Validates like validate(), returning the report with the JSON parsed
+    from fp and the Investigation loaded from it to check study groups, each
+    None if validation stopped before getting to it"""
     if config_dir is None:
         config_dir = default_config_dir
+    report = ValidationReport()
+    isa_json = isa = None
     log.setLevel(log_level)
     log.info("ISA JSON Validator from ISA tools API v0.3")
-    from io import StringIO
     stream = StringIO()
-    handler = logging.StreamHandler(stream)
+    handler = thread_log_handler(stream)
     log.addHandler(handler)
     try:
-        global errors
-        errors = list()
-        global warnings
-        warnings = list()
         log.info("Checking if encoding is UTF8")
-        check_utf8(fp=fp)  # Rule 0010
+        check_utf8(fp=fp, report=report)  # Rule 0010
         log.info("Loading json from " + fp.name)
-        isa_json = json.load(fp=fp)  # Rule 0002
+        isa_json = json.load(fp=fp, object_pairs_hook=_ISAJSONObject)  # Rule 0002
         log.info("Validating JSON against schemas using Draft4Validator")
         check_isa_schemas(isa_json=isa_json,
                           investigation_schema_path=os.path.join(BASE_DIR, "resources", "schemas", base_schemas_dir,
-                                                                 "core", "investigation_schema.json"))  # Rule 0003
+                                                                 "core", "investigation_schema.json"),
+                          report=report)  # Rule 0003
+        log.info("Indexing IDs, annotations and term sources...")
+        index = _ISAJSONIndex(isa_json)
         log.info("Checking if material IDs used are declared...")
-        for study_json in isa_json["studies"]:
-            check_material_ids_not_declared_used(study_json)  # Rules 1002-1005
-        for study_json in isa_json["studies"]:
-            check_material_ids_declared_used(study_json, get_source_ids)  # Rule 1015
-            check_material_ids_declared_used(study_json, get_sample_ids)  # Rule 1016
-            check_material_ids_declared_used(study_json, get_material_ids)  # Rule 1017
-            check_material_ids_declared_used(study_json, get_data_file_ids)  # Rule 1018
+        for study_json, study_index in zip(isa_json["studies"], index.studies):
+            check_material_ids_not_declared_used(study_json, report=report, index=study_index)  # Rules 1002-1005
+        for study_json, study_index in zip(isa_json["studies"], index.studies):
+            check_material_ids_declared_used(study_json, get_source_ids, report=report, index=study_index)  # Rule 1015
+            check_material_ids_declared_used(study_json, get_sample_ids, report=report, index=study_index)  # Rule 1016
+            check_material_ids_declared_used(study_json, get_material_ids, report=report, index=study_index)  # Rule 1017
+            check_material_ids_declared_used(study_json, get_data_file_ids, report=report, index=study_index)  # Rule 1018
         log.info("Checking characteristic categories usage...")
-        check_characteristic_category_ids_usage(isa_json["studies"])  # Rules 1013 and 1022
+        check_characteristic_category_ids_usage(isa_json["studies"], report=report, index=index)  # Rules 1013 and 1022
         log.info("Checking study factor usage...")
-        for study_json in isa_json["studies"]:
-            check_study_factor_usage(study_json)  # Rules 1008 and 1021
+        for study_json, study_index in zip(isa_json["studies"], index.studies):
+            check_study_factor_usage(study_json, report=report, index=study_index)  # Rules 1008 and 1021
         log.info("Checking protocol parameter usage...")
-        for study_json in isa_json["studies"]:
-            check_protocol_parameter_ids_usage(study_json)  # Rules 1009 and 1020
+        for study_json, study_index in zip(isa_json["studies"], index.studies):
+            check_protocol_parameter_ids_usage(study_json, report=report, index=study_index)  # Rules 1009 and 1020
         log.info("Checking unit category usage...")
-        for study_json in isa_json["studies"]:
-            check_unit_category_ids_usage(study_json)  # Rules 1014 and 1022
+        for study_json, study_index in zip(isa_json["studies"], index.studies):
+            check_unit_category_ids_usage(study_json, report=report, index=study_index)  # Rules 1014 and 1022
         log.info("Checking process sequences (study)...")
-        for study_json in isa_json["studies"]:
-            check_process_sequence_links(study_json["processSequence"])  # Rule 1006
+        for study_json, study_index in zip(isa_json["studies"], index.studies):
+            check_process_sequence_links(study_json["processSequence"], report=report,
+                                         index=study_index.process_sequence)  # Rule 1006
             log.info("Checking process sequences (assay)...")
-            for assay_json in study_json["assays"]:
-                check_process_sequence_links(assay_json["processSequence"])  # Rule 1006
+            for assay_json, assay_index in zip(study_json["assays"], study_index.assays):
+                check_process_sequence_links(assay_json["processSequence"], report=report,
+                                             index=assay_index.process_sequence)  # Rule 1006
         log.info("Checking process protocol usage...")
-        for study_json in isa_json["studies"]:
-            check_process_protocol_ids_usage(study_json)  # Rules 1007 and 1019
+        for study_json, study_index in zip(isa_json["studies"], index.studies):
+            check_process_protocol_ids_usage(study_json, report=report, index=study_index)  # Rules 1007 and 1019
         log.info("Checking date formats...")
-        check_date_formats(isa_json)  # Rule 3001
+        check_date_formats(isa_json, report=report, index=index)  # Rule 3001
         log.info("Checking DOI formats...")
-        check_dois(isa_json)  # Rule 3002
+        check_dois(isa_json, report=report, index=index)  # Rule 3002
         log.info("Checking Pubmed ID formats...")
-        check_pubmed_ids_format(isa_json)  # Rule 3003
+        check_pubmed_ids_format(isa_json, report=report, index=index)  # Rule 3003
         log.info("Checking filenames are present...")
-        check_filenames_present(isa_json)  # Rule 3005
+        check_filenames_present(isa_json, report=report, index=index)  # Rule 3005
         log.info("Checking protocol names...")
-        check_protocol_names(isa_json)  # Rule 1010
+        check_protocol_names(isa_json, report=report, index=index)  # Rule 1010
         log.info("Checking protocol parameter names...")
-        check_protocol_parameter_names(isa_json)  # Rule 1011
+        check_protocol_parameter_names(isa_json, report=report, index=index)  # Rule 1011
         log.info("Checking study factor names...")
-        check_study_factor_names(isa_json)  # Rule 1012
+        check_study_factor_names(isa_json, report=report, index=index)  # Rule 1012
         log.info("Checking ontology sources...")
-        check_ontology_sources(isa_json)  # Rule 3008
+        check_ontology_sources(isa_json, report=report, index=index)  # Rule 3008
         log.info("Checking term source REFs...")
-        check_term_source_refs(isa_json)  # Rules 3007 and 3009
+        check_term_source_refs(isa_json, report=report, index=index)  # Rules 3007 and 3009
         log.info("Checking missing term source REFs...")
-        check_term_accession_used_no_source_ref(isa_json)  # Rule 3010
+        check_term_accession_used_no_source_ref(isa_json, report=report, index=index)  # Rule 3010
         log.info("Loading configurations from " + config_dir)
-        configs = load_config(config_dir)  # Rule 4001
+        configs = load_config(config_dir, report=report)  # Rule 4001
         log.info("Checking measurement and technology types...")
         for study_json in isa_json["studies"]:
             for assay_json in study_json["assays"]:
-                check_measurement_technology_types(assay_json, configs)  # Rule 4002
+                check_measurement_technology_types(assay_json, configs, report=report)  # Rule 4002
         log.info("Checking against configuration schemas...")
         check_isa_schemas(isa_json=isa_json,
                           investigation_schema_path=os.path.join(config_dir, "schemas",
-                                                                 "investigation_schema.json"))  # Rule 4003
+                                                                 "investigation_schema.json"),
+                          report=report)  # Rule 4003
         # if all ERRORS are resolved, then try and validate against configuration
         handler.flush()
         if "(E)" in stream.getvalue():
             log.fatal("(F) There are some errors that mean validation against configurations cannot proceed.")
             return stream
-        fp.seek(0)  # reset file pointer
         log.info("Checking study and assay graphs...")
         for study_json in isa_json["studies"]:
-            check_study_and_assay_graphs(study_json, configs)  # Rule 4004
-        fp.seek(0)
+            check_study_and_assay_graphs(study_json, configs, report=report)  # Rule 4004
         # try load and do study groups check
         log.info("Checking study groups...")
-        isa = load(fp)
+        isa = load_dict(isa_json)
         for study in isa.studies:
-            check_study_groups(study)
+            check_study_groups(study, report=report)
             for assay in study.assays:
-                check_study_groups(assay)
+                check_study_groups(assay, report=report)
         log.info("Finished validation...")
     except KeyError as k:
-        errors.append({
+        report.errors.append({
             "message": "JSON Error",
             "supplemental": "Error when reading JSON; key: {}".format(str(k)),
             "code": 2
@@ -1456,7 +1961,7 @@ def validate(fp, config_dir=default_config_dir, log_level=config.log_level,
         log.fatal("(F) There was an error when trying to read the JSON")
         log.fatal("Key: " + str(k))
     except ValueError as v:
-        errors.append({
+        report.errors.append({
             "message": "JSON Error",
             "supplemental": "Error when parsing JSON; key: {}".format(str(v)),
             "code": 2
@@ -1464,7 +1969,7 @@ def validate(fp, config_dir=default_config_dir, log_level=config.log_level,
         log.fatal("(F) There was an error when trying to parse the JSON")
         log.fatal("Value: " + str(v))
     except SystemError as e:
-        errors.append({
+        report.errors.append({
             "message": "Unknown/System Error",
             "supplemental": str(e),
             "code": 0
@@ -1472,17 +1977,58 @@ def validate(fp, config_dir=default_config_dir, log_level=config.log_level,
         log.fatal("(F) Something went very very wrong! :(")
     finally:
         handler.flush()
+        log.removeHandler(handler)
         return {
-            "errors": errors,
-            "warnings": warnings,
+            "errors": report.errors,
+            "warnings": report.warnings,
             "validation_finished": True
+        }, isa_json, isa
+
+
+def _validate_json_file(json_file):
+    log.info("***Validating {}***\n".format(json_file))
+    if not os.path.isfile(json_file):
+        log.warning("Could not find ISA-JSON file, skipping {}".format(json_file))
+        return None
+    with open(json_file) as fp:
+        return {
+            "filename": fp.name,
+            "report": validate(fp)
         }
 
 
-def batch_validate(json_file_list):
+def iter_batch_validate(json_file_list, workers=None):
+    """ Validate a batch of ISA-JSON files, yielding the report of each file
+    as soon as it is validated
+        :param json_file_list: List of file paths to the ISA-JSON files to validate
+        :param workers: Number of processes validating files concurrently;
+        files are validated one after another if None or 1
+        :return: generator of dicts with the filename and report of a file,
+        each of which json.dumps() can write as one line of a JSON lines
+        file. With workers, they come in the order the files finish
+        validating. A file that cannot be validated gets a report with the
+        error that stopped it, and does not stop the batch.
+
+        Example:
+            from isatools import isajson
+            my_jsons = [
+                "/path/to/study1.json",
+                "/path/to/study2.json"
+            ]
+            with open("/path/to/reports.jsonl", "w") as out_fp:
+                for entry in isajson.iter_batch_validate(my_jsons, workers=4):
+                    out_fp.write(json.dumps(entry) + "\n")
+        """
+    json_schemas.warm()
+    return iter_batch(_validate_json_file, json_file_list, workers=workers)
+
+
+def batch_validate(json_file_list, workers=None):
     """ Validate a batch of ISA-JSON files
         :param json_file_list: List of file paths to the ISA-JSON files to validate
-        :return: Dict of reports
+        :param workers: Number of processes validating files concurrently;
+        see iter_batch_validate()
+        :return: Dict of reports, in the order of json_file_list
 
         Example:
             from isatools import isajson
@@ -1490,47 +2036,136 @@ def batch_validate(json_file_list):
                 "/path/to/study1.json",
                 "/path/to/study2.json"
             ]
-            my_reports = isajson.batch_validate(my_jsons)
+            my_reports = isajson.batch_validate(my_jsons, workers=4)
         """
+    json_schemas.warm()
     batch_report = {
-        "batch_report": []
+        "batch_report": list(iter_batch(_validate_json_file, json_file_list, workers=workers, ordered=True))
     }
-    for json_file in json_file_list:
-        log.info("***Validating {}***\n".format(json_file))
-        if not os.path.isfile(json_file):
-            log.warning("Could not find ISA-JSON file, skipping {}".format(json_file))
-        else:
-            with open(json_file) as fp:
-                batch_report["batch_report"].append(
-                    {
-                        "filename": fp.name,
-                        "report": validate(fp)
-                    }
-                )
     return batch_report
 
 
+class _LazyList(object):
+    """A JSON array of getter(item) for each of items, encoded one element
+    at a time by ISAJSONEncoder.iterencode"""
+
+    __slots__ = ('items', 'getter')
+
+    def __init__(self, items, getter):
+        self.items = items
+        self.getter = getter
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return map(self.getter, self.items)
+
+
+class _StreamedObject(dict):
+    """A JSON object with _LazyList members, or with members that are
+    _StreamedObjects"""
+
+
+def _materialize(o):
+    """Replaces the _LazyLists in an encoded object with lists"""
+    if isinstance(o, _LazyList):
+        return [_materialize(x) for x in o]
+    if isinstance(o, _StreamedObject):
+        return {k: _materialize(v) for k, v in o.items()}
+    return o
+
+
 class ISAJSONEncoder(JSONEncoder):
+    """JSONEncoder for the ISA model, to use as the cls of json.dump and
+    json.dumps.
+
+    An Investigation or Study is written as it is walked, so that json.dump
+    writes it to the file in chunks of about chunk_size characters without
+    building the JSON of its materials, data files, processes or assays as
+    a whole. With indent or sort_keys set it is encoded in one go instead.
+
+    With compact=True, members with a null, empty string, empty array or
+    empty object value are left out, except for the members that the default
+    configuration schemas require and those that ontology annotations are
+    told apart by, which are written as empty strings, so that the document
+    still validates. isajson.load reads both forms.
+
+    The @id of an object is given the first time the object is referred to
+    in an encoding, e.g. a json.dump call, as a prefix for its type followed
+    by the count of objects given that prefix before it, so that encoding
+    the same objects again gives the same document.
+    """
+
+    chunk_size = 1 << 16
+
+    def __init__(self, *args, compact=False, **kwargs):
+        super(ISAJSONEncoder, self).__init__(*args, **kwargs)
+        self.compact = compact
+        self._ids = dict()
+        self._id_counts = dict()
+
+    def iterencode(self, o, _one_shot=False):
+        # the id() keys of self._ids are only valid during an encoding, in
+        # which the objects are kept in the registry
+        self._ids = dict()
+        self._id_counts = dict()
+        if isinstance(o, (Investigation, Study)) and self.indent is None and not self.sort_keys:
+            return self._iterencode_chunks(self._encode(o))
+        return super(ISAJSONEncoder, self).iterencode(o, _one_shot)
+
+    def _iterencode_chunks(self, o):
+        chunks = []
+        size = 0
+        for chunk in self._iterencode_streamed(o):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.chunk_size:
+                yield ''.join(chunks)
+                chunks = []
+                size = 0
+        if chunks:
+            yield ''.join(chunks)
+
+    def _iterencode_streamed(self, o):
+        # what is not streamed is encoded in one go, which is what lets
+        # JSONEncoder use its C implementation
+        iterencode = super(ISAJSONEncoder, self).iterencode
+        if isinstance(o, _LazyList):
+            yield '['
+            for i, element in enumerate(o):
+                if i:
+                    yield self.item_separator
+                yield from self._iterencode_streamed(element)
+            yield ']'
+        elif isinstance(o, _StreamedObject):
+            yield '{'
+            for i, (key, value) in enumerate(o.items()):
+                if i:
+                    yield self.item_separator
+                yield from iterencode(key, True)
+                yield self.key_separator
+                yield from self._iterencode_streamed(value)
+            yield '}'
+        else:
+            yield from iterencode(o, True)
 
     def default(self, o):
+        return _materialize(self._encode(o))
 
-        def remove_nulls(d):
-            return {k: v for k, v in d.items() if v or isinstance(v, list) or v == ''}
+    def _encode(self, o):
 
-        def nulls_to_str(d):
-            to_del = []
-            for k, v in d.items():
-                if not isinstance(v, list) and v is None:
-                    d[k] = ''
-                if (k == "unit" or k == "previousProcess" or k == "nextProcess") and (v is None or v == ''):
-                    to_del.append(k)
-            for k in to_del:
-                del d[k]
-            return d
+        # keep names the members that compact output writes even when empty
+        def remove_empty(d, keep=()):
+            return {k: '' if v is None else v for k, v in d.items()
+                    if k in keep or not (v is None or v == '' or
+                                         (isinstance(v, (list, dict, _LazyList)) and len(v) == 0))}
 
-        # TODO: deal with non-verbose mode parsing; currently will break because of missing k-v's
-        clean_nulls = nulls_to_str  # creates verbose JSON if using nulls to str
-        # clean_nulls = remove_nulls  # optimises by removing k-v's that are null or empty strings but breaks reader
+        def nulls_to_str(d, keep=()):
+            return {k: '' if v is None else v for k, v in d.items()
+                    if not ((k == "unit" or k == "previousProcess" or k == "nextProcess") and (v is None or v == ''))}
+
+        clean_nulls = remove_empty if self.compact else nulls_to_str
 
         def get_comment(o):
             return clean_nulls(
@@ -1561,7 +2196,7 @@ class ISAJSONEncoder(JSONEncoder):
                         "annotationValue": o.term,
                         "termAccession": o.term_accession,
                         "termSource": o.term_source.name if o.term_source else None
-                    }
+                    }, keep=_ANNOTATION_KEYS
                 )
             else:
                 return None
@@ -1582,7 +2217,7 @@ class ISAJSONEncoder(JSONEncoder):
                     "midInitials": o.mid_initials if o.mid_initials else '',
                     "phone": o.phone,
                     "roles": get_ontology_annotations(o.roles)
-                }
+                }, keep=("firstName", "lastName", "midInitials")
             )
 
         def get_people(o):
@@ -1596,7 +2231,7 @@ class ISAJSONEncoder(JSONEncoder):
                     "pubMedID": o.pubmed_id,
                     "status": get_ontology_annotation(o.status) if o.status else {"@id": ''},
                     "title": o.title
-                }
+                }, keep=("pubMedID", "doi")
             )
 
         def get_publications(o):
@@ -1694,26 +2329,39 @@ class ISAJSONEncoder(JSONEncoder):
         def sqeezstr(s):
             return s.replace(' ', '').lower()
 
+        def id_prefix(o):
+            if isinstance(o, Source):
+                return '#source/'
+            elif isinstance(o, Sample):
+                return '#sample/'
+            elif isinstance(o, Material):
+                if o.type == 'Extract Name':
+                    return '#material/extract-'
+                elif o.type == 'Labeled Extract Name':
+                    return '#material/labledextract-'
+                else:
+                    raise TypeError("Could not resolve data type labeled: " + o.type)
+            elif isinstance(o, DataFile):
+                    return '#data/{}-'.format(sqeezstr(o.label))
+            elif isinstance(o, Process):
+                return '#process/'  # TODO: Implement ID gen on different kinds of processes?
+            else:
+                return '#{}/'.format(type(o).__name__.lower())
+
+        ids = self._ids
+        id_counts = self._id_counts
+
         def id_gen(o):
             if o is not None:
-                o_id = str(id(o))
-                if isinstance(o, Source):
-                    return '#source/' + o_id
-                elif isinstance(o, Sample):
-                    return '#sample/' + o_id
-                elif isinstance(o, Material):
-                    if o.type == 'Extract Name':
-                        return '#material/extract-' + o_id
-                    elif o.type == 'Labeled Extract Name':
-                        return '#material/labledextract-' + o_id
-                    else:
-                        raise TypeError("Could not resolve data type labeled: " + o.type)
-                elif isinstance(o, DataFile):
-                        return '#data/{}-'.format(sqeezstr(o.label)) + o_id
-                elif isinstance(o, Process):
-                    return '#process/' + o_id  # TODO: Implement ID gen on different kinds of processes?
-                else:
-                    return '#' + o_id
+                try:
+                    return ids[id(o)][1]
+                except KeyError:
+                    prefix = id_prefix(o)
+                    count = id_counts.get(prefix, 0)
+                    id_counts[prefix] = count + 1
+                    o_id = prefix + str(count)
+                    ids[id(o)] = (o, o_id)
+                    return o_id
             else:
                 return None
 
@@ -1743,7 +2391,7 @@ class ISAJSONEncoder(JSONEncoder):
                 }
             )
 
-        def get_study(o): return clean_nulls(
+        def get_study(o): return _StreamedObject(clean_nulls(
             {
                 "filename": o.filename,
                 "identifier": o.identifier,
@@ -1755,34 +2403,28 @@ class ISAJSONEncoder(JSONEncoder):
                 "people": get_people(o.contacts),
                 "studyDesignDescriptors": get_ontology_annotations(o.design_descriptors),
                 "protocols": list(map(lambda x: get_protocol(x), o.protocols)),
-                "materials": {
-                    "sources": list(map(lambda x: get_source(x), o.sources)),
-                    "samples": get_samples(o.samples),
-                    "otherMaterials": get_other_materials(o.other_material)
-                },
-                "processSequence": list(map(lambda x: get_process(x), o.process_sequence)),
+                "materials": clean_materials({
+                    "sources": _LazyList(o.sources, get_source),
+                    "samples": _LazyList(o.samples, get_sample),
+                    "otherMaterials": _LazyList(o.other_material, get_other_material)
+                }),
+                "processSequence": _LazyList(o.process_sequence, get_process),
                 "factors": list(map(lambda x: get_factor(x), o.factors)),
                 "characteristicCategories": get_characteristic_categories(o.characteristic_categories),
                 "unitCategories": get_ontology_annotations(o.units),
                 "comments": get_comments(o.comments),
-                "assays": list(map(lambda x: get_assay(x), o.assays))
-            }
-        )
+                "assays": _LazyList(o.assays, get_assay)
+            }, keep=("identifier", "title", "description")
+        ))
+
+        def clean_materials(d):
+            return _StreamedObject(remove_empty(d) if self.compact else d)
 
         def get_characteristic_categories(o):
             return list(map(lambda x: get_characteristic_category(x), o))
 
-        def get_samples(o):
-            return list(map(lambda x: get_sample(x), o))
-
-        def get_other_materials(o):
-            return list(map(lambda x: get_other_material(x), o))
-
-        def get_processes(o):
-            return list(map(lambda x: get_process(x), o))
-
         def get_assay(o):
-            return clean_nulls(
+            return _StreamedObject(clean_nulls(
                 {
                     "measurementType": get_ontology_annotation(o.measurement_type),
                     "technologyType": get_ontology_annotation(o.technology_type),
@@ -1791,14 +2433,14 @@ class ISAJSONEncoder(JSONEncoder):
                     "characteristicCategories": get_characteristic_categories(o.characteristic_categories),
                     "unitCategories": get_ontology_annotations(o.units),
                     "comments": get_comments(o.comments) if o.comments else [],
-                    "materials": {
-                        "samples": get_samples(o.samples),
-                        "otherMaterials": get_other_materials(o.other_material)
-                    },
-                    "dataFiles": list(map(lambda x: get_data_file(x), o.data_files)),
-                    "processSequence": get_processes(o.process_sequence)
+                    "materials": clean_materials({
+                        "samples": _LazyList(o.samples, get_sample),
+                        "otherMaterials": _LazyList(o.other_material, get_other_material)
+                    }),
+                    "dataFiles": _LazyList(o.data_files, get_data_file),
+                    "processSequence": _LazyList(o.process_sequence, get_process)
                 }
-            )
+            ))
 
         def get_data_file(o):
             return clean_nulls(
@@ -1811,7 +2453,7 @@ class ISAJSONEncoder(JSONEncoder):
             )
 
         if isinstance(o, Investigation):
-            return clean_nulls(
+            return _StreamedObject(clean_nulls(
                 {
                     "identifier": o.identifier,
                     "title": o.title,
@@ -1822,9 +2464,9 @@ class ISAJSONEncoder(JSONEncoder):
                     "publicReleaseDate": o.public_release_date,
                     "submissionDate": o.submission_date,
                     "publications": get_publications(o.publications),
-                    "studies": list(map(lambda x: get_study(x), o.studies))
-                }
-            )
+                    "studies": _LazyList(o.studies, get_study)
+                }, keep=("identifier", "title", "description")
+            ))
         elif isinstance(o, Study):
             return get_study(o)
         elif isinstance(o, OntologySource):
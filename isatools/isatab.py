@@ -13,11 +13,14 @@ import math
 import numpy as np
 import os
 import pandas as pd
+import pickle
 import re
 import shutil
 import tempfile
 from bisect import bisect_left
 from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from io import StringIO
 from itertools import tee
 from itertools import zip_longest
@@ -28,7 +31,17 @@ from progressbar import Bar
 from progressbar import ETA
 
 from isatools import config
+from isatools.io import isatab_configurator
 from isatools.model import *
+from isatools.model import _process_sequence_edges
+from isatools.validation import RuleRunner
+from isatools.validation import ValidationCache
+from isatools.validation import ValidationReport
+from isatools.validation import ValidationStopped
+from isatools.validation import digest as validation_digest
+from isatools.validation import file_digest
+from isatools.validation import iter_batch
+from isatools.validation import thread_log_handler
 
 logging.basicConfig(level=config.log_level)
 log = logging.getLogger(__name__)
@@ -163,9 +176,12 @@ class TransposedTabParser(object):
         return self._ttable_dict
 
 
-errors = []
-warnings = []
-info = []
+# Findings of the check functions when called without a report, outside of
+# validate()
+_default_report = ValidationReport()
+errors = _default_report.errors
+warnings = _default_report.warnings
+info = _default_report.info
 
 # REGEXES
 _RX_I_FILE_NAME = re.compile('i_(.*?)\.txt')
@@ -177,6 +193,9 @@ _RX_PMCID = re.compile('PMC[0-9]{8}')
 _RX_CHARACTERISTICS = re.compile('Characteristics\[(.*?)\]')
 _RX_PARAMETER_VALUE = re.compile('Parameter Value\[(.*?)\]')
 _RX_FACTOR_VALUE = re.compile('Factor Value\[(.*?)\]')
+_RX_PROTOCOL_REF = re.compile('Protocol REF')
+_RX_TERM_SOURCE_REF = re.compile('Term Source REF')
+_RX_SUMMARY_COLUMN = re.compile('(Sample Name|Protocol REF|Term Source REF)')
 _RX_INDEXED_COL = re.compile('(.*?)\.\d+')
 
 # column labels
@@ -586,56 +605,363 @@ def _get_start_end_nodes(G):
     return start_nodes, end_nodes
 
 
+def _path_node_weight(n):
+    """The number of columns a node contributes to a table row, as used to
+    pick the path that lays out the columns of a table"""
+    weight = 1
+    if isinstance(n, Source):
+        weight += len(n.characteristics)
+    elif isinstance(n, Sample):
+        weight += (len(n.characteristics) + len(n.factor_values))
+    elif isinstance(n, Material):
+        weight += (len(n.characteristics))
+    elif isinstance(n, Process):
+        weight += len([o for o in n.outputs if isinstance(o, DataFile)])
+    if n.comments is not None:
+        weight += len(n.comments)
+    return weight
+
+
 def _longest_path_and_attrs(paths):
     longest = (0, None)
     for path in paths:
-        length = len(path)
-        for n in path:
-            if isinstance(n, Source):
-                length += len(n.characteristics)
-            elif isinstance(n, Sample):
-                length += (len(n.characteristics) + len(n.factor_values))
-            elif isinstance(n, Material):
-                length += (len(n.characteristics))
-            elif isinstance(n, Process):
-                length += len([o for o in n.outputs if isinstance(o, DataFile)])
-            if n.comments is not None:
-                length += len(n.comments)
+        length = sum(_path_node_weight(n) for n in path)
         if length > longest[0]:
             longest = (length, path)
     return longest[1]
 
 
+class _ProcessSequenceGraph(object):
+    """The graph of a process sequence that the table files are written
+    from, built from the same edges as the study or assay graph.
+
+    It has the nodes and edges of the study or assay graph, in the same
+    order, but tells nodes apart by identity rather than by value, so that
+    building it hashes none of them. nodes_by_id maps id(node) to each node
+    and successor_ids maps it to the ids of the node's successors.
+    """
+
+    def __init__(self, process_sequence):
+        self.nodes_by_id = OrderedDict()
+        self.successor_ids = {}
+        for u, v in _process_sequence_edges(process_sequence):
+            self._add_edge(u, v)
+
+    def _add_edge(self, u, v):
+        for node in (u, v):
+            if id(node) not in self.nodes_by_id:
+                self.nodes_by_id[id(node)] = node
+                self.successor_ids[id(node)] = OrderedDict()
+        self.successor_ids[id(u)][id(v)] = None
+
+    def nodes(self):
+        return list(self.nodes_by_id.values())
+
+
+class _EndToEndPaths(object):
+    """The end-to-end paths of a study or assay graph, from each of the given
+    start nodes, i.e. from each Source to the Samples without successors, or
+    from each Sample to the Processes without a next process.
+
+    Rather than running all_simple_paths for every start and end pair, the
+    graph is searched depth first once per start, skipping the successors
+    that lead to no end. Whether a node leads to an end, the number of paths
+    from it and its longest suffix are each worked out once per node, so
+    counting the paths and picking the longest one take linear time, and
+    iterating takes time linear in the size of the paths. A path can also be
+    got by its position, with a binary search on the path counts at each
+    node along it.
+
+    Paths come in a stable order: by start node, then by successor order,
+    with a path stopping at an end before the paths going through it.
+    """
+
+    def __init__(self, G, start_nodes):
+        self.start_nodes = list(start_nodes)
+        if isinstance(G, _ProcessSequenceGraph):
+            self._nodes = G.nodes_by_id
+            self._successors = G.successor_ids
+        else:
+            self._nodes = {}
+            self._successors = {}
+            for node, successors in G.succ.items():
+                self._nodes[id(node)] = node
+                self._successors[id(node)] = [id(x) for x in successors]
+            nodes = None
+            for i, successors in self._successors.items():
+                if not all(j in self._nodes for j in successors):
+                    # a successor can be another object equal to a node of
+                    # G, which G holds as that node
+                    if nodes is None:
+                        nodes = {node: node for node in G}
+                    self._successors[i] = [id(nodes[x]) for x in G.succ[self._nodes[i]]]
+        self._leads_to_end = {}
+        self._counts = {}
+        self._suffixes = {}
+        self._offsets = {}
+        self._start_totals = None
+
+    def _is_end(self, start, i):
+        node = self._nodes[i]
+        if isinstance(start, Source):
+            return isinstance(node, Sample) and len(self._successors[i]) == 0
+        elif isinstance(start, Sample):
+            return isinstance(node, Process) and node.next_process is None
+        return False
+
+    def _kind(self, start):
+        return Source if isinstance(start, Source) else Sample \
+            if isinstance(start, Sample) else None
+
+    def _postorder(self, start, solved):
+        """Yields the ids of the nodes reachable from start that are not in
+        solved, each after its successors, leaving out start"""
+        seen = {id(start)}
+        stack = [(id(start), iter(self._successors[id(start)]))]
+        while stack:
+            i, successors = stack[-1]
+            for j in successors:
+                if j not in seen and j not in solved:
+                    seen.add(j)
+                    stack.append((j, iter(self._successors[j])))
+                    break
+            else:
+                stack.pop()
+                if i != id(start):
+                    yield i
+
+    def _solve(self, start):
+        """Works out which nodes lead to an end, the path counts and the
+        longest suffixes of the nodes reachable from start"""
+        kind = self._kind(start)
+        leads_to_end = self._leads_to_end.setdefault(kind, {})
+        counts = self._counts.setdefault(kind, {})
+        suffixes = self._suffixes.setdefault(kind, {})
+        for i in self._postorder(start, leads_to_end):
+            # the suffix of a path stopping here comes before any going on
+            is_end = self._is_end(start, i)
+            count = 1 if is_end else 0
+            best = (_path_node_weight(self._nodes[i]), None) \
+                if is_end else (0, None)
+            for j in self._successors[i]:
+                if leads_to_end.get(j):
+                    count += counts[j]
+                    length = _path_node_weight(self._nodes[i]) + \
+                        suffixes[j][0]
+                    if length > best[0]:
+                        best = (length, j)
+            leads_to_end[i] = count > 0
+            counts[i] = count
+            suffixes[i] = best
+        return leads_to_end, counts, suffixes
+
+    def __iter__(self):
+        for start in self.start_nodes:
+            if self._kind(start) is None:
+                continue
+            leads_to_end, _, __ = self._solve(start)
+            path = [id(start)]
+            on_path = {id(start)}
+            stack = [iter(self._successors[id(start)])]
+            while stack:
+                for j in stack[-1]:
+                    if j in on_path or not leads_to_end.get(j):
+                        continue
+                    path.append(j)
+                    on_path.add(j)
+                    stack.append(iter(self._successors[j]))
+                    if self._is_end(start, j):
+                        yield [self._nodes[x] for x in path]
+                    break
+                else:
+                    stack.pop()
+                    on_path.discard(path.pop())
+
+    def _start_offsets(self):
+        """Returns the number of paths from the start nodes before each start
+        node, followed by the total number of paths"""
+        if self._start_totals is None:
+            totals = [0]
+            for start in self.start_nodes:
+                count = 0
+                if self._kind(start) is not None:
+                    leads_to_end, counts, _ = self._solve(start)
+                    count = sum(counts[j] for j in self._successors[id(start)]
+                                if leads_to_end.get(j))
+                totals.append(totals[-1] + count)
+            self._start_totals = totals
+        return self._start_totals
+
+    def _successor_offsets(self, kind, i):
+        """Returns the successors of node i that lead to an end, and the
+        number of paths through the successors before each of them"""
+        offsets = self._offsets.setdefault(kind, {})
+        if i not in offsets:
+            leads_to_end, counts = self._leads_to_end[kind], self._counts[kind]
+            successors, totals, total = [], [], 0
+            for j in self._successors[i]:
+                if leads_to_end.get(j):
+                    successors.append(j)
+                    totals.append(total)
+                    total += counts[j]
+            offsets[i] = (successors, totals)
+        return offsets[i]
+
+    def __len__(self):
+        return self._start_offsets()[-1]
+
+    def __getitem__(self, k):
+        """Returns the path at position k in path order, found by going down
+        the path counts rather than through the paths before it"""
+        start_totals = self._start_offsets()
+        if k < 0:
+            k += start_totals[-1]
+        if not 0 <= k < start_totals[-1]:
+            raise IndexError('path index out of range')
+        n = bisect_right(start_totals, k) - 1
+        start, k = self.start_nodes[n], k - start_totals[n]
+        kind = self._kind(start)
+        path = [start]
+        i = id(start)
+        while True:
+            successors, totals = self._successor_offsets(kind, i)
+            n = bisect_right(totals, k) - 1
+            i, k = successors[n], k - totals[n]
+            path.append(self._nodes[i])
+            if self._is_end(start, i):
+                if k == 0:
+                    return path
+                k -= 1
+
+    def longest(self):
+        """Returns the path with the most columns, the first one in path
+        order if there are several, or None if there are no paths"""
+        longest = (0, None)
+        for start in self.start_nodes:
+            if self._kind(start) is None:
+                continue
+            leads_to_end, _, suffixes = self._solve(start)
+            best = (0, None)
+            for j in self._successors[id(start)]:
+                if leads_to_end.get(j) and suffixes[j][0] > best[0]:
+                    best = (suffixes[j][0], j)
+            if best[1] is None:
+                continue
+            length = _path_node_weight(start) + best[0]
+            if length > longest[0]:
+                path = [start]
+                i = best[1]
+                while i is not None:
+                    path.append(self._nodes[i])
+                    i = suffixes[i][1]
+                longest = (length, path)
+        return longest[1]
+
+
 def _all_end_to_end_paths(G, start_nodes):  # we know graphs start with Source or Sample and end with Process
-    paths = []
-    num_start_nodes = len(start_nodes)
-    message = 'Calculating for paths for {} start nodes: '.format(num_start_nodes)
-    if isinstance(start_nodes[0], Source):
-        message = 'Calculating for paths for {} sources: '.format(num_start_nodes)
-    elif isinstance(start_nodes[0], Sample):
-        message = 'Calculating for paths for {} samples: '.format(num_start_nodes)
-    if config.show_pbars:
-        pbar = ProgressBar(min_value=0, max_value=num_start_nodes, widgets=[message,
-                                                                            SimpleProgress(),
-                                                                            Bar(left=" |", right="| "), ETA()]).start()
-    else:
-        pbar = lambda x: x
-    for start in pbar(start_nodes):
-        # Find ends
-        if isinstance(start, Source):  # only look for Sample ends if start is a Source
-            for end in [x for x in nx.algorithms.descendants(G, start) if
-                        isinstance(x, Sample) and len(G.out_edges(x)) == 0]:
-                paths += list(nx.algorithms.all_simple_paths(G, start, end))
-        elif isinstance(start, Sample):  # only look for Process ends if start is a Sample
-            for end in [x for x in nx.algorithms.descendants(G, start) if
-                        isinstance(x, Process) and x.next_process is None]:
-                paths += list(nx.algorithms.all_simple_paths(G, start, end))
+    paths = list(_EndToEndPaths(G, start_nodes))
     log.info("Found {} paths!".format(len(paths)))
     if len(paths) == 0:
         log.debug([x.name for x in start_nodes])
     return paths
 
 
+def _is_missing_cell(value):
+    return value is None or (isinstance(value, str) and value == '') or \
+        (isinstance(value, float) and math.isnan(value))
+
+
+def _is_numeric_cell(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _format_cell(value, as_float):
+    if _is_missing_cell(value):
+        return ''
+    elif as_float:
+        return repr(float(value))
+    return value if isinstance(value, str) else str(value)
+
+
+def _write_table_rows(out_fp, paths, header, render_path):
+    """
+        Writes a table with one row per path, as rendered by render_path into
+        a list of cell values, sorted on the first column with duplicate rows
+        and empty columns left out.
+
+        The rows are rendered twice rather than held in memory: a first pass
+        finds the columns with values, how to format each column and the
+        first column values to sort on, and a second pass gets each path back
+        by its position in paths, which can be a list or an _EndToEndPaths,
+        renders its row in sorted order and writes it straight to out_fp.
+        Only the sort keys are kept for all rows, so memory grows with the
+        number of rows but not with their length. Since duplicate rows share
+        their first column value, duplicates only need to be looked for among
+        the rows of the current sort key.
+
+        The output is what building a DataFrame from all the rows, sorting it
+        on column 0, dropping duplicate rows and empty ('' or None) columns
+        and calling to_csv would give. That includes the order of rows with
+        the same sort key, and writing integers as floats in numeric columns
+        with missing values or floats.
+    """
+    if config.show_pbars:
+        pbar = ProgressBar(min_value=0, max_value=len(paths), widgets=['Writing {} paths: '.format(len(paths)),
+                                                                       SimpleProgress(),
+                                                                       Bar(left=" |", right="| "), ETA()]).start()
+    else:
+        pbar = lambda x: x
+    num_columns = len(header)
+    has_values = [False] * num_columns
+    has_missing = [False] * num_columns
+    is_numeric = [True] * num_columns
+    has_floats = [False] * num_columns
+    sort_keys = []
+    for path in pbar(paths):
+        row = render_path(path)
+        sort_keys.append(row[0])
+        for i, value in enumerate(row):
+            if _is_missing_cell(value):
+                has_missing[i] = True
+            else:
+                has_values[i] = True
+                if not _is_numeric_cell(value):
+                    is_numeric[i] = False
+                elif isinstance(value, float):
+                    has_floats[i] = True
+    if isinstance(pbar, ProgressBar):  pbar.finish()
+    num_paths = len(sort_keys)
+    log.info("Rendered {} paths".format(num_paths))
+
+    # sort as DataFrame.sort_values does, with missing values last
+    sort_keys, keys = np.empty(len(sort_keys), dtype=object), sort_keys
+    sort_keys[:] = keys
+    missing = np.asarray(pd.isnull(sort_keys))
+    index = np.arange(len(sort_keys))
+    order = np.concatenate([index[~missing][sort_keys[~missing].argsort(kind='quicksort')],
+                            np.nonzero(missing)[0]])
+
+    kept_columns = [i for i in range(num_columns) if has_values[i]]
+    as_float = [is_numeric[i] and (has_floats[i] or has_missing[i]) for i in range(num_columns)]
+    writer = csv.writer(out_fp, delimiter='\t', lineterminator='\n')
+    writer.writerow([header[i] for i in kept_columns])
+    num_rows = 0
+    seen, seen_key = set(), None
+    for j in order.tolist():
+        row = render_path(paths[j])
+        if not seen or row[0] != seen_key:
+            seen, seen_key = set(), row[0]
+        row_key = tuple(row)
+        if row_key in seen:
+            continue
+        seen.add(row_key)
+        writer.writerow([_format_cell(row[i], as_float[i]) for i in kept_columns])
+        num_rows += 1
+    if num_rows < num_paths:
+        log.info("Dropped {} duplicate rows".format(num_paths - num_rows))
+    log.info("Wrote {} rows".format(num_rows))
+
+
 def write_study_table_files(inv_obj, output_dir):
     """
         Writes out study table files according to pattern defined by
@@ -652,17 +978,18 @@ def write_study_table_files(inv_obj, output_dir):
     if not isinstance(inv_obj, Investigation):
         raise NotImplementedError
     for study_obj in inv_obj.studies:
-        if study_obj.graph is None: break
+        if len(study_obj.process_sequence) == 0: continue
         protrefcount = 0
         protnames = dict()
 
         flatten = lambda l: [item for sublist in l for item in sublist]
         columns = []
 
-        # start_nodes, end_nodes = _get_start_end_nodes(study_obj.graph)
-        paths = _all_end_to_end_paths(study_obj.graph, [x for x in study_obj.graph.nodes() if isinstance(x, Source)])
+        graph = _ProcessSequenceGraph(study_obj.process_sequence)
+        paths = _EndToEndPaths(graph, [x for x in graph.nodes() if isinstance(x, Source)])
+        log.info("Found {} paths!".format(len(paths)))
         sample_in_path_count = 0
-        for node in _longest_path_and_attrs(paths):
+        for node in paths.longest():
             if isinstance(node, Source):
                 olabel = "Source Name"
                 columns.append(olabel)
@@ -687,18 +1014,11 @@ def write_study_table_files(inv_obj, output_dir):
                 columns += flatten(map(lambda x: get_fv_columns(olabel, x), node.factor_values))
 
         omap = get_object_column_map(columns, columns)
-        # load into dictionary
-        df_dict = dict(map(lambda k: (k, []), flatten(omap)))
-        if config.show_pbars:
-            pbar = ProgressBar(min_value=0, max_value=len(paths), widgets=['Writing {} paths: '.format(len(paths)),
-                                                                           SimpleProgress(),
-                                                                           Bar(left=" |", right="| "), ETA()]).start()
-        else:
-            pbar = lambda x: x
-        for path in pbar(paths):
-            for k in df_dict.keys():  # add a row per path
-                df_dict[k].extend([""])
+        keys = flatten(omap)
+        labels = list(columns)
 
+        def render_path(path):
+            df_dict = dict(map(lambda k: (k, [""]), keys))
             sample_in_path_count = 0
             for node in path:
                 if isinstance(node, Source):
@@ -729,19 +1049,12 @@ def write_study_table_files(inv_obj, output_dir):
                     for fv in node.factor_values:
                         fvlabel = "{0}.Factor Value[{1}]".format(olabel, fv.factor_name.name)
                         write_value_columns(df_dict, fvlabel, fv)
-        if isinstance(pbar, ProgressBar):  pbar.finish()
-
-        DF = pd.DataFrame(columns=columns)
-        DF = DF.from_dict(data=df_dict)
-        DF = DF[columns]  # reorder columns
-        DF = DF.sort_values(by=DF.columns[0], ascending=True)  # arbitrary sort on column 0
+            return [df_dict[k][-1] for k in labels]
 
         for dup_item in set([x for x in columns if columns.count(x) > 1]):
             for j, each in enumerate([i for i, x in enumerate(columns) if x == dup_item]):
                 columns[each] = dup_item + str(j)
 
-        DF.columns = columns  # reset columns after checking for dups
-
         for i, col in enumerate(columns):
             if col.endswith("Term Source REF"):
                 columns[i] = "Term Source REF"
@@ -767,21 +1080,8 @@ def write_study_table_files(inv_obj, output_dir):
             elif col.startswith("Sample Name."):
                 columns[i] = "Sample Name"
 
-        log.info("Rendered {} paths".format(len(DF.index)))
-
-        DF_no_dups = DF.drop_duplicates()
-        if len(DF.index) > len(DF_no_dups.index):
-            log.info("Dropping duplicates...")
-            DF = DF_no_dups
-
-        log.info("Writing {} rows".format(len(DF.index)))
-        # reset columns, replace nan with empty string, drop empty columns
-        DF.columns = columns
-        DF = DF.replace('', np.nan)
-        DF = DF.dropna(axis=1, how='all')
-
         with open(os.path.join(output_dir, study_obj.filename), 'w') as out_fp:
-            DF.to_csv(path_or_buf=out_fp, index=False, sep='\t', encoding='utf-8')
+            _write_table_rows(out_fp, paths, columns, render_path)
 
 
 def write_assay_table_files(inv_obj, output_dir):
@@ -800,21 +1100,23 @@ def write_assay_table_files(inv_obj, output_dir):
         raise NotImplementedError
     for study_obj in inv_obj.studies:
         for assay_obj in study_obj.assays:
-            if assay_obj.graph is None: break
+            if len(assay_obj.process_sequence) == 0: continue
             protrefcount = 0
             protnames = dict()
 
             flatten = lambda l: [item for sublist in l for item in sublist]
             columns = []
 
-            # start_nodes, end_nodes = _get_start_end_nodes(assay_obj.graph)
-            paths = _all_end_to_end_paths(assay_obj.graph, [x for x in assay_obj.graph.nodes() if isinstance(x, Sample)])
+            graph = _ProcessSequenceGraph(assay_obj.process_sequence)
+            paths = _EndToEndPaths(graph, [x for x in graph.nodes() if isinstance(x, Sample)])
+            log.info("Found {} paths!".format(len(paths)))
             if len(paths) == 0:
                 log.info("No paths found, skipping writing assay file")
                 continue
-            if _longest_path_and_attrs(paths) is None:
+            longest_path = paths.longest()
+            if longest_path is None:
                 raise IOError("Could not find any valid end-to-end paths in assay graph")
-            for node in _longest_path_and_attrs(paths):
+            for node in longest_path:
                 if isinstance(node, Sample):
                     olabel = "Sample Name"
                     columns.append(olabel)
@@ -865,20 +1167,11 @@ def write_assay_table_files(inv_obj, output_dir):
                     pass  # handled in process
 
             omap = get_object_column_map(columns, columns)
+            keys = flatten(omap)
+            labels = list(columns)
 
-            # load into dictionary
-            df_dict = dict(map(lambda k: (k, []), flatten(omap)))
-
-            if config.show_pbars:
-                pbar = ProgressBar(min_value=0, max_value=len(paths), widgets=['Writing {} paths: '.format(len(paths)),
-                                                                               SimpleProgress(),
-                                                                               Bar(left=" |", right="| "), ETA()]).start()
-            else:
-                pbar = lambda x: x
-            for path in pbar(paths):
-                for k in df_dict.keys():  # add a row per path
-                    df_dict[k].extend([""])
-
+            def render_path(path):
+                df_dict = dict(map(lambda k: (k, [""]), keys))
                 for node in path:
 
                     if isinstance(node, Process):
@@ -932,20 +1225,12 @@ def write_assay_table_files(inv_obj, output_dir):
 
                     elif isinstance(node, DataFile):
                         pass  # handled in process
-
-            if isinstance(pbar, ProgressBar):  pbar.finish()
-
-            DF = pd.DataFrame(columns=columns)
-            DF = DF.from_dict(data=df_dict)
-            DF = DF[columns]  # reorder columns
-            DF = DF.sort_values(by=DF.columns[0], ascending=True)  # arbitrary sort on column 0
+                return [df_dict[k][-1] for k in labels]
 
             for dup_item in set([x for x in columns if columns.count(x) > 1]):
                 for j, each in enumerate([i for i, x in enumerate(columns) if x == dup_item]):
                     columns[each] = ".".join([dup_item, str(j)])
 
-            DF.columns = columns
-
             for i, col in enumerate(columns):
                 if col.endswith("Term Source REF"):
                     columns[i] = "Term Source REF"
@@ -975,20 +1260,8 @@ def write_assay_table_files(inv_obj, output_dir):
                 elif "." in col:
                         columns[i] = col[:col.rindex(".")]
 
-            log.info("Rendered {} paths".format(len(DF.index)))
-            if len(DF.index) > 1:
-                if len(DF.index) > len(DF.drop_duplicates().index):
-                    log.debug("Dropping duplicates...")
-                    DF = DF.drop_duplicates()
-
-            log.info("Writing {} rows".format(len(DF.index)))
-            # reset columns, replace nan with empty string, drop empty columns
-            DF.columns = columns
-            DF = DF.replace('', np.nan)
-            DF = DF.dropna(axis=1, how='all')
-
             with open(os.path.join(output_dir, assay_obj.filename), 'w') as out_fp:
-                DF.to_csv(path_or_buf=out_fp, index=False, sep='\t', encoding='utf-8')
+                _write_table_rows(out_fp, paths, columns, render_path)
 
 
 def get_value_columns(label, x):
@@ -1165,13 +1438,15 @@ def read_investigation_file(fp):
     return df_dict
 
 
-def check_utf8(fp):
+def check_utf8(fp, report=None):
     """Used for rule 0010"""
+    if report is None:
+        report = _default_report
     import chardet
     with open(fp.name, 'rb') as fp:
         charset = chardet.detect(fp.read())
         if charset['encoding'] is not 'UTF-8' and charset['encoding'] is not 'ascii':
-            warnings.append({
+            report.warnings.append({
                 "message": "File should be UTF8 encoding",
                 "supplemental": "Encoding is '{0}' with confidence {1}".format(charset['encoding'], charset['confidence']),
                 "code": 10
@@ -1181,8 +1456,10 @@ def check_utf8(fp):
             raise SystemError()
 
 
-def load_investigation(fp):
+def load_investigation(fp, report=None):
     """Used for rules 0005"""
+    if report is None:
+        report = _default_report
 
     def check_labels(section, labels_expected, df):
         labels_found = set([x for x in df.columns if isinstance(x, str)])
@@ -1197,14 +1474,14 @@ def load_investigation(fp):
             for label in extra_labels:
                 if _RX_COMMENT.match(label) is None:
                     log.fatal("(F) In {} section, label {} is not allowed".format(section, label))
-                    errors.append({
+                    report.errors.append({
                         "message": "Invalid label found in investigation file",
                         "supplemental": "In {} section, label {} is not allowed".format(section, label),
                         "code": 5
                     })
                 elif len(_RX_COMMENT.findall(label)) == 0:
                     log.warning("(W) In {} section, label {} is missing a name".format(section, label))
-                    warnings.append({
+                    report.warnings.append({
                         "message": "Missing name in Comment[] label",
                         "supplemental": "In {} section, label {} is missing a name".format(section, label),
                         "code": 4014
@@ -1294,11 +1571,13 @@ def load_investigation(fp):
     return df_dict
 
 
-def check_filenames_present(i_df):
+def check_filenames_present(i_df, report=None):
     """Used for rule 3005"""
+    if report is None:
+        report = _default_report
     for s_pos, study_df in enumerate(i_df['studies']):
         if study_df.iloc[0]['Study File Name'] is '':
-            warnings.append({
+            report.warnings.append({
                 "message": "Missing study file name",
                 "supplemental": "STUDY.{}".format(s_pos),
                 "code": 3005
@@ -1306,7 +1585,7 @@ def check_filenames_present(i_df):
             log.warning("(W) A study filename is missing for STUDY.{}".format(s_pos))
         for a_pos, filename in enumerate(i_df['s_assays'][s_pos]['Study Assay File Name'].tolist()):
             if filename is '':
-                warnings.append({
+                report.warnings.append({
                     "message": "Missing assay file name",
                     "supplemental": "STUDY.{}, STUDY ASSAY.{}".format(s_pos, a_pos),
                     "code": 3005
@@ -1314,14 +1593,16 @@ def check_filenames_present(i_df):
                 log.warning("(W) An assay filename is missing for STUDY ASSAY.{}".format(a_pos))
 
 
-def check_date_formats(i_df):
+def check_date_formats(i_df, report=None):
     """Used for rule 3001"""
+    if report is None:
+        report = _default_report
     def check_iso8601_date(date_str):
         if date_str is not '':
             try:
                 iso8601.parse_date(date_str)
             except iso8601.ParseError:
-                warnings.append({
+                report.warnings.append({
                     "message": "Date is not ISO8601 formatted",
                     "supplemental": "Found {} in date field".format(date_str),
                     "code": 3001
@@ -1345,12 +1626,14 @@ def check_date_formats(i_df):
         #     check_iso8601_date(process['date'])
 
 
-def check_dois(i_df):
+def check_dois(i_df, report=None):
     """Used for rule 3002"""
+    if report is None:
+        report = _default_report
     def check_doi(doi_str):
         if doi_str is not '':
             if not _RX_DOI.match(doi_str):
-                warnings.append({
+                report.warnings.append({
                     "message": "DOI is not valid format",
                     "supplemental": "Found {} in DOI field".format(doi_str),
                     "code": 3002
@@ -1363,12 +1646,14 @@ def check_dois(i_df):
             check_doi(doi)
 
 
-def check_pubmed_ids_format(i_df):
+def check_pubmed_ids_format(i_df, report=None):
     """Used for rule 3003"""
+    if report is None:
+        report = _default_report
     def check_pubmed_id(pubmed_id_str):
         if pubmed_id_str is not '':
             if (_RX_PMID.match(pubmed_id_str) is None) and (_RX_PMCID.match(pubmed_id_str) is None):
-                warnings.append({
+                report.warnings.append({
                     "message": "PubMed ID is not valid format",
                     "supplemental": "Found PubMedID {}".format(pubmed_id_str),
                     "code": 3003
@@ -1381,12 +1666,14 @@ def check_pubmed_ids_format(i_df):
             check_pubmed_id(str(doi))
 
 
-def check_protocol_names(i_df):
+def check_protocol_names(i_df, report=None):
     """Used for rule 1010"""
+    if report is None:
+        report = _default_report
     for study_protocols_df in i_df['s_protocols']:
         for i, protocol_name in enumerate(study_protocols_df['Study Protocol Name'].tolist()):
             if protocol_name is '' or 'Unnamed: ' in protocol_name:  # DataFrames labels empty cells as 'Unnamed: n'
-                warnings.append({
+                report.warnings.append({
                     "message": "Protocol missing name",
                     "supplemental": "pos={}".format(i),
                     "code": 1010
@@ -1395,14 +1682,16 @@ def check_protocol_names(i_df):
                                "ISA-tab".format(i))
 
 
-def check_protocol_parameter_names(i_df):
+def check_protocol_parameter_names(i_df, report=None):
     """Used for rule 1011"""
+    if report is None:
+        report = _default_report
     for study_protocols_df in i_df['s_protocols']:
         for i, protocol_parameters_names in enumerate(study_protocols_df['Study Protocol Parameters Name'].tolist()):
             if len(protocol_parameters_names.split(sep=';')) > 1:  # There's an empty cell if no protocols
                 for protocol_parameter_name in protocol_parameters_names.split(sep=';'):
                     if protocol_parameter_name is '' or 'Unnamed: ' in protocol_parameter_name:
-                        warnings.append({
+                        report.warnings.append({
                             "message": "Protocol Parameter missing name",
                             "supplemental": "Protocol Parameter at pos={}".format(i),
                             "code": 1011
@@ -1411,12 +1700,14 @@ def check_protocol_parameter_names(i_df):
                                        "can't be referenced in ISA-tab".format(i))
 
 
-def check_study_factor_names(i_df):
+def check_study_factor_names(i_df, report=None):
     """Used for rule 1012"""
+    if report is None:
+        report = _default_report
     for study_protocols_df in i_df['s_factors']:
         for i, protocol_name in enumerate(study_protocols_df['Study Factor Name'].tolist()):
             if protocol_name is '' or 'Unnamed: ' in protocol_name:  # DataFrames labels empty cells as 'Unnamed: n'
-                warnings.append({
+                report.warnings.append({
                     "message": "Study Factor missing name",
                     "supplemental": "Study Factor pos={}".format(i),
                     "code": 1012
@@ -1425,11 +1716,13 @@ def check_study_factor_names(i_df):
                             .format(i))
 
 
-def check_ontology_sources(i_df):
+def check_ontology_sources(i_df, report=None):
     """Used for rule 3008"""
+    if report is None:
+        report = _default_report
     for i, ontology_source_name in enumerate(i_df['ontology_sources']['Term Source Name'].tolist()):
         if ontology_source_name is '' or 'Unnamed: ' in ontology_source_name:
-            warnings.append({
+            report.warnings.append({
                 "message": "Ontology Source missing name ref",
                 "supplemental": "pos={}".format(i),
                 "code": 3008
@@ -1438,16 +1731,19 @@ def check_ontology_sources(i_df):
                            "referenced".format(i))
 
 
-def check_table_files_read(i_df, dir_context):
+def check_table_files_read(i_df, dir_context, tables=None, report=None):
     """Used for rules 0006 and 0008"""
+    if report is None:
+        report = _default_report
+    if tables is None:
+        tables = TableCache(dir_context)
     for i, study_df in enumerate(i_df['studies']):
         study_filename = study_df.iloc[0]['Study File Name']
         if study_filename is not '':
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8'):
-                    pass
+                tables.summary(study_filename)
             except FileNotFoundError:
-                errors.append({
+                report.errors.append({
                     "message": "Missing study tab file(s)",
                     "supplemental": "Study File {} does not appear to exist".format(study_filename),
                     "code": 6
@@ -1456,10 +1752,9 @@ def check_table_files_read(i_df, dir_context):
         for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
             if assay_filename is not '':
                 try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8'):
-                        pass
+                    tables.summary(assay_filename)
                 except FileNotFoundError:
-                    errors.append({
+                    report.errors.append({
                         "message": "Missing assay tab file(s)",
                         "supplemental": "Assay File {} does not appear to exist".format(assay_filename),
                         "code": 8
@@ -1467,117 +1762,88 @@ def check_table_files_read(i_df, dir_context):
                     log.error("(E) Assay File {} does not appear to exist".format(assay_filename))
 
 
-def check_table_files_load(i_df, dir_context):
+def check_table_files_load(i_df, dir_context, report=None):
     """Used for rules 0007 and 0009"""
     for i, study_df in enumerate(i_df['studies']):
         study_filename = study_df.iloc[0]['Study File Name']
         if study_filename is not '':
             try:
                 with open(os.path.join(dir_context, study_filename), encoding='utf-8') as fp:
-                    load_table_checks(fp)
+                    load_table_checks(fp, report=report)
             except FileNotFoundError:
                 pass
         for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
             if assay_filename is not '':
                 try:
                     with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as fp:
-                        load_table_checks(fp)
+                        load_table_checks(fp, report=report)
                 except FileNotFoundError:
                     pass
 
 
-def check_samples_not_declared_in_study_used_in_assay(i_df, dir_context):
-    for i, study_df in enumerate(i_df['studies']):
-        study_filename = study_df.iloc[0]['Study File Name']
+def check_samples_not_declared_in_study_used_in_assay(i_df, dir_context, tables=None, symbol_tables=None):
+    if symbol_tables is None:
+        symbol_tables = study_symbol_tables(i_df, TableCache(dir_context) if tables is None else tables)
+    for study in symbol_tables:
+        study_filename = study.study_filename
         if study_filename is not '':
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    study_samples = set(study_df['Sample Name'])
+                study_samples = study.samples(study_filename)
+            except FileNotFoundError:
+                pass
+        for assay_filename in study.assay_filenames:
+            try:
+                assay_samples = study.samples(assay_filename)
+                if not assay_samples.issubset(study_samples):
+                    log.error("(E) Some samples in an assay file {} are not declared in the study file {}: {}".format(assay_filename, study_filename, list(assay_samples - study_samples)))
             except FileNotFoundError:
                 pass
-        for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
-            if assay_filename is not '':
-                try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        assay_samples = set(assay_df['Sample Name'])
-                        if not assay_samples.issubset(study_samples):
-                            log.error("(E) Some samples in an assay file {} are not declared in the study file {}: {}".format(assay_filename, study_filename, list(assay_samples - study_samples)))
-                except FileNotFoundError:
-                    pass
 
 
-def check_protocol_usage(i_df, dir_context):
+def check_protocol_usage(i_df, dir_context, tables=None, report=None, symbol_tables=None):
     """Used for rules 1007 and 1019"""
-    for i, study_df in enumerate(i_df['studies']):
-        protocols_declared = set(i_df['s_protocols'][i]['Study Protocol Name'].tolist())
-        protocols_declared.add('')
-        study_filename = study_df.iloc[0]['Study File Name']
+    if report is None:
+        report = _default_report
+    if symbol_tables is None:
+        symbol_tables = study_symbol_tables(i_df, TableCache(dir_context) if tables is None else tables)
+    for study in symbol_tables:
+        protocols_declared = study.protocols_declared | {''}
+        study_filename = study.study_filename
         if study_filename is not '':
             try:
-                protocol_refs_used = set()
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    for protocol_ref_col in [i for i in study_df.columns if i.startswith('Protocol REF')]:
-                        protocol_refs_used = protocol_refs_used.union(study_df[protocol_ref_col])
-                    protocol_refs_used = set([r for r in protocol_refs_used if pd.notnull(r)])
-                    diff = list(protocol_refs_used - protocols_declared)
-                    if len(diff) > 0:
-                        errors.append({
-                            "message": "Missing Protocol declaration",
-                            "supplemental": "protocols in study file {} are not declared in the investigation file: "
-                                            "{}".format(study_filename, diff),
-                            "code": 1007
-                        })
-                        log.error(
-                            "(E) Some protocols used in a study file {} are not declared in the investigation file: "
-                            "{}".format(study_filename, diff))
+                protocol_refs_used = set([r for r in study.protocol_refs(study_filename) if pd.notnull(r)])
+                diff = list(protocol_refs_used - protocols_declared)
+                if len(diff) > 0:
+                    report.errors.append({
+                        "message": "Missing Protocol declaration",
+                        "supplemental": "protocols in study file {} are not declared in the investigation file: "
+                                        "{}".format(study_filename, diff),
+                        "code": 1007
+                    })
+                    log.error(
+                        "(E) Some protocols used in a study file {} are not declared in the investigation file: "
+                        "{}".format(study_filename, diff))
             except FileNotFoundError:
                 pass
-        for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
-            if assay_filename is not '':
-                try:
-                    protocol_refs_used = set()
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        for protocol_ref_col in [i for i in assay_df.columns if i.startswith('Protocol REF')]:
-                            protocol_refs_used = protocol_refs_used.union(assay_df[protocol_ref_col])
-                        protocol_refs_used = set([r for r in protocol_refs_used if pd.notnull(r)])
-                        diff = list(protocol_refs_used - protocols_declared)
-                        if len(diff) > 0:
-                            errors.append({
-                                "message": "Missing Protocol declaration",
-                                "supplemental": "protocols in study file {} are not declared in the investigation file: "
-                                                "{}".format(study_filename, diff),
-                                "code": 1007
-                            })
-                            log.error("(E) Some protocols used in an assay file {} are not declared in the "
-                                         "investigation file: {}".format(assay_filename, diff))
-                except FileNotFoundError:
-                    pass
-        # now collect all protocols in all assays to compare to declared protocols
-        protocol_refs_used = set()
-        if study_filename is not '':
+        for assay_filename in study.assay_filenames:
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    for protocol_ref_col in [i for i in study_df.columns if i.startswith('Protocol REF')]:
-                        protocol_refs_used = protocol_refs_used.union(study_df[protocol_ref_col])
+                protocol_refs_used = set([r for r in study.protocol_refs(assay_filename) if pd.notnull(r)])
+                diff = list(protocol_refs_used - protocols_declared)
+                if len(diff) > 0:
+                    report.errors.append({
+                        "message": "Missing Protocol declaration",
+                        "supplemental": "protocols in study file {} are not declared in the investigation file: "
+                                        "{}".format(study_filename, diff),
+                        "code": 1007
+                    })
+                    log.error("(E) Some protocols used in an assay file {} are not declared in the "
+                                 "investigation file: {}".format(assay_filename, diff))
             except FileNotFoundError:
                 pass
-        for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
-            if assay_filename is not '':
-                try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        for protocol_ref_col in [i for i in assay_df.columns if i.startswith('Protocol REF')]:
-                            protocol_refs_used = protocol_refs_used.union(assay_df[protocol_ref_col])
-                except FileNotFoundError:
-                    pass
-        diff = protocols_declared - protocol_refs_used - {''}
+        # now collect all protocols in all assays to compare to declared protocols
+        diff = protocols_declared - study.used(study.protocol_refs) - {''}
         if len(diff) > 0:
-            warnings.append({
+            report.warnings.append({
                 "message": "Protocol declared but not used",
                 "supplemental": "protocols declared in the file {} are not used in any assay file: "
                                 "{}".format(study_filename, diff),
@@ -1599,8 +1865,228 @@ def load_table(fp):
     return df
 
 
-def load_table_checks(fp):
+class TableCache(object):
+    """Study and assay tables of an ISA-Tab archive, each read from
+    dir_context at most once and shared between the validation rules.
+
+    get() loads a whole table with load_table and keeps it, together with
+    the columns of it matched by column patterns. chunks() hands out the
+    kept table when there is one, or else reads the file in batches of rows
+    without keeping them. A table file that is missing raises
+    FileNotFoundError on each use, without being looked up again.
+
+    The cross-file rules only need the summary() of a table: its column
+    labels and the distinct values of its Sample Name, Protocol REF and
+    Term Source REF columns, and pooling detection its process_pooling().
+    With a ValidationCache, these are kept in it by the content of the
+    table file, and an unchanged table is not read again.
+    """
+
+    def __init__(self, dir_context, cache=None):
+        self.dir_context = dir_context
+        self.cache = cache
+        self.__tables = {}
+        self.__columns = {}
+        self.__summaries = {}
+        self.__digests = {}
+
+    def get(self, filename):
+        try:
+            table = self.__tables[filename]
+        except KeyError:
+            try:
+                with open(os.path.join(self.dir_context, filename),
+                          encoding='utf-8') as fp:
+                    table = load_table(fp)
+            except FileNotFoundError:
+                table = None
+            self.__tables[filename] = table
+        if table is None:
+            raise FileNotFoundError(
+                'Table file {} not found in {}'.format(
+                    filename, self.dir_context))
+        return table
+
+    def chunks(self, filename, chunksize=10000):
+        if filename in self.__tables:
+            yield self.get(filename)
+        else:
+            with open(os.path.join(self.dir_context, filename),
+                      encoding='utf-8') as fp:
+                for chunk in load_table_chunks(fp, chunksize):
+                    yield chunk
+
+    def digest(self, filename):
+        """Returns the file_digest() of a table file"""
+        try:
+            return self.__digests[filename]
+        except KeyError:
+            try:
+                digest = file_digest(
+                    os.path.join(self.dir_context, filename))
+            except FileNotFoundError:
+                digest = None
+            self.__digests[filename] = digest
+        if digest is None:
+            raise FileNotFoundError(
+                'Table file {} not found in {}'.format(
+                    filename, self.dir_context))
+        return digest
+
+    def summary(self, filename):
+        try:
+            return self.__summaries[filename]
+        except KeyError:
+            pass
+        summary = None
+        if self.cache is not None:
+            key = validation_digest('table summary', _RX_SUMMARY_COLUMN.pattern, self.digest(filename))
+            summary = self.cache.get(key)
+        if summary is None:
+            table = self.get(filename)
+            summary = {
+                'columns': list(table.columns),
+                'values': dict(
+                    (x, sorted(set(table[x]))) for x in table.columns
+                    if _RX_SUMMARY_COLUMN.match(x))
+            }
+            if self.cache is not None:
+                self.cache.put(key, summary)
+        self.__summaries[filename] = summary
+        return summary
+
+    def process_pooling(self, filename, study_samples=None):
+        """Returns detect_table_process_pooling() of a table. With a
+        ValidationCache, it is kept in it by the content of the table file
+        and study_samples."""
+        key = None
+        if self.cache is not None:
+            key = validation_digest('process pooling', self.digest(filename),
+                                    None if study_samples is None else sorted(study_samples))
+            pooling_keys = self.cache.get(key)
+            if pooling_keys is not None:
+                return pooling_keys
+        pooling_keys = detect_table_process_pooling(self.get(filename), study_samples=study_samples)
+        if key is not None:
+            self.cache.put(key, pooling_keys)
+        return pooling_keys
+
+    def columns(self, filename, pattern):
+        """Returns the columns of a table whose labels match the compiled
+        regular expression pattern, in table order"""
+        key = filename, pattern.pattern
+        try:
+            return self.__columns[key]
+        except KeyError:
+            columns = [x for x in self.summary(filename)['columns']
+                       if pattern.match(x)]
+            self.__columns[key] = columns
+            return columns
+
+    def column_values(self, filename, column):
+        """Returns the set of the values in a column of a table, raising
+        KeyError if the table has no such column"""
+        summary = self.summary(filename)
+        try:
+            return set(summary['values'][column])
+        except KeyError:
+            return set(self.get(filename)[column])
+
+
+class StudySymbols(object):
+    """Symbol table of the i-th study of an investigation, used by the rules
+    checking that its study and assay tables refer to what is declared.
+
+    It holds the protocols, factors and protocol parameters declared for
+    the study in the investigation file and, for each of its tables, the
+    sample names, Protocol REF values, factor and parameter names and
+    Term Source REFs used in it, all taken from the table summaries of
+    tables. Looking up the symbols of a table file that is missing raises
+    FileNotFoundError, and the samples of a table without a Sample Name
+    column raise KeyError.
+    """
+
+    def __init__(self, i_df, i, tables):
+        self.study_filename = i_df['studies'][i].iloc[0]['Study File Name']
+        self.assay_filenames = [x for x in i_df['s_assays'][i]['Study Assay File Name'].tolist() if x is not '']
+        self.protocols_declared = set(i_df['s_protocols'][i]['Study Protocol Name'].tolist())
+        self.factors_declared = set(i_df['s_factors'][i]['Study Factor Name'].tolist())
+        self.parameters_declared = set()
+        for protocol_parameters in i_df['s_protocols'][i]['Study Protocol Parameters Name'].tolist():
+            self.parameters_declared.update(protocol_parameters.split(';'))
+        self.parameters_declared.discard('')  # empty string is not a valid protocol parameter
+        self.__symbols = {}
+        for filename in self.filenames:
+            if filename not in self.__symbols:
+                try:
+                    self.__symbols[filename] = self._table_symbols(tables.summary(filename))
+                except FileNotFoundError:
+                    self.__symbols[filename] = None
+
+    @property
+    def filenames(self):
+        """The study table file name, if any, and the assay table file names"""
+        if self.study_filename is not '':
+            return [self.study_filename] + self.assay_filenames
+        return self.assay_filenames
+
+    @staticmethod
+    def _table_symbols(summary):
+        columns, values = summary['columns'], summary['values']
+        return {
+            'samples': set(values['Sample Name']) if 'Sample Name' in values else None,
+            'protocol_refs': set(v for x in columns if _RX_PROTOCOL_REF.match(x) for v in values[x]),
+            'factors': set(v for x in columns if _RX_FACTOR_VALUE.match(x) for v in _RX_FACTOR_VALUE.findall(x)),
+            'parameters': set(
+                v for x in columns if _RX_PARAMETER_VALUE.match(x) for v in _RX_PARAMETER_VALUE.findall(x)),
+            'term_source_refs': set(v for x in columns if _RX_TERM_SOURCE_REF.match(x) for v in values[x])
+        }
+
+    def _get(self, filename, name):
+        symbols = self.__symbols[filename]
+        if symbols is None:
+            raise FileNotFoundError('Table file {} not found'.format(filename))
+        return symbols[name]
+
+    def samples(self, filename):
+        samples = self._get(filename, 'samples')
+        if samples is None:
+            raise KeyError('Sample Name')
+        return samples
+
+    def protocol_refs(self, filename):
+        return self._get(filename, 'protocol_refs')
+
+    def factors(self, filename):
+        return self._get(filename, 'factors')
+
+    def parameters(self, filename):
+        return self._get(filename, 'parameters')
+
+    def term_source_refs(self, filename):
+        return self._get(filename, 'term_source_refs')
+
+    def used(self, lookup):
+        """Returns the union of lookup(filename) over the tables of the
+        study that are not missing, e.g. used(self.factors)"""
+        used = set()
+        for filename in self.filenames:
+            try:
+                used.update(lookup(filename))
+            except FileNotFoundError:
+                pass
+        return used
+
+
+def study_symbol_tables(i_df, tables):
+    """Makes the StudySymbols of each study of an investigation"""
+    return [StudySymbols(i_df, i, tables) for i in range(len(i_df['studies']))]
+
 
+def load_table_checks(fp, report=None):
+
+    if report is None:
+        report = _default_report
     df = load_table(fp)
     columns = df.columns
     for x, column in enumerate(columns):  # check if columns have valid labels
@@ -1618,7 +2104,7 @@ def load_table_checks(fp):
         if _RX_COMMENT.match(column):
             if len(_RX_COMMENT.findall(column)) == 0:
                 log.warning("(W) In file {}, label {} is missing a name".format(os.path.basename(fp.name), column))
-                warnings.append({
+                report.warnings.append({
                     "message": "Missing name in Comment[] label",
                     "supplemental": "In file {}, label {} is missing a name".format(os.path.basename(fp.name), column),
                     "code": 4014
@@ -1626,7 +2112,7 @@ def load_table_checks(fp):
         if _RX_CHARACTERISTICS.match(column):
             if len(_RX_CHARACTERISTICS.findall(column)) == 0:
                 log.warning("(W) In file {}, label {} is missing a name".format(os.path.basename(fp.name), column))
-                warnings.append({
+                report.warnings.append({
                     "message": "Missing name in Characteristics[] label",
                     "supplemental": "In file {}, label {} is missing a name".format(os.path.basename(fp.name), column),
                     "code": 4014
@@ -1634,7 +2120,7 @@ def load_table_checks(fp):
         if _RX_PARAMETER_VALUE.match(column):
             if len(_RX_PARAMETER_VALUE.findall(column)) == 0:
                 log.warning("(W) In file {}, label {} is missing a name".format(os.path.basename(fp.name), column))
-                warnings.append({
+                report.warnings.append({
                     "message": "Missing name in Parameter Value[] label",
                     "supplemental": "In file {}, label {} is missing a name".format(os.path.basename(fp.name), column),
                     "code": 4014
@@ -1642,7 +2128,7 @@ def load_table_checks(fp):
         if _RX_FACTOR_VALUE.match(column):
             if len(_RX_FACTOR_VALUE.findall(column)) == 0:
                 log.warning("(W) In file {}, label {} is missing a name".format(os.path.basename(fp.name), column))
-                warnings.append({
+                report.warnings.append({
                     "message": "Missing name in Factor Value[] label",
                     "supplemental": "In file {}, label {} is missing a name".format(os.path.basename(fp.name), column),
                     "code": 4014
@@ -1712,134 +2198,65 @@ def load_table_checks(fp):
     return df
 
 
-def check_study_factor_usage(i_df, dir_context):
+def check_study_factor_usage(i_df, dir_context, tables=None, symbol_tables=None):
     """Used for rules 1008 and 1021"""
-    for i, study_df in enumerate(i_df['studies']):
-        study_factors_declared = set(i_df['s_factors'][i]['Study Factor Name'].tolist())
-        study_filename = study_df.iloc[0]['Study File Name']
+    if symbol_tables is None:
+        symbol_tables = study_symbol_tables(i_df, TableCache(dir_context) if tables is None else tables)
+    for study in symbol_tables:
+        study_factors_declared = study.factors_declared
+        study_filename = study.study_filename
         if study_filename is not '':
             try:
-                study_factors_used = set()
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    study_factor_ref_cols = [i for i in study_df.columns if _RX_FACTOR_VALUE.match(i)]
-                    for col in study_factor_ref_cols:
-                        fv = _RX_FACTOR_VALUE.findall(col)
-                        study_factors_used = study_factors_used.union(set(fv))
-                    if not study_factors_used.issubset(study_factors_declared):
-                        log.error(
-                            "(E) Some factors used in an study file {} are not declared in the investigation file: {}".format(
-                                study_filename, list(study_factors_used - study_factors_declared)))
+                study_factors_used = study.factors(study_filename)
+                if not study_factors_used.issubset(study_factors_declared):
+                    log.error(
+                        "(E) Some factors used in an study file {} are not declared in the investigation file: {}".format(
+                            study_filename, list(study_factors_used - study_factors_declared)))
             except FileNotFoundError:
                 pass
-        for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
-            if assay_filename is not '':
-                try:
-                    study_factors_used = set()
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        study_factor_ref_cols = set([i for i in assay_df.columns if _RX_FACTOR_VALUE.match(i)])
-                        for col in study_factor_ref_cols:
-                            fv = _RX_FACTOR_VALUE.findall(col)
-                            study_factors_used = study_factors_used.union(set(fv))
-                        if not study_factors_used.issubset(study_factors_declared):
-                            log.error(
-                                "(E) Some factors used in an assay file {} are not declared in the investigation file: {}".format(
-                                    assay_filename, list(study_factors_used - study_factors_declared)))
-                except FileNotFoundError:
-                    pass
-        study_factors_used = set()
-        if study_filename is not '':
+        for assay_filename in study.assay_filenames:
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    study_factor_ref_cols = [i for i in study_df.columns if _RX_FACTOR_VALUE.match(i)]
-                    for col in study_factor_ref_cols:
-                        fv = _RX_FACTOR_VALUE.findall(col)
-                        study_factors_used = study_factors_used.union(set(fv))
+                study_factors_used = study.factors(assay_filename)
+                if not study_factors_used.issubset(study_factors_declared):
+                    log.error(
+                        "(E) Some factors used in an assay file {} are not declared in the investigation file: {}".format(
+                            assay_filename, list(study_factors_used - study_factors_declared)))
             except FileNotFoundError:
                 pass
-        for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
-            if assay_filename is not '':
-                try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        study_factor_ref_cols = set([i for i in assay_df.columns if _RX_FACTOR_VALUE.match(i)])
-                        for col in study_factor_ref_cols:
-                            fv = _RX_FACTOR_VALUE.findall(col)
-                            study_factors_used = study_factors_used.union(set(fv))
-                except FileNotFoundError:
-                    pass
+        study_factors_used = study.used(study.factors)
         if len(study_factors_declared - study_factors_used) > 0:
             log.warning(
                 "(W) Some study factors declared in the investigation file are not used in any assay file: {}".format(
                     list(study_factors_declared - study_factors_used)))
 
 
-def check_protocol_parameter_usage(i_df, dir_context):
+def check_protocol_parameter_usage(i_df, dir_context, tables=None, symbol_tables=None):
     """Used for rules 1009 and 1020"""
-    for i, study_df in enumerate(i_df['studies']):
-        protocol_parameters_declared = set()
-        protocol_parameters_per_protocol = set(i_df['s_protocols'][i]['Study Protocol Parameters Name'].tolist())
-        for protocol_parameters in protocol_parameters_per_protocol:
-            parameters_list = protocol_parameters.split(';')
-            protocol_parameters_declared = protocol_parameters_declared.union(set(parameters_list))
-        protocol_parameters_declared = protocol_parameters_declared - {''}  # empty string is not a valid protocol parameter
-        study_filename = study_df.iloc[0]['Study File Name']
+    if symbol_tables is None:
+        symbol_tables = study_symbol_tables(i_df, TableCache(dir_context) if tables is None else tables)
+    for study in symbol_tables:
+        protocol_parameters_declared = study.parameters_declared
+        study_filename = study.study_filename
         if study_filename is not '':
             try:
-                protocol_parameters_used = set()
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    parameter_value_cols = [i for i in study_df.columns if _RX_PARAMETER_VALUE.match(i)]
-                    for col in parameter_value_cols:
-                        pv = _RX_PARAMETER_VALUE.findall(col)
-                        protocol_parameters_used = protocol_parameters_used.union(set(pv))
-                    if not protocol_parameters_used.issubset(protocol_parameters_declared):
-                        log.error(
-                            "(E) Some protocol parameters referenced in an study file {} are not declared in the investigation file: {}".format(
-                                study_filename, list(protocol_parameters_used - protocol_parameters_declared)))
+                protocol_parameters_used = study.parameters(study_filename)
+                if not protocol_parameters_used.issubset(protocol_parameters_declared):
+                    log.error(
+                        "(E) Some protocol parameters referenced in an study file {} are not declared in the investigation file: {}".format(
+                            study_filename, list(protocol_parameters_used - protocol_parameters_declared)))
             except FileNotFoundError:
                 pass
-        for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
-            if assay_filename is not '':
-                try:
-                    protocol_parameters_used = set()
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        parameter_value_cols = [i for i in assay_df.columns if _RX_PARAMETER_VALUE.match(i)]
-                        for col in parameter_value_cols:
-                            pv = _RX_PARAMETER_VALUE.findall(col)
-                            protocol_parameters_used = protocol_parameters_used.union(set(pv))
-                        if not protocol_parameters_used.issubset(protocol_parameters_declared):
-                            log.error(
-                                "(E) Some protocol parameters referenced in an assay file {} are not declared in the investigation file: {}".format(
-                                    assay_filename, list(protocol_parameters_used - protocol_parameters_declared)))
-                except FileNotFoundError:
-                    pass
-        # now collect all protocol parameters in all assays to compare to declared protocol parameters
-        protocol_parameters_used = set()
-        if study_filename is not '':
+        for assay_filename in study.assay_filenames:
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    parameter_value_cols = [i for i in study_df.columns if _RX_PARAMETER_VALUE.match(i)]
-                    for col in parameter_value_cols:
-                        pv = _RX_PARAMETER_VALUE.findall(col)
-                        protocol_parameters_used = protocol_parameters_used.union(set(pv))
+                protocol_parameters_used = study.parameters(assay_filename)
+                if not protocol_parameters_used.issubset(protocol_parameters_declared):
+                    log.error(
+                        "(E) Some protocol parameters referenced in an assay file {} are not declared in the investigation file: {}".format(
+                            assay_filename, list(protocol_parameters_used - protocol_parameters_declared)))
             except FileNotFoundError:
                 pass
-        for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
-            if assay_filename is not '':
-                try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        parameter_value_cols = [i for i in assay_df.columns if _RX_PARAMETER_VALUE.match(i)]
-                        for col in parameter_value_cols:
-                            pv = _RX_PARAMETER_VALUE.findall(col)
-                            protocol_parameters_used = protocol_parameters_used.union(set(pv))
-                except FileNotFoundError:
-                    pass
+        # now collect all protocol parameters in all assays to compare to declared protocol parameters
+        protocol_parameters_used = study.used(study.parameters)
         if len(protocol_parameters_declared - protocol_parameters_used) > 0:
             log.warning(
                 "(W) Some protocol parameters declared in the investigation file are not used in any assay file: {}".format(
@@ -1850,8 +2267,10 @@ def get_ontology_source_refs(i_df):
     return i_df['ontology_sources']['Term Source Name'].tolist()
 
 
-def check_term_source_refs_in_investigation(i_df):
+def check_term_source_refs_in_investigation(i_df, report=None):
     """Used for rules 3007 and 3009"""
+    if report is None:
+        report = _default_report
     ontology_sources_list = get_ontology_source_refs(i_df)
 
     def check_study_term_sources_in_secton_field(section_label, pos, column_label):
@@ -1867,7 +2286,7 @@ def check_term_source_refs_in_investigation(i_df):
             section_term_source_refs.remove(section_term_source_ref_to_remove)
         diff = set(section_term_source_refs) - set(ontology_sources_list)
         if len(diff) > 0:
-            warnings.append({
+            report.warnings.append({
                 "message": "Missing Term Source",
                 "supplemental": "Ontology sources missing {}".format(list(diff)),
                 "code": 3009
@@ -1878,7 +2297,7 @@ def check_term_source_refs_in_investigation(i_df):
     i_publication_status_term_source_ref = [i for i in i_df['i_publications']['Investigation Publication Status Term Source REF'].tolist() if i != '']
     diff = set(i_publication_status_term_source_ref) - set(ontology_sources_list)
     if len(diff) > 0:
-        warnings.append({
+        report.warnings.append({
             "message": "Missing Term Source",
             "supplemental": "Ontology sources missing {}".format(list(diff)),
             "code": 3009
@@ -1888,7 +2307,7 @@ def check_term_source_refs_in_investigation(i_df):
     i_person_roles_term_source_ref = [i for i in i_df['i_contacts']['Investigation Person Roles Term Source REF'].tolist() if i != '']
     diff = set(i_person_roles_term_source_ref) - set(ontology_sources_list)
     if len(diff) > 0:
-        warnings.append({
+        report.warnings.append({
             "message": "Missing Term Source",
             "supplemental": "Ontology sources missing {}".format(list(diff)),
             "code": 3009
@@ -1907,127 +2326,77 @@ def check_term_source_refs_in_investigation(i_df):
         check_study_term_sources_in_secton_field('s_contacts', i, 'Study Person Roles Term Source REF')
 
 
-def check_term_source_refs_in_assay_tables(i_df, dir_context):
+def check_term_source_refs_in_assay_tables(i_df, dir_context, tables=None, report=None, symbol_tables=None):
     """Used for rules 3007 and 3009"""
+    if report is None:
+        report = _default_report
+    if tables is None:
+        tables = TableCache(dir_context)
+    if symbol_tables is None:
+        symbol_tables = study_symbol_tables(i_df, tables)
     import math
     ontology_sources_list = set(get_ontology_source_refs(i_df))
-    for i, study_df in enumerate(i_df['studies']):
-        study_filename = study_df.iloc[0]['Study File Name']
+
+    def check_table(filename, study_filename, study):
+        columns = tables.summary(filename)['columns']
+        object_index = [i for i, x in enumerate(columns) if x.startswith('Term Source REF')]
+        object_index[0]  # raises IndexError if there is no Term Source REF column
+        if study.term_source_refs(filename) <= ontology_sources_list:
+            return  # every Term Source REF used in the table is declared
+        df = tables.get(filename)
+        for i in object_index:
+            for y, row in enumerate(df[columns[i]]):
+                if row not in ontology_sources_list:
+                    if isinstance(row, float):
+                        if math.isnan(row):
+                            continue
+                    report.warnings.append({
+                        "message": "Missing Term Source",
+                        "supplemental": "Ontology sources missing {} at column position {} and row {} "
+                                        "in {} not declared in ontology "
+                                        "sources {}".format(row + 1, i, y + 1, study_filename,
+                                                            list(ontology_sources_list)),
+                        "code": 3009
+                    })
+                    log.warning("(W) Term Source REF {} at column position {} and row {} in {} not "
+                                "declared in ontology sources {}".format(row + 1, i, y + 1, study_filename,
+                                                                         list(ontology_sources_list)))
+
+    for study in symbol_tables:
+        study_filename = study.study_filename
         if study_filename is not '':
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    df = load_table(s_fp)
-                    columns = df.columns
-                    object_index = [i for i, x in enumerate(columns) if x.startswith('Term Source REF')]
-                    prev_i = object_index[0]
-                    object_columns_list = [columns[prev_i]]
-                    for curr_i in object_index:  # collect each object's columns
-                        if prev_i == curr_i:
-                            pass  # skip if there's no diff, i.e. first one
-                        else:
-                            object_columns_list.append(columns[curr_i])
-                        prev_i = curr_i
-                    for x, col in enumerate(object_columns_list):
-                        for y, row in enumerate(df[col]):
-                            if row not in ontology_sources_list:
-                                if isinstance(row, float):
-                                    if not math.isnan(row):
-                                        warnings.append({
-                                            "message": "Missing Term Source",
-                                            "supplemental": "Ontology sources missing {} at column position {} and row {} "
-                                                            "in {} not declared in ontology "
-                                                            "sources {}".format(row+1, object_index[x], y+1, study_filename,
-                                                                                list(ontology_sources_list)),
-                                            "code": 3009
-                                        })
-                                        log.warning("(W) Term Source REF {} at column position {} and row {} in {} not "
-                                                    "declared in ontology sources {}".format(row+1, object_index[x], y+1,
-                                                                                             study_filename,
-                                                                                             list(ontology_sources_list)))
-                                else:
-                                    warnings.append({
-                                        "message": "Missing Term Source",
-                                        "supplemental": "Ontology sources missing {} at column position {} and row {} "
-                                                        "in {} not declared in ontology "
-                                                        "sources {}".format(row + 1, object_index[x], y + 1, study_filename,
-                                                                            list(ontology_sources_list)),
-                                        "code": 3009
-                                    })
-                                    log.warning("(W) Term Source REF {} at column position {} and row {} in {} not in "
-                                                "declared ontology sources {}"
-                                                .format(row+1, object_index[x], y+1, study_filename,
-                                                        list(ontology_sources_list)))
+                check_table(study_filename, study_filename, study)
             except FileNotFoundError:
                 pass
-            for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
-                if assay_filename is not '':
-                    try:
-                        with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                            df = load_table(a_fp)
-                            columns = df.columns
-                            object_index = [i for i, x in enumerate(columns) if x.startswith('Term Source REF')]
-                            prev_i = object_index[0]
-                            object_columns_list = [columns[prev_i]]
-                            for curr_i in object_index:  # collect each object's columns
-                                if prev_i == curr_i:
-                                    pass  # skip if there's no diff, i.e. first one
-                                else:
-                                    object_columns_list.append(columns[curr_i])
-                                prev_i = curr_i
-                            for x, col in enumerate(object_columns_list):
-                                for y, row in enumerate(df[col]):
-                                    if row not in ontology_sources_list:
-                                        if isinstance(row, float):
-                                            if not math.isnan(row):
-                                                warnings.append({
-                                                    "message": "Missing Term Source",
-                                                    "supplemental": "Ontology sources missing {} at column position {} and "
-                                                                    "row {} in {} not declared in ontology sources {}"
-                                                        .format(row + 1, object_index[x], y + 1, study_filename,
-                                                                list(ontology_sources_list)),
-                                                    "code": 3009
-                                                })
-                                                log.warning("(W) Term Source REF {} at column position {} and row {} in {} "
-                                                            "not declared in ontology sources {}"
-                                                            .format(row+1, object_index[x], y+1, study_filename,
-                                                                    list(ontology_sources_list)))
-                                        else:
-                                            warnings.append({
-                                                "message": "Missing Term Source",
-                                                "supplemental": "Ontology sources missing {} at column position {} and row "
-                                                                "{} in {} not declared in ontology sources {}"
-                                                    .format(row + 1, object_index[x], y + 1, study_filename,
-                                                            list(ontology_sources_list)),
-                                                "code": 3009
-                                            })
-                                            log.warning("(W) Term Source REF {} at column position {} and row {} in {} not "
-                                                        "in declared ontology sources {}"
-                                                        .format(row+1, object_index[x], y+1, study_filename,
-                                                                list(ontology_sources_list)))
-                    except FileNotFoundError:
-                        pass
+            for assay_filename in study.assay_filenames:
+                try:
+                    check_table(assay_filename, study_filename, study)
+                except FileNotFoundError:
+                    pass
 
 
-def check_term_source_refs_usage(i_df, dir_context):
-    check_term_source_refs_in_investigation(i_df)
-    check_term_source_refs_in_assay_tables(i_df, dir_context)
+def check_term_source_refs_usage(i_df, dir_context, tables=None, report=None):
+    check_term_source_refs_in_investigation(i_df, report=report)
+    check_term_source_refs_in_assay_tables(i_df, dir_context, tables, report=report)
 
 
-def load_config(config_dir):
+def load_config(config_dir, report=None):
     """Rule 4001"""
-    from isatools.io import isatab_configurator
+    if report is None:
+        report = _default_report
     configs = None
     try:
-        configs = isatab_configurator.load(config_dir)
+        configs = isatab_configurator.load_compiled(config_dir)
     except FileNotFoundError:
-        errors.append({
+        report.errors.append({
             "message": "Configurations could not be loaded",
             "supplemental": "On loading {}".format(config_dir),
             "code": 4001
         })
         log.error("(E) FileNotFoundError on trying to load from {}".format(config_dir))
     if configs is None:
-        errors.append({
+        report.errors.append({
             "message": "Configurations could not be loaded",
             "supplemental": "On loading {}".format(config_dir),
             "code": 4001
@@ -2040,15 +2409,17 @@ def load_config(config_dir):
     return configs
 
 
-def check_measurement_technology_types(i_df, configs):
+def check_measurement_technology_types(i_df, configs, report=None):
     """Rule 4002"""
+    if report is None:
+        report = _default_report
     for i, assay_df in enumerate(i_df['s_assays']):
         measurement_types = assay_df['Study Assay Measurement Type'].tolist()
         technology_types = assay_df['Study Assay Technology Type'].tolist()
         if len(measurement_types) == len(technology_types):
             for x, measurement_type in enumerate(measurement_types):
                 if (measurement_types[x], technology_types[x]) not in configs.keys():
-                    errors.append({
+                    report.errors.append({
                         "message": "Measurement/technology type invalid",
                         "supplemental": "Measurement {}/technology {}, STUDY ASSAY.{}"
                             .format(measurement_types[x], technology_types[x], i),
@@ -2058,7 +2429,9 @@ def check_measurement_technology_types(i_df, configs):
                                  "for STUDY ASSAY.{}'".format(measurement_types[x], technology_types[x], i))
 
 
-def check_investigation_against_config(i_df, configs):
+def check_investigation_against_config(i_df, configs, report=None):
+    if report is None:
+        report = _default_report
     import math
 
     def check_section_against_required_fields_one_value(section, required, i=0):
@@ -2071,7 +2444,7 @@ def check_investigation_against_config(i_df, configs):
                     if isinstance(required_value, float):
                         if math.isnan(required_value):
                             if i > 0:
-                                warnings.append({
+                                report.warnings.append({
                                     "message": "A required property is missing",
                                     "supplemental": "A property value in {}.{} of investigation file at column {} is "
                                                     "required".format(col, i + 1, x + 1),
@@ -2081,7 +2454,7 @@ def check_investigation_against_config(i_df, configs):
                                     "(W) A property value in {}.{} of investigation file at column {} is required".format(
                                         col, i+1, x + 1))
                             else:
-                                warnings.append({
+                                report.warnings.append({
                                     "message": "A required property is missing",
                                     "supplemental": "A property value in {} of investigation file at column {} is "
                                                     "required".format(col, x + 1),
@@ -2093,7 +2466,7 @@ def check_investigation_against_config(i_df, configs):
                     else:
                         if required_value == '' or 'Unnamed: ' in required_value:
                             if i > 0:
-                                warnings.append({
+                                report.warnings.append({
                                     "message": "A required property is missing",
                                     "supplemental": "A property value in {}.{} of investigation file at column {} is "
                                                     "required".format(col, i+1, x + 1),
@@ -2103,7 +2476,7 @@ def check_investigation_against_config(i_df, configs):
                                     "(W) A property value in {}.{} of investigation file at column {} is required".format(
                                         col, i+1, x + 1))
                             else:
-                                warnings.append({
+                                report.warnings.append({
                                     "message": "A required property is missing",
                                     "supplemental": "A property value in {} of investigation file at column {} is "
                                                     "required".format(col, x + 1),
@@ -2113,7 +2486,7 @@ def check_investigation_against_config(i_df, configs):
                                     "(W) A property value in {} of investigation file at column {} is required".format(
                                         col, x + 1))
 
-    required_fields = [i.header for i in configs[('[investigation]', '')].get_isatab_configuration()[0].get_field() if i.is_required]
+    required_fields = isatab_configurator.compile_config(configs[('[investigation]', '')]).required_headers
     check_section_against_required_fields_one_value(i_df['investigation'], required_fields)
     check_section_against_required_fields_one_value(i_df['i_publications'], required_fields)
     check_section_against_required_fields_one_value(i_df['i_contacts'], required_fields)
@@ -2128,10 +2501,12 @@ def check_investigation_against_config(i_df, configs):
         check_section_against_required_fields_one_value(i_df['s_contacts'][x], required_fields, x)
 
 
-def check_study_table_against_config(s_df, protocols_declared, config):
+def check_study_table_against_config(s_df, protocols_declared, config, report=None):
     # We are assuming the table load validation earlier passed
 
     # First check column order is correct against the configuration
+    if report is None:
+        report = _default_report
     columns = s_df.columns
     object_index = [(x, i) for x, i in enumerate(columns) if i in ['Source Name', 'Sample Name',
                                                               'Extract Name', 'Labeled Extract Name', 'Raw Data File',
@@ -2149,7 +2524,7 @@ def check_study_table_against_config(s_df, protocols_declared, config):
     object_index = [i for i in object_index if i[1] in fields]
     for x, object in enumerate(object_index):
         if fields[x] != object[1]:
-            warnings.append({
+            report.warnings.append({
                 "message": "The column order in assay table is not valid",
                 "supplemental": "Unexpected heading found. Expected {} but found {} at column number {}"
                     .format(fields[x], object[1], object[0]),
@@ -2164,7 +2539,9 @@ def check_study_table_against_config(s_df, protocols_declared, config):
     # Third, check if required values are present
 
 
-def check_assay_table_against_config(s_df, config):
+def check_assay_table_against_config(s_df, config, report=None):
+    if report is None:
+        report = _default_report
     import itertools
     # We are assuming the table load validation earlier passed
     # First check column order is correct against the configuration
@@ -2192,7 +2569,7 @@ def check_assay_table_against_config(s_df, config):
     object_index = [i for i in object_index if i[1] in fields]
     for x, object in enumerate(object_index):
         if fields[x] != object[1]:
-            warnings.append({
+            report.warnings.append({
                 "message": "The column order in assay table is not valid",
                 "supplemental": "Unexpected heading found. Expected {} but found {} at column number {}"
                     .format(fields[x], object[1], object[0]),
@@ -2216,13 +2593,15 @@ def cell_has_value(cell):
             return True
 
 
-def check_assay_table_with_config(df, config, filename, protocol_names_and_types):
+def check_assay_table_with_config(df, config, filename, protocol_names_and_types, report=None):
+    if report is None:
+        report = _default_report
     columns = list(df.columns)
     # Get required headers from config and check if they are present in the table; Rule 4010
-    required_fields = [i.header for i in config.get_isatab_configuration()[0].get_field() if i.is_required]
+    required_fields = isatab_configurator.compile_config(config).required_headers
     for required_field in required_fields:
         if required_field not in columns:
-            warnings.append({
+            report.warnings.append({
                 "message": "A required column in assay table is not present",
                 "supplemental": "In {} the required column {} missing from column headings"
                     .format(filename, required_field),
@@ -2233,7 +2612,7 @@ def check_assay_table_with_config(df, config, filename, protocol_names_and_types
             # Now check that the required column cells all have values, Rules 4003-4008
             for y, cell in enumerate(df[required_field]):
                 if not cell_has_value(cell):
-                    warnings.append({
+                    report.warnings.append({
                         "message": "A required cell value is missing",
                         "supplemental": "Cell at row {} in column '{}' has no value".format(y, required_field),
                         "code": 4012
@@ -2249,7 +2628,7 @@ def check_assay_table_with_config(df, config, filename, protocol_names_and_types
         for cell in df[each]:
             prots_found.add(cell)
         if len(prots_found) > 1:
-            warnings.append({
+            report.warnings.append({
                 "message": "Multiple protocol references in Protocol REF column",
                 "supplemental": "Multiple protocol references {} are found in {}".format(prots_found, each),
                 "code": 4999
@@ -2259,8 +2638,10 @@ def check_assay_table_with_config(df, config, filename, protocol_names_and_types
             prots_ok = False
 
 
-def check_study_assay_tables_against_config(i_df, dir_context, configs):
+def check_study_assay_tables_against_config(i_df, dir_context, configs, tables=None, report=None):
     """Used for rules 4003-4008"""
+    if tables is None:
+        tables = TableCache(dir_context)
     for i, study_df in enumerate(i_df['studies']):
         study_filename = study_df.iloc[0]['Study File Name']
         protocol_names = i_df['s_protocols'][i]['Study Protocol Name'].tolist()
@@ -2268,11 +2649,10 @@ def check_study_assay_tables_against_config(i_df, dir_context, configs):
         protocol_names_and_types = dict(zip(protocol_names, protocol_types))
         if study_filename is not '':
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    df = load_table(s_fp)
-                    config = configs[('[Sample]', '')]
-                    log.info("Checking study file {} against default study table configuration...".format(study_filename))
-                    check_assay_table_with_config(df, config, study_filename, protocol_names_and_types)
+                df = tables.get(study_filename)
+                config = configs[('[Sample]', '')]
+                log.info("Checking study file {} against default study table configuration...".format(study_filename))
+                check_assay_table_with_config(df, config, study_filename, protocol_names_and_types, report=report)
             except FileNotFoundError:
                 pass
         for j, assay_df in enumerate(i_df['s_assays']):
@@ -2281,24 +2661,26 @@ def check_study_assay_tables_against_config(i_df, dir_context, configs):
             technology_type = assay_df['Study Assay Technology Type'].tolist()[0]
             if assay_filename is not '':
                 try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        df = load_table(a_fp)
-                        config = configs[(measurement_type, technology_type)]
-                        log.info(
-                            "Checking assay file {} against default table configuration ({}, {})...".format(assay_filename, measurement_type, technology_type))
-                        check_assay_table_with_config(df, config, assay_filename, protocol_names_and_types)
-                        # check_assay_table_with_config(df, protocols, config, assay_filename)
+                    df = tables.get(assay_filename)
+                    config = configs[(measurement_type, technology_type)]
+                    log.info(
+                        "Checking assay file {} against default table configuration ({}, {})...".format(assay_filename, measurement_type, technology_type))
+                    check_assay_table_with_config(df, config, assay_filename, protocol_names_and_types,
+                                                  report=report)
+                    # check_assay_table_with_config(df, protocols, config, assay_filename)
                 except FileNotFoundError:
                     pass
         # TODO: Check protocol usage - Rule 4009
 
 
-def check_factor_value_presence(table):
+def check_factor_value_presence(table, report=None):
+    if report is None:
+        report = _default_report
     factor_fields = [i for i in table.columns if i.lower().startswith('factor value')]
     for factor_field in factor_fields:
         for x, cell_value in enumerate(table.fillna('')[factor_field]):
             if cell_value == '':
-                warnings.append({
+                report.warnings.append({
                     "message": "A required node factor value is missing value",
                     "supplemental": "(W) Missing value for '" + factor_field + "' at row " + str(x) + " in " +
                                     table.filename,
@@ -2307,18 +2689,23 @@ def check_factor_value_presence(table):
                 log.warning("(W) Missing value for '" + factor_field + "' at row " + str(x) + " in " + table.filename)
 
 
-def check_required_fields(table, cfg):
-    for fheader in [i.header for i in cfg.get_isatab_configuration()[0].get_field() if i.is_required]:
-        found_field = [i for i in table.columns if i.lower() == fheader.lower()]
+def check_required_fields(table, cfg, report=None):
+    if report is None:
+        report = _default_report
+    columns_by_lower_header = dict()
+    for column in table.columns:
+        columns_by_lower_header.setdefault(column.lower(), []).append(column)
+    for fheader in isatab_configurator.compile_config(cfg).required_headers:
+        found_field = columns_by_lower_header.get(fheader.lower(), [])
         if len(found_field) == 0:
-            warnings.append({
+            report.warnings.append({
                 "message": "A required column in assay table is not present",
                 "supplemental": "Required field '" + fheader + "' not found in the file '" + table.filename + "'",
                 "code": 4010
             })
             log.warning("(W) Required field '" + fheader + "' not found in the file '" + table.filename + "'")
         elif len(found_field) > 1:
-            warnings.append({
+            report.warnings.append({
                 "message": "Multiple columns found",
                 "supplemental": "Field '" + fheader + "' cannot have multiple values in the file '" + table.filename,
                 "code": 4013
@@ -2326,55 +2713,63 @@ def check_required_fields(table, cfg):
             log.warning("(W) Field '" + fheader + "' cannot have multiple values in the file '" + table.filename)
 
 
-def check_sample_names(study_sample_table, assay_tables=[]):
+def check_sample_names(study_sample_table, assay_tables=[], report=None):
     if len(assay_tables) > 0:
-        study_samples = set(study_sample_table['Sample Name'])
-        for assay_table in assay_tables:
-            assay_samples = set(assay_table['Sample Name'])
-            for assay_sample in assay_samples:
-                if assay_sample not in study_samples:
-                    warnings.append({
-                        "message": "Missing Sample",
-                        "supplemental": "{} is a Sample Name in {}, but it is not defined in the Study Sample File {}."
-                                .format(assay_sample, assay_table.filename, study_sample_table.filename),
-                        "code": 1003
-                    })
-                    log.warning("(W) {} is a Sample Name in {}, but it is not defined in the Study Sample File {}."
-                                .format(assay_sample, assay_table.filename, study_sample_table.filename))
+        _check_sample_names(study_sample_table.filename, set(study_sample_table['Sample Name']),
+                            [(x.filename, set(x['Sample Name'])) for x in assay_tables], report=report)
+
+
+def _check_sample_names(study_filename, study_samples, assay_samples_list, report=None):
+    """Used for rule 1003, given the sets of Sample Names of a study table
+    and a list of assay table file names with their sets of Sample Names"""
+    if report is None:
+        report = _default_report
+    for assay_filename, assay_samples in assay_samples_list:
+        for assay_sample in assay_samples:
+            if assay_sample not in study_samples:
+                report.warnings.append({
+                    "message": "Missing Sample",
+                    "supplemental": "{} is a Sample Name in {}, but it is not defined in the Study Sample File {}."
+                            .format(assay_sample, assay_filename, study_filename),
+                    "code": 1003
+                })
+                log.warning("(W) {} is a Sample Name in {}, but it is not defined in the Study Sample File {}."
+                            .format(assay_sample, assay_filename, study_filename))
 
 
-def check_field_values(table, cfg):
+def _map_cells(column, func):
+    """Applies func once per distinct value of a table column and returns
+    the results as an array holding one result per row. Empty (NaN) cells
+    get the result of func(float('nan')).
+    """
+    codes, uniques = pd.factorize(column)
+    results = [func(value) for value in uniques]
+    results.append(func(float('nan')))
+    return np.array(results)[codes]
+
+
+def _cells_have_value(column):
+    return _map_cells(column, cell_has_value).astype(bool)
+
+
+_VALUE_VALID, _VALUE_INVALID, _VALUE_NAN, _VALUE_BLANK, _VALUE_ERROR = range(5)
+
+
+def check_field_values(table, cfg, report=None):
+    if report is None:
+        report = _default_report
     def check_single_field(cell_value, cfg_field):
         # First check if the value is required by config
         if isinstance(cell_value, float):
             if math.isnan(cell_value):
-                if cfg_field.is_required:
-                    warnings.append({
-                        "message": "A required column in assay table is not present",
-                        "supplemental": "Missing value for the required field '" + cfg_field.header
-                                        + "' in the file '" + table.filename + "'",
-                        "code": 4010
-                    })
-                    log.warning("(W) Missing value for the required field '" + cfg_field.header + "' in the file '" +
-                                table.filename + "'")
-                return True
+                return _VALUE_NAN
         elif isinstance(cell_value, str):
-            value = cell_value.strip()
-            if value == '':
-                if cfg_field.is_required:
-                    warnings.append({
-                        "message": "A required cell value is missing",
-                        "supplemental": "Missing value for the required field '" + cfg_field.header + "' in the file '" +
-                                table.filename + "'",
-                        "code": 4012
-                    })
-                    log.warning("(W) Missing value for the required field '" + cfg_field.header + "' in the file '" +
-                                table.filename + "'")
-                return True
+            if cell_value.strip() == '':
+                return _VALUE_BLANK
         is_valid_value = True
         data_type = cfg_field.data_type.lower().strip()
-        if data_type in ['', 'string']:
-            return True
+        if data_type in ['', 'string', 'ontology-term', 'ontology term']:
+            return _VALUE_VALID  # Structure and values checked in check_ontology_fields()
         if 'boolean' == data_type:
             is_valid_value = 'true' == cell_value.strip() or 'false' == cell_value.strip()
         elif 'date' == data_type:
@@ -2393,13 +2788,42 @@ def check_field_values(table, cfg):
             except ValueError:
                 is_valid_value = False
         elif data_type == 'list':
-            list_values = [i.lower() for i in cfg_field.list_values.split(',')]
+            try:
+                list_values = cfg.list_values[cfg_field.header]
+            except KeyError:
+                list_values = [i.lower() for i in cfg_field.list_values.split(',')]
             if cell_value.lower() not in list_values:
                 is_valid_value = False
-        elif data_type in ['ontology-term', 'ontology term']:
-            return True  # Structure and values checked in check_ontology_fields()
         else:
-            warnings.append({
+            is_valid_value = False  # Unknown data type
+        return _VALUE_VALID if is_valid_value else _VALUE_INVALID
+
+    def cell_status(cell_value, cfg_field):
+        try:
+            return check_single_field(cell_value, cfg_field)
+        except Exception:
+            return _VALUE_ERROR  # Raised again if the checks get to this cell
+
+    def report_missing_value(cfg_field, status):
+        if status == _VALUE_NAN:
+            message = "A required column in assay table is not present"
+            code = 4010
+        else:
+            message = "A required cell value is missing"
+            code = 4012
+        report.warnings.append({
+            "message": message,
+            "supplemental": "Missing value for the required field '" + cfg_field.header + "' in the file '" +
+                            table.filename + "'",
+            "code": code
+        })
+        log.warning("(W) Missing value for the required field '" + cfg_field.header + "' in the file '" +
+                    table.filename + "'")
+
+    def report_invalid_value(cell_value, cfg_field):
+        data_type = cfg_field.data_type.lower().strip()
+        if data_type not in ['boolean', 'date', 'integer', 'double', 'list']:
+            report.warnings.append({
                 "message": "Unknown data type found",
                 "supplemental": "Unknown data type '" + data_type + "' for field '" + cfg_field.header +
                                 "' in the file '" + table.filename + "'",
@@ -2407,61 +2831,80 @@ def check_field_values(table, cfg):
             })
             log.warning("(W) Unknown data type '" + data_type + "' for field '" + cfg_field.header +
                         "' in the file '" + table.filename + "'")
-            return False
-        if not is_valid_value:
-            warnings.append({
-                "message": "A value does not correspond to the correct data type",
-                "supplemental": "Invalid value '" + cell_value + "' for type '" + data_type + "' of the field '"
-                                + cfg_field.header + "'",
-                "code": 4011
-            })
-            log.warning("(W) Invalid value '" + cell_value + "' for type '" + data_type + "' of the field '" +
-                        cfg_field.header + "'")
-            if data_type == 'list':
-                log.warning("(W) Value must be one of: " + cfg_field.list_values)
-        return is_valid_value
-
-    result = True
-    for irow in range(len(table.index)):
-        ncols = len(table.columns)
-        for icol in range(0, ncols):
-            cfields = [i for i in cfg.get_isatab_configuration()[0].get_field() if i.header == table.columns[icol]]
-            if len(cfields) == 1:
-                cfield = cfields[0]
-                result = result and check_single_field(table.iloc[irow][cfield.header], cfield)
-    return result
+            return
+        report.warnings.append({
+            "message": "A value does not correspond to the correct data type",
+            "supplemental": "Invalid value '" + cell_value + "' for type '" + data_type + "' of the field '"
+                            + cfg_field.header + "'",
+            "code": 4011
+        })
+        log.warning("(W) Invalid value '" + cell_value + "' for type '" + data_type + "' of the field '" +
+                    cfg_field.header + "'")
+        if data_type == 'list':
+            log.warning("(W) Value must be one of: " + cfg_field.list_values)
+
+    # Check each configured column as a whole, giving the row indexes of its
+    # missing and invalid values. Cells are reported in row order, and only
+    # up to the first invalid one, as the checks stop there.
+    cfg = isatab_configurator.compile_config(cfg)
+    columns = []
+    first_invalid = None
+    for icol, header in enumerate(table.columns):
+        cfield = cfg.field(header)
+        if cfield is None:
+            continue
+        status = _map_cells(table[header], lambda x: cell_status(x, cfield))
+        invalid_rows = np.flatnonzero((status == _VALUE_INVALID) | (status == _VALUE_ERROR))
+        if len(invalid_rows) > 0 and (first_invalid is None or invalid_rows[0] < first_invalid[0]):
+            first_invalid = (invalid_rows[0], icol, cfield)
+        if cfield.is_required:
+            columns.append((icol, cfield, status))
+
+    missing = []
+    for icol, cfield, status in columns:
+        missing_rows = np.flatnonzero((status == _VALUE_NAN) | (status == _VALUE_BLANK))
+        if first_invalid is not None:
+            last_row = first_invalid[0] if icol < first_invalid[1] else first_invalid[0] - 1
+            missing_rows = missing_rows[missing_rows <= last_row]
+        missing.extend((irow, icol, cfield, status[irow]) for irow in missing_rows)
+    for irow, icol, cfield, status in sorted(missing, key=lambda x: x[:2]):
+        report_missing_value(cfield, status)
+    if first_invalid is not None:
+        irow, icol, cfield = first_invalid
+        check_single_field(table.iloc[irow, icol], cfield)
+        report_invalid_value(table.iloc[irow, icol], cfield)
+        return False
+    return True
 
 
-def check_unit_field(table, cfg):
-    def check_unit_value(cell_value, unit_value, cfield, filename):
-        if cell_has_value(cell_value) or cell_has_value(unit_value):
-            warnings.append({
-                "message": "Cell found has unit but no value",
-                "supplemental": "Field '" + cfield.header + "' has a unit but not a value in the file '" + filename
-                                + "'",
-                "code": 4999
-            })
-            log.warning("(W) Field '" + cfield.header + "' has a unit but not a value in the file '" + filename + "'")
-            return False
-        return True
+def check_unit_field(table, cfg, report=None):
+    if report is None:
+        report = _default_report
+    def report_unit_without_value(cfield, filename):
+        report.warnings.append({
+            "message": "Cell found has unit but no value",
+            "supplemental": "Field '" + cfield.header + "' has a unit but not a value in the file '" + filename
+                            + "'",
+            "code": 4999
+        })
+        log.warning("(W) Field '" + cfield.header + "' has a unit but not a value in the file '" + filename + "'")
 
     result = True
+    cfg = isatab_configurator.compile_config(cfg)
     for icol, header in enumerate(table.columns):
-        cfields = [i for i in cfg.get_isatab_configuration()[0].get_field() if i.header == header]
-        if len(cfields) != 1:
+        cfield = cfg.field(header)
+        if cfield is None:
             continue
-        cfield = cfields[0]
-        ucfields = [i for i in cfg.get_isatab_configuration()[0].get_unit_field() if i.pos == cfield.pos + 1]
-        if len(ucfields) != 1:
+        ucfield = cfg.unit_field(cfield.pos + 1)
+        if ucfield is None:
             continue
-        ucfield = ucfields[0]
         if ucfield.is_required:
             rheader = None
             rindx = icol + 1
             if rindx < len(table.columns):
                 rheader = table.columns[rindx]
             if rheader is None or rheader.lower() != 'unit':
-                warnings.append({
+                report.warnings.append({
                     "message": "Cell requires a Unit",
                     "supplemental": "The field '" + header + "' in the file '" + table.filename + "' misses a required "
                                                                                                   "'Unit' column",
@@ -2470,14 +2913,17 @@ def check_unit_field(table, cfg):
                 log.warning("(W) The field '" + header + "' in the file '" + table.filename +
                             "' misses a required 'Unit' column")
                 result = False
-            else:
-                for irow in range(len(table.index)):
-                    result = result and check_unit_value(table.iloc[irow][icol], table.iloc[irow][rindx],
-                                                         cfield, table.filename)
+            elif result:
+                has_value = _cells_have_value(table.iloc[:, icol]) | _cells_have_value(table.iloc[:, rindx])
+                if has_value.any():
+                    report_unit_without_value(cfield, table.filename)
+                    result = False
     return result
 
 
-def check_protocol_fields(table, cfg, proto_map):
+def check_protocol_fields(table, cfg, proto_map, report=None):
+    if report is None:
+        report = _default_report
     from itertools import tee
 
     def pairwise(iterable):  # A lovely pairwise iterator
@@ -2485,6 +2931,7 @@ def check_protocol_fields(table, cfg, proto_map):
         next(b, None)
         return zip(a, b)
 
+    cfg = isatab_configurator.compile_config(cfg)
     proto_ref_index = [i for i in table.columns if 'protocol ref' in i.lower()]
     result = True
     for each in proto_ref_index:
@@ -2508,18 +2955,10 @@ def check_protocol_fields(table, cfg, proto_map):
         if last_proto_indx > last_mat_or_dat_indx:
             log.warning("(W) Protocol REF column without output in file '" + table.filename + "'")
         for left, right in pairwise(field_headers):
-            cleft = None
-            cright = None
-            clefts = [i for i in cfg.get_isatab_configuration()[0].get_field() if i.header.lower() == left.lower()]
-            if len(clefts) == 1:
-                cleft = clefts[0]
-            crights = [i for i in cfg.get_isatab_configuration()[0].get_field() if
-                       i.header.lower() == right.lower()]
-            if len(crights) == 1:
-                cright = crights[0]
+            cleft = cfg.field_ignoring_case(left)
+            cright = cfg.field_ignoring_case(right)
             if cleft is not None and cright is not None:
-                cprotos = [i.protocol_type for i in cfg.get_isatab_configuration()[0].get_protocol_field() if
-                           cleft.pos < i.pos and cright.pos > i.pos]
+                cprotos = [i.protocol_type for i in cfg.protocol_fields_between(cleft.pos, cright.pos)]
                 fprotos_headers = [i for i in table.columns[
                                               table.columns.get_loc(cleft.header):table.columns.get_loc(
                                                   cright.header)] if
@@ -2531,7 +2970,7 @@ def check_protocol_fields(table, cfg, proto_map):
                         proto_type = proto_map[proto_name]
                         fprotos.append(proto_type)
                     except KeyError:
-                        warnings.append({
+                        report.warnings.append({
                             "message": "Missing Protocol declaration",
                             "supplemental": " Could not find protocol type for protocol name '{}', trying to validate "
                                             "against name only".format(proto_name),
@@ -2542,7 +2981,7 @@ def check_protocol_fields(table, cfg, proto_map):
                         fprotos.append(proto_name)
                 invalid_protos = set(cprotos) - set(fprotos)
                 if len(invalid_protos) > 0:
-                    warnings.append({
+                    report.warnings.append({
                         "message": "Missing Protocol declaration",
                         "supplemental": "Protocol(s) of type " + str(list(invalid_protos))
                                         + " defined in the ISA-configuration expected as a between '"
@@ -2557,32 +2996,28 @@ def check_protocol_fields(table, cfg, proto_map):
     return result
 
 
-def check_ontology_fields(table, cfg):
-    def check_single_field(cell_value, source, acc, cfield, filename):
-        if (cell_has_value(cell_value) and not cell_has_value(
-                source) and cell_has_value(acc)) or not cell_has_value(
-                cell_value):
-            warnings.append({
-                "message": "Missing Term Source REF in annotation or missing Term Source Name",
-                "supplemental": "Incomplete values for ontology headers, for the field '"
-                                + cfield.header + "' in the file '"
-                                + filename + "'. Check that all the label/accession/source are provided.",
-                "code": 3008
-            })
-            log.warning(
-                "(W) Incomplete values for ontology headers, for the field '" + cfield.header + "' in the file '" +
-                filename + "'. Check that all the label/accession/source are provided.")
-            return False
-        # TODO: Implement check against declared ontology sources in investigation file
-        return True
+def check_ontology_fields(table, cfg, report=None):
+    if report is None:
+        report = _default_report
+    def report_incomplete_field(cfield, filename):
+        report.warnings.append({
+            "message": "Missing Term Source REF in annotation or missing Term Source Name",
+            "supplemental": "Incomplete values for ontology headers, for the field '"
+                            + cfield.header + "' in the file '"
+                            + filename + "'. Check that all the label/accession/source are provided.",
+            "code": 3008
+        })
+        log.warning(
+            "(W) Incomplete values for ontology headers, for the field '" + cfield.header + "' in the file '" +
+            filename + "'. Check that all the label/accession/source are provided.")
 
     result = True
     nfields = len(table.columns)
+    cfg = isatab_configurator.compile_config(cfg)
     for icol, header in enumerate(table.columns):
-        cfields = [i for i in cfg.get_isatab_configuration()[0].get_field() if i.header == header]
-        if len(cfields) != 1:
+        cfield = cfg.field(header)
+        if cfield is None:
             continue
-        cfield = cfields[0]
         if cfield.get_recommended_ontologies() is None:
             continue
         rindx = icol + 1
@@ -2599,9 +3034,14 @@ def check_ontology_fields(table, cfg):
             result = False
             continue
 
-        for irow in range(len(table.index)):
-            result = result and check_single_field(table.iloc[irow][icol], table.iloc[irow][rindx],
-                                                   table.iloc[irow][rrindx], cfield, table.filename)
+        if result:
+            has_term = _cells_have_value(table.iloc[:, icol])
+            has_source = _cells_have_value(table.iloc[:, rindx])
+            has_accession = _cells_have_value(table.iloc[:, rrindx])
+            # TODO: Implement check against declared ontology sources in investigation file
+            if ((has_term & ~has_source & has_accession) | ~has_term).any():
+                report_incomplete_field(cfield, table.filename)
+                result = False
 
     return result
 
@@ -2618,11 +3058,13 @@ def get_num_study_groups(study_sample_table, study_filename):
         log.info("No study factors found in {}".format(study_filename))
     return num_study_groups
 
-def check_study_groups(table, filename, study_group_size_in_comment):
+def check_study_groups(table, filename, study_group_size_in_comment, report=None):
+    if report is None:
+        report = _default_report
     num_study_groups = get_num_study_groups(table, filename)
     log.info('Found {} study groups in {}'.format(
             num_study_groups, filename))
-    info.append({
+    report.info.append({
             'message': 'Found {} study groups in {}'.format(
                 num_study_groups, filename),
             'supplemental': 'Found {} study groups in {}'.format(
@@ -2633,7 +3075,7 @@ def check_study_groups(table, filename, study_group_size_in_comment):
                         study_group_size_in_comment != num_study_groups:
             log.warning('Study group size reported as {} but found {} in {}'
                         .format(study_group_size_in_comment, num_study_groups, filename))
-            warnings.append({
+            report.warnings.append({
                 'message': 'Reported study group size does not match table'
                     .format(num_study_groups, filename),
                 'supplemental': 'Study group size reported as {} but found {} '
@@ -2644,92 +3086,180 @@ def check_study_groups(table, filename, study_group_size_in_comment):
             return False
     return True
 
-def validate(fp, config_dir=default_config_dir, log_level=config.log_level):
-    global errors
-    global warnings
-    global info
-    errors = list()
-    warnings = list()
-    info = list()
+# the codes of the rules run by validate, by rule
+_TABLE_RULE_CODES = [
+    (check_factor_value_presence, [4007]),
+    (check_required_fields, [4003, 4004, 4005, 4006, 4008, 4010, 4013]),
+    (check_field_values, [4010, 4011, 4012]),
+    (check_unit_field, [4999]),
+    (check_protocol_fields, [1007, 4009]),
+    (check_ontology_fields, [3008, 3010]),
+    (check_study_groups, [5001, 5002])
+]
+_CONFIG_RULE_CODES = [4001, 4002, 4003] + [x for _, codes in _TABLE_RULE_CODES for x in codes]
+
+
+def _check_table_against_config(tables, filename, configs, config_key, config_name, protocol_names_and_types,
+                                study_group_size_in_comment, cache=None, config_signature=None, runner=None,
+                                report=None):
+    """Runs the rules checking a study or assay table of tables against the
+    configuration configs[config_key].
+
+    With a ValidationCache, the findings of the rules are kept in it, and
+    are reused without reading the table again as long as neither the table
+    file nor what the rules depend on changes.
+    """
+    if report is None:
+        report = _default_report
+    if runner is None:
+        runner = RuleRunner(report)
+    if not runner.selected([x for _, codes in _TABLE_RULE_CODES for x in codes]):
+        tables.summary(filename)  # raises FileNotFoundError if the table is missing
+        return
+    if cache is not None:
+        key = validation_digest('table rules', tables.digest(filename), filename, config_key, config_signature,
+                                sorted(protocol_names_and_types.items()), study_group_size_in_comment,
+                                runner.selection)
+        results = cache.get(key)
+        if results is not None:
+            log.info("Reusing the validation results of unchanged {}".format(filename))
+            report.errors.extend(results['errors'])
+            report.warnings.extend(results['warnings'])
+            report.info.extend(results['info'])
+            runner.stop_on_errors()
+            return
+        marks = len(report.errors), len(report.warnings), len(report.info)
+    table = tables.get(filename)
+    table.filename = filename
+    config = configs[config_key]
+    codes = dict(_TABLE_RULE_CODES)
+    log.info("Checking Factor Value presence...")
+    runner.run(codes[check_factor_value_presence], check_factor_value_presence, table, report=report)  # Rule 4007
+    log.info("Checking required fields...")
+    runner.run(codes[check_required_fields], check_required_fields, table, config,
+               report=report)  # Rule 4003-8, 4010
+    log.info("Checking generic fields...")
+    if runner.run(codes[check_field_values], check_field_values, table, config, report=report) is False:  # Rule 4011
+        log.warning("(W) There are some field value inconsistencies in {} against {} "
+                    "configuration".format(table.filename, config_name))
+    log.info("Checking unit fields...")
+    if runner.run(codes[check_unit_field], check_unit_field, table, config, report=report) is False:
+        log.warning("(W) There are some unit value inconsistencies in {} against {} "
+                    "configuration".format(table.filename, config_name))
+    log.info("Checking protocol fields...")
+    if runner.run(codes[check_protocol_fields], check_protocol_fields, table, config, protocol_names_and_types,
+                  report=report) is False:  # Rule 4009
+        log.warning("(W) There are some protocol inconsistencies in {} against {} "
+                    "configuration".format(table.filename, config_name))
+    log.info("Checking ontology fields...")
+    if runner.run(codes[check_ontology_fields], check_ontology_fields, table, config,
+                  report=report) is False:  # Rule 3010
+        log.warning("(W) There are some ontology annotation inconsistencies in {} against {} "
+                    "configuration".format(table.filename, config_name))
+    log.info("Checking study group size...")
+    runner.run(codes[check_study_groups], check_study_groups, table, filename, study_group_size_in_comment,
+               report=report)
+    if cache is not None:
+        cache.put(key, {
+            'errors': report.errors[marks[0]:],
+            'warnings': report.warnings[marks[1]:],
+            'info': report.info[marks[2]:]
+        })
+
+
+def validate(fp, config_dir=default_config_dir, log_level=config.log_level, cache_dir=None, rules=None,
+             skip_rules=None, fail_fast=False, timings=False):
+    """Validates an ISA-Tab archive, given its investigation file fp.
+
+    With cache_dir, the results of the rules checking each study and assay
+    table on its own are kept in that directory, together with what the
+    rules across tables need of the table. Validating the archive again then
+    reads only the tables that changed since.
+
+    rules and skip_rules select the rules to run by the codes of their
+    findings, e.g. rules=['1xxx'] for the cross-reference checks only or
+    skip_rules=['4xxx'] to leave out the checks against configurations;
+    see RuleRunner. The configurations are not loaded if no rule needs
+    them, and the pooling detection, having no code, only runs with all
+    rules. With fail_fast, validation stops at the first error and the
+    report has validation_finished False. With timings, the report has
+    the time taken by each rule run under "timings".
+    """
+    report = ValidationReport()
+    runner = RuleRunner(report, rules=rules, skip_rules=skip_rules, fail_fast=fail_fast, timings=timings)
     log.setLevel(log_level)
     log.info("ISA tab Validator from ISA tools API v0.6")
-    from io import StringIO
     stream = StringIO()
-    handler = logging.StreamHandler(stream)
+    handler = thread_log_handler(stream)
     log.addHandler(handler)
     validation_finished = False
     try:
         # check_utf8(fp)  # skip as does not correctly report right now
         log.info("Loading... {}".format(fp.name))
-        i_df = load_investigation(fp=fp)
+        i_df = runner.call(None, load_investigation, fp=fp, report=report)
         log.info("Running prechecks...")
-        check_filenames_present(i_df)  # Rule 3005
-        check_table_files_read(i_df, os.path.dirname(fp.name))  # Rules 0006 and 0008
+        runner.run([3005], check_filenames_present, i_df, report=report)  # Rule 3005
+        cache = None if cache_dir is None else ValidationCache(cache_dir)
+        # each table is read once, by the first rule using it
+        tables = TableCache(os.path.dirname(fp.name), cache=cache)
+        runner.run([6, 8], check_table_files_read, i_df, os.path.dirname(fp.name), tables,
+                   report=report)  # Rules 0006 and 0008
         # check_table_files_load(i_df, os.path.dirname(fp.name))  # Rules 0007 and 0009, covered by later validation?
-        check_samples_not_declared_in_study_used_in_assay(i_df, os.path.dirname(fp.name))  # Rule 1003
-        check_study_factor_usage(i_df, os.path.dirname(fp.name))  # Rules 1008 and 1021
-        check_protocol_usage(i_df, os.path.dirname(fp.name))  # Rules 1007 and 1019
-        check_protocol_parameter_usage(i_df, os.path.dirname(fp.name))  # Rules 1009 and 1020
-        check_date_formats(i_df)  # Rule 3001
-        check_dois(i_df)  # Rule 3002
-        check_pubmed_ids_format(i_df)  # Rule 3003
-        check_protocol_names(i_df)  # Rule 1010
-        check_protocol_parameter_names(i_df)  # Rule 1011
-        check_study_factor_names(i_df)  # Rule 1012
-        check_ontology_sources(i_df)  # Rule 3008
+        symbol_tables = None
+        if runner.selected([1003, 1007, 1008, 1009, 1019, 1020, 1021]):
+            symbol_tables = runner.call(None, study_symbol_tables, i_df, tables)
+        runner.run([1003], check_samples_not_declared_in_study_used_in_assay, i_df, os.path.dirname(fp.name),
+                   tables, symbol_tables=symbol_tables)  # Rule 1003
+        runner.run([1008, 1021], check_study_factor_usage, i_df, os.path.dirname(fp.name), tables,
+                   symbol_tables=symbol_tables)  # Rules 1008 and 1021
+        runner.run([1007, 1019], check_protocol_usage, i_df, os.path.dirname(fp.name), tables, report=report,
+                   symbol_tables=symbol_tables)  # Rules 1007 and 1019
+        runner.run([1009, 1020], check_protocol_parameter_usage, i_df, os.path.dirname(fp.name), tables,
+                   symbol_tables=symbol_tables)  # Rules 1009 and 1020
+        runner.run([3001], check_date_formats, i_df, report=report)  # Rule 3001
+        runner.run([3002], check_dois, i_df, report=report)  # Rule 3002
+        runner.run([3003], check_pubmed_ids_format, i_df, report=report)  # Rule 3003
+        runner.run([1010], check_protocol_names, i_df, report=report)  # Rule 1010
+        runner.run([1011], check_protocol_parameter_names, i_df, report=report)  # Rule 1011
+        runner.run([1012], check_study_factor_names, i_df, report=report)  # Rule 1012
+        runner.run([3008], check_ontology_sources, i_df, report=report)  # Rule 3008
         log.info("Finished prechecks...")
-        log.info("Loading configurations found in {}".format(config_dir))
-        configs = load_config(config_dir)  # Rule 4001
-        if configs is None:
-            raise SystemError("No configuration to load so cannot proceed with validation!")
-        log.info("Using configurations found in {}".format(config_dir))
-        check_measurement_technology_types(i_df, configs)  # Rule 4002
-        log.info("Checking investigation file against configuration...")
-        check_investigation_against_config(i_df, configs)  # Rule 4003 for investigation file only
-        log.info("Finished checking investigation file")
+        configs = None
+        if runner.selected(_CONFIG_RULE_CODES):
+            log.info("Loading configurations found in {}".format(config_dir))
+            configs = runner.call([4001], load_config, config_dir, report=report)  # Rule 4001
+            if configs is None:
+                raise SystemError("No configuration to load so cannot proceed with validation!")
+            log.info("Using configurations found in {}".format(config_dir))
+        config_signature = None if cache is None else isatab_configurator.config_dir_signature(config_dir)
+        if configs is not None:
+            runner.run([4002], check_measurement_technology_types, i_df, configs, report=report)  # Rule 4002
+            log.info("Checking investigation file against configuration...")
+            runner.run([4003], check_investigation_against_config, i_df, configs,
+                       report=report)  # Rule 4003 for investigation file only
+            log.info("Finished checking investigation file")
         for i, study_df in enumerate(i_df['studies']):
             study_group_size_in_comment = None
             if NUMBER_OF_STUDY_GROUPS in study_df.columns:
                 study_group_sizes = study_df[NUMBER_OF_STUDY_GROUPS]
                 study_group_size_in_comment = next(iter(study_group_sizes))
             study_filename = study_df.iloc[0]['Study File Name']
-            study_sample_table = None
-            assay_tables = list()
-            if study_filename is not '':
+            study_checked = False
+            assay_filenames_checked = list()
+            if study_filename != '':
                 protocol_names = i_df['s_protocols'][i]['Study Protocol Name'].tolist()
                 protocol_types = i_df['s_protocols'][i]['Study Protocol Type'].tolist()
                 protocol_names_and_types = dict(zip(protocol_names, protocol_types))
                 try:
                     log.info("Loading... {}".format(study_filename))
-                    with open(os.path.join(os.path.dirname(fp.name), study_filename), encoding='utf-8') as s_fp:
-                        study_sample_table = load_table(s_fp)
-                        study_sample_table.filename = study_filename
-                        config = configs[('[Sample]', '')]
-                        log.info(
-                            "Validating {} against default study table configuration".format(study_filename))
-                        log.info("Checking Factor Value presence...")
-                        check_factor_value_presence(study_sample_table)  # Rule 4007
-                        log.info("Checking required fields...")
-                        check_required_fields(study_sample_table, config)  # Rule 4003-8, 4010
-                        log.info("Checking generic fields...")
-                        if not check_field_values(study_sample_table, config):  # Rule 4011
-                            log.warning("(W) There are some field value inconsistencies in {} against {} "
-                                        "configuration".format(study_sample_table.filename, 'Study Sample'))
-                        log.info("Checking unit fields...")
-                        if not check_unit_field(study_sample_table, config):
-                            log.warning("(W) There are some unit value inconsistencies in {} against {} "
-                                        "configuration".format(study_sample_table.filename, 'Study Sample'))
-                        log.info("Checking protocol fields...")
-                        if not check_protocol_fields(study_sample_table, config, protocol_names_and_types):  # Rule 4009
-                            log.warning("(W) There are some protocol inconsistencies in {} against {} "
-                                        "configuration".format(study_sample_table.filename, 'Study Sample'))
-                        log.info("Checking ontology fields...")
-                        if not check_ontology_fields(study_sample_table, config):  # Rule 3010
-                            log.warning("(W) There are some ontology annotation inconsistencies in {} against {} "
-                                        "configuration".format(study_sample_table.filename, 'Study Sample'))
-                        log.info("Checking study group size...")
-                        check_study_groups(study_sample_table, study_filename, study_group_size_in_comment)
-                        log.info("Finished validation on {}".format(study_filename))
+                    log.info(
+                        "Validating {} against default study table configuration".format(study_filename))
+                    _check_table_against_config(
+                        tables, study_filename, configs, ('[Sample]', ''), 'Study Sample',
+                        protocol_names_and_types, study_group_size_in_comment, cache=cache,
+                        config_signature=config_signature, runner=runner, report=report)
+                    study_checked = True
+                    log.info("Finished validation on {}".format(study_filename))
                 except FileNotFoundError:
                     pass
                 assay_df = i_df['s_assays'][i]
@@ -2741,71 +3271,58 @@ def validate(fp, config_dir=default_config_dir, log_level=config.log_level):
                 for x, assay_filename in enumerate(assay_df['Study Assay File Name'].tolist()):
                     measurement_type = assay_df['Study Assay Measurement Type'].tolist()[x]
                     technology_type = assay_df['Study Assay Technology Type'].tolist()[x]
-                    if assay_filename is not '':
-                        try:
-                            config = configs[(measurement_type, technology_type)]
-                        except KeyError:
-                            log.error("Could not load config matching ({}, {})".format(measurement_type, technology_type))
-                            log.warning("Only have configs matching:")
-                            for k in configs.keys():
-                                log.warning(k)
-                            config = None
-                        if config is None:
+                    if assay_filename != '':
+                        config = None
+                        if configs is not None:  # None if no rule selected needs the configurations
+                            try:
+                                config = configs[(measurement_type, technology_type)]
+                            except KeyError:
+                                log.error("Could not load config matching ({}, {})".format(measurement_type, technology_type))
+                                log.warning("Only have configs matching:")
+                                for k in configs.keys():
+                                    log.warning(k)
+                                config = None
+                        if configs is not None and config is None:
                             log.warning("Skipping configuration validation as could not load config...")
                         else:
                             try:
                                 log.info("Loading... {}".format(assay_filename))
-                                with open(os.path.join(os.path.dirname(fp.name), assay_filename), encoding='utf-8') as a_fp:
-                                    assay_table = load_table(a_fp)
-                                    assay_table.filename = assay_filename
-                                    assay_tables.append(assay_table)
-                                    log.info(
-                                        "Validating {} against assay table configuration ({}, {})...".format(
-                                            assay_filename, measurement_type, technology_type))
-                                    log.info("Checking Factor Value presence...")
-                                    check_factor_value_presence(assay_table)  # Rule 4007
-                                    log.info("Checking required fields...")
-                                    check_required_fields(assay_table, config)  # Rule 4003-8, 4010
-                                    log.info("Checking generic fields...")
-                                    if not check_field_values(assay_table, config):  # Rule 4011
-                                        log.warning(
-                                            "(W) There are some field value inconsistencies in {} against {} configuration".format(
-                                                assay_table.filename, (measurement_type, technology_type)))
-                                    log.info("Checking unit fields...")
-                                    if not check_unit_field(assay_table, config):
-                                        log.warning(
-                                            "(W) There are some unit value inconsistencies in {} against {} configuration".format(
-                                                assay_table.filename, (measurement_type, technology_type)))
-                                    log.info("Checking protocol fields...")
-                                    if not check_protocol_fields(assay_table, config, protocol_names_and_types):  # Rule 4009
-                                        log.warning("(W) There are some protocol inconsistencies in {} against {} "
-                                                    "configuration".format(assay_table.filename, (measurement_type, technology_type)))
-                                    log.info("Checking ontology fields...")
-                                    if not check_ontology_fields(assay_table, config):  # Rule 3010
-                                        log.warning("(W) There are some ontology annotation inconsistencies in {} against {} "
-                                                    "configuration".format(assay_table.filename, (measurement_type, technology_type)))
-                                    log.info("Checking study group size...")
-                                    check_study_groups(assay_table, assay_filename, study_group_size_in_comment)
-                                    log.info("Finished validation on {}".format(assay_filename))
+                                log.info(
+                                    "Validating {} against assay table configuration ({}, {})...".format(
+                                        assay_filename, measurement_type, technology_type))
+                                _check_table_against_config(
+                                    tables, assay_filename, configs, (measurement_type, technology_type),
+                                    (measurement_type, technology_type), protocol_names_and_types,
+                                    study_group_size_in_comment, cache=cache, config_signature=config_signature,
+                                    runner=runner, report=report)
+                                assay_filenames_checked.append(assay_filename)
+                                log.info("Finished validation on {}".format(assay_filename))
                             except FileNotFoundError:
                                 pass
-                        if study_sample_table is not None:
+                        if study_checked and len(assay_filenames_checked) > 0 and runner.selected([1003]):
                             log.info("Checking consistencies between study sample table and assay tables...")
-                            check_sample_names(study_sample_table, assay_tables)
+                            study_symbols = symbol_tables[i]
+                            runner.run([1003], _check_sample_names, study_filename,
+                                       study_symbols.samples(study_filename),
+                                       [(x, study_symbols.samples(x)) for x in assay_filenames_checked],
+                                       report=report)
                             log.info("Finished checking study sample table against assay tables...")
-            if len(errors) != 0:
+            if len(report.errors) != 0:
                 log.info("Skipping pooling test as there are outstanding errors")
             else:
                 from isatools import utils
                 try:
                     fp.seek(0)
-                    utils.detect_isatab_process_pooling(fp)
-                except:
-                    pass
+                    runner.run((), utils.detect_isatab_table_process_pooling, fp, tables=tables)
+                except (OSError, KeyError, IndexError, ValueError) as e:
+                    # e.g. a table the rules selected did not check for
+                    log.warning("Could not check for process pooling: {}".format(e))
         log.info("Finished validation...")
         validation_finished = True
+    except ValidationStopped:
+        log.info("Stopped validation at the first error")
     except ParserError as cpe:
-        errors.append({
+        report.errors.append({
             "message": "Unknown/System Error",
             "supplemental": "The validator could not identify what the error is: {}".format(str(cpe)),
             "code": 0
@@ -2813,7 +3330,7 @@ def validate(fp, config_dir=default_config_dir, log_level=config.log_level):
         log.fatal("(F) There was an error when trying to parse the ISA tab")
         log.fatal(cpe)
     except ValueError as ve:
-        errors.append({
+        report.errors.append({
             "message": "Unknown/System Error",
             "supplemental": "The validator could not identify what the error is: {}".format(str(ve)),
             "code": 0
@@ -2821,7 +3338,7 @@ def validate(fp, config_dir=default_config_dir, log_level=config.log_level):
         log.fatal("(F) There was an error when trying to parse the ISA tab")
         log.fatal(ve)
     except SystemError as se:
-        errors.append({
+        report.errors.append({
             "message": "Unknown/System Error",
             "supplemental": "The validator could not identify what the error is: {}".format(str(se)),
             "code": 0
@@ -2829,7 +3346,7 @@ def validate(fp, config_dir=default_config_dir, log_level=config.log_level):
         log.fatal("(F) Something went very very wrong! :(")
         log.fatal(se)
     except Exception as e:
-        errors.append({
+        report.errors.append({
             "message": "Unknown/System Error",
             "supplemental": "The validator could not identify what the error is: {}".format(str(e)),
             "code": 0
@@ -2838,18 +3355,60 @@ def validate(fp, config_dir=default_config_dir, log_level=config.log_level):
         log.fatal(e)
     finally:
         handler.flush()
-        return {
-            "errors": errors,
-            "warnings": warnings,
-            "info": info,
+        log.removeHandler(handler)
+        return runner.add_timings({
+            "errors": report.errors,
+            "warnings": report.warnings,
+            "info": report.info,
             "validation_finished": validation_finished
+        })
+
+
+def _validate_tab_dir(tab_dir):
+    log.info("***Validating {}***\n".format(tab_dir))
+    i_files = glob.glob(os.path.join(tab_dir, 'i_*.txt'))
+    if len(i_files) != 1:
+        log.warning("Could not find an investigation file, skipping {}".format(tab_dir))
+        return None
+    with open(i_files[0], encoding='utf-8') as fp:
+        return {
+            "filename": fp.name,
+            "report": validate(fp)
         }
 
 
-def batch_validate(tab_dir_list):
+def iter_batch_validate(tab_dir_list, workers=None):
+    """ Validate a batch of ISA-Tab archives, yielding the report of each
+    archive as soon as it is validated
+    :param tab_dir_list: List of file paths to the ISA-Tab archives to validate
+    :param workers: Number of processes validating archives concurrently;
+    archives are validated one after another if None or 1
+    :return: generator of dicts with the filename and report of an archive,
+    each of which json.dumps() can write as one line of a JSON lines file.
+    With workers, they come in the order the archives finish validating.
+    An archive that cannot be validated gets a report with the error that
+    stopped it, and does not stop the batch.
+
+    Example:
+        from isatools import isatab
+        my_tabs = [
+            '/path/to/study1/',
+            '/path/to/study2/'
+        ]
+        with open('/path/to/reports.jsonl', 'w') as out_fp:
+            for entry in isatab.iter_batch_validate(my_tabs, workers=4):
+                out_fp.write(json.dumps(entry) + '\n')
+    """
+    return iter_batch(_validate_tab_dir, tab_dir_list, workers=workers)
+
+
+def batch_validate(tab_dir_list, workers=None):
     """ Validate a batch of ISA-Tab archives
     :param tab_dir_list: List of file paths to the ISA-Tab archives to validate
-    :return: batch report as JSON
+    :param workers: Number of processes validating archives concurrently;
+    see iter_batch_validate()
+    :return: batch report as JSON, with the reports in the order of
+    tab_dir_list
 
     Example:
         from isatools import isatab
@@ -2857,24 +3416,11 @@ def batch_validate(tab_dir_list):
             '/path/to/study1/',
             '/path/to/study2/'
         ]
-        batch_report = isatab.batch_validate(my_tabs, '/path/to/report.txt')
+        batch_report = isatab.batch_validate(my_tabs, workers=4)
     """
     batch_report = {
-        "batch_report": []
+        "batch_report": list(iter_batch(_validate_tab_dir, tab_dir_list, workers=workers, ordered=True))
     }
-    for tab_dir in tab_dir_list:
-        log.info("***Validating {}***\n".format(tab_dir))
-        i_files = glob.glob(os.path.join(tab_dir, 'i_*.txt'))
-        if len(i_files) != 1:
-            log.warning("Could not find an investigation file, skipping {}".format(tab_dir))
-        else:
-            with open(i_files[0], encoding='utf-8') as fp:
-                batch_report['batch_report'].append(
-                    {
-                        "filename": fp.name,
-                        "report": validate(fp)
-                    }
-                )
     return batch_report
 
 
@@ -2919,7 +3465,141 @@ def dump_tables_to_dataframes(isa_obj):
     return output
 
 
-def load(isatab_path_or_ifile, skip_load_tables=False):  # from DF of investigation file
+def _shared_study_objects(ontology_sources, samples, protocols, factors):
+    """Lists the objects an assay table graph refers to but does not own, in
+    an order that only depends on the study"""
+    return list(ontology_sources) + list(samples) + list(protocols) + \
+           [p for protocol in protocols for p in protocol.parameters] + \
+           list(factors)
+
+
+class _SharedObjectPickler(pickle.Pickler):
+    """Pickles references to the shared study objects by their position.
+
+    With intern_annotations, ontology annotations are pickled as their term,
+    term source position and term accession, so that they can be taken from
+    the annotation pool of the unpickling process."""
+
+    def __init__(self, file, shared_objects, intern_annotations=False):
+        super(_SharedObjectPickler, self).__init__(
+            file, pickle.HIGHEST_PROTOCOL)
+        self._positions = dict(
+            (id(x), i) for i, x in enumerate(shared_objects))
+        self._intern_annotations = intern_annotations
+
+    def persistent_id(self, obj):
+        position = self._positions.get(id(obj))
+        if position is not None or not self._intern_annotations \
+                or type(obj) is not OntologyAnnotation \
+                or obj.id or obj.comments:
+            return position
+        term_source = None
+        if obj.term_source is not None:
+            term_source = self._positions.get(id(obj.term_source))
+            if term_source is None:
+                return None
+        return 'annotation', obj.term, term_source, obj.term_accession
+
+
+class _SharedObjectUnpickler(pickle.Unpickler):
+    """Resolves the references of _SharedObjectPickler to the shared study
+    objects of this process, and its ontology annotations to those of
+    annotation_pool"""
+
+    def __init__(self, file, shared_objects, annotation_pool=None):
+        super(_SharedObjectUnpickler, self).__init__(file)
+        self._shared_objects = shared_objects
+        self._annotation_pool = annotation_pool
+
+    def persistent_load(self, pid):
+        if isinstance(pid, tuple):
+            _, term, term_source, term_accession = pid
+            if term_source is not None:
+                term_source = self._shared_objects[term_source]
+            return self._annotation_pool.annotation(
+                term=term, term_source=term_source,
+                term_accession=term_accession)
+        return self._shared_objects[pid]
+
+
+def _create_assay_graph(tfile_path, ontology_sources, samples, protocols,
+                        factors, columnar=False, chunksize=None,
+                        annotation_pool=None):
+    factory = ProcessSequenceFactory(
+        ontology_sources=ontology_sources, study_samples=samples,
+        study_protocols=protocols, study_factors=factors, columnar=columnar,
+        annotation_pool=annotation_pool)
+    if chunksize:
+        return factory.create_from_chunks(
+            TableChunks(tfile_path, chunksize=chunksize))
+    return factory.create_from_df(read_tfile(tfile_path))
+
+
+def _load_assay_table(tfile_path, ontology_sources, samples, protocols,
+                      factors, columnar=False, chunksize=None,
+                      intern_annotations=False):
+    """Builds the graph of an assay table in a worker process.
+
+    Returns the pickled graph, with the study objects it refers to pickled as
+    references, together with what the table added to each study sample, so
+    that the parent process can merge both into its own study objects. With
+    intern_annotations, the ontology annotations of the graph are pickled so
+    as to be taken from the annotation pool of the parent process.
+    """
+    sample_lists = ('characteristics', 'factor_values', 'comments',
+                    'derives_from')
+    counts = [[len(getattr(s, x)) for x in sample_lists] for s in samples]
+    result = _create_assay_graph(tfile_path, ontology_sources, samples,
+                                 protocols, factors, columnar, chunksize)
+    sample_additions = [
+        [getattr(s, x)[n:] for x, n in zip(sample_lists, sample_counts)]
+        for s, sample_counts in zip(samples, counts)]
+    buffer = io.BytesIO()
+    _SharedObjectPickler(buffer, _shared_study_objects(
+        ontology_sources, samples, protocols, factors),
+        intern_annotations).dump((result, sample_additions))
+    return buffer.getvalue()
+
+
+def _merge_assay_table(payload, shared_objects, samples,
+                       annotation_pool=None):
+    """Unpickles a graph made by _load_assay_table onto the study objects of
+    this process and adds to the study samples what the assay table added"""
+    result, sample_additions = _SharedObjectUnpickler(
+        io.BytesIO(payload), shared_objects, annotation_pool).load()
+    for sample, (characteristics, factor_values, comments, derives_from) in \
+            zip(samples, sample_additions):
+        sample.characteristics.extend(characteristics)
+        sample.factor_values.extend(factor_values)
+        for comment in comments:
+            if comment.name not in [x.name for x in sample.comments]:
+                sample.comments.append(comment)
+        for source in derives_from:
+            if source not in sample.derives_from:
+                sample.derives_from.append(source)
+    return result
+
+
+def load(isatab_path_or_ifile, skip_load_tables=False, columnar=False,
+         chunksize=None, workers=None,
+         annotation_pool=None):  # from DF of investigation file
+    """Loads an ISA-Tab archive into an Investigation object.
+
+    columnar builds the graph of each table a column at a time rather than row
+    by row. chunksize, when set, reads the study and assay tables in batches of
+    at most that many rows instead of whole, to bound memory use on large
+    tables; the graph is then built with the columnar method.
+
+    workers, when more than 1, parses the assay tables concurrently in a pool
+    of that many processes, once the samples, protocols and factors of their
+    study are loaded. The graphs are merged back onto the study objects in
+    assay order, giving the same Investigation as a sequential load.
+
+    annotation_pool, when given, is an OntologyAnnotationPool from which the
+    ontology sources and the ontology annotations of the study and assay
+    tables are taken, so that repeated terms share a single instance. A pool
+    can be reused over several loads.
+    """
 
     def get_ontology_source(term_source_ref):
         try:
@@ -3013,6 +3693,29 @@ def load(isatab_path_or_ifile, skip_load_tables=False):  # from DF of investigat
             comments.append(comment)
         return comments
 
+    def set_assay_graph(study, assay, protocol_map, graph):
+        _, samples, other, data, processes, characteristic_categories, unit_categories = graph
+        assay.samples = sorted(list(samples.values()), key=lambda x: x.name, reverse=False)
+        assay.other_material = sorted(list(other.values()), key=lambda x:x.name, reverse=False)
+        assay.data_files = sorted(list(data.values()), key=lambda x:x.filename, reverse=False)
+        assay.process_sequence = list(processes.values())
+        assay.characteristic_categories = sorted(list(characteristic_categories.values()), key=lambda x: x.term, reverse=False)
+        assay.units = sorted(list(unit_categories.values()), key=lambda x: x.term, reverse=False)
+
+        for process in assay.process_sequence:
+            try:
+                process.executes_protocol = protocol_map[process.executes_protocol]
+            except KeyError:
+                try:
+                    unknown_protocol = protocol_map['unknown']
+                except KeyError:
+                    protocol_map['unknown'] = Protocol(
+                        name="unknown protocol",
+                        description="This protocol was auto-generated where a protocol could not be determined.")
+                    unknown_protocol = protocol_map['unknown']
+                    study.protocols.append(unknown_protocol)
+                process.executes_protocol = unknown_protocol
+
     FP = None
 
     if isinstance(isatab_path_or_ifile, str):
@@ -3025,16 +3728,26 @@ def load(isatab_path_or_ifile, skip_load_tables=False):  # from DF of investigat
     else:
         raise IOError("Cannot resolve input file")
 
+    executor = None
+    pending_assays = []
+    if workers is not None and workers > 1 and not skip_load_tables:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
     try:
         df_dict = read_investigation_file(FP)
 
         investigation = Investigation()
 
+        if annotation_pool is None:
+            new_ontology_source = OntologySource
+        else:
+            new_ontology_source = annotation_pool.source
+
         for _, row in df_dict['ontology_sources'].iterrows():
-            ontology_source = OntologySource(name=row['Term Source Name'],
-                                             file=row['Term Source File'],
-                                             version=row['Term Source Version'],
-                                             description=row['Term Source Description'])
+            ontology_source = new_ontology_source(name=row['Term Source Name'],
+                                                  file=row['Term Source File'],
+                                                  version=row['Term Source Version'],
+                                                  description=row['Term Source Description'])
             investigation.ontology_source_references.append(ontology_source)
 
         ontology_source_map = dict(map(lambda x: (x.name, x), investigation.ontology_source_references))
@@ -3102,10 +3815,16 @@ def load(isatab_path_or_ifile, skip_load_tables=False):  # from DF of investigat
             if skip_load_tables:
                 pass
             else:
-                study_tfile_df = read_tfile(os.path.join(os.path.dirname(FP.name), study.filename))
-                sources, samples, _, __, processes, characteristic_categories, unit_categories = ProcessSequenceFactory(
+                study_factory = ProcessSequenceFactory(
                     ontology_sources=investigation.ontology_source_references, study_protocols=study.protocols,
-                    study_factors=study.factors).create_from_df(study_tfile_df)
+                    study_factors=study.factors, columnar=columnar, annotation_pool=annotation_pool)
+                study_tfile_path = os.path.join(os.path.dirname(FP.name), study.filename)
+                if chunksize:
+                    sources, samples, _, __, processes, characteristic_categories, unit_categories = \
+                        study_factory.create_from_chunks(TableChunks(study_tfile_path, chunksize=chunksize))
+                else:
+                    sources, samples, _, __, processes, characteristic_categories, unit_categories = \
+                        study_factory.create_from_df(read_tfile(study_tfile_path))
                 study.sources = sorted(list(sources.values()), key=lambda x: x.name, reverse=False)
                 study.samples = sorted(list(samples.values()), key=lambda x: x.name, reverse=False)
                 study.process_sequence = list(processes.values())
@@ -3143,166 +3862,256 @@ def load(isatab_path_or_ifile, skip_load_tables=False):  # from DF of investigat
                 if skip_load_tables:
                     pass
                 else:
-                    assay_tfile_df = read_tfile(os.path.join(os.path.dirname(FP.name), assay.filename))
-                    _, samples, other, data, processes, characteristic_categories, unit_categories = ProcessSequenceFactory(
-                        ontology_sources=investigation.ontology_source_references,
-                        study_samples=study.samples,
-                        study_protocols=study.protocols,
-                        study_factors=study.factors).create_from_df(assay_tfile_df)
-                    assay.samples = sorted(list(samples.values()), key=lambda x: x.name, reverse=False)
-                    assay.other_material = sorted(list(other.values()), key=lambda x:x.name, reverse=False)
-                    assay.data_files = sorted(list(data.values()), key=lambda x:x.filename, reverse=False)
-                    assay.process_sequence = list(processes.values())
-                    assay.characteristic_categories = sorted(list(characteristic_categories.values()), key=lambda x: x.term, reverse=False)
-                    assay.units = sorted(list(unit_categories.values()), key=lambda x: x.term, reverse=False)
-
-                    for process in assay.process_sequence:
-                        try:
-                            process.executes_protocol = protocol_map[process.executes_protocol]
-                        except KeyError:
-                            try:
-                                unknown_protocol = protocol_map['unknown']
-                            except KeyError:
-                                protocol_map['unknown'] = Protocol(
-                                    name="unknown protocol",
-                                    description="This protocol was auto-generated where a protocol could not be determined.")
-                                unknown_protocol = protocol_map['unknown']
-                                study.protocols.append(unknown_protocol)
-                            process.executes_protocol = unknown_protocol
+                    assay_tfile_path = os.path.join(os.path.dirname(FP.name), assay.filename)
+                    assay_args = (investigation.ontology_source_references, study.samples, study.protocols,
+                                  study.factors, columnar, chunksize)
+                    if executor is not None:
+                        pending_assays.append((study, assay, protocol_map, _shared_study_objects(*assay_args[:4]),
+                                               executor.submit(_load_assay_table, assay_tfile_path, *assay_args,
+                                                               intern_annotations=annotation_pool is not None)))
+                    else:
+                        set_assay_graph(study, assay, protocol_map,
+                                        _create_assay_graph(assay_tfile_path, *assay_args,
+                                                            annotation_pool=annotation_pool))
 
                 study.assays.append(assay)
             investigation.studies.append(study)
+
+        for study, assay, protocol_map, shared_objects, future in pending_assays:
+            set_assay_graph(study, assay, protocol_map,
+                            _merge_assay_table(future.result(), shared_objects, study.samples,
+                                               annotation_pool))
     finally:
         FP.close()
+        if executor is not None:
+            executor.shutdown()
     return investigation
 
 
 def process_keygen(protocol_ref, column_group, object_label_index, all_columns, series, series_index, DF):
-    name_column_hits = [n for n in column_group if n in _LABELS_ASSAY_NODES]
-    if len(name_column_hits) == 1:
-        return series[name_column_hits[0]]
-
-    process_key = protocol_ref
-    node_cols = [i for i, c in enumerate(all_columns) if c in _LABELS_MATERIAL_NODES + _LABELS_DATA_NODES]
-    input_node_value = ''
-    output_node_value = ''
-    output_node_index = find_gt(node_cols, object_label_index)
-    if output_node_index > -1:
-        output_node_label = all_columns[output_node_index]
-        output_node_value = str(series[output_node_label])
-
-    input_node_index = find_lt(node_cols, object_label_index)
-    if input_node_index > -1:
-        input_node_label = all_columns[input_node_index]
-        input_node_value = str(series[input_node_label])
-
-    input_nodes_with_prot_keys = DF[[all_columns[object_label_index], all_columns[input_node_index]]].drop_duplicates()
-    output_nodes_with_prot_keys = DF[[all_columns[object_label_index], all_columns[output_node_index]]].drop_duplicates()
-
-    if len(input_nodes_with_prot_keys) > len(output_nodes_with_prot_keys):
-        node_key = output_node_value
-    else:
-        node_key = input_node_value
-
-    if process_key == protocol_ref:
-        process_key += '-' + str(series_index)
-
-    pv_cols = [c for c in column_group if c.startswith('Parameter Value[')]
-    if len(pv_cols) > 0:
-        # 2. else try use protocol REF + Parameter Values as key
-        if node_key is not None:
-            process_key = node_key + \
-                          ':' + protocol_ref + \
-                          ':' + '/'.join([str(v) for v in series[pv_cols]])
+    return ProcessKeyPlan(
+        DF, column_group, object_label_index, all_columns).key(
+        series, protocol_ref=protocol_ref)
+
+
+class ProcessKeyPlan(object):
+    """Compiled process key generation for one Protocol REF column group.
+
+    The columns a process key is made of (the name column, the input or output
+    node column, Parameter Value, Date and Performer columns) only depend on
+    the table, so they are worked out once per column group. Generating the key
+    of a row is then a lookup of a handful of its cells.
+
+    node_pair_counts, when given, are the numbers of distinct protocol and
+    input node, and protocol and output node, pairs over the whole table, for
+    plans compiled from one batch of its rows.
+    """
+
+    def __init__(self, DF, column_group, object_label_index, all_columns=None,
+                 node_pair_counts=None):
+        if all_columns is None:
+            all_columns = DF.columns
+        column_group = list(column_group)
+        self.column_group = column_group
+        self.protocol_ref_column = column_group[0]
+
+        name_column_hits = [n for n in column_group if n in _LABELS_ASSAY_NODES]
+        self.name_column = name_column_hits[0] \
+            if len(name_column_hits) == 1 else None
+
+        self.node_column = None
+        self.pv_columns = [c for c in column_group
+                           if c.startswith('Parameter Value[')]
+        date_col_hits = [c for c in column_group if c.startswith('Date')]
+        self.date_column = date_col_hits[0] if len(date_col_hits) == 1 else None
+        performer_col_hits = [c for c in column_group
+                              if c.startswith('Performer')]
+        self.performer_column = performer_col_hits[0] \
+            if len(performer_col_hits) == 1 else None
+
+        if self.name_column is not None:
+            return
+
+        node_cols = [i for i, c in enumerate(all_columns)
+                     if c in _LABELS_MATERIAL_NODES + _LABELS_DATA_NODES]
+        output_node_index = find_gt(node_cols, object_label_index)
+        input_node_index = find_lt(node_cols, object_label_index)
+
+        # the protocol and input node, and protocol and output node, columns
+        # whose number of distinct pairs decides which node keys a process
+        self.node_pair_columns = (
+            [all_columns[object_label_index], all_columns[input_node_index]],
+            [all_columns[object_label_index], all_columns[output_node_index]])
+
+        if node_pair_counts is None:
+            node_pair_counts = [len(DF[columns].drop_duplicates())
+                                for columns in self.node_pair_columns]
+
+        if node_pair_counts[0] > node_pair_counts[1]:
+            node_index = output_node_index
+        else:
+            node_index = input_node_index
+        if node_index > -1:
+            self.node_column = all_columns[node_index]
+
+    def key(self, row, protocol_ref=None):
+        """Returns the process key of a row, given as a pandas Series or any
+        mapping of column labels to cell values"""
+        if self.name_column is not None:
+            return row[self.name_column]
+
+        if protocol_ref is None:
+            protocol_ref = str(row[self.protocol_ref_column])
+
+        node_key = str(row[self.node_column]) \
+            if self.node_column is not None else ''
+
+        if len(self.pv_columns) > 0:
+            process_key = node_key + ':' + protocol_ref + ':' + '/'.join(
+                [str(row[c]) for c in self.pv_columns])
         else:
-            process_key = protocol_ref + \
-                          ':' + '/'.join([str(v) for v in series[pv_cols]])
-    else:
-        # 3. else try use input + protocol REF as key
-        # 4. else try use output + protocol REF as key
-        if node_key is not None:
             process_key = node_key + '/' + protocol_ref
 
-    date_col_hits = [c for c in column_group if c.startswith('Date')]
-    if len(date_col_hits) == 1:
-        process_key = ':'.join([process_key, series[date_col_hits[0]]])
+        if self.date_column is not None:
+            process_key = ':'.join([process_key, str(row[self.date_column])])
+
+        if self.performer_column is not None:
+            process_key = ':'.join(
+                [process_key, str(row[self.performer_column])])
 
-    performer_col_hits = [c for c in column_group if c.startswith('Performer')]
-    if len(performer_col_hits) == 1:
-        process_key = ':'.join([process_key, series[performer_col_hits[0]]])
+        return process_key
 
-    return process_key
+    def keys(self, DF):
+        """Returns the process keys of all the rows of DF at once"""
+        if self.name_column is not None:
+            return DF[self.name_column].tolist()
+
+        protocol_refs = DF[self.protocol_ref_column].astype(str)
+
+        node_keys = DF[self.node_column].astype(str) \
+            if self.node_column is not None else ''
+
+        if len(self.pv_columns) > 0:
+            pv_values = DF[self.pv_columns[0]].astype(str)
+            for pv_column in self.pv_columns[1:]:
+                pv_values = pv_values + '/' + DF[pv_column].astype(str)
+            process_keys = node_keys + ':' + protocol_refs + ':' + pv_values
+        else:
+            process_keys = node_keys + '/' + protocol_refs
 
+        if self.date_column is not None:
+            process_keys = \
+                process_keys + ':' + DF[self.date_column].astype(str)
 
-def get_value(object_column, column_group, object_series, ontology_source_map, unit_categories):
+        if self.performer_column is not None:
+            process_keys = \
+                process_keys + ':' + DF[self.performer_column].astype(str)
+
+        return process_keys.tolist()
+
+def get_value(object_column, column_group, object_series, ontology_source_map, unit_categories,
+              annotation_pool=None):
 
     cell_value = object_series[object_column]
 
     if cell_value == '':
         return cell_value, None
 
+    kind, value_columns = get_value_plan(object_column, column_group)
+
+    return resolve_value(
+        kind, [object_series[c] for c in value_columns], ontology_source_map,
+        unit_categories, annotation_pool)
+
+
+def get_value_plan(object_column, column_group):
+    """Works out how the value of a column is qualified by the columns that
+    follow it, so that it only has to be done once per column group.
+
+    Returns a tuple of the kind of value ('ontology', 'unit' or 'plain') and
+    the list of columns needed to resolve it, starting with the value column.
+    """
     column_index = list(column_group).index(object_column)
 
     try:
         offset_1r_col = column_group[column_index + 1]
         offset_2r_col = column_group[column_index + 2]
     except IndexError:
-        return cell_value, None
+        return 'plain', [object_column]
 
     if offset_1r_col.startswith('Term Source REF') and offset_2r_col.startswith('Term Accession Number'):
+        return 'ontology', [object_column, offset_1r_col, offset_2r_col]
 
-        value = OntologyAnnotation(term=str(cell_value))
+    try:
+        offset_3r_col = column_group[column_index + 3]
+    except IndexError:
+        return 'plain', [object_column]
 
-        term_source_value = object_series[offset_1r_col]
+    if offset_1r_col.startswith('Unit') and offset_2r_col.startswith('Term Source REF') \
+            and offset_3r_col.startswith('Term Accession Number'):
+        return 'unit', [object_column, offset_1r_col, offset_2r_col, offset_3r_col]
 
-        if term_source_value is not '':
+    return 'plain', [object_column]
 
-            try:
-                value.term_source = ontology_source_map[term_source_value]
-            except KeyError:
-                log.debug('term source: ', term_source_value, ' not found')
 
-        term_accession_value = object_series[offset_2r_col]
+def resolve_value(kind, cells, ontology_source_map, unit_categories,
+                  annotation_pool=None):
+    """Builds a (value, unit) pair from the cells named by get_value_plan.
 
-        if term_accession_value is not '':
-            value.term_accession = str(term_accession_value)
+    With an annotation_pool, ontology annotations are taken from the pool
+    rather than created for each cell."""
 
-        return value, None
+    cell_value = cells[0]
 
-    try:
-        offset_3r_col = column_group[column_index + 3]
-    except IndexError:
+    if cell_value == '' or kind == 'plain':
         return cell_value, None
 
-    if offset_1r_col.startswith('Unit') and offset_2r_col.startswith('Term Source REF') \
-            and offset_3r_col.startswith('Term Accession Number'):
+    if annotation_pool is None:
+        new_annotation = OntologyAnnotation
+    else:
+        new_annotation = annotation_pool.annotation
 
-        category_key = object_series[offset_1r_col]
+    if kind == 'ontology':
 
-        try:
-            unit_term_value = unit_categories[category_key]
-        except KeyError:
-            unit_term_value = OntologyAnnotation(term=category_key)
-            unit_categories[category_key] = unit_term_value
+        term_source = None
 
-            unit_term_source_value = object_series[offset_2r_col]
+        term_source_value = cells[1]
 
-            if unit_term_source_value is not '':
+        if term_source_value != '':
 
-                try:
-                    unit_term_value.term_source = ontology_source_map[unit_term_source_value]
-                except KeyError:
-                    log.debug('term source: ', unit_term_source_value, ' not found')
+            try:
+                term_source = ontology_source_map[term_source_value]
+            except KeyError:
+                log.debug('term source: ', term_source_value, ' not found')
 
-            term_accession_value = object_series[offset_3r_col]
+        value = new_annotation(
+            term=str(cell_value), term_source=term_source,
+            term_accession=str(cells[2]))
 
-            if term_accession_value is not '':
-                unit_term_value.term_accession = term_accession_value
+        return value, None
 
-        return cell_value, unit_term_value
+    category_key = cells[1]
 
-    else:
-        return cell_value, None
+    try:
+        unit_term_value = unit_categories[category_key]
+    except KeyError:
+        unit_term_source = None
+
+        unit_term_source_value = cells[2]
+
+        if unit_term_source_value != '':
+
+            try:
+                unit_term_source = ontology_source_map[unit_term_source_value]
+            except KeyError:
+                log.debug('term source: ', unit_term_source_value, ' not found')
+
+        unit_term_value = new_annotation(
+            term=category_key, term_source=unit_term_source,
+            term_accession=cells[3])
+        unit_categories[category_key] = unit_term_value
+
+    return cell_value, unit_term_value
 
 
 def pairwise(iterable):
@@ -3394,6 +4203,92 @@ def read_tfile(tfile_path, index_col=None, factor_filter=None):
         return tfile_df
 
 
+class _CommentStrippedFile(object):
+    """Read-only view of a table file that skips comment and blank lines as
+    they are read, rather than copying the file as strip_comments does"""
+
+    def __init__(self, in_fp):
+        self.name = getattr(in_fp, 'name', None)
+        self._lines = (line for line in in_fp
+                       if not line.lstrip().startswith('#')
+                       and len(line.strip()) > 0)
+        self._buffer = ''
+
+    def read(self, size=-1):
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        text = ''.join(parts)
+        if size < 0:
+            self._buffer = ''
+            return text
+        self._buffer = text[size:]
+        return text[:size]
+
+    def readline(self):
+        if self._buffer:
+            line, sep, rest = self._buffer.partition('\n')
+            if sep:
+                self._buffer = rest
+                return line + sep
+            self._buffer = ''
+            return line + next(self._lines, '')
+        return next(self._lines, '')
+
+    def __iter__(self):
+        return iter(self.readline, '')
+
+
+def load_table_chunks(fp, chunksize=10000):
+    """Yields the rows of an open study or assay table file as DataFrames of
+    at most chunksize rows, parsed like load_table, so that only one batch of
+    rows is held in memory at a time"""
+    for chunk in pd.read_csv(_CommentStrippedFile(fp), dtype=str, sep='\t',
+                             chunksize=chunksize):
+        yield chunk.replace(np.nan, '')
+
+
+class TableChunks(object):
+    """A study or assay table file read in batches of rows.
+
+    The header, the DataFrame column labels and the column groups of the
+    table are read once, up front. Iterating re-reads the file and yields
+    DataFrames of at most chunksize rows, each with the same columns and
+    isatab_header, so the column groups hold for every batch. Usage:
+
+        chunks = TableChunks('/path/to/a_assay.txt', chunksize=5000)
+        for DF in chunks:
+            ...
+    """
+
+    def __init__(self, tfile_path, chunksize=10000):
+        self.path = tfile_path
+        self.chunksize = chunksize
+        with open(tfile_path, encoding='utf-8') as tfile_fp:
+            self.isatab_header = list(next(csv.reader(
+                _CommentStrippedFile(tfile_fp), dialect='excel-tab')))
+            tfile_fp.seek(0)
+            self.columns = list(pd.read_csv(
+                _CommentStrippedFile(tfile_fp), dtype=str, sep='\t',
+                nrows=0).columns)
+
+    @property
+    def object_column_map(self):
+        return get_object_column_map(self.isatab_header, self.columns)
+
+    def __iter__(self):
+        log.debug("Opening %s", self.path)
+        with open(self.path, encoding='utf-8') as tfile_fp:
+            for chunk in load_table_chunks(tfile_fp, self.chunksize):
+                chunk.isatab_header = list(self.isatab_header)
+                yield chunk
+
+
 def get_multiple_index(file_index, key):
     return np.where(np.array(file_index) in key)[0]
 
@@ -3518,19 +4413,160 @@ def get_object_column_map(isatab_header, df_columns):
     return object_column_map
 
 
+def _get_df_object_column_map(DF):
+    try:
+        return get_object_column_map(DF.isatab_header, DF.columns)
+    except AttributeError:
+        return get_object_column_map(DF.columns, DF.columns)
+
+
+def _node_getter(sources, samples, other_material, data):
+    """Returns a function looking up a node by its column label and name"""
+    def get_node_by_label_and_key(l, k):
+        n = None
+        lk = l + ':' + k
+        if l == 'Source Name':
+            n = sources[lk]
+        if l == 'Sample Name':
+            n = samples[lk]
+        elif l in ('Extract Name', 'Labeled Extract Name'):
+            n = other_material[lk]
+        elif l.endswith('File'):
+            n = data[lk]
+        return n
+    return get_node_by_label_and_key
+
+
+def detect_table_process_pooling(DF, study_samples=None):
+    """Finds the processes of a study or assay table that have more than one
+    input edge in the graph load() builds from it, working on the table
+    alone, without building its ISA objects or graph.
+
+    A process has an input edge from each distinct input node of its rows
+    or, when it has none, from the process before it, and one from each
+    process linked to it whose only outputs are data files. study_samples
+    are the sample names of the study table when DF is an assay table, as
+    assay samples that are not in the study are left out of the graph.
+
+    Returns the process keys of the pooling processes, in table order.
+    """
+    header = getattr(DF, 'isatab_header', None)
+    if header is None:  # as read by load_table, with pandas suffixes
+        header = [re.sub(r'\.\d+$', '', x) for x in DF.columns]
+    DF = DF.copy()  # preprocess inserts missing Protocol REF columns
+    DF.isatab_header = list(header)
+    DF = preprocess(DF=DF)
+
+    columns = list(DF.columns)
+    node_cols = [
+        i for i, c in enumerate(
+            columns) if c in _LABELS_MATERIAL_NODES + _LABELS_DATA_NODES]
+    proc_cols = [
+        i for i, c in enumerate(columns) if c.startswith("Protocol REF")]
+
+    node_names = {}
+
+    def nodes(label):
+        """Names in a node column of the nodes that make it into the graph"""
+        try:
+            return node_names[label]
+        except KeyError:
+            names = set(DF[label].tolist())
+            names.discard('')
+            if label == 'Sample Name' and study_samples is not None:
+                names.intersection_update(study_samples)
+            node_names[label] = names
+            return names
+
+    protocol_refs = OrderedDict()
+    inputs = {}
+    outputs = {}  # process key: whether it outputs any material node
+    process_keys = []
+
+    for _cg, column_group in enumerate(_get_df_object_column_map(DF)):
+        object_label = column_group[0]
+        if not object_label.startswith('Protocol REF'):
+            continue
+        object_label_index = columns.index(object_label)
+        keys = ProcessKeyPlan(DF, column_group, _cg).keys(DF)
+        process_keys.append(keys)
+        for key, protocol_ref in zip(keys, DF[object_label].tolist()):
+            if key not in protocol_refs:
+                protocol_refs[key] = str(protocol_ref)
+
+        output_node_index = find_gt(node_cols, object_label_index)
+        output_proc_index = find_gt(proc_cols, object_label_index)
+
+        if output_proc_index < output_node_index > -1:
+            output_node_label = columns[output_node_index]
+            names = nodes(output_node_label)
+            for key, node_name in set(
+                    zip(keys, DF[output_node_label].tolist())):
+                if node_name in names:
+                    outputs[key] = outputs.get(key, False) or \
+                                   output_node_label in _LABELS_MATERIAL_NODES
+
+        input_node_index = find_lt(node_cols, object_label_index)
+        input_proc_index = find_lt(proc_cols, object_label_index)
+
+        if input_proc_index < input_node_index > -1:
+            input_node_label = columns[input_node_index]
+            names = nodes(input_node_label)
+            for key, node_name in set(
+                    zip(keys, DF[input_node_label].tolist())):
+                if node_name in names:
+                    inputs.setdefault(key, set()).add(
+                        (input_node_label, node_name))
+
+    # the last link made for a process is the one kept, see
+    # _create_from_chunks_columnar
+    next_process = {}
+    prev_process = {}
+    if len(process_keys) > 1:
+        key_sequences = pd.DataFrame(
+            OrderedDict((i, keys) for i, keys in enumerate(process_keys)))
+        for process_key_sequence in key_sequences.drop_duplicates(
+                keep='last').values.tolist():
+            for left, right in pairwise(process_key_sequence):
+                next_process[left] = right
+                prev_process[right] = left
+
+    in_edges = dict((key, set()) for key in protocol_refs)
+    for key in protocol_refs:
+        if key in inputs:
+            in_edges[key].update(inputs[key])
+        elif key in prev_process:
+            in_edges[key].add(prev_process[key])
+        if key in next_process and not outputs.get(key, False):
+            in_edges[next_process[key]].add(key)
+
+    pooling_keys = []
+    for key, protocol_ref in protocol_refs.items():
+        if len(in_edges[key]) > 1:
+            log.info('Possible process pooling detected on: {} {}'
+                     .format(key, protocol_ref))
+            pooling_keys.append(key)
+    return pooling_keys
+
+
 class ProcessSequenceFactory:
 
     def __init__(self, ontology_sources=None, study_samples=None,
-                 study_protocols=None, study_factors=None):
+                 study_protocols=None, study_factors=None, columnar=False,
+                 annotation_pool=None):
         self.ontology_sources = ontology_sources
         self.samples = study_samples
         self.protocols = study_protocols
         self.factors = study_factors
+        self.columnar = columnar
+        self.annotation_pool = annotation_pool
 
-    def create_from_df(self, DF):  # from DF of a table file
-
-        DF = preprocess(DF=DF)
+    def _new_annotation(self, term):
+        if self.annotation_pool is None:
+            return OntologyAnnotation(term=term)
+        return self.annotation_pool.annotation(term=term)
 
+    def _get_maps(self):
         if self.ontology_sources is not None:
             ontology_source_map = dict(
                 map(lambda x: (x.name, x), self.ontology_sources))
@@ -3542,31 +4578,36 @@ class ProcessSequenceFactory:
                 map(lambda x: (x.name, x), self.protocols))
         else:
             protocol_map = {}
+        return ontology_source_map, protocol_map
 
-        sources = {}
-        other_material = {}
-        data = {}
-        processes = {}
-        characteristic_categories = {}
-        unit_categories = {}
+    def _create_nodes(self, DF, nodes=None):
+        """Creates the Source, Sample, Material and DataFile nodes keyed by
+        '<column label>:<name>', from the unique values of each node column.
+
+        nodes are the (sources, samples, other_material, data,
+        characteristic_categories) maps made from earlier batches of rows of
+        the same table, which are added to rather than replaced"""
+        if nodes is None:
+            nodes = {}, {}, {}, {}, {}
+        sources, samples, other_material, data, characteristic_categories = \
+            nodes
 
         try:
-            sources = dict(map(lambda x: ('Source Name:' + x, Source(name=x)),
-                           [x for x in DF['Source Name'].drop_duplicates()
-                            if x != '']))
+            for x in DF['Source Name'].drop_duplicates():
+                if x != '' and 'Source Name:' + x not in sources:
+                    sources['Source Name:' + x] = Source(name=x)
         except KeyError:
             pass
 
-        samples = {}
         try:
+            sample_names = [str(x) for x in DF['Sample Name'].drop_duplicates()
+                            if x != '']
             if self.samples is not None:
                 sample_map = dict(
                     map(lambda x: ('Sample Name:' + x.name, x), self.samples))
-                sample_keys = list(
-                    map(lambda x: 'Sample Name:' + x,
-                        [str(x) for x in DF['Sample Name'].drop_duplicates()
-                         if x != '']))
-                for k in sample_keys:
+                for k in map(lambda x: 'Sample Name:' + x, sample_names):
+                    if k in samples:
+                        continue
                     try:
                         samples[k] = sample_map[k]
                     except KeyError:
@@ -3574,20 +4615,17 @@ class ProcessSequenceFactory:
                             'warning! Did not find sample referenced at assay '
                             'level in study samples')
             else:
-                samples = dict(
-                    map(lambda x: ('Sample Name:' + x, Sample(name=x)),
-                        [str(x) for x in DF['Sample Name'].drop_duplicates()
-                         if x != '']))
+                for x in sample_names:
+                    if 'Sample Name:' + x not in samples:
+                        samples['Sample Name:' + x] = Sample(name=x)
         except KeyError:
             pass
 
         try:
-            extracts = dict(
-                map(lambda x: ('Extract Name:' + x, Material(
-                    name=x, type_='Extract Name')),
-                    [x for x in DF['Extract Name'].drop_duplicates() if
-                     x != '']))
-            other_material.update(extracts)
+            for x in DF['Extract Name'].drop_duplicates():
+                if x != '' and 'Extract Name:' + x not in other_material:
+                    other_material['Extract Name:' + x] = Material(
+                        name=x, type_='Extract Name')
         except KeyError:
             pass
 
@@ -3596,18 +4634,19 @@ class ProcessSequenceFactory:
                 try:
                     category = characteristic_categories['Label']
                 except KeyError:
-                    category = OntologyAnnotation(term='Label')
+                    category = self._new_annotation('Label')
                     characteristic_categories['Label'] = category
                 for _, lextract_name in DF[
                     'Labeled Extract Name'].drop_duplicates().iteritems():
-                    if lextract_name != '':
+                    if lextract_name != '' and 'Labeled Extract Name:' + \
+                            lextract_name not in other_material:
                         lextract = Material(
                             name=lextract_name, type_='Labeled Extract Name')
                         lextract.characteristics = [
                             Characteristic(
                                 category=category,
-                                value=OntologyAnnotation(
-                                    term=DF.loc[_, 'Label'])
+                                value=self._new_annotation(
+                                    DF.loc[_, 'Label'])
                             )
                         ]
                         other_material[
@@ -3616,11 +4655,26 @@ class ProcessSequenceFactory:
             pass
 
         for data_col in [x for x in DF.columns if x.endswith(" File")]:
-            filenames = [x for x in DF[data_col].drop_duplicates() if x != '']
-            data.update(
-                dict(map(lambda x: (':'.join([data_col, x]),
-                                    DataFile(filename=x, label=data_col)),
-                         filenames)))
+            for x in DF[data_col].drop_duplicates():
+                if x != '' and ':'.join([data_col, x]) not in data:
+                    data[':'.join([data_col, x])] = DataFile(
+                        filename=x, label=data_col)
+        return sources, samples, other_material, data, \
+               characteristic_categories
+
+    def create_from_df(self, DF):  # from DF of a table file
+
+        if self.columnar:
+            return self._create_from_df_columnar(DF)
+
+        DF = preprocess(DF=DF)
+
+        ontology_source_map, protocol_map = self._get_maps()
+
+        sources, samples, other_material, data, characteristic_categories = \
+            self._create_nodes(DF)
+        processes = {}
+        unit_categories = {}
 
         node_cols = [
             i for i, c in enumerate(
@@ -3629,25 +4683,12 @@ class ProcessSequenceFactory:
             i for i, c in enumerate(
                 DF.columns) if c.startswith("Protocol REF")]
 
-        try:
-            object_column_map = get_object_column_map(
-                DF.isatab_header, DF.columns)
-        except AttributeError:
-            object_column_map = get_object_column_map(
-                DF.columns, DF.columns)
-
-        def get_node_by_label_and_key(l, k):
-            n = None
-            lk = l + ':' + k
-            if l == 'Source Name':
-                n = sources[lk]
-            if l == 'Sample Name':
-                n = samples[lk]
-            elif l in ('Extract Name', 'Labeled Extract Name'):
-                n = other_material[lk]
-            elif l.endswith('File'):
-                n = data[lk]
-            return n
+        object_column_map = _get_df_object_column_map(DF)
+
+        get_node_by_label_and_key = _node_getter(
+            sources, samples, other_material, data)
+
+        key_plans = {}
 
         for _cg, column_group in enumerate(object_column_map):
             # for each object, parse column group
@@ -3698,7 +4739,7 @@ class ProcessSequenceFactory:
                                 category = characteristic_categories[
                                     category_key]
                             except KeyError:
-                                category = OntologyAnnotation(term=category_key)
+                                category = self._new_annotation(category_key)
                                 characteristic_categories[
                                     category_key] = category
 
@@ -3706,7 +4747,8 @@ class ProcessSequenceFactory:
 
                             v, u = get_value(
                                 charac_column, column_group, object_series,
-                                ontology_source_map, unit_categories)
+                                ontology_source_map, unit_categories,
+                                self.annotation_pool)
 
                             characteristic.value = v
                             characteristic.unit = u
@@ -3736,7 +4778,8 @@ class ProcessSequenceFactory:
 
                                 v, u = get_value(
                                     fv_column, column_group, object_series, 
-                                    ontology_source_map, unit_categories)
+                                    ontology_source_map, unit_categories,
+                                    self.annotation_pool)
 
                                 fv.value = v
                                 fv.unit = u
@@ -3781,6 +4824,9 @@ class ProcessSequenceFactory:
 
             elif object_label.startswith('Protocol REF'):
                 object_label_index = list(DF.columns).index(object_label)
+                # compiled once per column group, reused when linking
+                key_plan = key_plans[_cg] = ProcessKeyPlan(
+                    DF, column_group, _cg)
                 if config.show_pbars:
                     pbar = ProgressBar(
                         min_value=0, max_value=len(DF.index), 
@@ -3795,11 +4841,8 @@ class ProcessSequenceFactory:
                     # if _ == 0:
                     #     print('processing: ', object_series[object_label])
                     protocol_ref = str(object_series[object_label])
-                    process_key = process_keygen(
-                        protocol_ref, column_group, _cg, DF.columns, 
-                        object_series, _, DF)
-
-                    # TODO: Keep process key sequence here to reduce number of passes on Protocol REF columns?
+                    process_key = key_plan.key(
+                        object_series, protocol_ref=protocol_ref)
 
                     try:
                         process = processes[process_key]
@@ -3890,7 +4933,8 @@ class ProcessSequenceFactory:
                             parameter_value = ParameterValue(category=category)
                             v, u = get_value(
                                 pv_column, column_group, object_series,
-                                ontology_source_map, unit_categories)
+                                ontology_source_map, unit_categories,
+                                self.annotation_pool)
 
                             parameter_value.value = v
                             parameter_value.unit = u
@@ -3945,9 +4989,8 @@ class ProcessSequenceFactory:
 
                 if object_label.startswith('Protocol REF'):
                     protocol_ref = str(object_series[object_label])
-                    process_key = process_keygen(
-                        protocol_ref, column_group, _cg, DF.columns,
-                        object_series, _, DF)
+                    process_key = key_plans[_cg].key(
+                        object_series, protocol_ref=protocol_ref)
                     process_key_sequence.append(process_key)
 
                 if object_label.endswith(' File'):
@@ -3974,6 +5017,401 @@ class ProcessSequenceFactory:
                characteristic_categories, unit_categories
 
 
+    def create_from_chunks(self, chunks):
+        """Builds the same Sources/Samples/Processes graph as create_from_df
+        from a table read in batches of rows, such as TableChunks, holding
+        one batch in memory at a time.
+
+        When a Protocol REF column group has no name column, its process keys
+        depend on the distinct node pairs of the whole table, which takes a
+        first pass over the batches, so chunks must then be iterable more than
+        once.
+        """
+        return self._create_from_chunks_columnar(
+            chunks, key_plans=self._get_chunk_key_plans(chunks))
+
+    @staticmethod
+    def _get_chunk_key_plans(chunks):
+        """Compiles the ProcessKeyPlan of each Protocol REF column group of a
+        table read in batches, counting the distinct node pairs of the groups
+        without a name column over all the batches"""
+        key_plans = {}
+        node_pairs = {}
+        columns = None
+        for DF in chunks:
+            DF = preprocess(DF=DF)
+            if columns is None:
+                columns = list(DF.columns)
+                for _cg, column_group in enumerate(
+                        _get_df_object_column_map(DF)):
+                    if column_group[0].startswith('Protocol REF'):
+                        key_plans[_cg] = ProcessKeyPlan(
+                            DF, column_group, _cg, node_pair_counts=(0, 0))
+                        if key_plans[_cg].name_column is None:
+                            node_pairs[_cg] = (set(), set())
+                if len(node_pairs) == 0:
+                    break  # no process key depends on the whole table
+            for _cg, pairs in node_pairs.items():
+                for pair_set, pair_columns in zip(
+                        pairs, key_plans[_cg].node_pair_columns):
+                    pair_set.update(
+                        zip(*[DF[c].tolist() for c in pair_columns]))
+
+        for _cg, pairs in node_pairs.items():
+            key_plans[_cg] = ProcessKeyPlan(
+                None, key_plans[_cg].column_group, _cg, all_columns=columns,
+                node_pair_counts=[len(x) for x in pairs])
+        return key_plans
+
+    def _create_from_df_columnar(self, DF):
+        """Builds the same Sources/Samples/Processes graph as create_from_df,
+        but works through each column group a column at a time instead of
+        building a pandas Series for every row.
+
+        Material and data nodes are annotated from the distinct rows of their
+        column group, process keys are generated for a whole Protocol REF
+        column at once and the linking pass only visits distinct combinations
+        of node names and process keys.
+        """
+        return self._create_from_chunks_columnar([DF])
+
+    def _create_from_chunks_columnar(self, chunks, key_plans=None):
+        """Runs the column at a time build of _create_from_df_columnar over
+        each batch of rows of a table in turn, keeping the nodes, processes
+        and the distinct rows already seen from one batch to the next.
+
+        key_plans are the ProcessKeyPlans of the whole table by column group
+        index, compiled from each batch when not given.
+        """
+        ontology_source_map, protocol_map = self._get_maps()
+
+        nodes = {}, {}, {}, {}, {}
+        sources, samples, other_material, data, characteristic_categories = \
+            nodes
+        processes = {}
+        unit_categories = {}
+
+        get_node_by_label_and_key = _node_getter(
+            sources, samples, other_material, data)
+
+        def value_plans(column_group, prefix):
+            plans = []
+            for column in [c for c in column_group if c.startswith(prefix)]:
+                kind, value_columns = get_value_plan(column, column_group)
+                plans.append((column, kind, [column_group.index(c)
+                                             for c in value_columns]))
+            return plans
+
+        def add_comments(obj, comment_columns, row):
+            for name, i in comment_columns:
+                if name not in [x.name for x in obj.comments]:
+                    obj.comments.append(Comment(name=name, value=str(row[i])))
+
+        def distinct(DF, columns, seen):
+            """Distinct rows of DF[columns] not in an earlier batch"""
+            for row in DF[columns].drop_duplicates().values:
+                row_key = tuple(row)
+                if row_key not in seen:
+                    seen.add(row_key)
+                    yield row
+
+        seen_rows = {}
+        seen_link_rows = set()
+        group_process_keys = OrderedDict()
+        columns = []
+
+        for DF in chunks:
+            DF = preprocess(DF=DF)
+
+            self._create_nodes(DF, nodes)
+
+            columns = list(DF.columns)
+            node_cols = [
+                i for i, c in enumerate(
+                    columns) if c in _LABELS_MATERIAL_NODES + _LABELS_DATA_NODES]
+            proc_cols = [
+                i for i, c in enumerate(columns) if c.startswith("Protocol REF")]
+
+            object_column_map = _get_df_object_column_map(DF)
+
+            process_keys = []
+
+            for _cg, column_group in enumerate(object_column_map):
+                column_group = list(column_group)
+                object_label = column_group[0]
+                comment_columns = [(c[8:-1], i) for i, c in
+                                   enumerate(column_group)
+                                   if c.startswith('Comment[')]
+
+                if object_label in _LABELS_MATERIAL_NODES:
+
+                    if object_label == "Source Name":
+                        material_map = sources
+                    elif object_label == "Sample Name":
+                        material_map = samples
+                    else:
+                        material_map = other_material
+
+                    charac_plans = value_plans(column_group, 'Characteristics[')
+                    fv_plans = value_plans(column_group, 'Factor Value[')
+
+                    factor_map = {}
+                    if self.factors is not None:
+                        for fv_column, _, __ in fv_plans:
+                            factor_hits = [f for f in self.factors
+                                           if f.name == fv_column[13:-1]]
+                            if len(factor_hits) == 1:
+                                factor_map[fv_column] = factor_hits[0]
+
+                    for row in distinct(DF, column_group,
+                                        seen_rows.setdefault(_cg, set())):
+                        material = material_map.get(
+                            ":".join([object_label, str(row[0])]))
+
+                        if material is None:
+                            continue  # skip if object not found
+
+                        for charac_column, kind, positions in charac_plans:
+                            category_key = charac_column[16:-1]
+
+                            try:
+                                category = characteristic_categories[
+                                    category_key]
+                            except KeyError:
+                                category = self._new_annotation(category_key)
+                                characteristic_categories[
+                                    category_key] = category
+
+                            characteristic = Characteristic(category=category)
+                            v, u = resolve_value(
+                                kind, [row[p] for p in positions],
+                                ontology_source_map, unit_categories,
+                                self.annotation_pool)
+                            characteristic.value = v
+                            characteristic.unit = u
+                            material.characteristics.append(characteristic)
+
+                        if isinstance(material, Sample) and \
+                                self.factors is not None:
+
+                            for fv_column, kind, positions in fv_plans:
+                                try:
+                                    factor = factor_map[fv_column]
+                                except KeyError:
+                                    raise ValueError(
+                                        'Could not resolve Study Factor from '
+                                        'Factor Value ', fv_column[13:-1])
+
+                                fv = FactorValue(factor_name=factor)
+                                v, u = resolve_value(
+                                    kind, [row[p] for p in positions],
+                                    ontology_source_map, unit_categories,
+                                    self.annotation_pool)
+                                fv.value = v
+                                fv.unit = u
+                                material.factor_values.append(fv)
+
+                        add_comments(material, comment_columns, row)
+
+                elif object_label in _LABELS_DATA_NODES:
+
+                    for row in distinct(DF, column_group,
+                                        seen_rows.setdefault(_cg, set())):
+                        try:
+                            data_file = get_node_by_label_and_key(
+                                object_label, str(row[0]))
+                            add_comments(data_file, comment_columns, row)
+                        except KeyError:
+                            pass  # skip if object not found
+
+                elif object_label.startswith('Protocol REF'):
+                    object_label_index = columns.index(object_label)
+                    key_plan = key_plans[_cg] if key_plans is not None else \
+                        ProcessKeyPlan(DF, column_group, _cg)
+                    keys = key_plan.keys(DF)
+                    process_keys.append(keys)
+                    protocol_refs = [str(x) for x in DF[object_label].tolist()]
+                    group_values = DF[column_group].values
+
+                    first_rows = OrderedDict()
+                    last_rows = OrderedDict()
+                    for i, key in enumerate(keys):
+                        first_rows.setdefault(key, i)
+                        last_rows[key] = i
+                    group_process_keys.setdefault(
+                        _cg, OrderedDict()).update(first_rows)
+
+                    pv_plans = value_plans(column_group, 'Parameter Value[')
+
+                    for key, i in first_rows.items():
+                        protocol_ref = protocol_refs[i]
+                        try:
+                            process = processes[key]
+                        except KeyError:
+                            process = Process(executes_protocol=protocol_ref)
+                            processes[key] = process
+
+                        row = group_values[i]
+
+                        for pv_column, kind, positions in pv_plans:
+                            category_key = pv_column[16:-1]
+
+                            if category_key in [
+                                x.category.parameter_name.term
+                                    for x in process.parameter_values]:
+                                continue
+
+                            try:
+                                protocol = protocol_map[protocol_ref]
+                            except KeyError:
+                                raise ValueError(
+                                    'Could not find protocol matching ',
+                                    protocol_ref)
+
+                            param_hits = [
+                                p for p in protocol.parameters
+                                if p.parameter_name.term == category_key]
+
+                            if len(param_hits) == 1:
+                                category = param_hits[0]
+                            else:
+                                raise ValueError(
+                                    'Could not resolve Protocol parameter '
+                                    'from Parameter Value ', category_key)
+
+                            parameter_value = ParameterValue(category=category)
+                            v, u = resolve_value(
+                                kind, [row[p] for p in positions],
+                                ontology_source_map, unit_categories,
+                                self.annotation_pool)
+                            parameter_value.value = v
+                            parameter_value.unit = u
+                            process.parameter_values.append(parameter_value)
+
+                        add_comments(process, comment_columns, row)
+
+                    name_column_hits = [n for n in column_group
+                                        if n in _LABELS_ASSAY_NODES]
+
+                    if len(name_column_hits) == 1:
+                        name_values = DF[name_column_hits[0]].values
+                        for key, i in last_rows.items():
+                            processes[key].name = str(name_values[i])
+
+                    output_node_index = find_gt(node_cols, object_label_index)
+                    output_proc_index = find_gt(proc_cols, object_label_index)
+
+                    if output_proc_index < output_node_index > -1:
+                        output_node_label = columns[output_node_index]
+                        for key, node_key in OrderedDict.fromkeys(
+                                zip(keys, DF[output_node_label].tolist())):
+                            try:
+                                output_node = get_node_by_label_and_key(
+                                    output_node_label, str(node_key))
+                            except KeyError:
+                                continue  # skip if object not found
+                            process = processes[key]
+                            if output_node is not None and \
+                                    output_node not in process.outputs:
+                                process.outputs.append(output_node)
+
+                    input_node_index = find_lt(node_cols, object_label_index)
+                    input_proc_index = find_lt(proc_cols, object_label_index)
+
+                    if input_proc_index < input_node_index > -1:
+                        input_node_label = columns[input_node_index]
+                        for key, node_key in OrderedDict.fromkeys(
+                                zip(keys, DF[input_node_label].tolist())):
+                            try:
+                                input_node = get_node_by_label_and_key(
+                                    input_node_label, str(node_key))
+                            except KeyError:
+                                continue  # skip if object not found
+                            process = processes[key]
+                            if input_node is not None and \
+                                    input_node not in process.inputs:
+                                process.inputs.append(input_node)
+
+            # link nodes on the distinct rows of the node name columns, in
+            # order of first appearance, as appending is idempotent
+            link_labels = [
+                cg[0] for cg in object_column_map if cg[0].startswith(
+                    'Source Name') or cg[0].startswith('Sample Name') or
+                cg[0].endswith(' File')]
+
+            link_rows = distinct(DF, link_labels, seen_link_rows) \
+                if len(link_labels) > 0 else []
+
+            for row in link_rows:
+                source_node_context = None
+                sample_node_context = None
+                for object_label, node_key in zip(link_labels, row):
+                    node_key = str(node_key)
+
+                    if object_label.startswith('Source Name'):
+                        try:
+                            source_node_context = get_node_by_label_and_key(
+                                object_label, node_key)
+                        except KeyError:
+                            pass  # skip if object not found
+
+                    if object_label.startswith('Sample Name'):
+                        try:
+                            sample_node_context = get_node_by_label_and_key(
+                                object_label, node_key)
+                        except KeyError:
+                            pass  # skip if object not found
+                        if source_node_context is not None:
+                            if source_node_context not in \
+                                    sample_node_context.derives_from:
+                                sample_node_context.derives_from.append(
+                                    source_node_context)
+
+                    if object_label.endswith(' File'):
+                        data_node = None
+                        try:
+                            data_node = get_node_by_label_and_key(
+                                object_label, node_key)
+                        except KeyError:
+                            pass  # skip if object not found
+                        if sample_node_context is not None and \
+                                data_node is not None:
+                            if sample_node_context not in \
+                                    data_node.generated_from:
+                                data_node.generated_from.append(
+                                    sample_node_context)
+
+            # link processes on the distinct process key sequences, in order
+            # of last appearance, as the last link made for a process is the
+            # one kept; later batches are linked after earlier ones
+            if len(process_keys) > 1:
+                key_sequences = pd.DataFrame(
+                    OrderedDict((i, keys) for i, keys in
+                                enumerate(process_keys)))
+                for process_key_sequence in key_sequences.drop_duplicates(
+                        keep='last').values.tolist():
+                    for pair in pairwise(process_key_sequence):
+                        plink(processes[pair[0]], processes[pair[1]])
+
+        # put the nodes and processes in the order a single pass over the
+        # whole table makes them, column by column rather than batch by batch
+        label_order = dict((c, i) for i, c in enumerate(columns))
+        other_material = dict(sorted(
+            other_material.items(),
+            key=lambda x: x[0].startswith('Labeled Extract Name:')))
+        data = dict(sorted(
+            data.items(), key=lambda x: label_order.get(
+                x[1].label, len(label_order))))
+        ordered_processes = {}
+        for keys in group_process_keys.values():
+            for key in keys:
+                if key not in ordered_processes:
+                    ordered_processes[key] = processes[key]
+
+        return sources, samples, other_material, data, ordered_processes, \
+               characteristic_categories, unit_categories
+
+
 def find_in_between(a, x, y):
     result = []
     while True:
@@ -4,6 +4,13 @@ This module implements the ISA Abstract Model 1.0 as Python classes, as
 specified in the `ISA Model and Serialization Specifications 1.0`_, and
 additional classes to support compatibility between ISA-Tab and ISA-JSON.
 
+Lists of processes, materials, process inputs and outputs, characteristics,
+factor values and comments passed to the constructors are copied, as the
+setters of those attributes always did, so that cached study and assay graphs
+and lookups can tell when they change. Change them in place through the
+attributes, e.g. ``study.process_sequence.append(process)``, rather than
+through the list that was passed in.
+
 Todo:
     * Check consistency with published ISA Model
     * Finish docstringing rest of the module
@@ -15,15 +22,457 @@ Todo:
 from __future__ import absolute_import
 import abc
 import networkx as nx
+import threading
 import warnings
+from collections import OrderedDict
 
 from isatools.errors import ISAModelAttributeError
 
 
-def _build_assay_graph(process_sequence=list()):
-    """:obj:`networkx.DiGraph` Returns a directed graph object based on a
-    given ISA process sequence."""
-    g = nx.DiGraph()
+class _CacheScope(object):
+    """The scope of the caches of studies and assays, i.e. their graphs and
+    the indexes of their lookups, shared by all the model objects those caches
+    can be built from.
+
+    A study or assay puts itself and every model object it references in a
+    new scope when it first builds a cache, and setters and lists put the
+    model objects they are given in the scope of their owner. When that brings
+    two scopes together, one becomes the parent of the other and the root of
+    the two is the scope of all their objects, so a scope ends up covering the
+    objects connected to each other, e.g. one investigation.
+
+    The generations are tokens replaced on changes to what the caches are
+    built from, i.e. the graph generation on any change to a process sequence,
+    process inputs, outputs and links, and everything the nodes are hashed on,
+    the name generation on changes to the names of materials, protocols and
+    study factors, and the value generation on changes to the keys of
+    characteristics and factor values. changed_materials, kept once a
+    characteristic or factor value index is built, logs the materials whose
+    characteristics or factor values were added to, for those indexes to
+    catch up with."""
+    __slots__ = ('parent', 'graph_generation', 'name_generation',
+                 'value_generation', 'changed_materials')
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.graph_generation = object()
+        self.name_generation = object()
+        self.value_generation = object()
+        self.changed_materials = None
+
+    def __reduce__(self):
+        # copies start with new generations, so the caches copied with them
+        # are rebuilt
+        return _CacheScope, (self.parent,)
+
+
+# guards the merging of scopes and the replacing of their generations
+_scope_lock = threading.RLock()
+
+# how many changed materials a scope logs before its characteristic and
+# factor value indexes are rebuilt instead
+_MAX_CHANGED_MATERIALS = 65536
+
+# the attribute names of the slots of each model class, and whether it has a
+# __dict__
+_slot_names_by_class = {}
+
+
+def _root(scope):
+    """Returns the root of a scope"""
+    while scope.parent is not None:
+        if scope.parent.parent is not None:
+            scope.parent = scope.parent.parent
+        scope = scope.parent
+    return scope
+
+
+def _slot_names(cls):
+    # the attribute names of the slots of cls, and whether it keeps its
+    # attributes in a __dict__ rather than in slots; a __dict__ declared in
+    # the slots, e.g. of Sample, only holds ad hoc attributes, and is not
+    # looked into since getting it creates it
+    try:
+        return _slot_names_by_class[cls]
+    except KeyError:
+        names = []
+        slotted_dict = False
+        for klass in cls.__mro__:
+            for name in klass.__dict__.get('__slots__', ()):
+                if name == '__dict__':
+                    slotted_dict = True
+                if name in ('_scope', '__dict__', '__weakref__'):
+                    continue
+                if name.startswith('__'):
+                    name = '_{0}{1}'.format(klass.__name__.lstrip('_'), name)
+                names.append(name)
+        _slot_names_by_class[cls] = \
+            names, cls.__dictoffset__ != 0 and not slotted_dict
+        return _slot_names_by_class[cls]
+
+
+def _model_objects(value, found):
+    """Appends to found the model objects in value, looking into lists,
+    tuples and dicts"""
+    if getattr(type(value), '_scope', None) is not None:
+        found.append(value)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _model_objects(item, found)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _model_objects(item, found)
+
+
+def _adopt(scope, objects):
+    """Puts the model objects given, and those they reference, in scope,
+    merging in the scopes of those already in one, and returns the root of
+    the resulting scope"""
+    with _scope_lock:
+        root = _root(scope)
+        stack = list(objects)
+        while stack:
+            obj = stack.pop()
+            if obj._scope is None:
+                obj._scope = root
+                names, has_dict = _slot_names(type(obj))
+                values = [getattr(obj, name, None) for name in names]
+                if has_dict:
+                    values.extend(obj.__dict__.values())
+                for value in values:
+                    if value is not None and not isinstance(value, str):
+                        _model_objects(value, stack)
+            elif obj._scope is not root:
+                other = _root(obj._scope)
+                if other is not root:
+                    other.parent = root
+        return root
+
+
+def _scope_root(obj):
+    """Returns the root of the scope of obj, putting it in a new scope if it
+    is in none"""
+    if obj._scope is None:
+        with _scope_lock:
+            if obj._scope is None:
+                _adopt(_CacheScope(), [obj])
+    return _root(obj._scope)
+
+
+def _attach(owner, values):
+    """Puts the model objects in values, which owner now references, in the
+    scope of owner, if it is in one"""
+    scope = getattr(owner, '_scope', None)
+    if scope is not None:
+        found = []
+        _model_objects(values, found)
+        if found:
+            _adopt(scope, found)
+
+
+def _changed(obj, values=(), names=False, key_values=False,
+             added_values=False):
+    """Marks the caches of the scope of obj as out of date after a change to
+    obj, which now references the model objects in values. names and
+    key_values tell that the name of obj, or the keys of a characteristic or
+    factor value, changed, and added_values that obj is a material whose
+    characteristics or factor values were added to, which is logged for the
+    indexes of the scope to add it under its new keys."""
+    scope = getattr(obj, '_scope', None)
+    if scope is None:
+        return
+    found = []
+    _model_objects(values, found)
+    with _scope_lock:
+        root = _adopt(scope, found)
+        root.graph_generation = object()
+        if names:
+            root.name_generation = object()
+        if key_values or added_values and root.changed_materials is not None \
+                and len(root.changed_materials) >= _MAX_CHANGED_MATERIALS:
+            root.value_generation = object()
+            root.changed_materials = None
+        elif added_values and root.changed_materials is not None:
+            root.changed_materials.append(obj)
+
+
+class _GraphList(list):
+    """A list of the model objects referenced by its owner, e.g. the inputs
+    of a process, that marks the caches of the owner's scope as out of date
+    when it is changed in place"""
+    __slots__ = ('owner',)
+
+    def __init__(self, owner, items=()):
+        super(_GraphList, self).__init__(items)
+        self.owner = owner
+
+    def __reduce__(self):
+        return type(self), (self.owner, list(self))
+
+    def _added(self, items):
+        # called with the items just put in the list
+        _changed(self.owner, items)
+
+    def append(self, item):
+        list.append(self, item)
+        self._added([item])
+
+    def extend(self, items):
+        items = list(items)
+        list.extend(self, items)
+        self._added(items)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def insert(self, index, item):
+        list.insert(self, index, item)
+        self._added([item])
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            value = list(value)
+            list.__setitem__(self, key, value)
+            self._added(value)
+        else:
+            list.__setitem__(self, key, value)
+            self._added([value])
+
+
+def _graph_list_method(method):
+    def changed(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        _changed(self.owner)
+        return result
+    changed.__name__ = method.__name__
+    changed.__doc__ = method.__doc__
+    return changed
+
+
+for _method_name in ('remove', 'pop', 'clear', 'sort', 'reverse',
+                     '__delitem__', '__imul__'):
+    setattr(_GraphList, _method_name,
+            _graph_list_method(getattr(list, _method_name)))
+
+
+class _ValueList(_GraphList):
+    """A _GraphList of the characteristics or factor values of a material,
+    its owner, which also logs the material when they are added to"""
+    __slots__ = ()
+
+    def _added(self, items):
+        _changed(self.owner, items, added_values=True)
+
+
+def _value_key(value):
+    return value.term if isinstance(value, OntologyAnnotation) else value
+
+
+def _characteristic_key(characteristic):
+    return (getattr(characteristic.category, 'term', None),
+            _value_key(characteristic.value))
+
+
+def _factor_value_key(factor_value):
+    return (getattr(factor_value.factor_name, 'name', None),
+            _value_key(factor_value.value))
+
+
+def _characteristic_keys(item):
+    return [_characteristic_key(x) for x in item.characteristics]
+
+
+def _factor_value_keys(item):
+    return [_factor_value_key(x) for x in item.factor_values]
+
+
+# the keys of each kind of index of an _IndexedList, the generation of its
+# scope it is built at, and whether it catches up with the changed materials
+# of its scope
+_INDEX_KINDS = {
+    'name': (lambda x: [x.name], 'name_generation', False),
+    'characteristics': (_characteristic_keys, 'value_generation', True),
+    'factor_values': (_factor_value_keys, 'value_generation', True),
+}
+
+
+def _add_to_index(index, keys, item):
+    for key in OrderedDict.fromkeys(keys):
+        index.setdefault(key, []).append(item)
+
+
+def _build_index(items, kind):
+    keys = _INDEX_KINDS[kind][0]
+    index = {}
+    for item in items:
+        _add_to_index(index, keys(item), item)
+    return index
+
+
+def _lookup(items, kind, key):
+    """Returns the items with the given key, using the index of an
+    _IndexedList and building one for any other list"""
+    if isinstance(items, _IndexedList):
+        index = items.index_by(kind)
+    else:
+        index = _build_index(items, kind)
+    return index.get(key, [])
+
+
+def _lookup_by_characteristic(items, characteristic):
+    if not isinstance(characteristic, Characteristic):
+        return []
+    return [x for x in _lookup(items, 'characteristics',
+                               _characteristic_key(characteristic))
+            if characteristic in x.characteristics]
+
+
+def _lookup_by_factor_value(items, factor_value):
+    if not isinstance(factor_value, FactorValue):
+        return []
+    return [x for x in _lookup(items, 'factor_values',
+                               _factor_value_key(factor_value))
+            if factor_value in x.factor_values]
+
+
+def _insert_in_order(items, item, position, positions):
+    """Inserts item, at the given position in its list, into items kept in
+    list order, unless it is there already"""
+    low, high = 0, len(items)
+    while low < high:
+        middle = (low + high) // 2
+        if positions[id(items[middle])] < position:
+            low = middle + 1
+        else:
+            high = middle
+    if low == len(items) or items[low] is not item:
+        items.insert(low, item)
+
+
+class _IndexedList(list):
+    """A list of materials, protocols or study factors of a study or assay,
+    its owner, that keeps the indexes behind the lookups of studies and
+    assays, e.g. get_sample and get_prot.
+
+    An index maps the keys of a kind, i.e. names, characteristics or factor
+    values, to the items that have them, in list order. It is built on first
+    use and kept up to date on append and extend, while other in-place changes
+    drop it. Changes to names and to the keys of characteristics and factor
+    values replace the name and value generations of the owner's scope, and
+    make the indexes be rebuilt. Materials whose characteristics or factor
+    values were added to are instead added under their new keys from the
+    changed materials of the scope. Characteristics and factor values are
+    keyed on their category or factor name and value, and keys an item no
+    longer has are left in the index, so the items found must still be
+    checked against the one looked up."""
+
+    def __init__(self, owner, items=()):
+        super(_IndexedList, self).__init__(items)
+        self.owner = owner
+        _attach(owner, self)
+
+    def index_by(self, kind):
+        """Returns the index of the given kind, a dict from key to items"""
+        keys, generation_name, follows_changes = _INDEX_KINDS[kind]
+        root = _scope_root(self.owner)
+        generation = getattr(root, generation_name)
+        log = None
+        if follows_changes:
+            log = root.changed_materials
+            if log is None:
+                with _scope_lock:
+                    if root.changed_materials is None:
+                        root.changed_materials = []
+                    log = root.changed_materials
+        indexes = self.__dict__.setdefault('_indexes', {})
+        entry = indexes.get(kind)
+        if entry is None or entry[0] is not generation or entry[2] is not log:
+            logged = len(log) if log is not None else 0
+            entry = indexes[kind] = [generation, _build_index(self, kind), log,
+                                     logged]
+        elif follows_changes and entry[3] < len(log):
+            logged = len(log)
+            index = entry[1]
+            positions = self.__positions()
+            for item in log[entry[3]:logged]:
+                position = positions.get(id(item))
+                if position is not None:
+                    for key in OrderedDict.fromkeys(keys(item)):
+                        _insert_in_order(index.setdefault(key, []), item,
+                                         position, positions)
+            entry[3] = logged
+        return entry[1]
+
+    def __positions(self):
+        # the position of each item in the list, by id
+        if '_positions' not in self.__dict__:
+            self.__dict__['_positions'] = {
+                id(item): position for position, item in enumerate(self)}
+        return self.__dict__['_positions']
+
+    def __add_to_indexes(self, items):
+        _attach(self.owner, items)
+        positions = self.__dict__.get('_positions')
+        if positions is not None:
+            for position, item in enumerate(items, len(self) - len(items)):
+                positions[id(item)] = position
+        indexes = self.__dict__.get('_indexes')
+        if indexes:
+            root = _scope_root(self.owner)
+            for kind, (generation, index, _, _) in indexes.items():
+                keys, generation_name, _ = _INDEX_KINDS[kind]
+                if generation is getattr(root, generation_name):
+                    for item in items:
+                        _add_to_index(index, keys(item), item)
+
+    def append(self, item):
+        list.append(self, item)
+        self.__add_to_indexes([item])
+
+    def extend(self, items):
+        items = list(items)
+        list.extend(self, items)
+        self.__add_to_indexes(items)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __reduce__(self):
+        # indexes are rebuilt rather than copied or pickled, as the
+        # generations they were built at mean nothing elsewhere
+        return type(self), (self.owner, list(self))
+
+
+def _indexed_list_method(method, adds=False):
+    def changed(self, *args, **kwargs):
+        self.__dict__.pop('_indexes', None)
+        self.__dict__.pop('_positions', None)
+        result = method(self, *args, **kwargs)
+        if adds:
+            _attach(self.owner, list(self))
+        return result
+    changed.__name__ = method.__name__
+    changed.__doc__ = method.__doc__
+    return changed
+
+
+for _method_name in ('insert', '__setitem__'):
+    setattr(_IndexedList, _method_name,
+            _indexed_list_method(getattr(list, _method_name), adds=True))
+
+for _method_name in ('remove', 'pop', 'clear', 'sort', 'reverse',
+                     '__delitem__', '__imul__'):
+    setattr(_IndexedList, _method_name,
+            _indexed_list_method(getattr(list, _method_name)))
+
+
+def _process_sequence_edges(process_sequence):
+    """Yields the edges (u, v) of the graph of an ISA process sequence, in the
+    order they are added to it: from each process to its outputs that are not
+    data files, or else to its next process, and to each process from its
+    inputs, or else from its previous process."""
     for process in process_sequence:
         if process.next_process is not None or len(
                 process.outputs) > 0:
@@ -31,16 +480,24 @@ def _build_assay_graph(process_sequence=list()):
                     not isinstance(n, DataFile)]) > 0:
                 for output in [n for n in process.outputs if
                                not isinstance(n, DataFile)]:
-                    g.add_edge(process, output)
+                    yield process, output
             else:
-                g.add_edge(process, process.next_process)
+                yield process, process.next_process
 
         if process.prev_process is not None or len(process.inputs) > 0:
             if len(process.inputs) > 0:
                 for input_ in process.inputs:
-                    g.add_edge(input_, process)
+                    yield input_, process
             else:
-                g.add_edge(process.prev_process, process)
+                yield process.prev_process, process
+
+
+def _build_assay_graph(process_sequence=list()):
+    """:obj:`networkx.DiGraph` Returns a directed graph object based on a
+    given ISA process sequence."""
+    g = nx.DiGraph()
+    for u, v in _process_sequence_edges(process_sequence):
+        g.add_edge(u, v)
     return g
 
 
@@ -51,10 +508,12 @@ class Comment(object):
         name: A string name for the comment context (maps to Comment[{name}])
         value: A string value for the comment.
     """
+    __slots__ = ('__name', '__value', '_scope')
 
     def __init__(self, name='', value=''):
         self.__name = name
         self.__value = value
+        self._scope = None
 
     @property
     def name(self):
@@ -65,6 +524,7 @@ class Comment(object):
     def name(self, val):
         if val is not None and isinstance(val, str):
             self.__name = val
+            _changed(self)
         else:
             raise ISAModelAttributeError('Comment.name must be a string')
 
@@ -77,6 +537,7 @@ class Comment(object):
     def value(self, val):
         if isinstance(val, str):
             self.__value = val
+            _changed(self)
         raise ISAModelAttributeError('Comment.value must be a string')
 
     def __repr__(self):
@@ -107,22 +568,28 @@ class Commentable(metaclass=abc.ABCMeta):
     Attributes:
         comments: Comments associated with the implementing ISA class.
     """
+    __slots__ = ('__comments', '_scope')
+
     def __init__(self, comments=None):
+        self._scope = None
         if comments is None:
-            self.__comments = []
+            self.__comments = None
         else:
-            self.__comments = comments
+            self.__comments = _GraphList(self, comments)
 
     @property
     def comments(self):
         """:obj:`list` of :obj:`Comment`: Container for ISA comments"""
+        if self.__comments is None:
+            self.__comments = _GraphList(self)
         return self.__comments
 
     @comments.setter
     def comments(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, Comment) for x in val):
-                self.__comments = list(val)
+                self.__comments = _GraphList(self, val)
+                _changed(self, self.__comments)
         else:
             raise ISAModelAttributeError(
                 '{0}.comments must be iterable containing Comments'
@@ -572,6 +1039,7 @@ class OntologySource(Commentable):
                 .format(val, type(val)))
         else:
             self.__name = val
+            _changed(self)
 
     @property
     def file(self):
@@ -586,6 +1054,7 @@ class OntologySource(Commentable):
                 .format(val, type(val)))
         else:
             self.__file = val
+            _changed(self)
 
     @property
     def version(self):
@@ -599,7 +1068,8 @@ class OntologySource(Commentable):
                 'OntologySource.version must be a str; got {0}:{1}'
                 .format(val, type(val)))
         else:
-            self.__version = val   
+            self.__version = val
+            _changed(self)
 
     @property
     def description(self):
@@ -614,6 +1084,7 @@ class OntologySource(Commentable):
                 .format(val, type(val)))
         else:
             self.__description = val
+            _changed(self)
 
     def __repr__(self):
         return "isatools.model.OntologySource(name='{ontology_source.name}', " \
@@ -657,6 +1128,7 @@ class OntologyAnnotation(Commentable):
         term_accession : A URI or resource-specific identifier for the term.
         comments: Comments associated with instances of this class.
     """
+    __slots__ = ('id', '__term', '__term_source', '__term_accession')
 
     def __init__(self, term='', term_source=None, term_accession='',
                  comments=None, id_=''):
@@ -680,6 +1152,7 @@ class OntologyAnnotation(Commentable):
                 .format(val, type(val)))
         else:
             self.__term = val
+            _changed(self, key_values=True)
 
     @property
     def term_source(self):
@@ -695,6 +1168,7 @@ class OntologyAnnotation(Commentable):
                 'None; got {0}:{1}'.format(val, type(val)))
         else:
             self.__term_source = val
+            _changed(self, self.__term_source)
 
     @property
     def term_accession(self):
@@ -708,6 +1182,7 @@ class OntologyAnnotation(Commentable):
                 'OntologyAnnotation.term_accession must be a str or None')
         else:
             self.__term_accession = val
+            _changed(self)
 
     def __repr__(self):
         return "isatools.model.OntologyAnnotation(" \
@@ -742,6 +1217,56 @@ class OntologyAnnotation(Commentable):
         return not self == other
 
 
+class OntologyAnnotationPool(object):
+    """An interning pool of ontology annotations and ontology sources
+
+    Hands out one shared instance per distinct (term, term_source,
+    term_accession) annotation and per distinct (name, file, version,
+    description) source, so that the same term repeated over many table
+    cells is held once. Term sources are told apart by identity, so the
+    annotations of two investigations only become shared when their sources
+    come from the same pool.
+
+    Since the instances are shared, changing one in place changes it
+    everywhere it is used; to edit an annotation of a single object, assign
+    a new OntologyAnnotation to it instead.
+    """
+
+    def __init__(self):
+        self.__annotations = {}
+        self.__sources = {}
+
+    def annotation(self, term='', term_source=None, term_accession=''):
+        """Returns the pooled OntologyAnnotation for the given term, term
+        source and term accession, creating it on first use"""
+        key = (term, id(term_source) if term_source is not None else None,
+               term_accession)
+        try:
+            return self.__annotations[key]
+        except KeyError:
+            annotation = OntologyAnnotation(
+                term=term, term_source=term_source,
+                term_accession=term_accession)
+            self.__annotations[key] = annotation
+            return annotation
+
+    def source(self, name, file='', version='', description=''):
+        """Returns the pooled OntologySource for the given name, file,
+        version and description, creating it on first use"""
+        key = (name, file, version, description)
+        try:
+            return self.__sources[key]
+        except KeyError:
+            source = OntologySource(
+                name=name, file=file, version=version,
+                description=description)
+            self.__sources[key] = source
+            return source
+
+    def __len__(self):
+        return len(self.__annotations) + len(self.__sources)
+
+
 class Publication(Commentable):
     """A publication associated with an investigation or study.
 
@@ -1110,16 +1635,17 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
         self.__filename = filename
 
         self.__materials = {
-            'sources': [],
-            'samples': [],
-            'other_material': []
+            'sources': _IndexedList(self),
+            'samples': _IndexedList(self),
+            'other_material': _IndexedList(self)
         }
         if not (sources is None):
-            self.__materials['sources'] = sources
+            self.__materials['sources'] = _IndexedList(self, sources)
         if not (samples is None):
-            self.__materials['samples'] = samples
+            self.__materials['samples'] = _IndexedList(self, samples)
         if not (other_material is None):
-            self.__materials['other_material'] = other_material
+            self.__materials['other_material'] = _IndexedList(
+                self, other_material)
 
         if units is None:
             self.__units = []
@@ -1127,14 +1653,17 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
             self.__units = units
 
         if process_sequence is None:
-            self.__process_sequence = []
+            self.__process_sequence = _GraphList(self)
         else:
-            self.__process_sequence = process_sequence
+            self.__process_sequence = _GraphList(self, process_sequence)
 
         if characteristic_categories is None:
             self.__characteristic_categories = []
         else:
             self.__characteristic_categories = characteristic_categories
+
+        self.__graph = None
+        self.__graph_generation = None
             
     @property
     def filename(self):
@@ -1175,7 +1704,7 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
     def sources(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, Source) for x in val):
-                self.__materials['sources'] = list(val)
+                self.__materials['sources'] = _IndexedList(self, val)
         else:
             raise ISAModelAttributeError(
                 '{}.sources must be iterable containing Sources'
@@ -1200,13 +1729,13 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
             name: Source name
 
         Returns:
-            :obj:`filter` of :obj:`Source` that can be iterated on.  If name is
-                None, yields all sources.
+            :obj:`iterator` of :obj:`Source` that can be iterated on.  If name
+                is None, yields all sources.
         """
         if name is None:
             return filter(True, self.sources)
         else:
-            return filter(lambda x: x.name == name, self.sources)
+            return iter(list(_lookup(self.sources, 'name', name)))
 
     def get_source(self, name):
         """Gets the first matching source material for a given name.
@@ -1218,7 +1747,7 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
             :obj:`Source` matching the name. Only returns the first found.
 
         """
-        slist = list(self.yield_sources(name=name))
+        slist = _lookup(self.sources, 'name', name)
         if len(slist) > 0:
             return slist[-1]
         else:
@@ -1231,14 +1760,14 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
             characteristic: Source characteristic
 
         Returns:
-            :obj:`filter` of :obj:`Source` that can be iterated on. If
+            :obj:`iterator` of :obj:`Source` that can be iterated on. If
                 characteristic is None, yields all sources.
         """
         if characteristic is None:
             return filter(True, self.sources)
         else:
-            return filter(lambda x: characteristic in x.characteristics,
-                          self.sources)
+            return iter(_lookup_by_characteristic(self.sources,
+                                                  characteristic))
 
     def get_source_by_characteristic(self, characteristic):
         """Gets the first matching source material for a given characteristic.
@@ -1251,8 +1780,7 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
                 found.
 
         """
-        slist = list(self.yield_sources_by_characteristic(characteristic=
-                                                          characteristic))
+        slist = _lookup_by_characteristic(self.sources, characteristic)
         if len(slist) > 0:
             return slist[-1]
         else:
@@ -1276,7 +1804,7 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
     def samples(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, Sample) for x in val):
-                self.__materials['samples'] = list(val)
+                self.__materials['samples'] = _IndexedList(self, val)
         else:
             raise ISAModelAttributeError(
                 '{}.samples must be iterable containing Samples'
@@ -1303,13 +1831,13 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
             name: Sample name
 
         Returns:
-            :obj:`filter` of :obj:`Source` that can be iterated on.  If name is
-                None, yields all samples.
+            :obj:`iterator` of :obj:`Sample` that can be iterated on.  If name
+                is None, yields all samples.
         """
         if name is None:
             return filter(True, self.samples)
         else:
-            return filter(lambda x: x.name == name, self.samples)
+            return iter(list(_lookup(self.samples, 'name', name)))
 
     def get_sample(self, name):
         """Gets the first matching sample material for a given name.
@@ -1321,7 +1849,7 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
             :obj:`Sample` matching the name. Only returns the first found.
 
         """
-        slist = list(self.yield_samples(name=name))
+        slist = _lookup(self.samples, 'name', name)
         if len(slist) > 0:
             return slist[-1]
         else:
@@ -1334,14 +1862,14 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
             characteristic: Sample characteristic
 
         Returns:
-            :obj:`filter` of :obj:`Sample` that can be iterated on. If
+            :obj:`iterator` of :obj:`Sample` that can be iterated on. If
                 characteristic is None, yields all samples.
         """
         if characteristic is None:
             return filter(True, self.samples)
         else:
-            return filter(lambda x: characteristic in x.characteristics,
-                          self.samples)
+            return iter(_lookup_by_characteristic(self.samples,
+                                                  characteristic))
 
     def get_sample_by_characteristic(self, characteristic):
         """Gets the first matching sample material for a given characteristic.
@@ -1354,8 +1882,7 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
                 found.
 
         """
-        slist = list(self.yield_samples_by_characteristic(characteristic=
-                                                          characteristic))
+        slist = _lookup_by_characteristic(self.samples, characteristic)
         if len(slist) > 0:
             return slist[-1]
         else:
@@ -1368,14 +1895,13 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
             factor_value: Sample factor value
 
         Returns:
-            :obj:`filter` of :obj:`Sample` that can be iterated on. If
+            :obj:`iterator` of :obj:`Sample` that can be iterated on. If
                 factor_value is None, yields all samples.
         """
         if factor_value is None:
             return filter(True, self.samples)
         else:
-            return filter(lambda x: factor_value in x.factor_values,
-                          self.samples)
+            return iter(_lookup_by_factor_value(self.samples, factor_value))
 
     def get_sample_by_factor_value(self, factor_value):
         """Gets the first matching sample material for a given factor_value.
@@ -1388,8 +1914,7 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
                 found.
 
         """
-        slist = list(self.yield_samples_by_factor_value(factor_value=
-                                                        factor_value))
+        slist = _lookup_by_factor_value(self.samples, factor_value)
         if len(slist) > 0:
             return slist[-1]
         else:
@@ -1414,7 +1939,7 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
     def other_material(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, Material) for x in val):
-                self.__materials['other_material'] = list(val)
+                self.__materials['other_material'] = _IndexedList(self, val)
         else:
             raise ISAModelAttributeError(
                 '{}.other_material must be iterable containing Materials'
@@ -1427,14 +1952,14 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
             characteristic: Material characteristic
 
         Returns:
-            :obj:`filter` of :obj:`Material` that can be iterated on. If
+            :obj:`iterator` of :obj:`Material` that can be iterated on. If
                 characteristic is None, yields all materials.
         """
         if characteristic is None:
             return filter(True, self.other_material)
         else:
-            return filter(lambda x: characteristic in x.characteristics,
-                          self.other_materials)
+            return iter(_lookup_by_characteristic(self.other_material,
+                                                  characteristic))
 
     def get_material_by_characteristic(self, characteristic):
         """Gets the first matching material material for a given characteristic.
@@ -1447,8 +1972,7 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
                 found.
 
         """
-        mlist = list(self.yield_materials_by_characteristic(characteristic=
-                                                            characteristic))
+        mlist = _lookup_by_characteristic(self.other_material, characteristic)
         if len(mlist) > 0:
             return mlist[-1]
         else:
@@ -1474,7 +1998,8 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
     def process_sequence(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, Process) for x in val):
-                self.__process_sequence = list(val)
+                self.__process_sequence = _GraphList(self, val)
+                _changed(self, self.__process_sequence)
         else:
             raise ISAModelAttributeError(
                 '{}.process_sequence must be iterable containing Processes'
@@ -1499,9 +2024,20 @@ class StudyAssayMixin(metaclass=abc.ABCMeta):
     @property
     def graph(self):
         """:obj:`networkx.DiGraph` A graph representation of the study's 
-        process sequence"""
+        process sequence.
+
+        The graph is built on first access and cached until the process
+        sequence, the inputs, outputs or links of a process, or the nodes
+        themselves are changed, in any study or assay of its scope, e.g. the
+        same investigation. It is shared between accesses, so it should be
+        copied before being modified."""
         if len(self.process_sequence) > 0:
-            return _build_assay_graph(self.process_sequence)
+            generation = _scope_root(self).graph_generation
+            if self.__graph is None or \
+                    self.__graph_generation is not generation:
+                self.__graph = _build_assay_graph(self.process_sequence)
+                self.__graph_generation = generation
+            return self.__graph
         else:
             return None
 
@@ -1582,9 +2118,9 @@ class Study(Commentable, StudyAssayMixin, MetadataMixin, object):
             self.__design_descriptors = design_descriptors
 
         if protocols is None:
-            self.__protocols = []
+            self.__protocols = _IndexedList(self)
         else:
-            self.__protocols = protocols
+            self.__protocols = _IndexedList(self, protocols)
 
         if assays is None:
             self.__assays = []
@@ -1592,9 +2128,9 @@ class Study(Commentable, StudyAssayMixin, MetadataMixin, object):
             self.__assays = assays
 
         if factors is None:
-            self.__factors = []
+            self.__factors = _IndexedList(self)
         else:
-            self.__factors = factors
+            self.__factors = _IndexedList(self, factors)
 
     @property
     def design_descriptors(self):
@@ -1621,7 +2157,7 @@ class Study(Commentable, StudyAssayMixin, MetadataMixin, object):
     def protocols(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, Protocol) for x in val):
-                self.__protocols = list(val)
+                self.__protocols = _IndexedList(self, val)
         else:
             raise ISAModelAttributeError(
                 '{}.protocols must be iterable containing Protocol'
@@ -1674,7 +2210,7 @@ class Study(Commentable, StudyAssayMixin, MetadataMixin, object):
     def get_prot(self, protocol_name):
         prot = None
         try:
-            prot = next(x for x in self.protocols if x.name == protocol_name)
+            prot = next(iter(_lookup(self.protocols, 'name', protocol_name)))
         except StopIteration:
             pass
         return prot
@@ -1700,7 +2236,7 @@ class Study(Commentable, StudyAssayMixin, MetadataMixin, object):
     def get_factor(self, name):
         factor = None
         try:
-            factor = next(x for x in self.factors if x.name == name)
+            factor = next(iter(_lookup(self.factors, 'name', name)))
         except StopIteration:
             pass
         return factor
@@ -1730,7 +2266,7 @@ class Study(Commentable, StudyAssayMixin, MetadataMixin, object):
     def factors(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, StudyFactor) for x in val):
-                self.__factors = list(val)
+                self.__factors = _IndexedList(self, val)
         else:
             raise ISAModelAttributeError(
                 '{}.factors must be iterable containing StudyFactors'
@@ -1852,6 +2388,7 @@ class StudyFactor(Commentable):
                 .format(val, type(val)))
         else:
             self.__name = val
+            _changed(self, names=True, key_values=True)
 
     @property
     def factor_type(self):
@@ -1867,6 +2404,7 @@ class StudyFactor(Commentable):
                 'None; got {0}:{1}'.format(val, type(val)))
         else:
             self.__factor_type = val
+            _changed(self, self.__factor_type)
 
     def __repr__(self):
         return "isatools.model.StudyFactor(name='{study_factor.name}', " \
@@ -2125,6 +2663,7 @@ class Protocol(Commentable):
                 .format(val, type(val)))
         else:
             self.__name = val
+            _changed(self, names=True)
 
     @property
     def protocol_type(self):
@@ -2344,12 +2883,15 @@ class ParameterValue(object):
         unit: The qualifying unit classifier, if the value is numeric.
         comments: Comments associated with instances of this class.
     """
+    __slots__ = ('__category', '__value', '__unit', '_scope')
+
     def __init__(self, category=None, value=None, unit=None):
         super().__init__()
 
         self.__category = category
         self.__value = value
         self.__unit = unit
+        self._scope = None
 
     @property
     def category(self):
@@ -2510,6 +3052,8 @@ class Source(Commentable):
             properties.
         comments: Comments associated with instances of this class.
     """
+    __slots__ = ('id', '__name', '__characteristics')
+
     def __init__(self, name='', id_='', characteristics=None, comments=None):
         super().__init__(comments)
 
@@ -2517,9 +3061,9 @@ class Source(Commentable):
         self.__name = name
 
         if characteristics is None:
-            self.__characteristics = []
+            self.__characteristics = None
         else:
-            self.__characteristics = characteristics
+            self.__characteristics = _ValueList(self, characteristics)
 
     @property
     def name(self):
@@ -2534,18 +3078,22 @@ class Source(Commentable):
                 .format(val, type(val)))
         else:
             self.__name = val
+            _changed(self, names=True)
 
     @property
     def characteristics(self):
         """:obj:`list` of :obj:`Characteristic`: Container for source material
         characteristics"""
+        if self.__characteristics is None:
+            self.__characteristics = _ValueList(self)
         return self.__characteristics
 
     @characteristics.setter
     def characteristics(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, Characteristic) for x in val):
-                self.__characteristics = list(val)
+                self.__characteristics = _ValueList(self, val)
+                _changed(self, self.__characteristics, added_values=True)
         else:
             raise ISAModelAttributeError(
                 'Source.characteristics must be iterable containing '
@@ -2601,6 +3149,8 @@ class Characteristic(Commentable):
         unit: If applicable, a unit qualifier for the value (if the value is
             numeric).
         """
+    __slots__ = ('__category', '__value', '__unit')
+
     def __init__(self, category=None, value=None, unit=None, comments=None):
         super().__init__(comments)
 
@@ -2630,6 +3180,7 @@ class Characteristic(Commentable):
                 ' or None; got {0}:{1}'.format(val, type(val)))
         else:
             self.__category = val
+            _changed(self, self.__category, key_values=True)
 
     @property
     def value(self):
@@ -2647,6 +3198,7 @@ class Characteristic(Commentable):
                 .format(val, type(val)))
         else:
             self.__value = val
+            _changed(self, self.__value, key_values=True)
 
     @property
     def unit(self):
@@ -2661,6 +3213,7 @@ class Characteristic(Commentable):
                 'got {0}:{1}'.format(val, type(val)))
         else:
             self.__unit = val
+            _changed(self, self.__unit)
 
     def __repr__(self):
         return 'isatools.model.Characteristic(' \
@@ -2709,6 +3262,9 @@ class Sample(Commentable):
             from.
         comments: Comments associated with instances of this class.
     """
+    __slots__ = ('id', '__name', '__factor_values', '__characteristics',
+                 '__derives_from', '__dict__')
+
     def __init__(self, name='', id_='', factor_values=None,
                  characteristics=None, derives_from=None, comments=None):
         super().__init__(comments)
@@ -2717,19 +3273,19 @@ class Sample(Commentable):
         self.__name = name
 
         if factor_values is None:
-            self.__factor_values = []
+            self.__factor_values = None
         else:
-            self.__factor_values = factor_values
+            self.__factor_values = _ValueList(self, factor_values)
 
         if characteristics is None:
-            self.__characteristics = []
+            self.__characteristics = None
         else:
-            self.__characteristics = characteristics
+            self.__characteristics = _ValueList(self, characteristics)
 
         if derives_from is None:
-            self.__derives_from = []
+            self.__derives_from = None
         else:
-            self.__derives_from = derives_from
+            self.__derives_from = _GraphList(self, derives_from)
 
     @property
     def name(self):
@@ -2744,18 +3300,22 @@ class Sample(Commentable):
                 .format(val, type(val)))
         else:
             self.__name = val
+            _changed(self, names=True)
 
     @property
     def factor_values(self):
         """:obj:`list` of :obj:`FactorValue`: Container for sample material
         factor_values"""
+        if self.__factor_values is None:
+            self.__factor_values = _ValueList(self)
         return self.__factor_values
 
     @factor_values.setter
     def factor_values(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, FactorValue) for x in val):
-                self.__factor_values = list(val)
+                self.__factor_values = _ValueList(self, val)
+                _changed(self, self.__factor_values, added_values=True)
         else:
             raise ISAModelAttributeError(
                 'Sample.factor_values must be iterable containing '
@@ -2765,13 +3325,16 @@ class Sample(Commentable):
     def characteristics(self):
         """:obj:`list` of :obj:`Characteristic`: Container for sample material
         characteristics"""
+        if self.__characteristics is None:
+            self.__characteristics = _ValueList(self)
         return self.__characteristics
 
     @characteristics.setter
     def characteristics(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, Characteristic) for x in val):
-                self.__characteristics = list(val)
+                self.__characteristics = _ValueList(self, val)
+                _changed(self, self.__characteristics, added_values=True)
         else:
             raise ISAModelAttributeError(
                 'Sample.characteristics must be iterable containing '
@@ -2795,13 +3358,16 @@ class Sample(Commentable):
     def derives_from(self):
         """:obj:`list` of :obj:`Source`: a list of references from this sample
         material to a source material(s)"""
+        if self.__derives_from is None:
+            self.__derives_from = _GraphList(self)
         return self.__derives_from
 
     @derives_from.setter
     def derives_from(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, Source) for x in val):
-                self.__derives_from = list(val)
+                self.__derives_from = _GraphList(self, val)
+                _changed(self, self.__derives_from)
         else:
             raise ISAModelAttributeError(
                 'Sample.derives_from must be iterable containing Sources')
@@ -2843,6 +3409,8 @@ class Sample(Commentable):
 class Material(Commentable, metaclass=abc.ABCMeta):
     """Represents a generic material in an experimental graph.
     """
+    __slots__ = ('id', '__name', '__type', '__characteristics', '__dict__')
+
     def __init__(self, name='', id_='', type_='', characteristics=None,
                  comments=None):
         super().__init__(comments)
@@ -2852,9 +3420,9 @@ class Material(Commentable, metaclass=abc.ABCMeta):
         self.__type = type_
 
         if characteristics is None:
-            self.__characteristics = list()
+            self.__characteristics = None
         else:
-            self.__characteristics = characteristics
+            self.__characteristics = _ValueList(self, characteristics)
 
     @property
     def name(self):
@@ -2869,6 +3437,7 @@ class Material(Commentable, metaclass=abc.ABCMeta):
                 .format(type(self).__name__, val, type(val)))
         else:
             self.__name = val
+            _changed(self, names=True)
 
     @property
     def type(self):
@@ -2885,18 +3454,22 @@ class Material(Commentable, metaclass=abc.ABCMeta):
                 .format(type(self).__name__, val, type(val)))
         else:
             self.__type = val
+            _changed(self)
 
     @property
     def characteristics(self):
         """:obj:`list` of :obj:`Characteristic`: Container for material
         characteristics"""
+        if self.__characteristics is None:
+            self.__characteristics = _ValueList(self)
         return self.__characteristics
 
     @characteristics.setter
     def characteristics(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, Characteristic) for x in val):
-                self.__characteristics = list(val)
+                self.__characteristics = _ValueList(self, val)
+                _changed(self, self.__characteristics, added_values=True)
         else:
             raise ISAModelAttributeError(
                 '{}.characteristics must be iterable containing '
@@ -2905,6 +3478,8 @@ class Material(Commentable, metaclass=abc.ABCMeta):
 
 class Extract(Material):
     """Represents a extract material in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, name='', id_='', characteristics=None, comments=None):
         super().__init__(name=name, id_=id_, characteristics=characteristics,
                          comments=comments)
@@ -2942,6 +3517,8 @@ class Extract(Material):
 
 class LabeledExtract(Material):
     """Represents a labeled extract material in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, name='', id_='', characteristics=None, comments=None):
         super().__init__(name=name, id_=id_, characteristics=characteristics,
                          comments=comments)
@@ -2987,6 +3564,8 @@ class FactorValue(Commentable):
         unit: If numeric, the unit qualifier for the value.
         comments: Comments associated with instances of this class.
     """
+    __slots__ = ('__factor_name', '__value', '__unit')
+
     def __init__(self, factor_name=None, value=None, unit=None, comments=None):
         super().__init__(comments)
         self.__factor_name = factor_name
@@ -3007,6 +3586,7 @@ class FactorValue(Commentable):
                 'or None; got {0}:{1}'.format(val, type(val)))
         else:
             self.__factor_name = val
+            _changed(self, self.__factor_name, key_values=True)
 
     @property
     def value(self):
@@ -3024,6 +3604,7 @@ class FactorValue(Commentable):
                 .format(val, type(val)))
         else:
             self.__value = val
+            _changed(self, self.__value, key_values=True)
 
     @property
     def unit(self):
@@ -3038,6 +3619,7 @@ class FactorValue(Commentable):
                 'got {0}:{1}'.format(val, type(val)))
         else:
             self.__unit = val
+            _changed(self, self.__unit)
 
     def __repr__(self):
         return "isatools.model.FactorValue(factor_name={factor_name}, " \
@@ -3089,6 +3671,10 @@ class Process(Commentable):
             DataFiles
         comments: Comments associated with instances of this class.
     """
+    __slots__ = ('id', '__name', '__executes_protocol', '__date',
+                 '__performer', '__parameter_values', '__inputs', '__outputs',
+                 '__prev_process', '__next_process', '__dict__')
+
     # TODO: replace with above but need to debug where behaviour starts varying
     def __init__(self, id_='', name='', executes_protocol=None, date_=None,
                  performer=None, parameter_values=None, inputs=None,
@@ -3112,14 +3698,14 @@ class Process(Commentable):
             self.__parameter_values = parameter_values
             
         if inputs is None:
-            self.__inputs = []
+            self.__inputs = _GraphList(self)
         else:
-            self.__inputs = inputs
+            self.__inputs = _GraphList(self, inputs)
 
         if outputs is None:
-            self.__outputs = []
+            self.__outputs = _GraphList(self)
         else:
-            self.__outputs = outputs
+            self.__outputs = _GraphList(self, outputs)
 
         self.__prev_process = None
         self.__next_process = None
@@ -3204,7 +3790,8 @@ class Process(Commentable):
                     isinstance(x, (Material, Source, Sample, DataFile)) for
                     x in
                     val):
-                self.__inputs = list(val)
+                self.__inputs = _GraphList(self, val)
+                _changed(self, self.__inputs)
         else:
             raise ISAModelAttributeError(
                 'Process.inputs must be iterable containing objects of types '
@@ -3222,7 +3809,8 @@ class Process(Commentable):
             if val == [] or all(
                     isinstance(x, (Material, Source, Sample, DataFile)) for
                     x in val):
-                self.__outputs = list(val)
+                self.__outputs = _GraphList(self, val)
+                _changed(self, self.__outputs)
         else:
             raise ISAModelAttributeError(
                 'Process.outputs must be iterable containing objects of types '
@@ -3242,6 +3830,7 @@ class Process(Commentable):
                 'or None; got {0}:{1}'.format(val, type(val)))
         else:
             self.__prev_process = val
+            _changed(self, self.__prev_process)
 
     @property
     def next_process(self):
@@ -3257,6 +3846,7 @@ class Process(Commentable):
                 'or None; got {0}:{1}'.format(val, type(val)))
         else:
             self.__next_process = val
+            _changed(self, self.__next_process)
 
     # def __repr__(self):
     #     return 'Process(name="{0.name}", ' \
@@ -3290,6 +3880,9 @@ class DataFile(Commentable):
         generated_from: Reference to Sample(s) the DataFile is generated from
         comments: Comments associated with instances of this class.
     """
+    __slots__ = ('id', '__filename', '__label', '__generated_from',
+                 '__dict__')
+
     def __init__(self, filename='', id_='', label='', generated_from=None, 
                  comments=None):
         super().__init__(comments)
@@ -3299,9 +3892,9 @@ class DataFile(Commentable):
         self.__label = label
         
         if generated_from is None:
-            self.__generated_from = []
+            self.__generated_from = None
         else:
-            self.__generated_from = generated_from
+            self.__generated_from = _GraphList(self, generated_from)
             
     @property
     def filename(self):
@@ -3316,6 +3909,7 @@ class DataFile(Commentable):
                 .format(type(self).__name__, val, type(val)))
         else:
             self.__filename = val
+            _changed(self)
 
     @property
     def label(self):
@@ -3330,18 +3924,22 @@ class DataFile(Commentable):
                 .format(type(self).__name__, val, type(val)))
         else:
             self.__label = val
+            _changed(self)
             
     @property
     def generated_from(self):
         """:obj:`list` of :obj:`Sample`: a list of references from this data
         file to samples that the file was generated from"""
+        if self.__generated_from is None:
+            self.__generated_from = _GraphList(self)
         return self.__generated_from
 
     @generated_from.setter
     def generated_from(self, val):
         if val is not None and hasattr(val, '__iter__'):
             if val == [] or all(isinstance(x, Sample) for x in val):
-                self.__generated_from = list(val)
+                self.__generated_from = _GraphList(self, val)
+                _changed(self, self.__generated_from)
         else:
             raise ISAModelAttributeError(
                 '{}.generated_from must be iterable containing Samples'.format(
@@ -3379,6 +3977,8 @@ class DataFile(Commentable):
 
 class RawDataFile(DataFile):
     """Represents a raw data file in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
@@ -3413,6 +4013,8 @@ class RawDataFile(DataFile):
 
 class DerivedDataFile(DataFile):
     """Represents a derived data file in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
@@ -3448,6 +4050,8 @@ class DerivedDataFile(DataFile):
 
 class RawSpectralDataFile(DataFile):
     """Represents a raw spectral data file in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
@@ -3482,6 +4086,8 @@ class RawSpectralDataFile(DataFile):
 
 class DerivedArrayDataFile(DataFile):
     """Represents a derived array data file in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
@@ -3517,6 +4123,8 @@ class DerivedArrayDataFile(DataFile):
 
 class ArrayDataFile(DataFile):
     """Represents a array data file in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
@@ -3552,6 +4160,8 @@ class ArrayDataFile(DataFile):
 
 class DerivedSpectralDataFile(DataFile):
     """Represents a derived spectral data file in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
@@ -3587,6 +4197,8 @@ class DerivedSpectralDataFile(DataFile):
 
 class ProteinAssignmentFile(DataFile):
     """Represents a protein assignment file in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
@@ -3622,6 +4234,8 @@ class ProteinAssignmentFile(DataFile):
 
 class PeptideAssignmentFile(DataFile):
     """Represents a peptide assignment file in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
@@ -3657,6 +4271,8 @@ class PeptideAssignmentFile(DataFile):
 
 class DerivedArrayDataMatrixFile(DataFile):
     """Represents a derived array data matrix file in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
@@ -3693,6 +4309,8 @@ class DerivedArrayDataMatrixFile(DataFile):
 class PostTranslationalModificationAssignmentFile(DataFile):
     """Represents a post translational modification assignment file in an
     experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
@@ -3728,6 +4346,8 @@ class PostTranslationalModificationAssignmentFile(DataFile):
 
 class AcquisitionParameterDataFile(DataFile):
     """Represents a acquisition parameter data file in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
@@ -3763,6 +4383,8 @@ class AcquisitionParameterDataFile(DataFile):
 
 class FreeInductionDecayDataFile(DataFile):
     """Represents a free induction decay data file in an experimental graph."""
+    __slots__ = ()
+
     def __init__(self, filename='', id_='', generated_from=None, comments=None):
         super().__init__(filename=filename, id_=id_,
                          generated_from=generated_from, comments=comments)
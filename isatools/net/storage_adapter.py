@@ -1,17 +1,16 @@
 from abc import ABCMeta, abstractmethod
 from urllib.parse import urljoin
 from lxml import etree
-from jsonschema import RefResolver, Draft4Validator
 from io import BytesIO, StringIO
 from zipfile import ZipFile
 import requests
 import json
 import os
-import pathlib
 import base64
 import logging
 
 from isatools import config
+from isatools.io import json_schemas
 
 logging.basicConfig(level=config.log_level)
 log = logging.getLogger(__name__)
@@ -53,11 +52,7 @@ def validate_json_against_schema(json_dict, schema_src):
     :param json_dict dict
     :param schema_src str - file path to the JSON schema file
     """
-    with open(schema_src) as schema_file:
-        schema = json.load(schema_file)
-    resolver = RefResolver(pathlib.Path(os.path.abspath(schema_src)).as_uri(), schema)
-    validator = Draft4Validator(schema, resolver=resolver)
-    return validator.validate(json_dict, schema)
+    return json_schemas.get_validator(schema_src).validate(json_dict)
 
 
 class IsaStorageAdapter(metaclass=ABCMeta):
@@ -76,6 +76,48 @@ def detect_isatab_process_pooling(fp):
     return report
 
 
+def detect_isatab_table_process_pooling(fp, tables=None):
+    """Detects process pooling as detect_isatab_process_pooling does, but
+    from the study and assay tables of the archive with
+    isatab.detect_table_process_pooling, without loading the archive into
+    ISA objects.
+
+    The report has the same form: for each table with pooling processes, a
+    dict of its file name to those processes. As processes loaded from
+    ISA-Tab have no ids, they are given by their keys in the table, i.e. the
+    value of their name column or else their output or input node and
+    protocol, e.g. 'pool1/extraction'.
+
+    :param fp: A file-like buffer object pointing to an investigation file
+    :param tables: The isatab.TableCache of the archive, if its tables have
+    already been read or its results are cached
+    :return: The pooling report
+    """
+    report = []
+
+    i_df = isatab.load_investigation(fp)
+    if tables is None:
+        tables = isatab.TableCache(os.path.dirname(fp.name))
+
+    for study in isatab.study_symbol_tables(i_df, tables):
+        try:
+            study_samples = study.samples(study.study_filename)
+        except KeyError:
+            study_samples = set()
+
+        for filename in study.filenames:
+            log.info('Checking {}'.format(filename))
+            pooling_list = list(tables.process_pooling(
+                filename, study_samples=None
+                if filename == study.study_filename else study_samples))
+
+            if len(pooling_list) > 0:
+                report.append({
+                    filename: pooling_list
+                })
+    return report
+
+
 def insert_distinct_parameter(table_fp, protocol_ref_to_unpool):
     reader = csv.reader(table_fp, dialect='excel-tab')
     headers = next(reader)  # get column headings
@@ -0,0 +1,231 @@
+"""Reports of the ISA-Tab and ISA-JSON validators."""
+from __future__ import absolute_import
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+
+class ValidationReport(object):
+    """The errors, warnings and info found by one validation run.
+
+    isatab.validate() and isajson.validate() make a new report for each run
+    and pass it to every check function, so that validations running at the
+    same time in different threads keep their findings apart.
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+        self.info = []
+
+
+class ValidationStopped(Exception):
+    """Raised by a fail-fast RuleRunner to stop a validation at its first
+    error."""
+
+
+def _code_matches(pattern, code):
+    pattern = str(pattern)
+    if len(pattern) != 4:
+        raise ValueError("Rule code pattern {} is not four digits or x, e.g. 1003 or 10xx".format(pattern))
+    return all(p in ('x', 'X', c) for p, c in zip(pattern, '{:04d}'.format(code)))
+
+
+class RuleRunner(object):
+    """Runs the rules of one validation run.
+
+    A rule is selected by the codes of the findings it reports. With rules,
+    a list of rule codes or of patterns of four digits or x, such as 3005
+    or '1xxx', only the rules with a code matching one of them are run;
+    rules without a code are then left out too. The rules with a code
+    matching one of skip_rules are never run.
+
+    With fail_fast, run() and call() raise ValidationStopped after a rule
+    that leaves errors in report. With timings, the time taken by each rule
+    is added up by rule and can be put in the validation report.
+    """
+
+    def __init__(self, report, rules=None, skip_rules=None, fail_fast=False, timings=False):
+        self.report = report
+        self.rules = None if rules is None else list(rules)
+        self.skip_rules = list(skip_rules or [])
+        for pattern in (self.rules or []) + self.skip_rules:
+            _code_matches(pattern, 0)
+        self.fail_fast = fail_fast
+        self.timings = OrderedDict() if timings else None
+
+    @property
+    def selection(self):
+        """What selects the rules, for keys of results that depend on it"""
+        return [None if self.rules is None else sorted(map(str, self.rules)), sorted(map(str, self.skip_rules))]
+
+    def selected(self, codes):
+        """Tells whether a rule with codes is run. A rule whose codes is
+        None is always run."""
+        if codes is None:
+            return True
+        if any(_code_matches(x, code) for x in self.skip_rules for code in codes):
+            return False
+        return self.rules is None or any(_code_matches(x, code) for x in self.rules for code in codes)
+
+    def run(self, codes, rule, *args, **kwargs):
+        """Calls rule(*args, **kwargs) and returns what it returns if the
+        rule is selected, or else returns None"""
+        if self.selected(codes):
+            return self.call(codes, rule, *args, **kwargs)
+        return None
+
+    def call(self, codes, rule, *args, **kwargs):
+        """Calls rule(*args, **kwargs), selected or not, and returns what it
+        returns"""
+        start = time.time()
+        try:
+            result = rule(*args, **kwargs)
+        finally:
+            if self.timings is not None:
+                name = getattr(rule, '__name__', str(rule))
+                timing = self.timings.setdefault(name, {"rule": name, "codes": list(codes or []), "seconds": 0.0})
+                timing["seconds"] += time.time() - start
+        self.stop_on_errors()
+        return result
+
+    def stop_on_errors(self):
+        """Raises ValidationStopped if failing fast and report has errors"""
+        if self.fail_fast and len(self.report.errors) > 0:
+            raise ValidationStopped("Stopped at the first error")
+
+    def add_timings(self, report_dict):
+        """Adds the timings, if kept, to the report dict of a validator"""
+        if self.timings is not None:
+            report_dict["timings"] = list(self.timings.values())
+        return report_dict
+
+
+class _CurrentThreadFilter(logging.Filter):
+
+    def __init__(self):
+        super(_CurrentThreadFilter, self).__init__()
+        self.thread = threading.get_ident()
+
+    def filter(self, record):
+        return record.thread is None or record.thread == self.thread
+
+
+def thread_log_handler(stream):
+    """Makes a log handler writing to stream only the records logged from
+    the thread calling this function, so that a validator collects the log
+    of its own run. The validator removes the handler when it is done.
+    """
+    handler = logging.StreamHandler(stream)
+    handler.addFilter(_CurrentThreadFilter())
+    return handler
+
+
+def digest(*parts):
+    """Makes a key for a ValidationCache out of JSON-serializable parts."""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def file_digest(path):
+    """Hashes the content of the file at path."""
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as fp:
+        for block in iter(lambda: fp.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+class ValidationCache(object):
+    """Results of validation rules kept as JSON files in cache_dir, so that
+    later validations can reuse them.
+
+    Keys are made with digest() from everything a result depends on, such as
+    the file_digest() of the files it was computed from, so that a changed
+    file never gets a stale result. Entries are never removed; delete
+    cache_dir to clear it, as after upgrading isatools. An entry that cannot
+    be read counts as missing.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, key):
+        try:
+            with open(os.path.join(self.cache_dir, key + '.json'), encoding='utf-8') as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, value):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+                json.dump(value, fp, default=str)
+            os.replace(tmp_path, os.path.join(self.cache_dir, key + '.json'))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def _failed_entry(path, error):
+    return {
+        "filename": path,
+        "report": {
+            "errors": [{
+                "message": "Unknown/System Error",
+                "supplemental": "The validator could not identify what the error is: {}".format(str(error)),
+                "code": 0
+            }],
+            "warnings": [],
+            "info": [],
+            "validation_finished": False
+        }
+    }
+
+
+def iter_batch(validate_path, paths, workers=None, ordered=False):
+    """Runs validate_path on each of paths and yields the batch report
+    entries it returns, leaving out the paths for which it returns None.
+
+    With workers more than 1, the paths are validated in a pool of that many
+    processes and the entries come in the order the validations finish, or
+    in the order of paths if ordered is set; validate_path must then be a
+    module-level function. Otherwise they are validated one after another,
+    in order. If validating a path raises, its
+    entry holds the error as an "Unknown/System Error" and the rest of the
+    batch carries on.
+    """
+    if workers is None or workers <= 1:
+        for path in paths:
+            try:
+                entry = validate_path(path)
+            except Exception as e:
+                entry = _failed_entry(path, e)
+            if entry is not None:
+                yield entry
+        return
+    executor = ProcessPoolExecutor(max_workers=workers)
+    futures = {}
+    try:
+        for path in paths:
+            futures[executor.submit(validate_path, path)] = path
+        for future in list(futures) if ordered else as_completed(list(futures)):
+            path = futures.pop(future)
+            try:
+                entry = future.result()
+            except Exception as e:
+                entry = _failed_entry(path, e)
+            if entry is not None:
+                yield entry
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown()
@@ -1,5 +1,8 @@
 import unittest
 from isatools import isajson
+from isatools.io.json_stream import JSONStream
+from isatools.model import *
+import io
 import json
 from isatools.tests import utils
 import os
@@ -129,3 +132,116 @@ class TestIsaJson(unittest.TestCase):
             self.assertEqual(len(assay_gx['materials']['otherMaterials']), 29)  # 29 other materials in a_matteo-assay-Gx.txt
             self.assertEqual(len(assay_gx['dataFiles']), 29)  # 29 data files  in a_matteo-assay-Gx.txt
             self.assertEqual(len(assay_gx['processSequence']), 116)  # 116 processes in in a_matteo-assay-Gx.txt
+
+    def test_json_load_streamed_bii_s_7(self):
+        with open(os.path.join(utils.JSON_DATA_DIR, 'BII-S-7', 'BII-S-7.json')) as isajson_fp:
+            isa_json = json.load(isajson_fp)
+            isajson_fp.seek(0)
+            ISA = isajson.load(isajson_fp)
+        ISA_J = json.loads(json.dumps(ISA, cls=isajson.ISAJSONEncoder))
+
+        # the same document loaded from its parsed JSON
+        self.assertEqual(json.loads(json.dumps(isajson.load_dict(isa_json), cls=isajson.ISAJSONEncoder)), ISA_J)
+
+        # the same document with its members in reverse order, so that processes come before the nodes they use
+        def reverse_members(j):
+            if isinstance(j, dict):
+                return {k: reverse_members(j[k]) for k in reversed(list(j.keys()))}
+            if isinstance(j, list):
+                return [reverse_members(x) for x in j]
+            return j
+
+        reversed_fp = io.BytesIO(json.dumps(reverse_members(isa_json)).encode('utf-8'))
+        self.assertEqual(json.loads(json.dumps(isajson.load(reversed_fp), cls=isajson.ISAJSONEncoder)), ISA_J)
+
+    def test_json_dump_compact(self):
+        i = Investigation(identifier='i1')
+        uberon = OntologySource(name='UBERON')
+        i.ontology_source_references.append(uberon)
+        s = Study(filename='s_compact.txt')
+        organism_part = OntologyAnnotation(term='organism part')
+        s.characteristic_categories.append(organism_part)
+        volume = ProtocolParameter(parameter_name=OntologyAnnotation(term='volume'))
+        ml = OntologyAnnotation(term='ml')
+        s.units.append(ml)
+        sample_collection_protocol = Protocol(name='sample collection',
+                                              protocol_type=OntologyAnnotation(term='sample collection'),
+                                              parameters=[volume])
+        s.protocols.append(sample_collection_protocol)
+        source1 = Source(name='source-source1')
+        sample1 = Sample(name='sample-sample1', characteristics=[Characteristic(
+            category=organism_part, value=OntologyAnnotation(term='liver', term_source=uberon))])
+        sample_collection_process = Process(executes_protocol=sample_collection_protocol,
+                                            parameter_values=[ParameterValue(category=volume, value=0, unit=ml)])
+        sample_collection_process.inputs = [source1]
+        sample_collection_process.outputs = [sample1]
+        s.sources = [source1]
+        s.samples = [sample1]
+        s.process_sequence = [sample_collection_process]
+        i.studies = [s]
+
+        ISA_J = json.dumps(i, cls=isajson.ISAJSONEncoder)
+        isajson_fp = io.StringIO()
+        json.dump(i, isajson_fp, cls=isajson.ISAJSONEncoder)
+        self.assertEqual(isajson_fp.getvalue(), ISA_J)  # json.dump writes what json.dumps returns
+
+        ISA_J_compact = json.dumps(i, cls=isajson.ISAJSONEncoder, compact=True)
+        self.assertLess(len(ISA_J_compact), len(ISA_J))
+        self.assertNotIn('"submissionDate"', ISA_J_compact)
+        self.assertIn('"description": ""', ISA_J_compact)  # required by the default configuration
+        self.assertNotIn('"otherMaterials"', ISA_J_compact)
+        self.assertIn('"value": 0', ISA_J_compact)
+
+        # both load to the same objects
+        self.assertEqual(json.dumps(isajson.load(io.StringIO(ISA_J_compact)), cls=isajson.ISAJSONEncoder),
+                         json.dumps(isajson.load(io.StringIO(ISA_J)), cls=isajson.ISAJSONEncoder))
+
+    def test_json_dump_ids(self):
+        s = Study(filename='s_ids.txt')
+        sample_collection_protocol = Protocol(name='sample collection',
+                                              protocol_type=OntologyAnnotation(term='sample collection'))
+        s.protocols.append(sample_collection_protocol)
+        s.sources = [Source(name='source-source{}'.format(n)) for n in range(2)]
+        s.samples = [Sample(name='sample-sample{}'.format(n)) for n in range(2)]
+        for source, sample in zip(s.sources, s.samples):
+            sample_collection_process = Process(executes_protocol=sample_collection_protocol)
+            sample_collection_process.inputs = [source]
+            sample_collection_process.outputs = [sample]
+            s.process_sequence.append(sample_collection_process)
+
+        ISA_J = json.loads(json.dumps(s, cls=isajson.ISAJSONEncoder))
+        self.assertListEqual([source['@id'] for source in ISA_J['materials']['sources']], ['#source/0', '#source/1'])
+        self.assertListEqual([process['outputs'][0]['@id'] for process in ISA_J['processSequence']],
+                             ['#sample/0', '#sample/1'])
+        self.assertEqual(ISA_J['processSequence'][1]['executesProtocol']['@id'], ISA_J['protocols'][0]['@id'])
+
+        # the same objects, or another load of them, give the same document
+        self.assertEqual(json.dumps(s, cls=isajson.ISAJSONEncoder), json.dumps(s, cls=isajson.ISAJSONEncoder))
+        ISA_J = json.dumps(Investigation(studies=[s]), cls=isajson.ISAJSONEncoder)
+        self.assertEqual(json.dumps(isajson.load(io.StringIO(ISA_J)), cls=isajson.ISAJSONEncoder),
+                         json.dumps(isajson.load(io.StringIO(ISA_J)), cls=isajson.ISAJSONEncoder))
+
+
+class TestJSONStream(unittest.TestCase):
+
+    def test_json_stream_walk(self):
+        doc = '{"a": [1, 2.5, {"b": "x\\\\"}], "skipped": {"c": [true, null]}, "d": "\\u00e9t\\u00e9", "e": -12}'
+        for block_size in (1, 3, 1 << 16):
+            stream = JSONStream(io.BytesIO(doc.encode('utf-8')), block_size=block_size)
+            walk = []
+            for key in stream.items():
+                if key == 'a':
+                    for i in stream.elements():
+                        walk.append((key, i, stream.value()))
+                elif key != 'skipped':
+                    walk.append((key, stream.value()))
+            stream.end()
+            self.assertListEqual(walk, [('a', 0, 1), ('a', 1, 2.5), ('a', 2, {'b': 'x\\'}), ('d', 'été'), ('e', -12)])
+
+    def test_json_stream_errors(self):
+        with self.assertRaises(ValueError):
+            JSONStream(io.StringIO('{"a": [1, 2}')).skip()
+        stream = JSONStream(io.StringIO('{} {}'))
+        stream.skip()
+        with self.assertRaises(ValueError):
+            stream.end()
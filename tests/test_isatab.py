@@ -1,6 +1,7 @@
 """Tests on isatab.py package"""
 from __future__ import absolute_import
 import unittest
+import networkx as nx
 import os
 import pandas as pd
 import shutil
@@ -882,6 +883,199 @@ sample1	extraction	extract1	scanning	datafile.raw"""
         self.assertIn(expected_line2, dumps_out)
         self.assertIn(expected_line3, dumps_out)
 
+    def test_end_to_end_paths_on_pooled_study(self):
+        protocol = Protocol(name='sample collection')
+        sources = [Source(name='source{}'.format(i)) for i in range(4)]
+        sources[3].characteristics = [Characteristic(
+            category=OntologyAnnotation(term='organism'), value='rat')]
+        samples = [Sample(name='sample{}'.format(i)) for i in range(3)]
+        s = Study(filename='s_test.txt', protocols=[protocol])
+        s.process_sequence = [
+            Process(executes_protocol=protocol, inputs=sources[:3],
+                    outputs=samples[:2]),
+            Process(executes_protocol=protocol, inputs=sources[2:],
+                    outputs=samples[2:])]
+
+        start_nodes = [x for x in s.graph.nodes() if isinstance(x, Source)]
+        paths = isatab._EndToEndPaths(s.graph, start_nodes)
+        expected = []
+        for start in start_nodes:
+            for end in samples:
+                expected += nx.algorithms.all_simple_paths(s.graph, start, end)
+        self.assertEqual(len(paths), 8)
+        self.assertEqual(sorted(tuple(map(id, x)) for x in paths),
+                         sorted(tuple(map(id, x)) for x in expected))
+        self.assertEqual(paths.longest()[0], sources[3])
+        self.assertEqual(paths.longest(),
+                         isatab._longest_path_and_attrs(list(paths)))
+        self.assertEqual([tuple(map(id, paths[k])) for k in range(len(paths))],
+                         [tuple(map(id, x)) for x in paths])
+        self.assertEqual(paths[-1], list(paths)[-1])
+        with self.assertRaises(IndexError):
+            paths[len(paths)]
+
+        graph = isatab._ProcessSequenceGraph(s.process_sequence)
+        self.assertEqual([id(x) for x in graph.nodes()],
+                         [id(x) for x in s.graph.nodes()])
+        self.assertEqual([(i, j) for i in graph.successor_ids
+                          for j in graph.successor_ids[i]],
+                         [(id(u), id(v)) for u in s.graph
+                          for v in s.graph.succ[u]])
+
+    def test_end_to_end_paths_with_equal_samples(self):
+        # the graph holds equal samples as one node
+        protocol = Protocol(name='sample collection')
+        sources = [Source(name='source{}'.format(i)) for i in range(2)]
+        samples = [Sample(name='sample1') for _ in range(2)]
+        s = Study(filename='s_test.txt', protocols=[protocol])
+        s.process_sequence = [
+            Process(executes_protocol=protocol, inputs=[source],
+                    outputs=[sample])
+            for source, sample in zip(sources, samples)]
+
+        paths = isatab._EndToEndPaths(s.graph, sources)
+        expected = []
+        for start in sources:
+            expected += nx.algorithms.all_simple_paths(s.graph, start,
+                                                       samples[0])
+        self.assertEqual(len(paths), 2)
+        self.assertEqual(sorted(tuple(map(id, x)) for x in paths),
+                         sorted(tuple(map(id, x)) for x in expected))
+
+    def test_write_table_rows_sorts_drops_duplicates_and_empty_columns(self):
+        rows = {
+            'p1': ['sample2', 'extraction', '', 10],
+            'p2': ['sample1', 'extraction', '', ''],
+            'p3': ['sample2', 'extraction', '', 10],
+            'p4': ['sample1', 'extraction', '', 5],
+        }
+        out_fp = StringIO()
+        isatab._write_table_rows(
+            out_fp, [['p1'], ['p2'], ['p3'], ['p4']],
+            ['Sample Name', 'Protocol REF', 'Performer',
+             'Parameter Value[volume]'],
+            lambda path: list(rows[path[0]]))
+        self.assertEqual(out_fp.getvalue(), """Sample Name	Protocol REF	Parameter Value[volume]
+sample1	extraction	
+sample1	extraction	5.0
+sample2	extraction	10.0
+""")
+
+    def test_isatab_dump_of_loaded_isatab(self):
+        investigation = Investigation(identifier='I1')
+        study = Study(filename='s_study.txt', identifier='S1')
+        study.protocols = [
+            Protocol(name='sample collection'),
+            Protocol(name='extraction', parameters=[ProtocolParameter(
+                parameter_name=OntologyAnnotation(term='volume'))])]
+        study.assays = [Assay(
+            filename='a_assay.txt',
+            measurement_type=OntologyAnnotation(term='metabolite profiling'),
+            technology_type=OntologyAnnotation(term='mass spectrometry'))]
+        investigation.studies = [study]
+        isatab.dump(investigation, self._tmp_dir, skip_dump_tables=True)
+        with open(os.path.join(self._tmp_dir, 's_study.txt'), 'w') as fp:
+            fp.write("""Source Name	Characteristics[organism]	Protocol REF	Sample Name
+source2	mouse	sample collection	sample3
+source1	rat	sample collection	sample1
+source1	rat	sample collection	sample2
+source3	rat	sample collection	sample2
+source1	rat	sample collection	sample4
+""")
+        with open(os.path.join(self._tmp_dir, 'a_assay.txt'), 'w') as fp:
+            fp.write("""Sample Name	Protocol REF	Parameter Value[volume]	Extract Name	Raw Data File
+sample2	extraction	10	e3	d3
+sample1	extraction	10	e1	d1
+sample1	extraction	20	e2	d2
+sample3	extraction	10	e4	d1
+sample4	extraction	5	e5	d4
+sample4	extraction	5	e6	d5
+""")
+        # rows with the same first column keep the order of their paths
+        expected_study = """Source Name	Characteristics[organism]	Protocol REF	Sample Name
+source1	rat	sample collection	sample1
+source1	rat	sample collection	sample2
+source1	rat	sample collection	sample4
+source2	mouse	sample collection	sample3
+source3	rat	sample collection	sample2
+"""
+        expected_assay = """Sample Name	Protocol REF	Parameter Value[volume]
+sample1	extraction	10
+sample1	extraction	20
+sample2	extraction	10
+sample3	extraction	10
+sample4	extraction	5
+"""
+        in_dir = self._tmp_dir
+        for _ in range(2):
+            out_dir = tempfile.mkdtemp(dir=self._tmp_dir)
+            isatab.dump(isatab.load(in_dir), out_dir)
+            with open(os.path.join(out_dir, 's_study.txt')) as fp:
+                self.assertEqual(fp.read(), expected_study)
+            with open(os.path.join(out_dir, 'a_assay.txt')) as fp:
+                self.assertEqual(fp.read(), expected_assay)
+            in_dir = out_dir
+
+    def test_isatab_dumps_equal_but_distinct_sources(self):
+        # equal sources are written as one row per path, not merged
+        protocol = Protocol(name='sample collection')
+        s = Study(filename='s_test.txt', protocols=[protocol])
+
+        def source():
+            return Source(name='source1', characteristics=[Characteristic(
+                category=OntologyAnnotation(term='organism'),
+                value=OntologyAnnotation(term='rat'))])
+
+        s.process_sequence = [
+            Process(executes_protocol=protocol, inputs=[source()],
+                    outputs=[Sample(name='sample2')]),
+            Process(executes_protocol=protocol,
+                    inputs=[Source(name='source2')],
+                    outputs=[Sample(name='sample1')]),
+            Process(executes_protocol=protocol, inputs=[source()],
+                    outputs=[Sample(name='sample1')]),
+            Process(executes_protocol=protocol, inputs=[source()],
+                    outputs=[Sample(name='sample3')])]
+        i = Investigation()
+        i.studies = [s]
+        isatab.dump(i, self._tmp_dir)
+        with open(os.path.join(self._tmp_dir, 's_test.txt')) as fp:
+            self.assertEqual(fp.read(), """Source Name	Characteristics[organism]	Protocol REF	Sample Name
+source1	rat	sample collection	sample2
+source1	rat	sample collection	sample1
+source1	rat	sample collection	sample3
+source2		sample collection	sample1
+""")
+
+
+    def test_isatab_dump_skips_empty_studies_and_assays(self):
+        i = Investigation()
+        for n in range(2):
+            protocols = [Protocol(name='sample collection'),
+                         Protocol(name='extraction')]
+            s = Study(filename='s_study{}.txt'.format(n), protocols=protocols)
+            s.assays = [Assay(filename='a_assay{}.{}.txt'.format(n, m))
+                        for m in range(2)]
+            i.studies.append(s)
+        # only the second study and its second assay have processes
+        s = i.studies[1]
+        source, sample = Source(name='source1'), Sample(name='sample1')
+        s.process_sequence = [Process(executes_protocol=s.protocols[0],
+                                      inputs=[source], outputs=[sample])]
+        s.assays[1].process_sequence = [Process(
+            executes_protocol=s.protocols[1], inputs=[sample],
+            outputs=[DataFile(filename='datafile1.raw',
+                              label='Raw Data File')])]
+        isatab.dump(i, self._tmp_dir)
+        self.assertEqual(
+            sorted(x for x in os.listdir(self._tmp_dir)
+                   if not x.startswith('i_')),
+            ['a_assay1.1.txt', 's_study1.txt'])
+        with open(os.path.join(self._tmp_dir, 'a_assay1.1.txt')) as fp:
+            self.assertEqual(fp.read(), """Sample Name	Protocol REF	Raw Data File
+sample1	extraction	datafile1.raw
+""")
+
 
 class UnitTestIsaTabLoad(unittest.TestCase):
 
@@ -963,6 +1157,261 @@ sample1	extraction	e2	scanning	d2"""
         self.assertEqual(len(d), 2)
         self.assertEqual(len(pr), 3)
 
+    def test_columnar_source_protocol_ref_pool_split_sample(self):
+        table_to_load = """Source Name	Protocol REF	Sample Name
+source1	sample collection	sample1
+source2	sample collection	sample1
+source3	sample collection	sample2
+source3	sample collection	sample3"""
+        for columnar in (False, True):
+            factory = ProcessSequenceFactory(
+                study_protocols=[Protocol(name="sample collection")],
+                columnar=columnar)
+            DF = pd.read_csv(StringIO(table_to_load), sep='\t')
+            DF.isatab_header = ["Source Name", "Protocol REF", "Sample Name"]
+            so, sa, om, d, pr, _, __ = factory.create_from_df(DF)
+            self.assertEqual(len(so), 3)
+            self.assertEqual(len(sa), 3)
+            self.assertEqual(len(pr), 3)
+            self.assertEqual(
+                [[[n.name for n in p.inputs], [n.name for n in p.outputs]]
+                 for p in pr.values()],
+                [[['source1'], ['sample1']], [['source2'], ['sample1']],
+                 [['source3'], ['sample2', 'sample3']]])
+            self.assertEqual(
+                [s.name for s in sa['Sample Name:sample1'].derives_from],
+                ['source1', 'source2'])
+
+    def test_columnar_same_graph_as_row_by_row(self):
+        protocols = [
+            Protocol(name="extraction", parameters=[
+                ProtocolParameter(parameter_name=OntologyAnnotation(
+                    term="volume"))]),
+            Protocol(name="scanning")]
+        table_to_load = """Sample Name	Protocol REF	Parameter Value[volume]	Unit	Term Source REF	Term Accession Number	Extract Name	Characteristics[colour]	Term Source REF	Term Accession Number	Protocol REF	Scan Name	Raw Data File	Comment[checksum]
+sample1	extraction	10	ml	UO	UO_1	e1	red	OBI	OBI_1	scanning	scan1	d1	c1
+sample1	extraction	10	ml	UO	UO_1	e1	red	OBI	OBI_1	scanning	scan2	d2	c2
+sample2	extraction	20	ml	UO	UO_1	e2	blue			scanning	scan3	d3	c3"""
+        results = []
+        for columnar in (False, True):
+            factory = ProcessSequenceFactory(
+                ontology_sources=[OntologySource(name="UO"),
+                                  OntologySource(name="OBI")],
+                study_samples=[Sample(name="sample1"), Sample(name="sample2")],
+                study_protocols=protocols, columnar=columnar)
+            DF = pd.read_csv(StringIO(table_to_load), sep='\t', dtype=str)\
+                .fillna('')
+            DF.isatab_header = [
+                "Sample Name", "Protocol REF", "Parameter Value[volume]",
+                "Unit", "Term Source REF", "Term Accession Number",
+                "Extract Name", "Characteristics[colour]", "Term Source REF",
+                "Term Accession Number", "Protocol REF", "Scan Name",
+                "Raw Data File", "Comment[checksum]"]
+            so, sa, om, d, pr, cc, uc = factory.create_from_df(DF)
+            results.append((
+                sorted(om.keys()), sorted(d.keys()), list(pr.keys()),
+                [(p.name, [n.name for n in p.inputs],
+                  [getattr(n, 'name', None) or n.filename for n in p.outputs],
+                  [(pv.value, pv.unit.term) for pv in p.parameter_values],
+                  p.next_process.name if p.next_process else None,
+                  p.prev_process.name if p.prev_process else None)
+                 for p in pr.values()],
+                [(c.value.term, c.value.term_accession)
+                 for m in om.values() for c in m.characteristics],
+                [(f.comments[0].value, [s.name for s in f.generated_from])
+                 for f in d.values()],
+                sorted(cc.keys()), sorted(uc.keys())))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(len(results[1][2]), 5)
+
+    def test_process_key_plan(self):
+        table_to_load = """Sample Name	Protocol REF	Parameter Value[volume]	Date	Extract Name	Protocol REF	Scan Name	Raw Data File
+sample1	extraction	10	2017-01-01	e1	scanning	scan1	d1
+sample1	extraction	20	2017-01-02	e2	scanning	scan2	d2"""
+        DF = pd.read_csv(StringIO(table_to_load), sep='\t', dtype=str)
+        extraction_plan = isatab.ProcessKeyPlan(
+            DF, ['Protocol REF', 'Parameter Value[volume]', 'Date'], 1)
+        self.assertEqual(extraction_plan.node_column, 'Sample Name')
+        self.assertEqual(extraction_plan.keys(DF), [
+            'sample1:extraction:10:2017-01-01',
+            'sample1:extraction:20:2017-01-02'])
+        self.assertEqual(
+            [extraction_plan.key(row) for _, row in DF.iterrows()],
+            extraction_plan.keys(DF))
+        scanning_plan = isatab.ProcessKeyPlan(
+            DF, ['Protocol REF.1', 'Scan Name'], 3)
+        self.assertEqual(scanning_plan.keys(DF), ['scan1', 'scan2'])
+        self.assertEqual(isatab.process_keygen(
+            'extraction', ['Protocol REF', 'Parameter Value[volume]', 'Date'],
+            1, DF.columns, DF.iloc[0], 0, DF),
+            'sample1:extraction:10:2017-01-01')
+
+    def test_table_chunks(self):
+        table_to_load = """# exported table
+Source Name	Protocol REF	Sample Name	Characteristics[organism]	Term Source REF	Term Accession Number
+
+source1	sample collection	sample1	human	NCBITAXON	9606
+  # comment in the middle
+source2	sample collection	sample2	mouse	NCBITAXON	10090
+source3	sample collection	sample3	rat	NCBITAXON	10116
+"""
+        table_path = os.path.join(self._tmp_dir, 's_chunks.txt')
+        with open(table_path, 'w', encoding='utf-8') as fp:
+            fp.write(table_to_load)
+        chunks = isatab.TableChunks(table_path, chunksize=2)
+        self.assertEqual(chunks.isatab_header[-2:], [
+            'Term Source REF', 'Term Accession Number'])
+        self.assertEqual(chunks.columns[-2:], [
+            'Term Source REF', 'Term Accession Number'])
+        self.assertEqual([list(x) for x in chunks.object_column_map], [
+            ['Source Name'], ['Protocol REF'],
+            ['Sample Name', 'Characteristics[organism]', 'Term Source REF',
+             'Term Accession Number']])
+        batches = list(chunks)
+        self.assertEqual([len(x) for x in batches], [2, 1])
+        for DF in batches:
+            self.assertEqual(list(DF.columns), chunks.columns)
+            self.assertEqual(DF.isatab_header, chunks.isatab_header)
+        self.assertEqual(batches[1]['Sample Name'].tolist(), ['sample3'])
+        with open(table_path, encoding='utf-8') as fp:
+            DF = pd.concat(isatab.load_table_chunks(fp, chunksize=2))
+        with open(table_path, encoding='utf-8') as fp:
+            self.assertTrue(DF.equals(isatab.load_table(fp)))
+
+    def test_create_from_chunks_same_graph_as_create_from_df(self):
+        protocols = [
+            Protocol(name="sample collection"),
+            Protocol(name="extraction", parameters=[
+                ProtocolParameter(parameter_name=OntologyAnnotation(
+                    term="volume"))])]
+        table_to_load = """Source Name	Characteristics[organism]	Protocol REF	Sample Name	Protocol REF	Parameter Value[volume]	Extract Name	Labeled Extract Name	Label	Raw Data File	Derived Data File
+source1	human	sample collection	sample1	extraction	10	e1	le1	Cy3	d1	dd1
+source1	human	sample collection	sample2	extraction	20	e2	le2	Cy5	d2	dd1
+source2	mouse	sample collection	sample3	extraction	10	e3	le3	Cy3	d3	dd2
+source2	mouse	sample collection	sample3	extraction	10	e4	le4	Cy5	d4	dd2
+source3	rat	sample collection	sample4	extraction	10	e5	le5	Cy3	d5	dd3"""
+        table_path = os.path.join(self._tmp_dir, 'a_chunks.txt')
+        with open(table_path, 'w', encoding='utf-8') as fp:
+            fp.write(table_to_load)
+
+        def graph(result):
+            so, sa, om, d, pr, cc, uc = result
+            return (
+                [(k, [(c.category.term, c.value)
+                      for c in v.characteristics]) for k, v in so.items()],
+                [(k, [n.name for n in v.derives_from])
+                 for k, v in sa.items()],
+                list(om.keys()), list(d.keys()),
+                [(k, p.executes_protocol, [n.name for n in p.inputs],
+                  [n.name for n in p.outputs],
+                  [pv.value for pv in p.parameter_values],
+                  p.next_process.executes_protocol
+                  if p.next_process else None)
+                 for k, p in pr.items()],
+                sorted(cc.keys()))
+
+        expected = graph(ProcessSequenceFactory(
+            study_protocols=protocols).create_from_df(
+            isatab.read_tfile(table_path)))
+        for chunksize in (1, 2, 5):
+            self.assertEqual(graph(ProcessSequenceFactory(
+                study_protocols=protocols).create_from_chunks(
+                isatab.TableChunks(table_path, chunksize=chunksize))),
+                expected)
+
+    def test_isatab_load_assays_in_worker_processes(self):
+        investigation = Investigation(identifier='I1')
+        study = Study(filename='s_study.txt', identifier='S1')
+        study.protocols = [
+            Protocol(name='sample collection'),
+            Protocol(name='extraction', parameters=[ProtocolParameter(
+                parameter_name=OntologyAnnotation(term='volume'))])]
+        study.assays = [Assay(filename='a_assay{}.txt'.format(i))
+                        for i in range(3)]
+        investigation.studies = [study]
+        isatab.dump(investigation, self._tmp_dir, skip_dump_tables=True)
+        with open(os.path.join(self._tmp_dir, 's_study.txt'), 'w') as fp:
+            fp.write("""Source Name	Protocol REF	Sample Name
+source1	sample collection	sample1
+source1	sample collection	sample2
+""")
+        for i in range(3):
+            with open(os.path.join(
+                    self._tmp_dir, 'a_assay{}.txt'.format(i)), 'w') as fp:
+                fp.write("""Sample Name	Characteristics[part]	Protocol REF	Parameter Value[volume]	Extract Name	Raw Data File
+sample1	leaf	extraction	{0}	e{0}.1	d{0}.1
+sample2	root	extraction	{0}	e{0}.2	d{0}.2
+""".format(i))
+
+        def graph(investigation):
+            study = investigation.studies[0]
+            samples = dict((id(x), x.name) for x in study.samples)
+            return (
+                [(x.name, [c.value for c in x.characteristics])
+                 for x in study.samples],
+                [[(p.executes_protocol.name,
+                   [samples[id(x)] for x in p.inputs],
+                   [x.name for x in p.outputs],
+                   [(pv.category in study.protocols[1].parameters, pv.value)
+                    for pv in p.parameter_values])
+                  for p in assay.process_sequence]
+                 for assay in study.assays],
+                [[x.filename for x in assay.data_files]
+                 for assay in study.assays])
+
+        expected = graph(isatab.load(self._tmp_dir))
+        self.assertEqual(graph(isatab.load(self._tmp_dir, workers=2)),
+                         expected)
+        self.assertEqual(expected[0][0], ('sample1', ['leaf'] * 3))
+
+    def test_isatab_load_with_annotation_pool(self):
+        investigation = Investigation(identifier='I1')
+        investigation.ontology_source_references = [
+            OntologySource(name='NCBITAXON'), OntologySource(name='UO')]
+        study = Study(filename='s_study.txt', identifier='S1')
+        study.protocols = [Protocol(name='sample collection')]
+        study.assays = [Assay(filename='a_assay{}.txt'.format(i))
+                        for i in range(2)]
+        investigation.studies = [study]
+        isatab.dump(investigation, self._tmp_dir, skip_dump_tables=True)
+        with open(os.path.join(self._tmp_dir, 's_study.txt'), 'w') as fp:
+            fp.write("""Source Name	Characteristics[organism]	Term Source REF	Term Accession Number	Protocol REF	Sample Name
+source1	human	NCBITAXON	9606	sample collection	sample1
+source2	human	NCBITAXON	9606	sample collection	sample2
+source3	mouse	NCBITAXON	10090	sample collection	sample3
+""")
+        for i in range(2):
+            with open(os.path.join(
+                    self._tmp_dir, 'a_assay{}.txt'.format(i)), 'w') as fp:
+                fp.write("""Sample Name	Characteristics[part]	Term Source REF	Term Accession Number	Characteristics[weight]	Unit	Term Source REF	Term Accession Number	Raw Data File
+sample1	leaf		1	5	gram	UO	UO_0000021	d{0}.1
+sample2	leaf		1	6	gram	UO	UO_0000021	d{0}.2
+""".format(i))
+
+        def graph(investigation):
+            study = investigation.studies[0]
+            return ([(x.name, x.characteristics) for x in study.sources],
+                    [(x.name, x.characteristics) for x in study.samples])
+
+        expected = graph(isatab.load(self._tmp_dir))
+        for workers in (None, 2):
+            pool = OntologyAnnotationPool()
+            loaded = isatab.load(self._tmp_dir, workers=workers,
+                                 annotation_pool=pool)
+            self.assertEqual(graph(loaded), expected)
+            study = loaded.studies[0]
+            self.assertIs(study.sources[0].characteristics[0].value,
+                          study.sources[1].characteristics[0].value)
+            self.assertIs(study.samples[0].characteristics[0].value,
+                          study.samples[1].characteristics[-2].value)
+            self.assertIs(study.assays[0].units[0], study.assays[1].units[0])
+            self.assertIs(loaded.ontology_source_references[0],
+                          pool.source(name='NCBITAXON'))
+        self.assertIs(
+            isatab.load(self._tmp_dir, annotation_pool=pool)
+            .studies[0].sources[0].characteristics[0].value,
+            study.sources[0].characteristics[0].value)
+
     def test_isatab_load_issue210_on_MTBLS30(self):
         with open(os.path.join(self._tab_data_dir, 'MTBLS30', 'i_Investigation.txt'), encoding='utf-8') as fp:
             ISA = isatab.load(fp)
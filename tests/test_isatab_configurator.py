@@ -53,3 +53,31 @@ class TestIsaTabConfigurator(unittest.TestCase):
                          .table_name,'metagenome_seq')
         self.assertEqual(configurator.get_config(
             config_dict, 'metagenome sequencing', 'nucleotide sequencing')[0].header, 'Sample Name')
+
+    def test_load_compiled(self):
+        import shutil
+        import tempfile
+        from isatools import isatab
+        from isatools.io import isatab_configurator as configurator
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            for filename in ['studySample.xml', 'metaboliteprofiling_ms.xml']:
+                shutil.copy(os.path.join(isatab.default_config_dir, filename), tmp_dir)
+            config_dict = configurator.load_compiled(tmp_dir)
+            self.assertEqual(2, len(config_dict))
+            config = config_dict[('metabolite profiling', 'mass spectrometry')]
+            self.assertIsInstance(config, configurator.CompiledConfiguration)
+            self.assertIs(config, configurator.compile_config(config))
+            self.assertIs(config, configurator.load_compiled(tmp_dir)[('metabolite profiling', 'mass spectrometry')])
+            self.assertEqual('metaboliteprofiling_ms', config.get_isatab_configuration()[0].table_name)
+            self.assertEqual(['Sample Name', 'Extract Name', 'MS Assay Name'], config.required_headers)
+            self.assertEqual(5, config.field('Label').pos)
+            self.assertIs(config.field('Label'), config.field_ignoring_case('label'))
+            self.assertIsNone(config.field('label'))
+            self.assertEqual(['extraction', 'labeling'],
+                             [i.protocol_type for i in config.protocol_fields_between(0, 5)])
+
+            shutil.copy(os.path.join(isatab.default_config_dir, 'clinical_chemistry.xml'), tmp_dir)
+            self.assertEqual(3, len(configurator.load_compiled(tmp_dir)))
+        finally:
+            shutil.rmtree(tmp_dir)
@@ -1,6 +1,7 @@
 """Tests on isatools.model classes"""
 from __future__ import absolute_import
 import datetime
+import pickle
 import unittest
 
 from isatools.model import *
@@ -222,6 +223,34 @@ class OntologyAnnotationTest(unittest.TestCase):
             hash(expected_other_ontology_annotation), hash(self.ontology_annotation))
 
 
+class OntologyAnnotationPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = OntologyAnnotationPool()
+
+    def test_source(self):
+        source = self.pool.source(name='N', version='1')
+        self.assertEqual(OntologySource(name='N', version='1'), source)
+        self.assertIs(source, self.pool.source(name='N', version='1'))
+        self.assertIsNot(source, self.pool.source(name='N', version='2'))
+
+    def test_annotation(self):
+        source = self.pool.source(name='N')
+        annotation = self.pool.annotation(
+            term='T', term_source=source, term_accession='A')
+        self.assertEqual(OntologyAnnotation(
+            term='T', term_source=OntologySource(name='N'),
+            term_accession='A'), annotation)
+        self.assertIs(annotation, self.pool.annotation(
+            term='T', term_source=source, term_accession='A'))
+        self.assertIsNot(annotation, self.pool.annotation(
+            term='T', term_source=source))
+        self.assertIsNot(annotation, self.pool.annotation(
+            term='T', term_source=OntologySource(name='N'),
+            term_accession='A'))
+        self.assertEqual(4, len(self.pool))
+
+
 class PublicationTest(unittest.TestCase):
 
     def setUp(self):
@@ -446,6 +475,249 @@ class StudyTest(unittest.TestCase):
         self.assertNotEqual(expected_other_study, self.study)
         self.assertNotEqual(hash(expected_other_study), hash(self.study))
 
+    def test_graph_is_cached(self):
+        source = Source(name='source1')
+        sample = Sample(name='sample1')
+        process = Process(inputs=[source], outputs=[sample])
+        self.study.process_sequence = [process]
+        graph = self.study.graph
+        self.assertIs(graph, self.study.graph)
+        self.assertEqual(set(graph.nodes()), {source, process, sample})
+
+    def test_graph_is_rebuilt_after_changes(self):
+        source = Source(name='source1')
+        sample = Sample(name='sample1')
+        process = Process(inputs=[source], outputs=[sample])
+        self.study.process_sequence.append(process)
+        graph = self.study.graph
+
+        sample2 = Sample(name='sample2')
+        process.outputs.append(sample2)
+        self.assertIsNot(graph, self.study.graph)
+        self.assertTrue(self.study.graph.has_edge(process, sample2))
+
+        graph = self.study.graph
+        sample2.characteristics.append(Characteristic(
+            category=OntologyAnnotation(term='organism part'), value='leaf'))
+        self.assertIsNot(graph, self.study.graph)
+        self.assertTrue(self.study.graph.has_node(sample2))
+
+        graph = self.study.graph
+        process2 = Process()
+        plink(process, process2)
+        self.study.process_sequence.append(process2)
+        self.assertIsNot(graph, self.study.graph)
+        self.assertTrue(self.study.graph.has_edge(process, process2))
+
+    def test_graph_is_rebuilt_after_changes_to_node_contents(self):
+        organism = OntologyAnnotation(term='rat')
+        source = Source(name='source1', characteristics=[Characteristic(
+            category=OntologyAnnotation(term='organism'), value=organism)])
+        factor = StudyFactor(name='dose')
+        sample = Sample(name='sample1', factor_values=[
+            FactorValue(factor_name=factor, value='high')])
+        self.study.process_sequence = [
+            Process(inputs=[source], outputs=[sample])]
+
+        self.study.graph
+        organism.term = 'mouse'
+        self.assertIn(source, self.study.graph)
+        self.study.graph
+        organism.term_source = OntologySource(name='NCBITAXON')
+        self.assertIn(source, self.study.graph)
+        self.study.graph
+        organism.term_source.version = '1'
+        self.assertIn(source, self.study.graph)
+        self.study.graph
+        factor.name = 'dosage'
+        self.assertIn(sample, self.study.graph)
+        self.study.graph
+        factor.factor_type = OntologyAnnotation(term='dose')
+        self.assertIn(sample, self.study.graph)
+        comment = Comment(name='note')
+        source.comments.append(comment)
+        self.study.graph
+        comment.name = 'remark'
+        self.assertIn(source, self.study.graph)
+
+    def test_constructor_lists_are_copied(self):
+        # as the setters do, so that changes go through the lists the model
+        # tracks
+        process_sequence = []
+        sources = []
+        inputs = []
+        study = Study(process_sequence=process_sequence, sources=sources)
+        process = Process(inputs=inputs)
+        process_sequence.append(process)
+        sources.append(Source(name='source1'))
+        inputs.append(Source(name='source1'))
+        self.assertEqual(len(study.process_sequence), 0)
+        self.assertEqual(len(study.sources), 0)
+        self.assertEqual(len(process.inputs), 0)
+
+    def test_get_sample_after_changes(self):
+        sample1 = Sample(name='sample1')
+        self.study.samples = [sample1]
+        self.assertIs(self.study.get_sample('sample1'), sample1)
+        self.assertIsNone(self.study.get_sample('sample2'))
+
+        sample2 = Sample(name='sample1')
+        self.study.samples.append(sample2)
+        self.assertIs(self.study.get_sample('sample1'), sample2)
+        self.assertEqual(list(self.study.yield_samples('sample1')),
+                         [sample1, sample2])
+
+        sample2.name = 'sample2'
+        self.assertIs(self.study.get_sample('sample1'), sample1)
+        self.assertIs(self.study.get_sample('sample2'), sample2)
+
+        self.study.samples.remove(sample1)
+        self.assertIsNone(self.study.get_sample('sample1'))
+
+    def test_get_sample_by_characteristic_and_factor_value(self):
+        organism = OntologyAnnotation(term='organism')
+        dose = StudyFactor(name='dose')
+        sample1 = Sample(name='sample1', characteristics=[
+            Characteristic(category=organism, value='human')])
+        sample2 = Sample(name='sample2', characteristics=[
+            Characteristic(category=organism, value='mouse')],
+            factor_values=[FactorValue(factor_name=dose, value=10)])
+        self.study.samples = [sample1, sample2]
+
+        mouse = Characteristic(category=organism, value='mouse')
+        self.assertEqual(
+            list(self.study.yield_samples_by_characteristic(mouse)),
+            [sample2])
+        sample1.characteristics[0].value = 'mouse'
+        self.assertEqual(
+            list(self.study.yield_samples_by_characteristic(mouse)),
+            [sample1, sample2])
+        self.assertIs(self.study.get_sample_by_factor_value(
+            FactorValue(factor_name=StudyFactor(name='dose'), value=10)),
+            sample2)
+        self.assertIsNone(self.study.get_sample_by_factor_value(
+            FactorValue(factor_name=dose, value=20)))
+
+    def test_get_by_characteristic_after_changes_in_place(self):
+        organism = OntologyAnnotation(term='organism')
+        rat = OntologyAnnotation(term='rat')
+        source = Source(name='source1', characteristics=[
+            Characteristic(category=organism, value=rat)])
+        self.study.sources = [source]
+        mouse = Characteristic(category=organism,
+                               value=OntologyAnnotation(term='mouse'))
+        self.assertIsNone(self.study.get_source_by_characteristic(mouse))
+        rat.term = 'mouse'
+        self.assertEqual(
+            list(self.study.yield_sources_by_characteristic(mouse)), [source])
+
+        sample1 = Sample(name='sample1')
+        sample2 = Sample(name='sample2')
+        self.study.samples = [sample1, sample2]
+        self.assertIsNone(self.study.get_sample_by_characteristic(mouse))
+        sample2.characteristics.append(mouse)
+        sample1.characteristics.append(mouse)
+        self.assertEqual(
+            list(self.study.yield_samples_by_characteristic(mouse)),
+            [sample1, sample2])
+        sample1.factor_values = [FactorValue(factor_name=StudyFactor(
+            name='dose'), value=10)]
+        self.assertIs(self.study.get_sample_by_factor_value(
+            FactorValue(factor_name=StudyFactor(name='dose'), value=10)),
+            sample1)
+
+    def test_get_prot_and_get_factor(self):
+        protocol1 = Protocol(name='extraction')
+        protocol2 = Protocol(name='extraction')
+        self.study.protocols = [protocol1, protocol2]
+        self.assertIs(self.study.get_prot('extraction'), protocol1)
+        protocol1.name = 'sample collection'
+        self.assertIs(self.study.get_prot('extraction'), protocol2)
+        self.assertIs(self.study.get_prot('sample collection'), protocol1)
+
+        self.study.add_factor(name='dose', factor_type='dose')
+        self.assertEqual(self.study.get_factor('dose').name, 'dose')
+        self.study.del_factor(name='dose', are_you_sure=True)
+        self.assertIsNone(self.study.get_factor('dose'))
+
+    def test_caches_are_kept_on_changes_to_other_studies(self):
+        other_study = Study(filename='s_other.txt')
+        for study in (self.study, other_study):
+            sample = Sample(name='sample1')
+            study.samples = [sample]
+            study.process_sequence = [
+                Process(inputs=[Source(name='source1')], outputs=[sample])]
+        graph = self.study.graph
+        index = self.study.samples.index_by('name')
+        other_study.graph
+        other_study.get_sample('sample1')
+
+        other_study.samples[0].name = 'sample2'
+        other_study.process_sequence.append(Process())
+        self.assertIs(graph, self.study.graph)
+        self.assertIs(index, self.study.samples.index_by('name'))
+        self.assertIs(other_study.get_sample('sample2'),
+                      other_study.samples[0])
+
+    def test_caches_follow_changes_to_objects_shared_with_other_studies(self):
+        organism = OntologyAnnotation(term='organism')
+        other_study = Study(filename='s_other.txt')
+        for study in (self.study, other_study):
+            source = Source(name='source1', characteristics=[
+                Characteristic(category=organism, value='rat')])
+            study.sources = [source]
+            study.process_sequence = [Process(inputs=[source])]
+            study.graph
+        rat = Characteristic(category=OntologyAnnotation(term='species'),
+                             value='rat')
+        self.assertIsNone(self.study.get_source_by_characteristic(rat))
+
+        graphs = [self.study.graph, other_study.graph]
+        organism.term = 'species'
+        self.assertIsNot(graphs[0], self.study.graph)
+        self.assertIsNot(graphs[1], other_study.graph)
+        self.assertIs(self.study.get_source_by_characteristic(rat),
+                      self.study.sources[0])
+
+    def test_caches_of_pickled_study(self):
+        sample = Sample(name='sample1')
+        self.study.samples = [sample]
+        self.study.process_sequence = [Process(outputs=[sample])]
+        graph = self.study.graph
+        self.study.get_sample('sample1')
+
+        study = pickle.loads(pickle.dumps(self.study))
+        study.samples[0].name = 'sample2'
+        self.assertIs(study.get_sample('sample2'), study.samples[0])
+        self.assertIn(study.samples[0], study.graph)
+        self.assertIs(graph, self.study.graph)
+        self.assertIs(self.study.get_sample('sample1'), sample)
+
+    def test_lookups_while_other_threads_add_samples(self):
+        import threading
+        organism = OntologyAnnotation(term='organism')
+        self.study.samples.index_by('characteristics')
+
+        def add_samples(prefix):
+            for i in range(200):
+                sample = Sample(name='{0}{1}'.format(prefix, i))
+                self.study.samples.append(sample)
+                sample.characteristics.append(
+                    Characteristic(category=organism, value=prefix))
+                self.study.get_sample_by_characteristic(
+                    Characteristic(category=organism, value=prefix))
+
+        threads = [threading.Thread(target=add_samples, args=(prefix,))
+                   for prefix in 'abcd']
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for prefix in 'abcd':
+            self.assertEqual(len(list(
+                self.study.yield_samples_by_characteristic(Characteristic(
+                    category=organism, value=prefix)))), 200)
+
 
 class StudyFactorTest(unittest.TestCase):
 
@@ -902,7 +1174,18 @@ class SampleTest(unittest.TestCase):
         expected_other_sample = Sample(name='S2')
         self.assertNotEqual(expected_other_sample, self.sample)
         self.assertNotEqual(hash(expected_other_sample), hash(self.sample))
-        
+
+    def test_containers_allocated_on_first_use(self):
+        characteristics = self.sample.characteristics
+        characteristics.append(Characteristic(
+            category=OntologyAnnotation(term='organism part'),
+            value=OntologyAnnotation(term='blood')))
+        self.assertIs(characteristics, self.sample.characteristics)
+        self.assertEqual(self.sample, pickle.loads(pickle.dumps(self.sample)))
+        self.assertEqual(self.sample_default,
+                         pickle.loads(pickle.dumps(self.sample_default)))
+        self.assertFalse(hasattr(OntologyAnnotation(), '__dict__'))
+
 
 class ExtractTest(unittest.TestCase):
 
@@ -1077,6 +1360,14 @@ class DataFileTest(unittest.TestCase):
         self.assertNotEqual(expected_other_data_file, self.data_file)
         self.assertNotEqual(hash(expected_other_data_file), hash(self.data_file))
 
+    def test_batch_create_assays(self):
+        assays = batch_create_assays(
+            Material(name='M'),
+            Process(executes_protocol=Protocol(name='extraction')),
+            Extract(name='E'))
+        self.assertEqual(['E-0'], [x.outputs[0].name for x in assays])
+        self.assertIs(assays[0].inputs[0], assays[0].outputs[0].derives_from)
+
 
 class RawDataFileTest(unittest.TestCase):
 
@@ -51,6 +51,45 @@ class TestIsaGraph(unittest.TestCase):
                         sorted(pooling_list),
                         sorted(['#process/Extraction1', '#process/NMR_assay1']))
 
+    def test_detect_isatab_table_process_pooling(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            investigation = Investigation(identifier='I1')
+            study = Study(filename='s_study.txt', identifier='S1')
+            study.protocols = [
+                Protocol(name='sample collection'),
+                Protocol(name='extraction')]
+            study.assays = [Assay(filename='a_assay.txt')]
+            investigation.studies = [study]
+            isatab.dump(investigation, tmp_dir, skip_dump_tables=True)
+            with open(os.path.join(tmp_dir, 's_study.txt'), 'w') as fp:
+                fp.write('Source Name\tProtocol REF\tSample Name\n'
+                         'source1\tsample collection\tsample1\n'
+                         'source1\tsample collection\tsample2\n'
+                         'source2\tsample collection\tsample3\n')
+            with open(os.path.join(tmp_dir, 'a_assay.txt'), 'w') as fp:
+                fp.write('Sample Name\tProtocol REF\tExtract Name\n'
+                         'sample1\textraction\tpool1\n'
+                         'sample2\textraction\tpool1\n'
+                         'sample3\textraction\te3\n')
+            with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp:
+                expected = utils.detect_isatab_process_pooling(fp)
+            with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp:
+                report = utils.detect_isatab_table_process_pooling(fp)
+            self.assertEqual(report, [{'a_assay.txt': ['pool1/extraction']}])
+            # the graph-based report gives the (empty) ids of the processes
+            self.assertEqual(
+                [dict((k, len(v)) for k, v in x.items()) for x in report],
+                [dict((k, len(v)) for k, v in x.items()) for x in expected])
+            with open(os.path.join(tmp_dir, 'a_assay.txt')) as fp:
+                self.assertEqual(
+                    isatab.detect_table_process_pooling(
+                        isatab.load_table(fp),
+                        study_samples={'sample1', 'sample2', 'sample3'}),
+                    ['pool1/extraction'])
+        finally:
+            shutil.rmtree(tmp_dir)
+
     def test_detect_graph_process_pooling_batch_on_mtbls(self):
         for i in range(1, 1):
             try:
@@ -1,7 +1,10 @@
 import unittest
+import json
 import os
 import shutil
+from isatools import isajson
 from isatools.convert import json2isatab
+from isatools.model import *
 from isatools.tests.utils import assert_tab_content_equal
 from isatools.tests import utils
 import tempfile
@@ -106,7 +109,61 @@ class TestJson2IsaTab(unittest.TestCase):
     def test_json2isatab_validate_first(self):
         with open(os.path.join(self._json_data_dir, 'BII-S-7', 'BII-S-7.json')) as json_fp:
             json2isatab.convert(json_fp, self._tmp_dir, validate_first=True)
-        
+
+    def test_json2isatab_convert_timings(self):
+        with open(os.path.join(self._json_data_dir, 'BII-S-3', 'BII-S-3.json')) as json_fp:
+            timings = json2isatab.convert(json_fp, self._tmp_dir, validate_first=True, timings=True)
+        self.assertEqual([t['stage'] for t in timings], ['validate', 'investigation file', 'study tables',
+                                                         'assay tables', 'data files'])
+        with open(os.path.join(self._tmp_dir, 's_BII-S-3.txt')) as out_fp:
+            with open(os.path.join(self._tab_data_dir, 'BII-S-3', 's_BII-S-3.txt')) as reference_fp:
+                self.assertTrue(assert_tab_content_equal(out_fp, reference_fp))
+
+    def test_json2isatab_convert_compact(self):
+        i = Investigation(identifier='i1')
+        obi = OntologySource(name='OBI')
+        i.ontology_source_references.append(obi)
+        s = Study(filename='s_compact.txt', identifier='s1')
+        sample_collection = Protocol(name='sample collection',
+                                     protocol_type=OntologyAnnotation(term='sample collection', term_source=obi))
+        s.protocols.append(sample_collection)
+        s.sources = [Source(name='source-source{}'.format(n)) for n in range(2)]
+        s.samples = [Sample(name='sample-sample{}'.format(n)) for n in range(2)]
+        for source, sample in zip(s.sources, s.samples):
+            s.process_sequence.append(Process(executes_protocol=sample_collection, inputs=[source], outputs=[sample]))
+        i.studies = [s]
+        reports = []
+        for compact in (False, True):
+            json_dir = os.path.join(self._tmp_dir, 'compact' if compact else 'full')
+            os.makedirs(os.path.join(json_dir, 'isatab'))
+            json_path = os.path.join(json_dir, 'i.json')
+            with open(json_path, 'w') as json_fp:
+                json.dump(i, json_fp, cls=isajson.ISAJSONEncoder, compact=compact)
+            with open(json_path) as json_fp:
+                reports.append(isajson.validate(json_fp))
+            self.assertEqual(reports[-1]['errors'], [])
+            with open(json_path) as json_fp:
+                self.assertIsNotNone(json2isatab.convert(json_fp, os.path.join(json_dir, 'isatab'), timings=True))
+        self.assertEqual(reports[1], reports[0])
+        self.assertNotIn(3007, [w['code'] for w in reports[1]['warnings']])
+        with open(os.path.join(self._tmp_dir, 'compact', 'isatab', 's_compact.txt')) as out_fp:
+            with open(os.path.join(self._tmp_dir, 'full', 'isatab', 's_compact.txt')) as reference_fp:
+                self.assertEqual(out_fp.read(), reference_fp.read())
+
+    def test_json2isatab_convert_missing_required_member(self):
+        i = Investigation(identifier='i1', title='Investigation 1', description='An investigation')
+        i.studies = [Study(filename='s_required.txt', identifier='s1', title='Study 1', description='A study')]
+        isa_json = json.loads(json.dumps(i, cls=isajson.ISAJSONEncoder, compact=True))
+        del isa_json['title']
+        del isa_json['studies'][0]['identifier']
+        json_path = os.path.join(self._tmp_dir, 'i.json')
+        with open(json_path, 'w') as json_fp:
+            json.dump(isa_json, json_fp)
+        with open(json_path) as json_fp:
+            self.assertIn(3, [e['code'] for e in isajson.validate(json_fp)['errors']])
+        with open(json_path) as json_fp:
+            self.assertIsNone(json2isatab.convert(json_fp, self._tmp_dir))
+
     def test_json2isatab_convert_bii_i_1_investigation(self):
         with open(os.path.join(self._json_data_dir, 'BII-I-1', 'BII-I-1.json')) as json_fp:
             json2isatab.convert(json_fp, self._tmp_dir)
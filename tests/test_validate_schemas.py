@@ -2,7 +2,14 @@ import unittest
 import os
 import json
 import glob
+import shutil
+import tempfile
+import threading
+from unittest import mock
 from jsonschema import Draft4Validator
+from jsonschema import ValidationError
+
+from isatools.io import json_schemas
 
 
 class TestIsaJsonSchemas(unittest.TestCase):
@@ -35,3 +42,43 @@ class TestIsaJsonSchemas(unittest.TestCase):
     def test_cedar_schemas(self):
         folder = os.path.join(self._schemas_dir, "cedar")
         self.validateSchemasInFolder(folder)
+
+
+class TestJsonSchemaRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.mkdtemp()
+        core_dir = os.path.dirname(json_schemas.CORE_INVESTIGATION_SCHEMA)
+        for schema_file in glob.glob(os.path.join(core_dir, '*.json')):
+            shutil.copy(schema_file, self._tmp_dir)
+        self._schema_path = os.path.join(self._tmp_dir, 'investigation_schema.json')
+
+    def tearDown(self):
+        shutil.rmtree(self._tmp_dir)
+
+    def test_get_validator(self):
+        validator = json_schemas.get_validator(self._schema_path)
+        self.assertIs(json_schemas.get_validator(self._schema_path), validator)
+        validator.validate({"people": [{"comments": [{"name": "x", "value": "y"}]}]})
+        self.assertRaises(ValidationError, validator.validate, {"people": [{"comments": [{"name": 1}]}]})
+        validators = []
+        thread = threading.Thread(target=lambda: validators.append(json_schemas.get_validator(self._schema_path)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(validators[0], validator)
+        comment_schema_path = os.path.join(self._tmp_dir, 'comment_schema.json')
+        with open(comment_schema_path) as fp:
+            comment_schema = json.load(fp)
+        comment_schema['properties']['name'] = {"type": "integer"}
+        with open(comment_schema_path, 'w') as fp:
+            json.dump(comment_schema, fp)
+        stat = os.stat(comment_schema_path)
+        os.utime(comment_schema_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        validator = json_schemas.get_validator(self._schema_path)
+        validator.validate({"people": [{"comments": [{"name": 1}]}]})
+
+    def test_warm(self):
+        json_schemas.warm([self._schema_path])
+        with mock.patch('builtins.open', side_effect=AssertionError('schema file read after warm()')):
+            json_schemas.get_validator(self._schema_path).validate(
+                {"studies": [{"assays": [{"comments": [{"name": "x"}]}]}]})
@@ -1,5 +1,8 @@
 import unittest
+from unittest import mock
 from isatools import isajson, isatab
+from isatools.model import *
+from isatools.validation import ValidationReport
 import os
 from isatools.tests import utils
 import tempfile
@@ -303,6 +306,41 @@ class TestValidateIsaJson(unittest.TestCase):
             if 4004 not in [e['code'] for e in report['warnings']]:
                 self.fail("Validation passed against transcription_seq.json configuration, when it should have failed")
 
+    def test_validate_isajson_rules_on_index(self):
+        """Tests that rules 1005, 1006 and 3010 report the same against the index validate() builds"""
+        import json
+        s = Study(filename='s_index.txt')
+        sample_collection_protocol = Protocol(name='sample collection',
+                                              protocol_type=OntologyAnnotation(term='sample collection'))
+        s.protocols.append(sample_collection_protocol)
+        s.sources = [Source(name='source-source{}'.format(n)) for n in range(2)]
+        s.samples = [Sample(name='sample-sample{}'.format(n)) for n in range(2)]
+        for source, sample in zip(s.sources, s.samples):
+            sample_collection_process = Process(executes_protocol=sample_collection_protocol)
+            sample_collection_process.inputs = [source]
+            sample_collection_process.outputs = [sample]
+            s.process_sequence.append(sample_collection_process)
+        isa_json = json.loads(json.dumps(Investigation(studies=[s]), cls=isajson.ISAJSONEncoder))
+        study_json = isa_json['studies'][0]
+        del study_json['materials']['samples'][1]
+        study_json['processSequence'][1]['previousProcess'] = {'@id': '#process/missing'}
+        study_json['protocols'][0]['protocolType']['termAccession'] = 'OBI:0000659'
+
+        index = isajson._ISAJSONIndex(isa_json)
+        report, index_report = ValidationReport(), ValidationReport()
+        isajson.check_material_ids_not_declared_used(study_json, report=report)
+        isajson.check_material_ids_not_declared_used(study_json, report=index_report, index=index.studies[0])
+        isajson.check_process_sequence_links(study_json['processSequence'], report=report)
+        isajson.check_process_sequence_links(study_json['processSequence'], report=index_report,
+                                             index=index.studies[0].process_sequence)
+        isajson.check_term_accession_used_no_source_ref(isa_json, report=report)
+        isajson.check_term_accession_used_no_source_ref(isa_json, report=index_report, index=index)
+        self.assertEqual([1005, 1006], [e['code'] for e in report.errors])
+        self.assertIn("'#sample/1'", report.errors[0]['supplemental'])
+        self.assertEqual([3010], [e['code'] for e in report.warnings])
+        self.assertEqual(report.errors, index_report.errors)
+        self.assertEqual(report.warnings, index_report.warnings)
+
 
 class TestValidateIsaTab(unittest.TestCase):
 
@@ -336,6 +374,193 @@ class TestValidateIsaTab(unittest.TestCase):
             elif len(report['errors'] + report['warnings']) == 0:
                 self.fail("Validation error and warnings are missing when should report some with BII-S-7")
 
+    @staticmethod
+    def _write_archive(tmp_dir, assay_filename='a_assay.txt'):
+        investigation = Investigation(identifier='I1')
+        study = Study(filename='s_study.txt', identifier='S1')
+        study.protocols = [
+            Protocol(name='sample collection', protocol_type=OntologyAnnotation(term='sample collection')),
+            Protocol(name='extraction', protocol_type=OntologyAnnotation(term='extraction'))]
+        study.factors = [StudyFactor(name='dose', factor_type=OntologyAnnotation(term='dose'))]
+        study.assays = [Assay(filename=assay_filename,
+                              measurement_type=OntologyAnnotation(term='metabolite profiling'),
+                              technology_type=OntologyAnnotation(term='mass spectrometry'))]
+        investigation.studies = [study]
+        isatab.dump(investigation, tmp_dir, skip_dump_tables=True)
+        with open(os.path.join(tmp_dir, 's_study.txt'), 'w') as fp:
+            fp.write("""Source Name	Protocol REF	Sample Name	Factor Value[dose]
+source1	sample collection	sample1	low
+source2	sample collection	sample2	high
+""")
+        with open(os.path.join(tmp_dir, 'a_assay.txt'), 'w') as fp:
+            fp.write("""Sample Name	Protocol REF	Extract Name	Raw Spectral Data File
+sample1	extraction	e1	d1
+sample2	extraction	e2	d2
+""")
+
+    def test_validate_isatab_loads_each_table_once(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            self._write_archive(tmp_dir)
+            with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp, \
+                    mock.patch.object(isatab, 'load_table', wraps=isatab.load_table) as load_table:
+                report = isatab.validate(fp)
+            self.assertTrue(report['validation_finished'])
+            self.assertEqual(2, load_table.call_count)
+
+            tables = isatab.TableCache(tmp_dir)
+            table = tables.get('s_study.txt')
+            self.assertIs(table, tables.get('s_study.txt'))
+            chunks = list(tables.chunks('s_study.txt'))
+            self.assertEqual(1, len(chunks))
+            self.assertIs(table, chunks[0])
+            self.assertEqual(['Factor Value[dose]'], tables.columns('s_study.txt', isatab._RX_FACTOR_VALUE))
+            self.assertEqual(['Sample Name'], list(next(isatab.TableCache(tmp_dir).chunks('a_assay.txt')).columns[:1]))
+            self.assertRaises(FileNotFoundError, tables.get, 'a_missing.txt')
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_study_symbol_tables(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            self._write_archive(tmp_dir)
+            with open(os.path.join(tmp_dir, 'a_assay.txt'), 'a') as fp:
+                fp.write('sample3\tnormalization\te3\td3\n')
+            with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp:
+                i_df = isatab.load_investigation(fp)
+            study, = isatab.study_symbol_tables(i_df, isatab.TableCache(tmp_dir))
+            self.assertEqual(['s_study.txt', 'a_assay.txt'], study.filenames)
+            self.assertEqual({'sample collection', 'extraction'}, study.protocols_declared)
+            self.assertEqual({'sample1', 'sample2'}, study.samples('s_study.txt'))
+            self.assertEqual({'sample1', 'sample2', 'sample3'}, study.samples('a_assay.txt'))
+            self.assertEqual({'extraction', 'normalization'}, study.protocol_refs('a_assay.txt'))
+            self.assertEqual({'dose'}, study.factors('s_study.txt'))
+            self.assertEqual(set(), study.factors('a_assay.txt'))
+            self.assertEqual({'sample collection', 'extraction', 'normalization'}, study.used(study.protocol_refs))
+
+            report = isatab.ValidationReport()
+            isatab.check_protocol_usage(i_df, tmp_dir, report=report)
+            self.assertEqual([1007], [x['code'] for x in report.errors])
+            self.assertIn("['normalization']", report.errors[0]['supplemental'])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_validate_isatab_rule_selection(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            self._write_archive(tmp_dir, assay_filename='a_missing.txt')
+            with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp:
+                expected = isatab.validate(fp)
+            self.assertEqual([8], [x['code'] for x in expected['errors']])
+            self.assertNotIn('timings', expected)
+
+            with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp:
+                report = isatab.validate(fp, rules=['1xxx'], timings=True)
+            self.assertEqual([], report['errors'])
+            self.assertTrue(all(str(x['code']).startswith('1') for x in report['warnings']))
+            self.assertTrue(report['validation_finished'])
+            timed = [x['rule'] for x in report['timings']]
+            self.assertIn('check_protocol_usage', timed)
+            self.assertIn('check_protocol_fields', timed)
+            self.assertNotIn('check_field_values', timed)
+            self.assertNotIn('check_filenames_present', timed)
+
+            with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp:
+                report = isatab.validate(fp, rules=['3005'], timings=True)
+            self.assertEqual(['load_investigation', 'check_filenames_present'],
+                             [x['rule'] for x in report['timings']])
+
+            with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp:
+                report = isatab.validate(fp, skip_rules=['0008'])
+            self.assertEqual([], report['errors'])
+            self.assertEqual(expected['warnings'], report['warnings'])
+
+            with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp:
+                report = isatab.validate(fp, fail_fast=True, timings=True)
+            self.assertEqual(expected['errors'], report['errors'])
+            self.assertFalse(report['validation_finished'])
+            self.assertEqual('check_table_files_read', report['timings'][-1]['rule'])
+
+            with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp:
+                self.assertRaises(ValueError, isatab.validate, fp, rules=['10x'])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_validate_isatab_incremental(self):
+        tmp_dir, cache_dir = tempfile.mkdtemp(), tempfile.mkdtemp()
+        try:
+            self._write_archive(tmp_dir)
+
+            def validate(cache_dir=None):
+                with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp, \
+                        mock.patch.object(isatab, 'load_table', wraps=isatab.load_table) as load_table:
+                    return isatab.validate(fp, cache_dir=cache_dir), load_table.call_count
+
+            expected, _ = validate()
+            self.assertEqual((expected, 2), validate(cache_dir))
+            self.assertEqual((expected, 0), validate(cache_dir))
+            with open(os.path.join(tmp_dir, 'a_assay.txt'), 'a') as fp:
+                fp.write('sample3\textraction\te3\td3\n')
+            expected, _ = validate()
+            self.assertIn(1003, [x['code'] for x in expected['warnings']])
+            self.assertEqual((expected, 1), validate(cache_dir))
+            self.assertEqual((expected, 0), validate(cache_dir))
+        finally:
+            shutil.rmtree(tmp_dir)
+            shutil.rmtree(cache_dir)
+
+    def test_validate_isatab_field_values_in_row_order(self):
+        import pandas as pd
+        fields = [mock.Mock(header='Sample Name', data_type='String', is_required=True, pos=0),
+                  mock.Mock(header='Parameter Value[runs]', data_type='Integer', is_required=True, pos=1),
+                  mock.Mock(header='Extract Name', data_type='String', is_required=True, pos=3)]
+        cfg = mock.Mock()
+        cfg.get_isatab_configuration.return_value = [mock.Mock(get_field=mock.Mock(return_value=fields),
+                                                               get_protocol_field=mock.Mock(return_value=[]),
+                                                               get_unit_field=mock.Mock(return_value=[]))]
+        table = pd.DataFrame({'Sample Name': ['s1', 's2', '', 's4'],
+                              'Parameter Value[runs]': ['1', '', 'x', 'y'],
+                              'Extract Name': ['', 'e2', 'e3', '']},
+                             columns=['Sample Name', 'Parameter Value[runs]', 'Extract Name'])
+        table.filename = 'a_assay.txt'
+        report = ValidationReport()
+        self.assertFalse(isatab.check_field_values(table, cfg, report=report))
+        # the checks stop at the first invalid value, in row order
+        self.assertEqual([(4012, "Missing value for the required field 'Extract Name' in the file 'a_assay.txt'"),
+                          (4012, "Missing value for the required field 'Parameter Value[runs]' in the file "
+                                 "'a_assay.txt'"),
+                          (4012, "Missing value for the required field 'Sample Name' in the file 'a_assay.txt'"),
+                          (4011, "Invalid value 'x' for type 'integer' of the field 'Parameter Value[runs]'")],
+                         [(x['code'], x['supplemental']) for x in report.warnings])
+
+        table['Parameter Value[runs]'] = ['1', '2', '3', '4']
+        report = ValidationReport()
+        self.assertTrue(isatab.check_field_values(table, cfg, report=report))
+        self.assertEqual(['Extract Name', 'Sample Name', 'Extract Name'],
+                         [x['supplemental'].split("'")[1] for x in report.warnings])
+
+    def test_validate_isatab_concurrently(self):
+        from concurrent.futures import ThreadPoolExecutor
+        tmp_dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        try:
+            self._write_archive(tmp_dirs[0])
+            self._write_archive(tmp_dirs[1], assay_filename='a_missing.txt')
+
+            def validate(tmp_dir):
+                with open(os.path.join(tmp_dir, 'i_investigation.txt')) as fp:
+                    return isatab.validate(fp)
+
+            expected = [validate(tmp_dir) for tmp_dir in tmp_dirs]
+            self.assertNotEqual(expected[0]['errors'], expected[1]['errors'])
+            handlers = list(isatab.log.handlers)
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                reports = list(executor.map(validate, tmp_dirs * 4))
+            self.assertEqual(expected * 4, reports)
+            self.assertEqual(handlers, isatab.log.handlers)
+        finally:
+            for tmp_dir in tmp_dirs:
+                shutil.rmtree(tmp_dir)
+
 
 class TestStudyGroupsValidationIsaTab(unittest.TestCase):
 
@@ -458,6 +683,31 @@ class TestBatchValidateIsaTab(unittest.TestCase):
         batch_report = isatab.batch_validate(self._bii_tab_dir_list)
         self.assertTrue(len([f['filename'] for f in batch_report['batch_report']]) == len(self._bii_tab_dir_list))
 
+    def test_batch_validate_workers(self):
+        import json
+        tab_dirs = [os.path.join(self._tmp_dir, x) for x in ['valid', 'missing_assay', 'empty', 'broken']]
+        for tab_dir in tab_dirs:
+            os.mkdir(tab_dir)
+        TestValidateIsaTab._write_archive(tab_dirs[0])
+        TestValidateIsaTab._write_archive(tab_dirs[1], assay_filename='a_missing.txt')
+        os.mkdir(os.path.join(tab_dirs[3], 'i_investigation.txt'))
+
+        batch_report = isatab.batch_validate(tab_dirs)
+        self.assertEqual([os.path.join(tab_dirs[0], 'i_investigation.txt'),
+                          os.path.join(tab_dirs[1], 'i_investigation.txt'), tab_dirs[3]],
+                         [x['filename'] for x in batch_report['batch_report']])
+        self.assertEqual(0, len(batch_report['batch_report'][0]['report']['errors']))
+        self.assertEqual([8], [x['code'] for x in batch_report['batch_report'][1]['report']['errors']])
+        self.assertFalse(batch_report['batch_report'][2]['report']['validation_finished'])
+        self.assertEqual([0], [x['code'] for x in batch_report['batch_report'][2]['report']['errors']])
+        self.assertEqual(batch_report, isatab.batch_validate(tab_dirs, workers=2))
+
+        entries = list(isatab.iter_batch_validate(tab_dirs, workers=2))
+        self.assertEqual(sorted(batch_report['batch_report'], key=lambda x: x['filename']),
+                         sorted(entries, key=lambda x: x['filename']))
+        for entry in entries:
+            self.assertEqual(entry, json.loads(json.dumps(entry)))
+
 
 class TestBatchValidateIsaJson(unittest.TestCase):
 